@@ -0,0 +1,131 @@
+"""
+전처리 파이프라인 처리량 벤치마크 (루트 디렉토리에서 실행)
+청크 분할 → 임베딩 → FAISS 저장 단계별 처리량과 저장된 인덱스의 검색 지연 시간을 측정합니다.
+
+기본은 로컬 임베딩 백엔드(EMBEDDING_BACKEND=local)와 합성 인정기준 데이터를 사용하므로
+AWS 자격 증명이나 네트워크 없이 실행되며, 결과는 임시 디렉토리에 저장되어 현재 인덱스를 건드리지 않습니다.
+
+사용법:
+    python benchmark_ingestion.py
+    python benchmark_ingestion.py --items 5000 --dimensions 512
+    python benchmark_ingestion.py --data ./data/raw/sample_criteria.json
+    python benchmark_ingestion.py --backend bedrock --items 200   # Bedrock 호출 (요금 발생)
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from tools.env import load_env
+from tools.embedding_backend import create_embedder
+from tools.faiss_retriever import FAISSRetriever
+from pipeline import DataPreprocessor
+
+# 환경 변수 로드
+load_env()
+
+# 합성 데이터에 쓰는 어휘
+_WORDS = (
+    "인공관절", "고관절", "슬관절", "전치환술", "재치환술", "척추", "고정술", "스텐트", "카테터", "도관",
+    "급여", "비급여", "인정", "산정", "심사", "적응증", "환자", "시술", "재료", "수술",
+    "방사선", "영상", "소견", "확인", "경우", "이상", "이하", "개월", "1회", "추가"
+)
+
+
+def synthetic_items(count: int, seed: int = 0) -> list:
+    """pipeline.DataPreprocessor 입력 형식의 합성 인정기준 항목"""
+    rng = random.Random(seed)
+    
+    def sentence(length: int) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(length)) + "."
+    
+    items = []
+    for i in range(count):
+        items.append({
+            "id": f"synthetic_{i}",
+            "재료코드": f"J{i:05d}",
+            "재료명": sentence(3),
+            "시술코드": f"N{i % 997:04d}",
+            "시술명": sentence(3),
+            "인정기준": " ".join(sentence(12) for _ in range(4)),
+            "제외사항": " ".join(sentence(10) for _ in range(2)),
+            "심사기준": " ".join(sentence(10) for _ in range(3)),
+            "근거법령": sentence(6),
+            "참고사항": sentence(8) if i % 2 == 0 else ""
+        })
+    return items
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{seconds:.2f}s ({count / seconds if seconds > 0 else float('inf'):.0f}개/s)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전처리 파이프라인 처리량 벤치마크")
+    parser.add_argument("--backend", default="local", help="임베딩 백엔드 (local/bedrock)")
+    parser.add_argument("--items", type=int, default=2000, help="합성 인정기준 항목 수")
+    parser.add_argument("--data", default=None, help="합성 데이터 대신 사용할 인정기준 JSON")
+    parser.add_argument("--dimensions", type=int, default=None, help="임베딩 차원 (기본 EMBEDDING_DIMENSIONS)")
+    parser.add_argument("--queries", type=int, default=200, help="검색 지연 시간 측정 질의 수")
+    args = parser.parse_args()
+    
+    if args.dimensions:
+        os.environ["EMBEDDING_DIMENSIONS"] = str(args.dimensions)
+    
+    embedder = create_embedder(args.backend)
+    if args.data:
+        with open(args.data, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+        source = args.data
+    else:
+        items = synthetic_items(args.items)
+        source = "합성 데이터"
+    
+    print("=" * 60)
+    print(f"전처리 처리량 벤치마크: {source} ({len(items)}개 항목)")
+    print(f"임베딩 백엔드: {embedder.embedding_model_id} ({embedder.dimensions}차원)")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory(prefix="ingestion_bench_") as vector_store_path:
+        preprocessor = DataPreprocessor(embedder=embedder)
+        preprocessor.vector_store_path = vector_store_path
+        
+        start = time.perf_counter()
+        chunks = preprocessor.create_chunks(items)
+        chunk_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        preprocessor.create_embeddings(chunks)
+        embed_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        preprocessor.save_to_faiss(chunks)
+        index_time = time.perf_counter() - start
+        
+        retriever = FAISSRetriever(embedder=embedder, vector_store_path=vector_store_path)
+        queries = [chunk['text'][:80] for chunk in random.Random(1).sample(chunks, min(args.queries, len(chunks)))]
+        start = time.perf_counter()
+        for query in queries:
+            retriever.search(query)
+        search_time = time.perf_counter() - start
+    
+    total = chunk_time + embed_time + index_time
+    print()
+    print("=" * 60)
+    print(f"청크 분할: {_rate(len(items), chunk_time)} → {len(chunks)}개 청크")
+    print(f"임베딩:    {_rate(len(chunks), embed_time)}")
+    print(f"FAISS 저장: {_rate(len(chunks), index_time)}")
+    print(f"전체:      {_rate(len(chunks), total)}")
+    print(f"검색:      질의당 {search_time / max(1, len(queries)) * 1000:.2f}ms ({len(queries)}개 질의, 임베딩 포함)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
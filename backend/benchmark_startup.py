@@ -0,0 +1,133 @@
+"""
+API 서버 시작 시간 벤치마크 (루트 디렉토리에서 실행)
+run_server.py 프로세스 시작부터 /api/health가 응답할 때까지(import → 엔진 로드 → 준비 완료)의
+시간을 여러 번 측정하고, 서빙 경로에서 로드되는 무거운 모듈을 확인합니다.
+
+사용법:
+    python benchmark_startup.py            # 5회 측정
+    python benchmark_startup.py --runs 10 --imports
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# api.main import 시점에 로드되면 안 되는 모듈
+# (전처리/PDF 스택은 첫 전처리 작업에서, 임베더/FAISS 검색기는 lifespan의 엔진 생성 시 로드)
+DEFERRED_MODULES = (
+    "pipeline", "pipeline_pdf", "pipeline_pdf_batch", "pipeline_pdf_incremental",
+    "tools.document_loader", "tools.embedder_tool", "tools.faiss_retriever",
+    "pdfplumber", "fitz", "langchain_core", "langchain_aws"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready_time(timeout: float = 120.0) -> float:
+    """
+    run_server.py를 실행하고 /api/health가 200을 반환할 때까지 걸린 시간(초)
+    
+    Args:
+        timeout: 최대 대기 시간(초)
+    
+    Returns:
+        프로세스 시작부터 준비 완료까지의 시간(초)
+    """
+    port = _free_port()
+    env = dict(os.environ, API_HOST="127.0.0.1", API_PORT=str(port))
+    url = f"http://127.0.0.1:{port}/api/health"
+    
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "run_server.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"서버가 종료되었습니다 (exit code {process.returncode})")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"{timeout}초 안에 서버가 준비되지 않았습니다")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def report_imports(top: int = 15):
+    """api.main import 시간 상위 모듈과 import 시점에 로드된 DEFERRED_MODULES 출력"""
+    code = (
+        "import sys, api.main; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.join(BACKEND_DIR, "src"),
+        capture_output=True,
+        text=True
+    )
+    
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    
+    print(f"\napi.main import 시간 상위 {top}개 모듈 (누적, ms)")
+    for cumulative, name in rows[:top]:
+        print(f"  {cumulative / 1000:8.1f}  {name}")
+    
+    loaded = result.stdout.strip()
+    if loaded:
+        print(f"\n[WARNING] api.main import 시점에 로드됨: {loaded}")
+    else:
+        print("\n[OK] api.main import 시점에 전처리/PDF/검색 모듈을 로드하지 않음")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 서버 시작 시간 벤치마크")
+    parser.add_argument("--runs", type=int, default=5, help="측정 횟수")
+    parser.add_argument("--imports", action="store_true", help="import 시간 상위 모듈도 출력")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print("API 서버 시작 시간 벤치마크 (run_server.py → /api/health)")
+    print("=" * 60)
+    
+    times = []
+    for i in range(args.runs):
+        elapsed = measure_ready_time()
+        times.append(elapsed)
+        print(f"  {i + 1}회: {elapsed:.3f}초")
+    
+    print(f"\n중앙값 {statistics.median(times):.3f}초 / 최소 {min(times):.3f}초 / 최대 {max(times):.3f}초")
+    
+    if args.imports:
+        report_imports()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+2단계(저차원 후보 → 전체 차원 재채점) 벡터 검색 벤치마크 (루트 디렉토리에서 실행)
+전체 차원 검색 결과 대비 recall@k, 검색 지연 시간, INDEX_MMAP 설정별 상주 벡터 메모리를 비교하여
+FAISS_COARSE_DIMENSIONS / FAISS_COARSE_CANDIDATES 값을 정할 때 사용합니다.
+
+현재 FAISS 인덱스(VECTOR_STORE_PATH)가 있으면 저장된 벡터 근처의 질의로, 없으면 합성 데이터로 측정합니다.
+
+사용법:
+    python benchmark_vector_search.py
+    python benchmark_vector_search.py --coarse-dims 256 512 --candidates 5 10 20 --k 10
+    python benchmark_vector_search.py --synthetic 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+import faiss
+
+from tools.env import load_env
+from tools.faiss_retriever import build_coarse_index, two_stage_search
+
+# 환경 변수 로드
+load_env()
+
+
+def synthetic_vectors(count: int, dimensions: int = 1024, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """주제별로 모인 정규화 벡터 (실제 문서 임베딩처럼 군집 구조)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimensions)).astype('float32')
+    vectors = centers[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dimensions)).astype('float32')
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def sample_queries(vectors: np.ndarray, count: int, noise: float = 0.3, seed: int = 1) -> np.ndarray:
+    """저장된 벡터에 잡음을 더한 질의 (비슷한 문서를 찾는 질의)"""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)].copy()
+    queries += noise * rng.standard_normal(queries.shape).astype('float32') / np.sqrt(vectors.shape[1])
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def evaluate(index, queries: np.ndarray, k: int, coarse_dimensions: int, candidates: int) -> dict:
+    """
+    전체 차원 검색 대비 2단계 검색의 recall@k와 질의당 지연 시간
+    
+    Args:
+        index: 전체 차원 FAISS 인덱스
+        queries: (n, d) 질의 벡터
+        k: 결과 수
+        coarse_dimensions: 저차원 인덱스 차원
+        candidates: 결과 수 대비 후보 배수
+    
+    Returns:
+        {"recall", "exact_ms", "two_stage_ms", "full_bytes", "coarse_bytes"}
+    """
+    coarse_index = build_coarse_index(index, coarse_dimensions)
+    
+    exact, exact_time = [], 0.0
+    approx, approx_time = [], 0.0
+    for query in queries:
+        query = query[None, :]
+        start = time.perf_counter()
+        _, ids = index.search(query, k)
+        exact_time += time.perf_counter() - start
+        exact.append(set(ids[0].tolist()))
+        
+        start = time.perf_counter()
+        _, ids = two_stage_search(index, coarse_index, query, k, candidates)
+        approx_time += time.perf_counter() - start
+        approx.append(set(ids[0].tolist()))
+    
+    recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact)])
+    return {
+        "recall": float(recall),
+        "exact_ms": exact_time / len(queries) * 1000,
+        "two_stage_ms": approx_time / len(queries) * 1000,
+        "full_bytes": index.ntotal * index.d * 4,
+        "coarse_bytes": coarse_index.ntotal * coarse_dimensions * 4
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="2단계 벡터 검색 recall/지연 시간 벤치마크")
+    parser.add_argument("--coarse-dims", type=int, nargs="+", default=[256], help="저차원 인덱스 차원")
+    parser.add_argument("--candidates", type=int, nargs="+", default=[10], help="결과 수 대비 후보 배수")
+    parser.add_argument("--k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--queries", type=int, default=200, help="질의 수")
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 벡터 수 (0이면 현재 인덱스 사용)")
+    args = parser.parse_args()
+    
+    index_path = os.path.join(os.getenv("VECTOR_STORE_PATH", "./data/vector_store"), "faiss_index.bin")
+    if not args.synthetic and os.path.exists(index_path):
+        index = faiss.read_index(index_path)
+        source = index_path
+    else:
+        index = faiss.IndexFlatL2(1024)
+        index.add(synthetic_vectors(args.synthetic or 20000))
+        source = "합성 데이터"
+    queries = sample_queries(index.reconstruct_n(0, index.ntotal), args.queries)
+    
+    print("=" * 60)
+    print(f"2단계 벡터 검색 벤치마크: {source}")
+    print(f"벡터 {index.ntotal}개 x {index.d}차원 ({index.ntotal * index.d * 4 / 1024 / 1024:.1f}MB), recall@{args.k}")
+    print("=" * 60)
+    
+    def mb(size: int) -> str:
+        return f"{size / 1024 / 1024:.1f}MB"
+    
+    for coarse_dimensions in args.coarse_dims:
+        for candidates in args.candidates:
+            result = evaluate(index, queries, args.k, coarse_dimensions, candidates)
+            full, coarse = result["full_bytes"], result["coarse_bytes"]
+            print(
+                f"  {coarse_dimensions}차원 x 후보 {candidates}배: "
+                f"recall {result['recall']:.3f}, "
+                f"{result['exact_ms']:.2f}ms → {result['two_stage_ms']:.2f}ms"
+            )
+            # INDEX_MMAP=false면 전체 인덱스가 메모리에 그대로 있고 저차원 인덱스가 추가됨
+            # INDEX_MMAP=true면 전체 벡터는 매핑된 파일(페이지 캐시 공유)에서 후보만 읽음
+            print(
+                f"    상주 벡터 INDEX_MMAP=false: {mb(full + coarse)} (전체 {mb(full)} + 저차원 {mb(coarse)}), "
+                f"INDEX_MMAP=true: {mb(coarse)} (전체 {mb(full)}는 mmap)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+기존 인덱스(faiss_index.bin, metadata.pkl, bm25_index.pkl)로부터 mmap 저장소 생성
+INDEX_MMAP=true로 여러 워커를 실행할 때, 파이프라인을 다시 돌리지 않고 mmap 파일만 만들 때 사용
+"""
+
+import os
+import sys
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from tools.env import load_env
+from tools.mmap_store import export_mmap_store
+
+# 환경 변수 로드
+load_env()
+
+
+def build_mmap_store():
+    """pickle 인덱스를 mmap 저장소로 내보내기"""
+    
+    print("=" * 60)
+    print("mmap 저장소 생성 시작")
+    print("=" * 60)
+    
+    vector_store_path = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
+    directory = export_mmap_store(vector_store_path)
+    
+    if directory is None:
+        print("먼저 데이터 전처리를 실행해주세요.")
+        return
+    
+    print("\n" + "=" * 60)
+    print("mmap 저장소 생성 완료!")
+    print("=" * 60)
+    print("\n.env에 INDEX_MMAP=true를 설정하고 서버를 시작(또는 POST /api/admin/reload)하세요.")
+
+
+if __name__ == "__main__":
+    try:
+        build_mmap_store()
+    except Exception as e:
+        print(f"\n오류 발생: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
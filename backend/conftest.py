@@ -0,0 +1,116 @@
+"""
+테스트 공용 가짜 객체와 픽스처
+가짜 임베더/검색기/답변 에이전트와 작은 벡터 스토어(FAISS 인덱스, metadata.pkl, bm25_index.pkl)
+
+각 테스트 모듈은 요청별로 다른 동작만 하위 클래스로 덧붙여 사용합니다.
+"""
+
+import sys
+import os
+import pickle
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import faiss
+import numpy as np
+import pytest
+
+from tools.bm25_retriever import BM25Retriever
+
+
+class FakeEmbedder:
+    """모든 텍스트를 같은 벡터로 임베딩하는 가짜 임베더"""
+
+    def __init__(self, vector=(0.0, 0.0, 0.0, 0.0)):
+        self.vector = list(vector)
+
+    def embed_text(self, text):
+        return list(self.vector)
+
+    async def aembed_text(self, text):
+        return self.embed_text(text)
+
+
+class FakeRetriever:
+    """
+    고정된 문서를 반환하는 가짜 하이브리드 검색기
+
+    Attributes:
+        results: asearch_with_fallback이 반환하는 문서
+        queries: 받은 질의 (호출 순서)
+        received: 받은 exclude_ids (호출 순서)
+    """
+
+    def __init__(self, results=None):
+        self.results = results or []
+        self.queries = []
+        self.received = []
+
+    @property
+    def calls(self):
+        return len(self.queries)
+
+    async def aembed_query(self, query):
+        return None
+
+    async def asearch_with_fallback(self, query, top_k=5, filter_codes=None,
+                                    use_local_rerank=True, executor=None, query_embedding=None,
+                                    exclude_ids=None, use_fallback=True, use_reranker=None):
+        self.queries.append(query)
+        self.received.append(exclude_ids)
+        return list(self.results)
+
+
+class FakeAgent:
+    """고정 답변을 반환하고 호출 횟수를 세는 가짜 답변 에이전트"""
+
+    def __init__(self, answer="판단: 인정됨"):
+        self.answer = answer
+        self.calls = 0
+
+    async def aanswer_query(self, question, material_code=None, procedure_code=None,
+                            retrieved_docs=None, conversation_history=None):
+        self.calls += 1
+        return {
+            "answer": self.answer,
+            "sources": [],
+            "material_code": material_code,
+            "procedure_code": procedure_code,
+            "question": question
+        }
+
+
+def write_vector_store(path, texts, metadata=None, vectors=None):
+    """
+    작은 FAISS 인덱스, metadata.pkl, bm25_index.pkl 저장 (버전 발행은 하지 않음)
+
+    Args:
+        path: 벡터 스토어 디렉토리
+        texts: 청크 텍스트
+        metadata: 청크별 메타데이터 (기본 빈 딕셔너리, 항목에 id 필드가 없는 ID 도입 전 형식)
+        vectors: (len(texts), d) 벡터 (기본 i번째 청크는 [0.1 * i] * 4)
+    """
+    if vectors is None:
+        vectors = [[0.1 * i] * 4 for i in range(len(texts))]
+    vectors = np.asarray(vectors, dtype='float32')
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    faiss.write_index(index, os.path.join(path, "faiss_index.bin"))
+
+    if metadata is None:
+        metadata = [{} for _ in texts]
+    with open(os.path.join(path, "metadata.pkl"), 'wb') as f:
+        pickle.dump([{"text": text, "metadata": meta} for text, meta in zip(texts, metadata)], f)
+
+    bm25 = BM25Retriever(vector_store_path=path)
+    bm25.build_index(list(texts), list(metadata))
+    bm25.save_index()
+
+
+@pytest.fixture
+def vector_store(tmp_path):
+    """tmp_path에 벡터 스토어를 쓰는 함수 (vector_store(texts, metadata, vectors) → 디렉토리 경로)"""
+    def write(texts, metadata=None, vectors=None):
+        write_vector_store(str(tmp_path), texts, metadata, vectors)
+        return str(tmp_path)
+    return write
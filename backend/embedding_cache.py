@@ -0,0 +1,73 @@
+"""
+전처리 임베딩 캐시(EMBEDDING_CACHE_DB) 관리 스크립트
+
+사용법:
+    python embedding_cache.py stats
+    python embedding_cache.py compact                    # 현재 모델/차원이 아닌 항목 삭제 후 VACUUM
+    python embedding_cache.py compact --max-age-days 90  # 90일 동안 사용되지 않은 항목도 삭제
+"""
+
+import argparse
+import os
+import sys
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from tools.env import load_env
+from tools.embedder_tool import TitanEmbedder
+
+# 환경 변수 로드
+load_env()
+
+
+def _format_bytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+def print_stats(embedder: TitanEmbedder):
+    """캐시 항목 수와 크기 출력"""
+    stats = embedder.store.stats()
+    print(f"캐시 파일: {embedder.store.db_path}")
+    print(f"항목 수: {stats['entries']}개 ({_format_bytes(stats['bytes'])})")
+    for model in stats["models"]:
+        current = ""
+        if model["model_id"] == embedder.embedding_model_id and model["dimensions"] == embedder.dimensions:
+            current = "  ← 현재 설정"
+        print(f"  - {model['model_id']} ({model['dimensions']}차원): {model['entries']}개{current}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전처리 임베딩 캐시 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="항목 수와 파일 크기 출력")
+    compact = subparsers.add_parser("compact", help="현재 모델/차원이 아닌 항목 삭제 후 파일 크기 축소")
+    compact.add_argument("--max-age-days", type=float, default=None, help="이 기간 동안 사용되지 않은 항목도 삭제")
+    compact.add_argument("--keep-other-models", action="store_true", help="다른 모델/차원의 항목 유지")
+    args = parser.parse_args()
+    
+    embedder = TitanEmbedder()
+    if not embedder.store.enabled:
+        print("EMBEDDING_CACHE_DB가 비어 있어 임베딩 캐시가 비활성화되어 있습니다.")
+        return
+    
+    if args.command == "stats":
+        print_stats(embedder)
+        return
+    
+    print("=" * 60)
+    print("임베딩 캐시 정리 시작")
+    print("=" * 60)
+    result = embedder.store.compact(
+        model_id=None if args.keep_other_models else embedder.embedding_model_id,
+        dimensions=None if args.keep_other_models else embedder.dimensions,
+        max_age_days=args.max_age_days
+    )
+    print(f"삭제한 항목: {result['removed']}개")
+    print(f"파일 크기: {_format_bytes(result['bytes_before'])} → {_format_bytes(result['bytes_after'])}")
+    print()
+    print_stats(embedder)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,16 @@
 import os
 import pickle
 import sys
-from dotenv import load_dotenv
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
+from tools.env import load_env
 from tools.bm25_retriever import BM25Retriever
+from tools.index_version import publish_index_version
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 def rebuild_bm25_index():
@@ -63,6 +64,9 @@ def rebuild_bm25_index():
     
     print("[OK] BM25 인덱스 저장 완료")
     
+    # 새 인덱스 버전 발행 (서버의 답변 캐시 무효화)
+    publish_index_version(vector_store_path)
+    
     # 5. 테스트 검색
     print("\n5. 테스트 검색 실행...")
     test_queries = [
@@ -86,7 +90,7 @@ def rebuild_bm25_index():
     print("BM25 인덱스 재생성 완료!")
     print("=" * 60)
     print("\n하이브리드 검색을 사용할 준비가 되었습니다.")
-    print("백엔드 서버를 재시작하여 새로운 검색 기능을 사용하세요.")
+    print("실행 중인 서버는 POST /api/admin/reload로 새 인덱스를 반영할 수 있습니다.")
 
 
 if __name__ == "__main__":
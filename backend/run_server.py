@@ -9,10 +9,10 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 import uvicorn
-from dotenv import load_dotenv
+from tools.env import load_env
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 if __name__ == "__main__":
     host = os.getenv("API_HOST", "0.0.0.0")
@@ -1,6 +1,24 @@
-"""Agent 패키지"""
+"""Agent 패키지
 
-from .answer_agent import InsuranceAnswerAgent, answer_insurance_query
+agent.query_engine 등 하위 모듈을 import할 때 나머지 모듈까지 로드하지 않도록
+패키지 수준 이름은 처음 접근할 때 로드합니다.
+"""
 
-__all__ = ['InsuranceAnswerAgent', 'answer_insurance_query']
+import importlib
 
+_LAZY_EXPORTS = {
+    'InsuranceAnswerAgent': '.answer_agent',
+    'answer_insurance_query': '.answer_agent',
+    'QueryEngine': '.query_engine',
+    'get_query_engine': '.query_engine'
+}
+
+__all__ = ['InsuranceAnswerAgent', 'answer_insurance_query', 'QueryEngine', 'get_query_engine']
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -4,13 +4,24 @@ AWS Bedrock의 Claude 4.5 Haiku를 사용하여 보험 인정기준 질의에 
 """
 
 import os
-import json
-from typing import Dict, Any, List
-from dotenv import load_dotenv
-import boto3
+import time
+from typing import Dict, Any, List, Tuple, AsyncIterator
+
+from tools.env import load_env
+from tools.bedrock_client import AsyncBedrockClient, get_bedrock_runtime, get_rate_limiter
+from tools.admission import BedrockThrottled
+from tools.deadline import answer_max_tokens
+from tools.chunk_ids import chunk_id_of, make_snippet
+from tools.metrics import (
+    stage_timer, observe_stage, record_bedrock_error, record_value, bedrock_error_code,
+    STAGE_CLAUDE, STAGE_CLAUDE_FIRST_TOKEN, THROTTLE_ERROR_CODES
+)
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
+
+# Claude 호출 실패 시 반환되는 답변 접두어 (캐시 저장 제외 판단에 사용)
+CLAUDE_ERROR_PREFIX = "Claude 호출 중 오류 발생"
 
 
 class InsuranceAnswerAgent:
@@ -24,12 +35,13 @@ class InsuranceAnswerAgent:
             "anthropic.claude-haiku-4-5-20251001-v1:0"  
         )
         
-        # Bedrock Runtime 클라이언트 생성
-        self.bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name=self.aws_region,
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+        # 프로세스 공용 Bedrock Runtime 클라이언트 (연결 풀, 재시도 공유)
+        self.bedrock_runtime = get_bedrock_runtime()
+        
+        # Claude 모델 한도(CLAUDE_RATE_LIMIT_*)를 적용하는 호출 래퍼 (요약 호출도 같은 한도)
+        self.async_client = AsyncBedrockClient(
+            self.bedrock_runtime,
+            limiter=get_rate_limiter(self.model_id, "CLAUDE")
         )
         
         # 시스템 프롬프트 정의
@@ -180,29 +192,28 @@ class InsuranceAnswerAgent:
 - [불명확한 조건이 있는 경우, 어떤 정보가 추가로 필요한지 명시]
 """
     
-    def invoke_claude(
+    def _build_request_body(
         self,
         user_message: str,
         context: str = "",
         conversation_history: List[Dict[str, str]] = None,
         max_tokens: int = 4000
-    ) -> str:
+    ) -> Dict[str, Any]:
         """
-        Claude 4.5 Sonnet 모델 호출
+        Claude 요청 본문 구성 (Bedrock Messages API 형식)
         
         Args:
             user_message: 사용자 질문
             context: 검색된 컨텍스트 (관련 문서)
-            conversation_history: 이전 대화 내역 [{"role": "user/assistant", "content": "..."}]
-            max_tokens: 최대 토큰 수 (기본 4000)
+            conversation_history: 이전 대화 내역
+            max_tokens: 최대 토큰 수 (요청 마감 시간이 부족하면 DEGRADED_MAX_TOKENS로 축소)
             
         Returns:
-            모델 응답
+            요청 본문 딕셔너리
         """
-        try:
-            # 컨텍스트가 있으면 추가
-            if context:
-                full_message = f"""다음은 검색된 관련 정보입니다:
+        # 컨텍스트가 있으면 추가
+        if context:
+            full_message = f"""다음은 검색된 관련 정보입니다:
 
 {context}
 
@@ -221,69 +232,258 @@ class InsuranceAnswerAgent:
 4. **답변 유형 선택**: 수가 산정 질문인지, 삭감 판단 질문인지 명확히 구분하세요.
 5. **최종 답변**: 선택한 케이스와 논리적 근거를 바탕으로 정확한 답변을 제시하세요.
 6. 반드시 "📋 문서 분석" 섹션부터 시작하세요."""
-            else:
-                full_message = user_message
-            
-            # 메시지 배열 구성
-            messages = []
-            
-            # 이전 대화 내역이 있으면 추가
-            if conversation_history:
-                messages.extend(conversation_history)
-            
-            # 현재 사용자 메시지 추가
-            messages.append({
-                "role": "user",
-                "content": full_message
-            })
+        else:
+            full_message = user_message
+        
+        # 메시지 배열 구성
+        messages = []
+        
+        # 이전 대화 내역이 있으면 추가
+        if conversation_history:
+            messages.extend(conversation_history)
+        
+        # 현재 사용자 메시지 추가
+        messages.append({
+            "role": "user",
+            "content": full_message
+        })
+        
+        # 요청별 timings에 프롬프트 크기 기록 (느린 요청과 프롬프트 길이 상관관계 확인용)
+        record_value("prompt_chars", len(self.system_prompt) + sum(len(m["content"]) for m in messages))
+        record_value("history_messages", len(messages) - 1)
+        
+        return {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": answer_max_tokens(max_tokens),
+            "system": self.system_prompt,
+            "messages": messages,
+            "temperature": 0.7  # 더 유연한 추론을 위한 설정
+        }
+    
+    def _raise_if_throttled(self, error: Exception):
+        """
+        Bedrock 스로틀이면 BedrockThrottled 발생
+        
+        스로틀 오류를 답변 문자열로 바꾸면 API가 200으로 오류를 반환하게 되므로,
+        API 경로(비동기 호출)에서는 예외로 전달하여 503 + Retry-After로 응답합니다.
+        """
+        code = bedrock_error_code(error)
+        if code in THROTTLE_ERROR_CODES:
+            raise BedrockThrottled(f"Bedrock 요청 한도 초과 ({code})") from error
+    
+    def invoke_claude(
+        self,
+        user_message: str,
+        context: str = "",
+        conversation_history: List[Dict[str, str]] = None,
+        max_tokens: int = 4000
+    ) -> str:
+        """
+        Claude 4.5 Sonnet 모델 호출
+        
+        Args:
+            user_message: 사용자 질문
+            context: 검색된 컨텍스트 (관련 문서)
+            conversation_history: 이전 대화 내역 [{"role": "user/assistant", "content": "..."}]
+            max_tokens: 최대 토큰 수 (기본 4000)
             
+        Returns:
+            모델 응답
+        """
+        try:
             # Claude API 호출 (Bedrock)
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": max_tokens,
-                "system": self.system_prompt,
-                "messages": messages,
-                "temperature": 0.7  # 더 유연한 추론을 위한 설정
-            })
-            
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.model_id,
-                body=body,
-                contentType="application/json",
-                accept="application/json"
+            body = self._build_request_body(
+                user_message,
+                context,
+                conversation_history=conversation_history,
+                max_tokens=max_tokens
             )
             
-            # 응답 파싱
-            response_body = json.loads(response["body"].read())
+            with stage_timer(STAGE_CLAUDE):
+                response_body = self.async_client.invoke_model_json_blocking(self.model_id, body)
             answer = response_body.get("content", [{}])[0].get("text", "")
             
             return answer
             
         except Exception as e:
-            error_msg = f"Claude 호출 중 오류 발생: {str(e)}"
+            record_bedrock_error(self.model_id, e)
+            error_msg = f"{CLAUDE_ERROR_PREFIX}: {str(e)}"
             print(error_msg)
             return error_msg
     
-    def answer_query(
+    async def ainvoke_claude(
+        self,
+        user_message: str,
+        context: str = "",
+        conversation_history: List[Dict[str, str]] = None,
+        max_tokens: int = 4000
+    ) -> str:
+        """
+        Claude 모델 호출 (비동기)
+        
+        Args:
+            user_message: 사용자 질문
+            context: 검색된 컨텍스트 (관련 문서)
+            conversation_history: 이전 대화 내역
+            max_tokens: 최대 토큰 수 (기본 4000)
+            
+        Returns:
+            모델 응답
+            
+        Raises:
+            BedrockThrottled: Bedrock 스로틀 (그 외 오류는 오류 문자열로 반환)
+        """
+        try:
+            with stage_timer(STAGE_CLAUDE):
+                response_body = await self.async_client.invoke_model_json(
+                    self.model_id,
+                    self._build_request_body(
+                        user_message,
+                        context,
+                        conversation_history=conversation_history,
+                        max_tokens=max_tokens
+                    )
+                )
+            return response_body.get("content", [{}])[0].get("text", "")
+            
+        except Exception as e:
+            record_bedrock_error(self.model_id, e)
+            self._raise_if_throttled(e)
+            error_msg = f"{CLAUDE_ERROR_PREFIX}: {str(e)}"
+            print(error_msg)
+            return error_msg
+    
+    async def astream_claude(
+        self,
+        user_message: str,
+        context: str = "",
+        conversation_history: List[Dict[str, str]] = None,
+        max_tokens: int = 4000
+    ) -> AsyncIterator[str]:
+        """
+        Claude 모델 스트리밍 호출 (invoke_model_with_response_stream)
+        
+        전체 응답을 기다리지 않고 생성된 텍스트 조각을 도착하는 대로 yield합니다.
+        
+        Args:
+            user_message: 사용자 질문
+            context: 검색된 컨텍스트 (관련 문서)
+            conversation_history: 이전 대화 내역
+            max_tokens: 최대 토큰 수 (기본 4000)
+            
+        Yields:
+            답변 텍스트 조각
+        """
+        body = self._build_request_body(
+            user_message,
+            context,
+            conversation_history=conversation_history,
+            max_tokens=max_tokens
+        )
+        
+        start = time.perf_counter()
+        first_token = True
+        try:
+            async for chunk in self.async_client.invoke_model_stream(self.model_id, body):
+                # Messages API 스트림: content_block_delta 이벤트에 텍스트 조각이 담김
+                if chunk.get("type") == "content_block_delta":
+                    delta = chunk.get("delta", {})
+                    if delta.get("type") == "text_delta" and delta.get("text"):
+                        if first_token:
+                            observe_stage(STAGE_CLAUDE_FIRST_TOKEN, time.perf_counter() - start)
+                            first_token = False
+                        yield delta["text"]
+        except Exception as e:
+            record_bedrock_error(self.model_id, e)
+            self._raise_if_throttled(e)
+            raise
+        observe_stage(STAGE_CLAUDE, time.perf_counter() - start)
+    
+    def _build_summary_body(
+        self,
+        previous_summary: str,
+        messages: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        """
+        대화 요약 요청 본문 구성
+        
+        Args:
+            previous_summary: 이미 요약된 앞부분 대화 (없으면 None)
+            messages: 새로 요약할 대화 메시지
+        
+        Returns:
+            요청 본문 딕셔너리
+        """
+        transcript = "\n\n".join(
+            f"{'사용자' if m['role'] == 'user' else '상담원'}: {m['content']}" for m in messages
+        )
+        prompt = "다음 보험 인정기준 상담 대화를 이후 답변에 필요한 내용만 남겨 요약해주세요.\n"
+        prompt += "재료코드/시술코드, 환자 조건(수치, 부위, 상황), 판단 결과와 근거 고시는 빠짐없이 유지하세요.\n\n"
+        if previous_summary:
+            prompt += f"[기존 요약]\n{previous_summary}\n\n"
+        prompt += f"[대화]\n{transcript}"
+        
+        return {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "500")),
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.0
+        }
+    
+    def summarize_history(self, previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        """
+        토큰 예산을 넘는 오래된 대화 요약 (HistoryBudget에서 호출)
+        
+        Args:
+            previous_summary: 이미 요약된 앞부분 대화 (없으면 None)
+            messages: 새로 요약할 대화 메시지
+        
+        Returns:
+            요약 텍스트
+        
+        Raises:
+            Exception: Bedrock 호출 실패 (호출 측에서 요약 없이 진행)
+        """
+        try:
+            response_body = self.async_client.invoke_model_json_blocking(
+                self.model_id,
+                self._build_summary_body(previous_summary, messages)
+            )
+        except Exception as e:
+            record_bedrock_error(self.model_id, e)
+            raise
+        return response_body.get("content", [{}])[0].get("text", "")
+    
+    async def asummarize_history(self, previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        """summarize_history의 비동기 버전"""
+        try:
+            response_body = await self.async_client.invoke_model_json(
+                self.model_id,
+                self._build_summary_body(previous_summary, messages)
+            )
+        except Exception as e:
+            record_bedrock_error(self.model_id, e)
+            raise
+        return response_body.get("content", [{}])[0].get("text", "")
+    
+    def prepare_query(
         self,
         question: str,
         material_code: str = None,
         procedure_code: str = None,
-        retrieved_docs: List[Dict[str, Any]] = None,
-        conversation_history: List[Dict[str, str]] = None
-    ) -> Dict[str, Any]:
+        retrieved_docs: List[Dict[str, Any]] = None
+    ) -> Tuple[str, str, List[Dict[str, Any]]]:
         """
-        질의에 대한 답변 생성
+        검색 결과로 컨텍스트와 참고 문서 목록, 사용자 질문 구성
         
         Args:
             question: 사용자 질문
             material_code: 재료코드 (선택사항)
             procedure_code: 시술코드 (선택사항)
             retrieved_docs: 검색된 문서 리스트
-            conversation_history: 이전 대화 내역
             
         Returns:
-            답변 딕셔너리 (answer, sources, reasoning)
+            (사용자 질문, 컨텍스트, 참고 문서 리스트)
         """
         # 컨텍스트 구성
         context = ""
@@ -315,7 +515,9 @@ class InsuranceAnswerAgent:
                     "시술코드": doc['metadata'].get('시술코드'),
                     "시술명": doc['metadata'].get('시술명'),
                     "score": doc.get('score', 0),
-                    "text": doc['text']  # 제외 기능을 위한 텍스트 포함
+                    # 전체 텍스트 대신 ID와 미리보기만 전달 (전체는 GET /api/chunks/{id})
+                    "id": chunk_id_of(doc),
+                    "snippet": make_snippet(doc['text'])
                 })
         
         # 사용자 질문 구성
@@ -328,6 +530,33 @@ class InsuranceAnswerAgent:
         
         user_question = "\n".join(user_question_parts)
         
+        return user_question, context, sources
+    
+    def answer_query(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        retrieved_docs: List[Dict[str, Any]] = None,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        질의에 대한 답변 생성
+        
+        Args:
+            question: 사용자 질문
+            material_code: 재료코드 (선택사항)
+            procedure_code: 시술코드 (선택사항)
+            retrieved_docs: 검색된 문서 리스트
+            conversation_history: 이전 대화 내역
+            
+        Returns:
+            답변 딕셔너리 (answer, sources, reasoning)
+        """
+        user_question, context, sources = self.prepare_query(
+            question, material_code, procedure_code, retrieved_docs
+        )
+        
         # Claude 호출 (대화 히스토리 포함)
         answer = self.invoke_claude(
             user_question, 
@@ -342,6 +571,45 @@ class InsuranceAnswerAgent:
             "procedure_code": procedure_code,
             "question": question
         }
+    
+    async def aanswer_query(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        retrieved_docs: List[Dict[str, Any]] = None,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        질의에 대한 답변 생성 (비동기)
+        
+        Args:
+            question: 사용자 질문
+            material_code: 재료코드 (선택사항)
+            procedure_code: 시술코드 (선택사항)
+            retrieved_docs: 검색된 문서 리스트
+            conversation_history: 이전 대화 내역
+            
+        Returns:
+            답변 딕셔너리 (answer, sources, reasoning)
+        """
+        user_question, context, sources = self.prepare_query(
+            question, material_code, procedure_code, retrieved_docs
+        )
+        
+        answer = await self.ainvoke_claude(
+            user_question,
+            context,
+            conversation_history=conversation_history
+        )
+        
+        return {
+            "answer": answer,
+            "sources": sources,
+            "material_code": material_code,
+            "procedure_code": procedure_code,
+            "question": question
+        }
 
 
 # 전체 파이프라인 (검색 + 답변)
@@ -350,7 +618,9 @@ def answer_insurance_query(
     material_code: str = None,
     procedure_code: str = None,
     conversation_history: List[Dict[str, str]] = None,
-    excluded_sources: List[str] = None
+    excluded_sources: List[str] = None,
+    engine=None,
+    excluded_ids: List[str] = None
 ) -> Dict[str, Any]:
     """
     보험 인정기준 질의 전체 파이프라인
@@ -360,62 +630,27 @@ def answer_insurance_query(
         material_code: 재료코드 (선택사항)
         procedure_code: 시술코드 (선택사항)
         conversation_history: 이전 대화 내역 (선택사항)
-        excluded_sources: 제외할 문서 텍스트 목록 (선택사항)
+        excluded_sources: 제외할 문서 텍스트 목록 (선택사항, excluded_ids 사용 권장)
+        engine: 사용할 QueryEngine (None이면 프로세스 전역 인스턴스 사용)
+        excluded_ids: 제외할 청크 ID 목록 (선택사항)
         
     Returns:
         답변 결과
     """
-    from tools.hybrid_retriever import HybridRetriever
+    from agent.query_engine import get_query_engine
     
-    # 1. 관련 문서 검색 (하이브리드: 벡터 70% + BM25 30%)
-    # BM25 로컬 리랭크 + Fallback (primary_field 없는 문서 전체 검색)
-    retriever = HybridRetriever(
-        vector_weight=0.7,
-        bm25_weight=0.3,
-        use_rrf=False,
-        use_reranker=False  # Cohere Reranker 비활성화 (로컬 BM25 리랭크 사용)
-    )
+    # 검색기/에이전트는 매 요청마다 만들지 않고 프로세스 전역 엔진을 재사용
+    if engine is None:
+        engine = get_query_engine()
     
-    # 필터 코드 구성
-    filter_codes = {}
-    if material_code:
-        filter_codes["재료코드"] = material_code
-    if procedure_code:
-        filter_codes["시술코드"] = procedure_code
-    
-    # search_with_fallback 사용:
-    # - 기본 하이브리드 검색
-    # - primary_field 없는 문서 감지 → 해당 문서 전체 청크 추가
-    # - BM25 로컬 리랭크로 재정렬
-    retrieved_docs = retriever.search_with_fallback(
-        query=question,
-        top_k=10,
-        filter_codes=filter_codes if filter_codes else None,
-        use_local_rerank=True  # BM25 로컬 리랭크 활성화
-    )
-    
-    # 제외할 문서 필터링 (사용자가 노이즈로 지정한 문서 제거)
-    if excluded_sources and retrieved_docs:
-        original_count = len(retrieved_docs)
-        retrieved_docs = [
-            doc for doc in retrieved_docs 
-            if doc.get('text') not in excluded_sources
-        ]
-        filtered_count = original_count - len(retrieved_docs)
-        if filtered_count > 0:
-            print(f"[필터링] {filtered_count}개 노이즈 문서 제외")
-    
-    # 2. 에이전트로 답변 생성 (대화 히스토리 포함)
-    agent = InsuranceAnswerAgent()
-    result = agent.answer_query(
+    return engine.answer(
         question=question,
         material_code=material_code,
         procedure_code=procedure_code,
-        retrieved_docs=retrieved_docs if isinstance(retrieved_docs, list) else [],
-        conversation_history=conversation_history
+        conversation_history=conversation_history,
+        excluded_ids=excluded_ids,
+        excluded_sources=excluded_sources
     )
-    
-    return result
 
 
 # 테스트용 메인 함수
@@ -6,7 +6,6 @@ LCEL (LangChain Expression Language) 사용
 
 import os
 from typing import Dict, Any, List, Optional
-from dotenv import load_dotenv
 
 # LangChain 임포트 (최신 LCEL 방식)
 from langchain_aws import ChatBedrock
@@ -15,10 +14,11 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough
 
 # 커스텀 검색기
+from tools.env import load_env
 from tools.langchain_retriever import HybridLangChainRetriever
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 class InsuranceLangChainAgent:
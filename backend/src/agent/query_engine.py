@@ -0,0 +1,975 @@
+"""
+질의 엔진
+검색기(HybridRetriever)와 답변 에이전트를 프로세스당 한 번만 생성하여 모든 요청이 공유
+
+인덱스 리로드는 RCU(read-copy-update) 방식입니다. 새 검색기를 백그라운드에서
+완전히 로드한 뒤 self.retriever 참조만 교체하며, 진행 중인 요청은 시작할 때
+잡아 둔 이전 검색기(스냅샷)로 끝까지 처리됩니다.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from typing import Dict, Any, List, AsyncIterator, Callable, Optional, Tuple
+
+from agent.answer_agent import InsuranceAnswerAgent, CLAUDE_ERROR_PREFIX
+from tools.answer_cache import AnswerCache
+from tools.index_version import read_index_version
+from tools.semantic_cache import SemanticAnswerCache, chunk_fingerprints
+from tools.chunk_ids import chunk_id_of, resolve_excluded_ids
+from tools.code_index import normalize_code
+from tools.singleflight import SingleFlight
+from tools.admission import AdmissionController
+from tools.session_store import SessionStore
+from tools.history_budget import HistoryBudget
+from tools.deadline import (
+    DeadlinePolicy, Deadline, current_deadline, check_deadline, remaining_time, run_with_deadline
+)
+from tools.metrics import stage_timer, context_bound, STAGE_ANSWER_CACHE, STAGE_SEMANTIC_CACHE, STAGE_CLAUDE
+
+
+class QueryEngine:
+    """프로세스 전역 질의 엔진 (검색 + 답변 생성)"""
+    
+    def __init__(
+        self,
+        retriever=None,
+        agent: InsuranceAnswerAgent = None,
+        answer_cache: AnswerCache = None,
+        semantic_cache: SemanticAnswerCache = None,
+        retriever_factory: Callable[[], Any] = None,
+        admission: AdmissionController = None,
+        session_store: SessionStore = None,
+        history_budget: HistoryBudget = None,
+        deadline_policy: DeadlinePolicy = None
+    ):
+        """
+        초기화
+        
+        FAISS 인덱스, 메타데이터, BM25 인덱스 로드와 Bedrock 클라이언트 생성은
+        여기서 한 번만 수행됩니다.
+        
+        Args:
+            retriever: 사용할 검색기 (None이면 HybridRetriever 생성)
+            agent: 사용할 답변 에이전트 (None이면 InsuranceAnswerAgent 생성)
+            answer_cache: 답변 캐시 (None이면 ANSWER_CACHE_ENABLED 설정에 따라 생성)
+            semantic_cache: 시맨틱 답변 캐시 (None이면 SEMANTIC_CACHE_ENABLED 설정에 따라 생성)
+            retriever_factory: 인덱스 리로드 시 새 검색기를 만드는 함수
+                (None이면 기존 임베더를 재사용하는 HybridRetriever 생성)
+            admission: Bedrock 호출 승인 제어 (None이면 ADMISSION_ENABLED 설정에 따라 생성)
+            session_store: 대화 세션 저장소 (None이면 SESSION_ENABLED 설정에 따라 생성)
+            history_budget: 이전 대화 토큰 예산 (None이면 HISTORY_* 설정으로 생성)
+            deadline_policy: 요청 마감 시간과 축소 기준 (None이면 REQUEST_DEADLINE 등 설정으로 생성)
+        """
+        self.vector_store_path = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
+        self._retriever_factory = retriever_factory or self._build_default_retriever
+        self._reload_lock = threading.Lock()
+        # 검색기와 그 인덱스 버전을 한 쌍으로 교체/조회 (교체 구간만 잡으므로 짧음)
+        self._swap_lock = threading.Lock()
+        
+        # 파일 로드 전에 버전을 읽어, 로드 중 새 버전이 발행되면 다음 확인 때 다시 로드
+        self.loaded_index_version = read_index_version(self.vector_store_path)
+        self.loaded_at = time.time()
+        self.retriever = retriever if retriever is not None else self._retriever_factory()
+        self.agent = agent if agent is not None else InsuranceAnswerAgent()
+        
+        # 동일 질문 반복 시 검색/Claude 호출 생략 (메모리 LRU + SQLite)
+        if answer_cache is None and os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true":
+            answer_cache = AnswerCache()
+        self.answer_cache = answer_cache
+        
+        # 표현만 다른 같은 질문에 답변 재사용 (질문 임베딩 유사도)
+        if semantic_cache is None and os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true":
+            semantic_cache = SemanticAnswerCache()
+        self.semantic_cache = semantic_cache
+        if semantic_cache is not None:
+            semantic_cache.index_version = self.loaded_index_version
+        
+        # 같은 질문이 동시에 몰릴 때 Bedrock 호출을 한 번으로 합침
+        self.singleflight = SingleFlight()
+        
+        # 캐시 miss 요청의 Bedrock 동시 호출 제한 (대기열 초과 시 429/503)
+        if admission is None and os.getenv("ADMISSION_ENABLED", "true").lower() == "true":
+            admission = AdmissionController()
+        self.admission = admission
+        
+        # session_id로 이전 대화를 서버에서 관리 (클라이언트가 전체 대화를 다시 보내지 않음)
+        if session_store is None and os.getenv("SESSION_ENABLED", "true").lower() == "true":
+            session_store = SessionStore()
+        self.session_store = session_store
+        
+        # Claude에 보내는 이전 대화를 토큰 예산 안으로 (오래된 턴은 캐시된 요약으로 대체)
+        self.history_budget = history_budget if history_budget is not None else HistoryBudget()
+        
+        # 요청별 마감 시간 (남은 시간이 부족하거나 대기열이 길면 Fallback → 리랭크 → max_tokens 순으로 축소)
+        self.deadline_policy = deadline_policy if deadline_policy is not None else DeadlinePolicy()
+        
+        # CPU 작업(FAISS, BM25, 결과 통합) 전용 스레드 풀 (크기 제한)
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("RETRIEVAL_WORKERS", "4")),
+            thread_name_prefix="retrieval"
+        )
+    
+    def _build_default_retriever(self):
+        """기본 검색기 생성 (리로드 시 기존 Titan 임베더/Bedrock 클라이언트 재사용)"""
+        from tools.hybrid_retriever import HybridRetriever
+        
+        current = getattr(self, "retriever", None)
+        embedder = getattr(getattr(current, "faiss_retriever", None), "embedder", None)
+        
+        # 하이브리드: 벡터 70% + BM25 30%
+        # Cohere Reranker 비활성화 (로컬 BM25 리랭크 사용)
+        return HybridRetriever(
+            vector_weight=0.7,
+            bm25_weight=0.3,
+            use_rrf=False,
+            use_reranker=False,
+            embedder=embedder,
+            vector_store_path=self.vector_store_path
+        )
+    
+    @staticmethod
+    def _describe_retriever(retriever) -> Dict[str, Any]:
+        """검색기에 로드된 인덱스 요약 (FAISS 벡터 수, BM25 문서 수)"""
+        faiss_retriever = getattr(retriever, "faiss_retriever", None)
+        bm25_retriever = getattr(retriever, "bm25_retriever", None)
+        index = getattr(faiss_retriever, "index", None)
+        metadata = getattr(faiss_retriever, "metadata", None)
+        corpus = getattr(bm25_retriever, "corpus", None)
+        return {
+            "vectors": index.ntotal if index is not None else None,
+            "chunks": len(metadata) if metadata is not None else None,
+            "bm25_docs": len(corpus) if corpus is not None else None
+        }
+    
+    def index_info(self) -> Dict[str, Any]:
+        """현재 서비스 중인 인덱스 스냅샷 정보"""
+        return {
+            "index_version": self.loaded_index_version,
+            "published_version": read_index_version(self.vector_store_path),
+            "loaded_at": self.loaded_at,
+            **self._describe_retriever(self.retriever)
+        }
+    
+    def _snapshot(self) -> Tuple[Any, str]:
+        """
+        현재 검색기와 그 검색기가 로드한 인덱스 버전 (요청 시작 시 한 번 잡아 끝까지 사용)
+        
+        캐시 키에는 디스크에 발행된 버전이 아니라 답변을 만드는 검색기의 버전을 사용하므로,
+        새 인덱스 발행 후 리로드 전까지 이전 인덱스로 만든 답변이 새 버전으로 저장되지 않습니다.
+        """
+        with self._swap_lock:
+            return self.retriever, self.loaded_index_version
+    
+    def get_chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """
+        청크 ID로 현재 인덱스의 청크 조회 (참고 문서 전체 텍스트)
+        
+        Args:
+            chunk_id: 청크 ID (sources의 id)
+        
+        Returns:
+            {"id", "text", "metadata"} (없으면 None)
+        """
+        return self.retriever.get_chunk(chunk_id)
+    
+    def warm_query_embeddings(self, path: str = None) -> int:
+        """
+        질의 목록 파일로 질의 임베딩 캐시 미리 채우기 (블로킹, 서버 시작 시 백그라운드 실행)
+        
+        Args:
+            path: 한 줄에 질의 하나인 텍스트 파일 (기본 QUERY_EMBEDDING_WARMUP_PATH, #으로 시작하면 주석)
+        
+        Returns:
+            캐시에 넣은 질의 수
+        """
+        if path is None:
+            path = os.getenv("QUERY_EMBEDDING_WARMUP_PATH", "")
+        warm = getattr(self.retriever, "warm_query_embeddings", None)
+        if not path or warm is None:
+            return 0
+        if not os.path.exists(path):
+            print(f"[WARNING] 질의 임베딩 warmup 파일이 없습니다: {path}")
+            return 0
+        
+        with open(path, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        count = warm(queries)
+        print(f"[OK] 질의 임베딩 캐시 미리 채움: {count}/{len(queries)}개")
+        return count
+    
+    def reload_index(self) -> Dict[str, Any]:
+        """
+        새 인덱스를 로드하여 원자적으로 교체 (블로킹)
+        
+        새 검색기 로드와 검증이 끝난 후에만 참조를 교체하므로, 로드에 실패하면
+        기존 인덱스로 계속 서비스합니다.
+        
+        Returns:
+            교체된 인덱스 정보 (버전, 벡터/문서 수, 소요 시간)
+        
+        Raises:
+            RuntimeError: 새 인덱스가 비어 있거나 FAISS/메타데이터 크기가 맞지 않는 경우
+        """
+        with self._reload_lock:
+            started = time.time()
+            version = read_index_version(self.vector_store_path)
+            print(f"[인덱스 리로드] 버전 {version} 로드 시작")
+            
+            retriever = self._retriever_factory()
+            info = self._describe_retriever(retriever)
+            has_indexes = hasattr(retriever, "faiss_retriever")
+            if has_indexes and info["vectors"] is None and info["bm25_docs"] is None:
+                raise RuntimeError("새 인덱스를 로드하지 못했습니다 (인덱스 파일 없음)")
+            if info["vectors"] is not None and info["vectors"] != info["chunks"]:
+                raise RuntimeError(
+                    f"FAISS 벡터 수({info['vectors']})와 메타데이터 수({info['chunks']})가 다릅니다"
+                )
+            
+            # RCU 교체: 진행 중 요청은 이전 검색기 참조로 끝까지 처리
+            with self._swap_lock:
+                previous_version = self.loaded_index_version
+                self.retriever = retriever
+                self.loaded_index_version = version
+                self.loaded_at = time.time()
+            self._invalidate_semantic_cache(retriever, version)
+            
+            elapsed = self.loaded_at - started
+            print(f"[인덱스 리로드] {previous_version} → {version} 교체 완료 ({elapsed:.1f}초)")
+            return {
+                "previous_version": previous_version,
+                "index_version": version,
+                "elapsed": elapsed,
+                **info
+            }
+    
+    def _invalidate_semantic_cache(self, retriever, version: str):
+        """교체된 검색기의 청크 기준으로 삭제/변경된 청크를 사용한 시맨틱 캐시 항목 무효화"""
+        if self.semantic_cache is None:
+            return
+        metadata = getattr(getattr(retriever, "faiss_retriever", None), "metadata", None)
+        # 메타데이터가 없는 검색기는 청크를 확인할 수 없으므로 청크를 사용한 항목 모두 무효화
+        current = chunk_fingerprints(metadata) if metadata is not None else set()
+        self.semantic_cache.invalidate_missing_chunks(current, version)
+    
+    async def areload_index(self) -> Dict[str, Any]:
+        """reload_index의 비동기 버전 (로드는 검색 스레드 풀이 아닌 별도 스레드에서 실행)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.reload_index)
+    
+    async def watch_index(self, interval: float):
+        """
+        발행된 인덱스 버전을 주기적으로 확인하여 바뀌면 리로드
+        
+        Args:
+            interval: 확인 주기 (초)
+        """
+        loop = asyncio.get_running_loop()
+        failed_version = None
+        while True:
+            await asyncio.sleep(interval)
+            version = None
+            try:
+                version = await loop.run_in_executor(None, read_index_version, self.vector_store_path)
+                if version in (self.loaded_index_version, failed_version):
+                    continue
+                print(f"[인덱스 감시] 새 인덱스 버전 발견: {version}")
+                await self.areload_index()
+                failed_version = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 같은 버전으로 반복 실패하지 않도록 기록 (새 버전이 발행되면 다시 시도)
+                failed_version = version
+                print(f"[WARNING] 인덱스 자동 리로드 실패: {str(e)}")
+    
+    def _build_filter_codes(
+        self,
+        material_code: str = None,
+        procedure_code: str = None
+    ) -> Dict[str, str]:
+        """재료코드/시술코드 필터 구성 (없으면 None)"""
+        filter_codes = {}
+        if material_code:
+            filter_codes["재료코드"] = material_code
+        if procedure_code:
+            filter_codes["시술코드"] = procedure_code
+        return filter_codes if filter_codes else None
+    
+    def _cache_get(
+        self,
+        index_version: str,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        conversation_history: List[Dict[str, str]] = None,
+        excluded_ids: List[str] = None
+    ) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        답변 캐시 조회
+        
+        Args:
+            index_version: 요청 스냅샷의 인덱스 버전 (_snapshot)
+        
+        Returns:
+            (캐시 키, 캐시된 결과) - 캐시 비활성화 시 결과는 None
+        """
+        # 키는 캐시 비활성화 시에도 동시 요청 합치기에 사용
+        key = AnswerCache.make_key(
+            question,
+            material_code=material_code,
+            procedure_code=procedure_code,
+            excluded_ids=excluded_ids,
+            conversation_history=conversation_history,
+            index_version=index_version
+        )
+        if self.answer_cache is None:
+            return key, None
+        
+        with stage_timer(STAGE_ANSWER_CACHE):
+            cached = self.answer_cache.get(key, index_version)
+        if cached is not None:
+            print("[답변 캐시] hit")
+            # 정규화 전 원래 질문으로 응답
+            cached = dict(cached, question=question)
+        return key, cached
+    
+    @staticmethod
+    def _degraded() -> bool:
+        """현재 요청이 마감 시간/부하로 단계를 생략했는지 (축소된 답변은 캐시하지 않음)"""
+        deadline = current_deadline()
+        return deadline is not None and bool(deadline.shed_steps)
+    
+    def _cache_set(self, key: Optional[str], index_version: str, result: Dict[str, Any]):
+        """답변 캐시 저장 (Claude 호출 오류 답변, 축소된 답변은 저장하지 않음)"""
+        if self.answer_cache is None or key is None or self._degraded():
+            return
+        answer = result.get("answer") or ""
+        if not answer or answer.startswith(CLAUDE_ERROR_PREFIX):
+            return
+        self.answer_cache.set(key, result, index_version)
+    
+    async def _acache_get(self, *args, **kwargs):
+        """답변 캐시 조회 (SQLite I/O를 스레드 풀에서 실행)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            context_bound(partial(self._cache_get, *args, **kwargs))
+        )
+    
+    async def _acache_set(self, key: Optional[str], index_version: str, result: Dict[str, Any]):
+        """답변 캐시 저장 (SQLite I/O를 스레드 풀에서 실행)"""
+        if self.answer_cache is None or key is None or self._degraded():
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._cache_set, key, index_version, result)
+    
+    def _session_history(
+        self,
+        session_id: Optional[str],
+        conversation_history: List[Dict[str, str]] = None
+    ) -> List[Dict[str, str]]:
+        """session_id가 있으면 클라이언트가 보낸 대화 대신 서버 세션의 대화 사용"""
+        if session_id is None or self.session_store is None:
+            return conversation_history
+        # 빈 세션은 대화 맥락 없음과 같게 처리 (첫 질문도 시맨틱 캐시 사용)
+        return self.session_store.get(session_id) or None
+    
+    async def _asession_history(self, *args) -> List[Dict[str, str]]:
+        """세션 조회 (SQLite I/O를 스레드 풀에서 실행)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._session_history, *args)
+    
+    def _record_turn(self, session_id: Optional[str], question: str, answer: str):
+        """세션에 질문/답변 턴 추가 (Claude 호출 오류 답변은 저장하지 않음)"""
+        if session_id is None or self.session_store is None:
+            return
+        if not answer or answer.startswith(CLAUDE_ERROR_PREFIX):
+            return
+        self.session_store.append_turn(session_id, question, answer)
+    
+    async def _arecord_turn(self, session_id: Optional[str], question: str, answer: str):
+        """세션 턴 추가 (SQLite I/O를 스레드 풀에서 실행)"""
+        if session_id is None or self.session_store is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._record_turn, session_id, question, answer)
+    
+    def _use_semantic_cache(
+        self,
+        conversation_history: List[Dict[str, str]] = None,
+        excluded_ids: List[str] = None
+    ) -> bool:
+        """대화 맥락이나 제외 문서가 없는 단독 질문만 시맨틱 캐시 사용"""
+        return self.semantic_cache is not None and not conversation_history and not excluded_ids
+    
+    def _semantic_get(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        retriever=None
+    ) -> Tuple[Optional[List[float]], str, Optional[Dict[str, Any]]]:
+        """
+        시맨틱 캐시 조회
+        
+        Returns:
+            (질문 임베딩, 필터 키, 캐시된 결과) - 임베딩은 검색에 재사용
+        """
+        query_embedding = (retriever or self.retriever).embed_query(question)
+        filter_key = self.semantic_cache.make_filter_key(question, material_code, procedure_code)
+        if query_embedding is None:
+            return None, filter_key, None
+        with stage_timer(STAGE_SEMANTIC_CACHE):
+            cached = self.semantic_cache.lookup(query_embedding, filter_key)
+        return query_embedding, filter_key, cached
+    
+    async def _asemantic_get(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        retriever=None
+    ) -> Tuple[Optional[List[float]], str, Optional[Dict[str, Any]]]:
+        """시맨틱 캐시 조회 (비동기, 임베딩은 await하고 FAISS 조회는 스레드 풀에서 실행)"""
+        loop = asyncio.get_running_loop()
+        query_embedding = await (retriever or self.retriever).aembed_query(question)
+        filter_key = self.semantic_cache.make_filter_key(question, material_code, procedure_code)
+        if query_embedding is None:
+            return None, filter_key, None
+        with stage_timer(STAGE_SEMANTIC_CACHE):
+            cached = await loop.run_in_executor(
+                self.executor, self.semantic_cache.lookup, query_embedding, filter_key
+            )
+        return query_embedding, filter_key, cached
+    
+    def _semantic_set(
+        self,
+        query_embedding: Optional[List[float]],
+        filter_key: str,
+        result: Dict[str, Any],
+        retrieved_docs: List[Dict[str, Any]],
+        index_version: str
+    ):
+        """시맨틱 캐시 저장 (답변에 사용한 청크 지문과 요청 스냅샷의 인덱스 버전 함께 저장)"""
+        if query_embedding is None or self._degraded():
+            return
+        answer = result.get("answer") or ""
+        if not answer or answer.startswith(CLAUDE_ERROR_PREFIX):
+            return
+        self.semantic_cache.add(
+            query_embedding,
+            filter_key,
+            result,
+            chunk_fingerprints=[chunk_id_of(doc) for doc in retrieved_docs],
+            index_version=index_version
+        )
+    
+    async def _asemantic_set(self, *args):
+        """시맨틱 캐시 저장 (FAISS add_with_ids와 LRU 정리를 스레드 풀에서 실행)"""
+        loop = asyncio.get_running_loop()
+        # 축소 여부(_degraded)를 현재 요청의 마감 시간으로 판단하도록 컨텍스트와 함께 실행
+        await loop.run_in_executor(
+            self.executor,
+            context_bound(partial(self._semantic_set, *args))
+        )
+    
+    def retrieve(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        excluded_ids: List[str] = None,
+        top_k: int = 10,
+        query_embedding: List[float] = None,
+        retriever=None
+    ) -> List[Dict[str, Any]]:
+        """
+        관련 문서 검색
+        
+        Args:
+            question: 질문
+            material_code: 재료코드 (선택사항)
+            procedure_code: 시술코드 (선택사항)
+            excluded_ids: 제외할 청크 ID 목록 (선택사항)
+            top_k: 반환할 결과 수
+            query_embedding: 미리 계산된 질의 임베딩 (선택사항)
+            retriever: 사용할 검색기 스냅샷 (None이면 현재 검색기)
+        
+        Returns:
+            검색된 문서 리스트
+        """
+        # search_with_fallback 사용:
+        # - 기본 하이브리드 검색
+        # - primary_field 없는 문서 감지 → 해당 문서 전체 청크 추가
+        # - BM25 로컬 리랭크로 재정렬
+        retrieved_docs = (retriever or self.retriever).search_with_fallback(
+            query=question,
+            top_k=top_k,
+            filter_codes=self._build_filter_codes(material_code, procedure_code),
+            use_local_rerank=True,
+            query_embedding=query_embedding,
+            exclude_ids=excluded_ids
+        )
+        
+        return retrieved_docs if isinstance(retrieved_docs, list) else []
+    
+    async def aretrieve(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        excluded_ids: List[str] = None,
+        top_k: int = 10,
+        query_embedding: List[float] = None,
+        retriever=None
+    ) -> List[Dict[str, Any]]:
+        """
+        관련 문서 검색 (비동기)
+        
+        Bedrock 호출은 await하고 CPU 작업은 self.executor에서 실행하므로
+        이벤트 루프를 막지 않습니다.
+        
+        Args:
+            question: 질문
+            material_code: 재료코드 (선택사항)
+            procedure_code: 시술코드 (선택사항)
+            excluded_ids: 제외할 청크 ID 목록 (선택사항)
+            top_k: 반환할 결과 수
+            query_embedding: 미리 계산된 질의 임베딩 (선택사항)
+            retriever: 사용할 검색기 스냅샷 (None이면 현재 검색기)
+        
+        Returns:
+            검색된 문서 리스트
+        """
+        retrieved_docs = await (retriever or self.retriever).asearch_with_fallback(
+            query=question,
+            top_k=top_k,
+            filter_codes=self._build_filter_codes(material_code, procedure_code),
+            use_local_rerank=True,
+            executor=self.executor,
+            query_embedding=query_embedding,
+            exclude_ids=excluded_ids
+        )
+        
+        return retrieved_docs if isinstance(retrieved_docs, list) else []
+    
+    async def asearch(
+        self,
+        query: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        excluded_ids: List[str] = None,
+        top_k: int = 10,
+        use_fallback: bool = True,
+        use_rerank: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        검색만 수행 (답변 생성 없음, 캐시/승인 제어 미사용)
+        
+        Args:
+            query: 검색 질문
+            material_code: 재료코드 (선택사항)
+            procedure_code: 시술코드 (선택사항)
+            excluded_ids: 제외할 청크 ID 목록 (선택사항)
+            top_k: 반환할 결과 수
+            use_fallback: False면 primary_field 없는 문서의 전체 청크 추가 생략
+            use_rerank: False면 Cohere Rerank와 BM25 로컬 리랭크 생략
+        
+        Returns:
+            검색 결과 리스트 (vector_score, bm25_score, rerank_score 포함)
+        """
+        results = await self.retriever.asearch_with_fallback(
+            query=query,
+            top_k=top_k,
+            filter_codes=self._build_filter_codes(material_code, procedure_code),
+            use_local_rerank=use_rerank,
+            executor=self.executor,
+            exclude_ids=excluded_ids,
+            use_fallback=use_fallback,
+            use_reranker=None if use_rerank else False
+        )
+        
+        return results if isinstance(results, list) else []
+    
+    async def alookup(
+        self,
+        codes: List[str],
+        excluded_ids: List[str] = None,
+        top_k: int = 10,
+        fallback: bool = True
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        코드로 청크 조회 (코드 역색인 우선, 일치하는 청크가 없을 때만 검색)
+        
+        Args:
+            codes: 재료코드, 시술코드, 분류번호, 고시번호 등 (여러 개면 모두 포함하는 청크)
+            excluded_ids: 제외할 청크 ID 목록 (선택사항)
+            top_k: 검색으로 대체할 때 반환할 결과 수
+            fallback: False면 일치하는 청크가 없어도 검색하지 않음
+        
+        Returns:
+            (일치 방식 "exact"/"search"/"none", 청크 리스트) - exact는 일치하는 청크 전체
+        """
+        codes = [normalize_code(code) for code in codes if code]
+        results = self.retriever.lookup_codes(codes, exclude_ids=excluded_ids)
+        if results:
+            return "exact", results
+        if not fallback:
+            return "none", []
+        
+        results = await self.asearch(
+            f"{' '.join(codes)} 보험 인정기준",
+            excluded_ids=excluded_ids,
+            top_k=top_k
+        )
+        return ("search" if results else "none"), results
+    
+    def answer(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        conversation_history: List[Dict[str, str]] = None,
+        excluded_ids: List[str] = None,
+        excluded_sources: List[str] = None,
+        session_id: str = None
+    ) -> Dict[str, Any]:
+        """
+        검색 + 답변 생성
+        
+        Args:
+            question: 질문
+            material_code: 재료코드 (선택사항)
+            procedure_code: 시술코드 (선택사항)
+            conversation_history: 이전 대화 내역 (선택사항)
+            excluded_ids: 제외할 청크 ID 목록 (선택사항)
+            excluded_sources: 제외할 문서 텍스트 목록 (이전 클라이언트 호환용, ID로 변환)
+            session_id: 대화 세션 ID (선택사항, 지정 시 conversation_history 대신 세션 대화를 사용하고
+                답변 후 이번 턴을 세션에 추가)
+        
+        Returns:
+            답변 결과
+        """
+        self._start_deadline()
+        # 요청 처리 중 인덱스가 리로드되어도 같은 스냅샷(검색기, 버전) 사용
+        retriever, index_version = self._snapshot()
+        excluded_ids = resolve_excluded_ids(excluded_ids, excluded_sources)
+        conversation_history = self._session_history(session_id, conversation_history)
+        key, cached = self._cache_get(
+            index_version, question, material_code, procedure_code, conversation_history, excluded_ids
+        )
+        if cached is not None:
+            self._record_turn(session_id, question, cached["answer"])
+            return cached
+        
+        query_embedding, filter_key = None, None
+        if self._use_semantic_cache(conversation_history, excluded_ids):
+            query_embedding, filter_key, cached = self._semantic_get(
+                question, material_code, procedure_code, retriever
+            )
+            if cached is not None:
+                cached = dict(cached, question=question)
+                self._cache_set(key, index_version, cached)
+                self._record_turn(session_id, question, cached["answer"])
+                return cached
+        
+        retrieved_docs = self.retrieve(
+            question,
+            material_code=material_code,
+            procedure_code=procedure_code,
+            excluded_ids=excluded_ids,
+            query_embedding=query_embedding,
+            retriever=retriever
+        )
+        
+        check_deadline(STAGE_CLAUDE)
+        result = self.agent.answer_query(
+            question=question,
+            material_code=material_code,
+            procedure_code=procedure_code,
+            retrieved_docs=retrieved_docs,
+            conversation_history=self._fit_history(conversation_history)
+        )
+        self._cache_set(key, index_version, result)
+        self._semantic_set(query_embedding, filter_key, result, retrieved_docs, index_version)
+        self._record_turn(session_id, question, result["answer"])
+        return result
+    
+    async def aanswer(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        conversation_history: List[Dict[str, str]] = None,
+        excluded_ids: List[str] = None,
+        excluded_sources: List[str] = None,
+        session_id: str = None
+    ) -> Dict[str, Any]:
+        """
+        검색 + 답변 생성 (비동기)
+        
+        Args:
+            question: 질문
+            material_code: 재료코드 (선택사항)
+            procedure_code: 시술코드 (선택사항)
+            conversation_history: 이전 대화 내역 (선택사항)
+            excluded_ids: 제외할 청크 ID 목록 (선택사항)
+            excluded_sources: 제외할 문서 텍스트 목록 (이전 클라이언트 호환용, ID로 변환)
+            session_id: 대화 세션 ID (선택사항, 지정 시 conversation_history 대신 세션 대화를 사용하고
+                답변 후 이번 턴을 세션에 추가)
+        
+        Returns:
+            답변 결과
+        """
+        self._start_deadline()
+        # 요청 처리 중 인덱스가 리로드되어도 같은 스냅샷(검색기, 버전) 사용
+        retriever, index_version = self._snapshot()
+        excluded_ids = resolve_excluded_ids(excluded_ids, excluded_sources)
+        conversation_history = await self._asession_history(session_id, conversation_history)
+        key, cached = await self._acache_get(
+            index_version, question, material_code, procedure_code, conversation_history, excluded_ids
+        )
+        if cached is not None:
+            await self._arecord_turn(session_id, question, cached["answer"])
+            return cached
+        
+        # 같은 키의 동시 요청은 하나의 검색+생성 작업을 공유
+        result = await self.singleflight.do(key, partial(
+            self._aanswer_uncached,
+            question, material_code, procedure_code, conversation_history, excluded_ids,
+            key, index_version, retriever
+        ))
+        await self._arecord_turn(session_id, question, result["answer"])
+        return dict(result, question=question)
+    
+    def _fit_history(self, conversation_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """이전 대화를 토큰 예산 안으로 (예산 초과분은 요약으로 대체)"""
+        if not conversation_history:
+            return conversation_history
+        return self.history_budget.fit(conversation_history, self.agent)
+    
+    async def _afit_history(self, conversation_history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """_fit_history의 비동기 버전 (승인 제어 슬롯 안에서 호출)"""
+        if not conversation_history:
+            return conversation_history
+        return await self.history_budget.afit(conversation_history, self.agent)
+    
+    def _start_deadline(self) -> Optional[Deadline]:
+        """현재 요청의 마감 시간 시작 (승인 대기열 길이도 축소 기준으로 사용)"""
+        if self.admission is None:
+            return self.deadline_policy.start()
+        return self.deadline_policy.start(lambda: self.admission.queue_depth)
+    
+    def _admission_slot(self):
+        """Bedrock 호출 구간의 승인 제어 슬롯 (비활성화 시 아무것도 하지 않음, 대기는 마감 시간까지)"""
+        return self.admission.slot(remaining_time()) if self.admission is not None else nullcontext()
+    
+    async def _aanswer_uncached(self, *args) -> Dict[str, Any]:
+        """캐시 miss 시 승인 제어 슬롯을 잡고 처리 (대기열이 가득 차면 AdmissionRejected)"""
+        async with self._admission_slot():
+            return await self._aanswer_admitted(*args)
+    
+    async def _aanswer_admitted(
+        self,
+        question: str,
+        material_code: str,
+        procedure_code: str,
+        conversation_history: List[Dict[str, str]],
+        excluded_ids: List[str],
+        key: str,
+        index_version: str,
+        retriever
+    ) -> Dict[str, Any]:
+        """캐시 miss 시 시맨틱 캐시 조회 → 검색 → 답변 생성 → 캐시 저장 (검색기는 요청 스냅샷)"""
+        query_embedding, filter_key = None, None
+        if self._use_semantic_cache(conversation_history, excluded_ids):
+            query_embedding, filter_key, cached = await self._asemantic_get(
+                question, material_code, procedure_code, retriever
+            )
+            if cached is not None:
+                await self._acache_set(key, index_version, cached)
+                return cached
+        
+        retrieved_docs = await self.aretrieve(
+            question,
+            material_code=material_code,
+            procedure_code=procedure_code,
+            excluded_ids=excluded_ids,
+            query_embedding=query_embedding,
+            retriever=retriever
+        )
+        
+        conversation_history = await self._afit_history(conversation_history)
+        check_deadline(STAGE_CLAUDE)
+        result = await run_with_deadline(STAGE_CLAUDE, self.agent.aanswer_query(
+            question=question,
+            material_code=material_code,
+            procedure_code=procedure_code,
+            retrieved_docs=retrieved_docs,
+            conversation_history=conversation_history
+        ))
+        await self._acache_set(key, index_version, result)
+        await self._asemantic_set(query_embedding, filter_key, result, retrieved_docs, index_version)
+        return result
+    
+    async def astream(
+        self,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        conversation_history: List[Dict[str, str]] = None,
+        excluded_ids: List[str] = None,
+        excluded_sources: List[str] = None,
+        session_id: str = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        검색 + 스트리밍 답변 생성
+        
+        검색이 끝나면 참고 문서(sources)를 먼저 보내고, 이후 Claude가 생성하는
+        텍스트 조각을 도착하는 대로 보냅니다. 캐시 hit 시에는 저장된 답변을
+        하나의 token 이벤트로 보냅니다. 같은 키로 동시에 들어온 스트리밍 요청은
+        하나의 Claude 스트림을 공유합니다.
+        
+        Args:
+            question: 질문
+            material_code: 재료코드 (선택사항)
+            procedure_code: 시술코드 (선택사항)
+            conversation_history: 이전 대화 내역 (선택사항)
+            excluded_ids: 제외할 청크 ID 목록 (선택사항)
+            excluded_sources: 제외할 문서 텍스트 목록 (이전 클라이언트 호환용, ID로 변환)
+            session_id: 대화 세션 ID (선택사항, 지정 시 conversation_history 대신 세션 대화를 사용하고
+                답변 후 이번 턴을 세션에 추가)
+        
+        Yields:
+            (이벤트명, 데이터) 튜플 - "sources", "token", "done" 순
+        """
+        self._start_deadline()
+        # 요청 처리 중 인덱스가 리로드되어도 같은 스냅샷(검색기, 버전) 사용
+        retriever, index_version = self._snapshot()
+        excluded_ids = resolve_excluded_ids(excluded_ids, excluded_sources)
+        conversation_history = await self._asession_history(session_id, conversation_history)
+        key, cached = await self._acache_get(
+            index_version, question, material_code, procedure_code, conversation_history, excluded_ids
+        )
+        if cached is not None:
+            await self._arecord_turn(session_id, question, cached["answer"])
+            for event in self._replay(cached):
+                yield event
+            return
+        
+        async for event, data in self.singleflight.stream(key, partial(
+            self._astream_uncached,
+            question, material_code, procedure_code, conversation_history, excluded_ids,
+            key, index_version, retriever
+        )):
+            if event == "sources":
+                data = dict(data, question=question)
+            elif event == "done":
+                # 다음 질문이 이번 턴을 보도록 done 이벤트 전에 세션에 추가
+                await self._arecord_turn(session_id, question, data["answer"])
+            yield event, data
+    
+    def _replay(self, cached: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """캐시된 답변을 스트리밍 이벤트 형식으로 변환"""
+        return [
+            ("sources", {
+                "sources": cached["sources"],
+                "material_code": cached.get("material_code"),
+                "procedure_code": cached.get("procedure_code"),
+                "question": cached["question"]
+            }),
+            ("token", {"text": cached["answer"]}),
+            ("done", {"answer": cached["answer"]})
+        ]
+    
+    async def _astream_uncached(self, *args) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """캐시 miss 시 승인 제어 슬롯을 잡고 스트리밍 (슬롯은 생성이 끝날 때까지 유지)"""
+        async with self._admission_slot():
+            async for event in self._astream_admitted(*args):
+                yield event
+    
+    async def _astream_admitted(
+        self,
+        question: str,
+        material_code: str,
+        procedure_code: str,
+        conversation_history: List[Dict[str, str]],
+        excluded_ids: List[str],
+        key: str,
+        index_version: str,
+        retriever
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """캐시 miss 시 시맨틱 캐시 조회 → 검색 → 스트리밍 생성 → 캐시 저장 (검색기는 요청 스냅샷)"""
+        query_embedding, filter_key = None, None
+        if self._use_semantic_cache(conversation_history, excluded_ids):
+            query_embedding, filter_key, cached = await self._asemantic_get(
+                question, material_code, procedure_code, retriever
+            )
+            if cached is not None:
+                await self._acache_set(key, index_version, dict(cached, question=question))
+                for event in self._replay(dict(cached, question=question)):
+                    yield event
+                return
+        
+        retrieved_docs = await self.aretrieve(
+            question,
+            material_code=material_code,
+            procedure_code=procedure_code,
+            excluded_ids=excluded_ids,
+            query_embedding=query_embedding,
+            retriever=retriever
+        )
+        
+        # 스트리밍은 시작 후 끊지 않고, 시작 전 마감 시간 확인과 max_tokens 축소로 제한
+        check_deadline(STAGE_CLAUDE)
+        user_question, context, sources = self.agent.prepare_query(
+            question, material_code, procedure_code, retrieved_docs
+        )
+        
+        yield "sources", {
+            "sources": sources,
+            "material_code": material_code,
+            "procedure_code": procedure_code,
+            "question": question
+        }
+        
+        answer_parts = []
+        async for text in self.agent.astream_claude(
+            user_question,
+            context,
+            conversation_history=await self._afit_history(conversation_history)
+        ):
+            answer_parts.append(text)
+            yield "token", {"text": text}
+        
+        answer = "".join(answer_parts)
+        result = {
+            "answer": answer,
+            "sources": sources,
+            "material_code": material_code,
+            "procedure_code": procedure_code,
+            "question": question
+        }
+        await self._acache_set(key, index_version, result)
+        await self._asemantic_set(query_embedding, filter_key, result, retrieved_docs, index_version)
+        yield "done", {"answer": answer}
+
+
+# 싱글톤 인스턴스
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_query_engine() -> QueryEngine:
+    """QueryEngine 싱글톤 인스턴스 반환"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = QueryEngine()
+    return _engine
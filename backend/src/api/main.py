@@ -2,21 +2,78 @@
 FastAPI 메인 애플리케이션
 """
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
 import os
 
+from tools.env import load_env
+
+# 환경 변수 로드 (다른 모듈이 import 시점에 읽는 설정보다 먼저)
+load_env()
+
 from .routes import router
+from agent.query_engine import get_query_engine
+from tools.ingest_jobs import JobManager
+from tools.code_catalog import CodeCatalog
+from tools.metrics import render_metrics
+
+
+def _log_warmup_failure(task: asyncio.Task):
+    """질의 임베딩 warmup 태스크의 예외를 로그로 남김 (태스크를 기다리는 곳이 없음)"""
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        print(f"[WARNING] 질의 임베딩 warmup 실패: {error}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    앱 수명주기 관리
+
+    검색 엔진(FAISS/BM25 인덱스, Bedrock 클라이언트)과 답변 에이전트를
+    프로세스당 한 번만 로드하여 모든 요청이 공유합니다.
+    INDEX_WATCH_INTERVAL(초)이 설정되면 새 인덱스 버전 발행 시 자동으로 리로드합니다.
+    전처리 작업은 별도 워커 프로세스에서 실행되며, 종료 시 실행 중인 작업을 취소합니다.
+    코드 카탈로그(CODE_CATALOG_PATH)도 시작 시 한 번 로드하여 색인합니다.
+    QUERY_EMBEDDING_WARMUP_PATH가 설정되면 그 질의들의 임베딩을 백그라운드에서 미리 계산합니다.
+    """
+    engine = get_query_engine()
+    app.state.engine = engine
+    app.state.jobs = JobManager()
+    app.state.catalog = CodeCatalog.load()
+    
+    # 자주 쓰는 질의의 임베딩을 백그라운드에서 미리 계산 (시작을 지연시키지 않음)
+    warmup = None
+    if os.getenv("QUERY_EMBEDDING_WARMUP_PATH"):
+        warmup = asyncio.create_task(asyncio.to_thread(engine.warm_query_embeddings))
+        warmup.add_done_callback(_log_warmup_failure)
+    
+    watcher = None
+    watch_interval = float(os.getenv("INDEX_WATCH_INTERVAL", "0"))
+    if watch_interval > 0:
+        watcher = asyncio.create_task(engine.watch_index(watch_interval))
+    
+    yield
+    
+    if watcher is not None:
+        watcher.cancel()
+    # 종료 시 warmup 태스크 취소 (스레드에서 이미 실행 중이면 끝까지 실행되고 결과만 버려짐)
+    if warmup is not None:
+        warmup.cancel()
+    
+    await asyncio.to_thread(app.state.jobs.shutdown)
 
-# 환경 변수 로드
-load_dotenv()
 
 # FastAPI 앱 초기화
 app = FastAPI(
     title="보험 인정기준 RAG API",
     description="보험재료코드 및 시술행위코드의 심평원 인정기준 삭감 여부 판단 시스템",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정 - 환경변수 또는 기본값 사용
@@ -31,6 +88,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],  # 브라우저에서 단계별 처리 시간 헤더 읽기 허용
 )
 
 # 라우터 등록
@@ -43,10 +101,18 @@ async def root():
     return {
         "message": "보험 인정기준 RAG API 서버",
         "docs": "/docs",
-        "api": "/api"
+        "api": "/api",
+        "metrics": "/metrics"
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 메트릭 (단계별 지연 시간, 후보 수, 캐시 hit, Bedrock 오류/스로틀)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -2,21 +2,97 @@
 API 라우트 정의
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Request, Header, Response, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
+import hmac
+import json
 import sys
 import os
 
 # 부모 디렉토리를 path에 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agent.answer_agent import answer_insurance_query
-from pipeline import DataPreprocessor
+from agent.query_engine import QueryEngine, get_query_engine
+from tools.ingest_jobs import JobManager, run_preprocess_job
+from tools.metrics import start_request_timings
+from tools.admission import AdmissionRejected
+from tools.session_store import SessionStore, new_session_id
+from tools.chunk_ids import chunk_id_of
+from tools.code_index import normalize_code
+from tools.code_catalog import CodeCatalog
 
 router = APIRouter()
 
 
+def get_engine(request: Request) -> QueryEngine:
+    """
+    lifespan에서 생성된 프로세스 전역 QueryEngine 반환 (의존성 주입용)
+    
+    lifespan 없이 앱이 구동된 경우(예: 테스트) 싱글톤을 생성하여 등록합니다.
+    """
+    engine = getattr(request.app.state, "engine", None)
+    if engine is None:
+        engine = get_query_engine()
+        request.app.state.engine = engine
+    return engine
+
+
+def get_jobs(request: Request) -> JobManager:
+    """
+    lifespan에서 생성된 백그라운드 작업 관리자 반환 (의존성 주입용)
+    """
+    jobs = getattr(request.app.state, "jobs", None)
+    if jobs is None:
+        jobs = JobManager()
+        request.app.state.jobs = jobs
+    return jobs
+
+
+def get_catalog(request: Request) -> CodeCatalog:
+    """
+    lifespan에서 로드된 코드 카탈로그 반환 (의존성 주입용)
+    """
+    catalog = getattr(request.app.state, "catalog", None)
+    if catalog is None:
+        catalog = CodeCatalog.load()
+        request.app.state.catalog = catalog
+    return catalog
+
+
+def _overloaded(error: AdmissionRejected) -> HTTPException:
+    """과부하 거부를 429/503 + Retry-After 응답으로 변환"""
+    return HTTPException(
+        status_code=error.status_code,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
+def _check_session(engine: QueryEngine, session_id: Optional[str]):
+    """세션 ID 확인 (세션 비활성화 또는 형식 오류 시 400)"""
+    if session_id is None:
+        return
+    if engine.session_store is None:
+        raise HTTPException(status_code=400, detail="대화 세션이 비활성화되어 있습니다 (SESSION_ENABLED=false).")
+    if not SessionStore.is_valid_id(session_id):
+        raise HTTPException(status_code=400, detail="세션 ID는 영문, 숫자, -, _ 최대 64자여야 합니다.")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    관리자 엔드포인트 인증 (X-Admin-Token 헤더를 ADMIN_TOKEN과 비교)
+    
+    ADMIN_TOKEN이 설정되지 않으면 관리자 엔드포인트를 열지 않습니다 (503).
+    """
+    admin_token = os.getenv("ADMIN_TOKEN", "")
+    if not admin_token:
+        raise HTTPException(status_code=503, detail="관리자 API가 비활성화되어 있습니다 (ADMIN_TOKEN 미설정).")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode("utf-8"), admin_token.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+
 # 대화 메시지 모델
 class ConversationMessage(BaseModel):
     """대화 메시지 모델"""
@@ -32,11 +108,23 @@ class QueryRequest(BaseModel):
     question: str = Field(..., description="질문 내용")
     conversation_history: Optional[List[ConversationMessage]] = Field(
         None, 
-        description="이전 대화 내역 (선택사항)"
+        description="이전 대화 내역 (선택사항, session_id 사용 시 무시)"
+    )
+    session_id: Optional[str] = Field(
+        None,
+        description="대화 세션 ID (선택사항, 지정 시 서버에 저장된 이전 대화를 사용하고 이번 턴을 추가)"
+    )
+    excluded_ids: Optional[List[str]] = Field(
+        None,
+        description="제외할 청크 ID 목록 (재검색 시 노이즈 문서 제거용, sources의 id)"
     )
     excluded_sources: Optional[List[str]] = Field(
         None,
-        description="제외할 문서 텍스트 목록 (재검색 시 노이즈 문서 제거용)"
+        description="제외할 문서 텍스트 목록 (이전 클라이언트 호환용, excluded_ids 사용 권장)"
+    )
+    include_timings: bool = Field(
+        False,
+        description="응답에 단계별 처리 시간(timings) 포함 여부 (디버그용)"
     )
 
 
@@ -50,7 +138,15 @@ class Source(BaseModel):
     시술코드: Optional[str] = None
     시술명: Optional[str] = None
     score: float
-    text: str  # 제외 기능을 위한 문서 텍스트
+    id: str  # 청크 ID (제외 및 GET /chunks/{id} 전체 텍스트 조회용)
+    snippet: str = ""  # 청크 앞부분 미리보기
+
+
+class Chunk(BaseModel):
+    """청크 전체 텍스트 모델"""
+    id: str
+    text: str
+    metadata: Dict[str, Any]
 
 
 class QueryResponse(BaseModel):
@@ -60,6 +156,77 @@ class QueryResponse(BaseModel):
     material_code: Optional[str] = None
     procedure_code: Optional[str] = None
     question: str
+    session_id: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = Field(
+        None,
+        description="단계별 처리 시간(ms), 후보 수, 프롬프트 크기 (include_timings=true일 때만)"
+    )
+
+
+class SearchRequest(BaseModel):
+    """검색 요청 모델 (답변 생성 없음)"""
+    query: str = Field(..., description="검색 질문")
+    material_code: Optional[str] = Field(None, description="재료코드 (선택사항)")
+    procedure_code: Optional[str] = Field(None, description="시술코드 (선택사항)")
+    top_k: int = Field(10, ge=1, le=50, description="반환할 결과 수")
+    excluded_ids: Optional[List[str]] = Field(None, description="제외할 청크 ID 목록")
+    fallback: bool = Field(True, description="primary_field 없는 문서의 전체 청크 추가 여부")
+    rerank: bool = Field(True, description="Cohere Rerank / BM25 로컬 리랭크 여부")
+
+
+class SearchResult(BaseModel):
+    """검색 결과 청크 모델"""
+    id: str
+    text: str
+    metadata: Dict[str, Any]
+    score: float
+    vector_score: Optional[float] = None
+    bm25_score: Optional[float] = None
+    rerank_score: Optional[float] = None
+
+
+class SearchResponse(BaseModel):
+    """검색 응답 모델"""
+    query: str
+    results: List[SearchResult]
+    timings: Dict[str, Any] = Field(..., description="단계별 처리 시간(ms), 후보 수")
+
+
+class LookupResponse(BaseModel):
+    """코드 조회 응답 모델"""
+    codes: List[str]
+    match: str = Field(..., description="exact(코드 역색인 일치), search(검색으로 대체), none")
+    results: List[SearchResult]
+    timings: Dict[str, Any] = Field(..., description="단계별 처리 시간(ms), 후보 수")
+
+
+class CodeEntry(BaseModel):
+    """코드 카탈로그 항목 모델"""
+    type: str = Field(..., description="treatment(치료코드), material(재료코드), medicine(약제코드)")
+    code: str
+    name: str
+    edi: str
+    linked_codes: List[str] = Field(..., description="청크 연결용 코드 (코드, EDI, 이름의 분류번호)")
+
+
+class CodeSearchResponse(BaseModel):
+    """코드 카탈로그 검색 응답 모델"""
+    total: int
+    page: int
+    page_size: int
+    items: List[CodeEntry]
+
+
+class CodeChunksResponse(BaseModel):
+    """코드 카탈로그 항목 연결 청크 응답 모델"""
+    entries: List[CodeEntry]
+    results: List[SearchResult]
+
+
+class Session(BaseModel):
+    """대화 세션 모델"""
+    session_id: str
+    messages: List[ConversationMessage]
 
 
 class PreprocessRequest(BaseModel):
@@ -71,13 +238,21 @@ class PreprocessRequest(BaseModel):
 
 
 @router.post("/query", response_model=QueryResponse)
-async def query_insurance_criteria(request: QueryRequest):
+async def query_insurance_criteria(
+    request: QueryRequest,
+    response: Response,
+    engine: QueryEngine = Depends(get_engine)
+):
     """
     보험 인정기준 질의
     
     재료코드와 시술코드를 기반으로 보험 인정 여부를 판단합니다.
     대화 히스토리를 통해 이전 대화 내용을 참고할 수 있습니다.
+    session_id를 보내면 서버에 저장된 세션 대화를 사용하므로 전체 대화를 다시 보낼 필요가 없습니다.
+    단계별 처리 시간은 Server-Timing 헤더로, include_timings=true이면 timings 필드로도 반환합니다.
     """
+    _check_session(engine, request.session_id)
+    timings = start_request_timings()
     try:
         # 대화 히스토리를 딕셔너리 리스트로 변환
         conversation_history = None
@@ -87,16 +262,26 @@ async def query_insurance_criteria(request: QueryRequest):
                 for msg in request.conversation_history
             ]
         
-        result = answer_insurance_query(
+        # 검색(CPU)은 제한된 스레드 풀에서, Bedrock 호출은 await로 처리하여
+        # 느린 요청 하나가 워커의 다른 요청을 막지 않도록 함
+        result = await engine.aanswer(
             material_code=request.material_code,
             procedure_code=request.procedure_code,
             question=request.question,
             conversation_history=conversation_history,
-            excluded_sources=request.excluded_sources
+            excluded_ids=request.excluded_ids,
+            excluded_sources=request.excluded_sources,
+            session_id=request.session_id
         )
         
-        return QueryResponse(**result)
-        
+        response.headers["Server-Timing"] = timings.server_timing()
+        if request.include_timings:
+            return QueryResponse(**result, session_id=request.session_id, timings=timings.to_dict())
+        return QueryResponse(**result, session_id=request.session_id)
+    
+    except AdmissionRejected as e:
+        # 대기열 초과(429), 대기 시간 초과/Bedrock 스로틀(503)
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -104,28 +289,408 @@ async def query_insurance_criteria(request: QueryRequest):
         )
 
 
-@router.post("/preprocess")
-async def preprocess_data(request: PreprocessRequest):
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 형식의 메시지 문자열 생성"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/query/stream")
+async def query_insurance_criteria_stream(
+    request: QueryRequest,
+    engine: QueryEngine = Depends(get_engine)
+):
     """
-    데이터 전처리 실행
+    보험 인정기준 질의 (SSE 스트리밍)
     
-    원본 데이터를 청크로 나누고 임베딩을 생성하여 FAISS 인덱스에 저장합니다.
+    검색이 끝나면 `sources` 이벤트로 참고 문서를 먼저 보내고,
+    Claude가 생성하는 답변을 `token` 이벤트로 도착하는 대로 보냅니다.
+    생성이 끝나면 전체 답변을 담은 `done` 이벤트를, 오류 시 `error` 이벤트를 보냅니다.
+    include_timings=true이면 `done` 이벤트에 단계별 처리 시간(timings)을 포함합니다.
+    session_id를 보내면 `done` 이벤트 시점에 이번 턴이 세션에 추가됩니다.
+    과부하로 거부된 요청은 스트림을 시작하기 전에 429/503 + Retry-After로 응답합니다.
     """
+    _check_session(engine, request.session_id)
+    conversation_history = None
+    if request.conversation_history:
+        conversation_history = [
+            {"role": msg.role, "content": msg.content}
+            for msg in request.conversation_history
+        ]
+    
+    timings = start_request_timings()
+    events = engine.astream(
+        material_code=request.material_code,
+        procedure_code=request.procedure_code,
+        question=request.question,
+        conversation_history=conversation_history,
+        excluded_ids=request.excluded_ids,
+        excluded_sources=request.excluded_sources,
+        session_id=request.session_id
+    )
+    
+    # 첫 이벤트(sources)까지 받아 둠 → 승인 제어 거부는 상태 코드로 응답 가능
+    first, first_error = None, None
     try:
-        preprocessor = DataPreprocessor()
-        preprocessor.run_pipeline(request.data_path)
-        
-        return {
-            "status": "success",
-            "message": "데이터 전처리가 완료되었습니다.",
-            "data_path": request.data_path
+        first = await events.__anext__()
+    except StopAsyncIteration:
+        pass
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except Exception as e:
+        first_error = e
+    
+    async def event_stream():
+        try:
+            if first_error is not None:
+                raise first_error
+            if first is None:
+                return
+            
+            yield _sse_event(*first)
+            async for event, data in events:
+                if event == "done" and request.session_id is not None:
+                    data = dict(data, session_id=request.session_id)
+                if event == "done" and request.include_timings:
+                    data = dict(data, timings=timings.to_dict())
+                yield _sse_event(event, data)
+        except Exception as e:
+            yield _sse_event("error", {"detail": f"질의 처리 중 오류 발생: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # 프록시 버퍼링 비활성화
         }
-        
+    )
+
+
+def _search_result(result: Dict[str, Any]) -> SearchResult:
+    """검색기 결과 → 응답 모델"""
+    return SearchResult(
+        id=chunk_id_of(result),
+        text=result["text"],
+        metadata=result.get("metadata", {}),
+        score=result.get("score", 0.0),
+        vector_score=result.get("vector_score"),
+        bm25_score=result.get("bm25_score"),
+        rerank_score=result.get("rerank_score")
+    )
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search_chunks(
+    request: SearchRequest,
+    response: Response,
+    engine: QueryEngine = Depends(get_engine)
+):
+    """
+    검색만 수행 (Claude 답변 생성 없음)
+    
+    하이브리드 검색 결과를 검색기별 점수(vector_score, bm25_score, rerank_score)와 함께 반환합니다.
+    fallback=false, rerank=false이면 해당 단계를 생략하여 벡터/BM25 검색과 결과 통합만 수행합니다.
+    단계별 처리 시간은 timings 필드와 Server-Timing 헤더로 반환합니다.
+    """
+    timings = start_request_timings()
+    try:
+        results = await engine.asearch(
+            request.query,
+            material_code=request.material_code,
+            procedure_code=request.procedure_code,
+            excluded_ids=request.excluded_ids,
+            top_k=request.top_k,
+            use_fallback=request.fallback,
+            use_rerank=request.rerank
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"검색 중 오류 발생: {str(e)}"
+        )
+    
+    response.headers["Server-Timing"] = timings.server_timing()
+    return SearchResponse(
+        query=request.query,
+        results=[_search_result(result) for result in results],
+        timings=timings.to_dict()
+    )
+
+
+@router.get("/lookup", response_model=LookupResponse)
+async def lookup_codes(
+    response: Response,
+    code: List[str] = Query(..., description="재료코드, 시술코드, 분류번호(자651-2), 고시번호 (반복 지정 시 모두 포함하는 청크)"),
+    excluded_ids: Optional[List[str]] = Query(None, description="제외할 청크 ID"),
+    fallback: bool = Query(True, description="일치하는 청크가 없으면 검색으로 대체"),
+    top_k: int = Query(10, ge=1, le=50, description="검색으로 대체할 때 반환할 결과 수"),
+    engine: QueryEngine = Depends(get_engine)
+):
+    """
+    코드로 인정기준 청크 조회 (임베딩/Claude 호출 없음)
+    
+    인덱스 발행 시 만든 코드 역색인에서 코드를 포함하는 청크를 모두 반환합니다.
+    일치하는 청크가 없을 때만 하이브리드 검색으로 대체합니다(match=search).
+    """
+    timings = start_request_timings()
+    try:
+        match, results = await engine.alookup(
+            code,
+            excluded_ids=excluded_ids,
+            top_k=top_k,
+            fallback=fallback
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"전처리 중 오류 발생: {str(e)}"
+            detail=f"코드 조회 중 오류 발생: {str(e)}"
         )
+    
+    response.headers["Server-Timing"] = timings.server_timing()
+    return LookupResponse(
+        codes=[normalize_code(c) for c in code],
+        match=match,
+        results=[_search_result(result) for result in results],
+        timings=timings.to_dict()
+    )
+
+
+@router.get("/codes", response_model=CodeSearchResponse)
+def search_codes(
+    response: Response,
+    q: str = Query("", description="검색어 (코드/이름/EDI 부분 일치, 대소문자/공백 무시)"),
+    type: Optional[str] = Query(None, pattern="^(treatment|material|medicine)$", description="코드 종류"),
+    field: str = Query("all", pattern="^(all|code|name|edi)$", description="검색 대상 필드"),
+    sort: str = Query("code", pattern="^(code|name|edi)$", description="정렬 키"),
+    order: str = Query("asc", pattern="^(asc|desc)$", description="정렬 방향"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(100, ge=1, le=500),
+    catalog: CodeCatalog = Depends(get_catalog)
+):
+    """
+    코드 카탈로그 검색 (페이지네이션, 정렬)
+    
+    코드/EDI/이름의 문자 n-gram 역색인으로 후보를 좁혀 검색합니다.
+    """
+    timings = start_request_timings()
+    result = catalog.search(q, code_type=type, field=field, sort=sort, order=order, page=page, page_size=page_size)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return result
+
+
+@router.get("/codes/typeahead", response_model=List[CodeEntry])
+def typeahead_codes(
+    response: Response,
+    q: str = Query(..., description="입력 중인 검색어"),
+    type: Optional[str] = Query(None, pattern="^(treatment|material|medicine)$", description="코드 종류"),
+    limit: int = Query(10, ge=1, le=50),
+    catalog: CodeCatalog = Depends(get_catalog)
+):
+    """
+    코드 자동완성 (코드/EDI 접두어 일치 우선, 이름 부분 일치 순)
+    """
+    timings = start_request_timings()
+    items = catalog.typeahead(q, code_type=type, limit=limit)
+    response.headers["Server-Timing"] = timings.server_timing()
+    return items
+
+
+@router.get("/codes/{code}/chunks", response_model=CodeChunksResponse)
+def get_code_chunks(
+    code: str,
+    type: Optional[str] = Query(None, pattern="^(treatment|material|medicine)$", description="코드 종류"),
+    catalog: CodeCatalog = Depends(get_catalog),
+    engine: QueryEngine = Depends(get_engine)
+):
+    """
+    카탈로그 항목을 언급하는 청크 조회 (코드 역색인, 임베딩/Claude 호출 없음)
+    
+    항목의 연결 코드(코드, EDI, 이름의 분류번호) 중 하나라도 포함하는 청크를 반환합니다.
+    """
+    entries = catalog.get(code, code_type=type)
+    if not entries:
+        raise HTTPException(status_code=404, detail=f"카탈로그에 없는 코드입니다: {code}")
+    
+    linked_codes = dict.fromkeys(c for entry in entries for c in entry["linked_codes"])
+    results = {}
+    for linked_code in linked_codes:
+        for result in engine.retriever.lookup_codes([linked_code]):
+            results.setdefault(chunk_id_of(result), result)
+    
+    return CodeChunksResponse(
+        entries=entries,
+        results=[_search_result(result) for result in results.values()]
+    )
+
+
+@router.get("/chunks/{chunk_id}", response_model=Chunk)
+def get_chunk(chunk_id: str, engine: QueryEngine = Depends(get_engine)):
+    """
+    청크 전체 텍스트 조회 (참고 문서 펼치기 시 지연 로딩)
+    
+    첫 호출 시 ID 색인을 만들므로 스레드 풀에서 실행되도록 동기 함수로 둡니다.
+    """
+    chunk = engine.get_chunk(chunk_id)
+    if chunk is None:
+        raise HTTPException(status_code=404, detail=f"청크를 찾을 수 없습니다: {chunk_id}")
+    return chunk
+
+
+@router.post("/sessions", response_model=Session, status_code=201)
+async def create_session(engine: QueryEngine = Depends(get_engine)):
+    """
+    새 대화 세션 ID 발급 (클라이언트가 만든 ID를 그대로 session_id로 보내도 됨)
+    """
+    session_id = new_session_id()
+    _check_session(engine, session_id)
+    return {"session_id": session_id, "messages": []}
+
+
+@router.get("/sessions/{session_id}", response_model=Session)
+def get_session(session_id: str, engine: QueryEngine = Depends(get_engine)):
+    """
+    세션 대화 조회 (SQLite 조회가 있을 수 있어 스레드 풀에서 실행되도록 동기 함수로 둡니다)
+    """
+    _check_session(engine, session_id)
+    return {"session_id": session_id, "messages": engine.session_store.get(session_id)}
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+def delete_session(session_id: str, engine: QueryEngine = Depends(get_engine)):
+    """
+    세션 삭제 (대화 초기화)
+    """
+    _check_session(engine, session_id)
+    engine.session_store.delete(session_id)
+    return Response(status_code=204)
+
+
+@router.post("/preprocess", status_code=202)
+async def preprocess_data(
+    request: PreprocessRequest,
+    jobs: JobManager = Depends(get_jobs)
+):
+    """
+    데이터 전처리 작업 제출
+    
+    원본 데이터를 청크로 나누고 임베딩을 생성하여 FAISS 인덱스에 저장하는 작업을
+    별도 워커 프로세스에서 실행합니다. 진행 상황은 `GET /jobs/{job_id}`로 조회합니다.
+    """
+    if not os.path.exists(request.data_path):
+        raise HTTPException(
+            status_code=400,
+            detail=f"데이터 파일을 찾을 수 없습니다: {request.data_path}"
+        )
+    
+    try:
+        job = jobs.submit(
+            "preprocess",
+            run_preprocess_job,
+            args=(request.data_path,),
+            params={"data_path": request.data_path}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"전처리 작업 제출 중 오류 발생: {str(e)}"
+        )
+    
+    return {
+        "status": "accepted",
+        "message": "데이터 전처리 작업이 시작되었습니다.",
+        "job_id": job["job_id"],
+        "job": job
+    }
+
+
+@router.get("/jobs")
+async def list_jobs(jobs: JobManager = Depends(get_jobs)):
+    """
+    백그라운드 작업 목록 (최근 제출 순)
+    """
+    return {"jobs": jobs.list(), **jobs.stats()}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, jobs: JobManager = Depends(get_jobs)):
+    """
+    백그라운드 작업 상태 (단계별 진행률: parsed, chunked, embedded, indexed, 처리량)
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return job
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str, jobs: JobManager = Depends(get_jobs)):
+    """
+    백그라운드 작업 취소
+    
+    대기 중인 작업은 즉시, 실행 중인 작업은 다음 진행 보고 시점에 중단됩니다.
+    인덱스 저장 단계에 들어간 작업은 저장을 마친 뒤 종료됩니다.
+    """
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return job
+
+
+@router.get("/cache/stats")
+async def cache_stats(engine: QueryEngine = Depends(get_engine)):
+    """
+    답변 캐시 통계 (hit/miss, 항목 수, 합쳐진 동시 요청 수, 승인 제어 상태, 세션/대화 요약, 질의 임베딩 캐시)
+    """
+    stats = {"enabled": engine.answer_cache is not None}
+    if engine.answer_cache is not None:
+        stats.update(engine.answer_cache.stats())
+    stats["semantic"] = (
+        {"enabled": True, **engine.semantic_cache.stats()}
+        if engine.semantic_cache is not None else {"enabled": False}
+    )
+    stats["singleflight"] = engine.singleflight.stats()
+    stats["admission"] = (
+        {"enabled": True, **engine.admission.stats()}
+        if engine.admission is not None else {"enabled": False}
+    )
+    stats["sessions"] = (
+        {"enabled": True, **engine.session_store.stats()}
+        if engine.session_store is not None else {"enabled": False}
+    )
+    stats["history"] = engine.history_budget.stats()
+    embedder = getattr(getattr(engine.retriever, "faiss_retriever", None), "embedder", None)
+    query_cache = getattr(embedder, "query_cache", None)
+    stats["query_embedding"] = (
+        {"enabled": True, **query_cache.stats()}
+        if query_cache is not None else {"enabled": False}
+    )
+    return stats
+
+
+@router.post("/admin/reload", dependencies=[Depends(require_admin)])
+async def reload_index(engine: QueryEngine = Depends(get_engine)):
+    """
+    인덱스 리로드 (서버 재시작 없음)
+    
+    새 FAISS/BM25 인덱스를 백그라운드에서 로드한 뒤 원자적으로 교체합니다.
+    진행 중인 요청은 이전 인덱스로 끝까지 처리됩니다.
+    """
+    try:
+        result = await engine.areload_index()
+        return {"status": "success", **result}
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"인덱스 리로드 중 오류 발생 (기존 인덱스 유지): {str(e)}"
+        )
+
+
+@router.get("/admin/index", dependencies=[Depends(require_admin)])
+async def index_info(engine: QueryEngine = Depends(get_engine)):
+    """
+    현재 서비스 중인 인덱스 정보 (로드된 버전, 발행된 버전, 벡터/문서 수)
+    """
+    return engine.index_info()
 
 
 @router.get("/health")
@@ -149,7 +714,23 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /query": "보험 인정기준 질의",
-            "POST /preprocess": "데이터 전처리",
+            "POST /query/stream": "보험 인정기준 질의 (SSE 스트리밍)",
+            "POST /search": "검색만 수행 (답변 생성 없음)",
+            "GET /lookup": "코드로 인정기준 청크 조회",
+            "GET /codes": "코드 카탈로그 검색",
+            "GET /codes/typeahead": "코드 자동완성",
+            "GET /codes/{code}/chunks": "코드를 언급하는 청크",
+            "GET /chunks/{chunk_id}": "참고 문서 전체 텍스트",
+            "POST /sessions": "대화 세션 발급",
+            "GET /sessions/{session_id}": "세션 대화 조회",
+            "DELETE /sessions/{session_id}": "세션 삭제 (대화 초기화)",
+            "POST /preprocess": "데이터 전처리 작업 제출",
+            "GET /jobs": "작업 목록",
+            "GET /jobs/{job_id}": "작업 진행 상황",
+            "POST /jobs/{job_id}/cancel": "작업 취소",
+            "GET /cache/stats": "답변 캐시 통계",
+            "POST /admin/reload": "인덱스 리로드 (무중단)",
+            "GET /admin/index": "현재 인덱스 정보",
             "GET /health": "헬스 체크"
         }
     }
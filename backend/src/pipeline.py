@@ -6,23 +6,30 @@
 import json
 import os
 import pickle
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable
 import numpy as np
 import faiss
-from dotenv import load_dotenv
 
-from tools.embedder_tool import TitanEmbedder
+from tools.env import load_env
+from tools.embedding_backend import EmbeddingBackend, create_embedder, embed_chunks
+from tools.index_version import publish_index_version
+from tools.chunk_ids import make_chunk_id
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 class DataPreprocessor:
     """데이터 전처리 및 벡터 스토어 생성 클래스"""
     
-    def __init__(self):
-        """초기화"""
-        self.embedder = TitanEmbedder()
+    def __init__(self, embedder: EmbeddingBackend = None):
+        """
+        초기화
+        
+        Args:
+            embedder: 임베딩 백엔드 (None이면 EMBEDDING_BACKEND 설정으로 생성)
+        """
+        self.embedder = embedder if embedder is not None else create_embedder()
         self.vector_store_path = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
         
         # 디렉토리 생성
@@ -139,24 +146,24 @@ class DataPreprocessor:
         print(f"청크 생성 완료: {len(chunks)}개 청크")
         return chunks
     
-    def create_embeddings(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def create_embeddings(
+        self,
+        chunks: List[Dict[str, Any]],
+        progress_callback: Callable[[int], None] = None
+    ) -> List[Dict[str, Any]]:
         """
         청크에 임베딩 추가
         
         Args:
             chunks: 청크 리스트
+            progress_callback: 청크 하나를 임베딩할 때마다 호출 (진행률 보고/취소용)
             
         Returns:
             임베딩이 추가된 청크 리스트
         """
         print("임베딩 생성 시작...")
         
-        texts = [chunk['text'] for chunk in chunks]
-        embeddings = self.embedder.embed_texts(texts)
-        
-        # 임베딩을 각 청크에 추가
-        for i, chunk in enumerate(chunks):
-            chunk['embedding'] = embeddings[i]
+        embed_chunks(self.embedder, chunks, progress_callback=progress_callback)
         
         print("임베딩 생성 완료")
         return chunks
@@ -191,6 +198,7 @@ class DataPreprocessor:
         metadata_list = []
         for chunk in valid_chunks:
             metadata = {
+                "id": make_chunk_id(chunk['text']),
                 "text": chunk['text'],
                 "metadata": chunk['metadata']
             }
@@ -201,30 +209,49 @@ class DataPreprocessor:
             pickle.dump(metadata_list, f)
         print(f"메타데이터 저장 완료: {metadata_path}")
         
+        # 새 인덱스 버전 발행 (서버의 답변 캐시 무효화)
+        publish_index_version(self.vector_store_path)
+        
         print(f"총 {len(valid_chunks)}개 벡터가 인덱스에 추가되었습니다.")
     
-    def run_pipeline(self, raw_data_path: str):
+    def run_pipeline(self, raw_data_path: str, reporter=None):
         """
         전체 파이프라인 실행
         
         Args:
             raw_data_path: 원본 데이터 파일 경로
+            reporter: 단계별 진행률 보고 객체 (백그라운드 작업용 JobReporter, 없으면 None)
         """
         print("=" * 60)
         print("데이터 전처리 파이프라인 시작")
         print("=" * 60)
         
         # 1. 원본 데이터 로드
+        if reporter:
+            reporter.stage("parsed")
         data = self.load_raw_data(raw_data_path)
         
         # 2. 청크 생성
+        if reporter:
+            reporter.complete(len(data))
+            reporter.stage("chunked")
         chunks = self.create_chunks(data)
         
         # 3. 임베딩 생성
-        chunks_with_embeddings = self.create_embeddings(chunks)
+        if reporter:
+            reporter.complete(len(chunks))
+            reporter.stage("embedded", total=len(chunks))
+        chunks_with_embeddings = self.create_embeddings(
+            chunks,
+            progress_callback=reporter.advance if reporter else None
+        )
         
-        # 4. FAISS에 저장
+        # 4. FAISS에 저장 (이 단계부터는 취소하지 않음)
+        if reporter:
+            reporter.stage("indexed", total=len(chunks_with_embeddings))
         self.save_to_faiss(chunks_with_embeddings)
+        if reporter:
+            reporter.complete(len(chunks_with_embeddings))
         
         print("=" * 60)
         print("데이터 전처리 파이프라인 완료")
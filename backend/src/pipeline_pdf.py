@@ -9,21 +9,28 @@ import pickle
 from typing import List, Dict, Any
 import numpy as np
 import faiss
-from dotenv import load_dotenv
 
-from tools.embedder_tool import TitanEmbedder
+from tools.env import load_env
+from tools.embedding_backend import EmbeddingBackend, create_embedder, embed_chunks
+from tools.index_version import publish_index_version
+from tools.chunk_ids import make_chunk_id
 from tools.document_loader import DocumentLoader
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 class PDFPreprocessor:
     """PDF 문서 전처리 및 벡터 스토어 생성 클래스"""
     
-    def __init__(self):
-        """초기화"""
-        self.embedder = TitanEmbedder()
+    def __init__(self, embedder: EmbeddingBackend = None):
+        """
+        초기화
+        
+        Args:
+            embedder: 임베딩 백엔드 (None이면 EMBEDDING_BACKEND 설정으로 생성)
+        """
+        self.embedder = embedder if embedder is not None else create_embedder()
         self.loader = DocumentLoader()
         self.vector_store_path = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
         
@@ -83,12 +90,7 @@ class PDFPreprocessor:
         """
         print("임베딩 생성 시작...")
         
-        texts = [chunk['text'] for chunk in chunks]
-        embeddings = self.embedder.embed_texts(texts)
-        
-        # 임베딩을 각 청크에 추가
-        for i, chunk in enumerate(chunks):
-            chunk['embedding'] = embeddings[i]
+        embed_chunks(self.embedder, chunks)
         
         print("임베딩 생성 완료")
         return chunks
@@ -120,6 +122,7 @@ class PDFPreprocessor:
         metadata_list = []
         for chunk in valid_chunks:
             metadata = {
+                "id": make_chunk_id(chunk['text']),
                 "text": chunk['text'],
                 "metadata": chunk['metadata']
             }
@@ -130,6 +133,9 @@ class PDFPreprocessor:
             pickle.dump(metadata_list, f)
         print(f"메타데이터 저장 완료: {metadata_path}")
         
+        # 새 인덱스 버전 발행 (서버의 답변 캐시 무효화)
+        publish_index_version(self.vector_store_path)
+        
         print(f"총 {len(valid_chunks)}개 벡터가 인덱스에 추가되었습니다.")
     
     def run_pipeline(self, pdf_path: str):
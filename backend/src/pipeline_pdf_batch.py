@@ -9,21 +9,28 @@ import glob
 from typing import List, Dict, Any
 import numpy as np
 import faiss
-from dotenv import load_dotenv
 
-from tools.embedder_tool import TitanEmbedder
+from tools.env import load_env
+from tools.embedding_backend import EmbeddingBackend, create_embedder, embed_chunks
+from tools.index_version import publish_index_version
+from tools.chunk_ids import make_chunk_id
 from tools.document_loader import DocumentLoader
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 class BatchPDFPreprocessor:
     """여러 PDF 문서를 한 번에 전처리하는 클래스"""
     
-    def __init__(self):
-        """초기화"""
-        self.embedder = TitanEmbedder()
+    def __init__(self, embedder: EmbeddingBackend = None):
+        """
+        초기화
+        
+        Args:
+            embedder: 임베딩 백엔드 (None이면 EMBEDDING_BACKEND 설정으로 생성)
+        """
+        self.embedder = embedder if embedder is not None else create_embedder()
         self.loader = DocumentLoader()
         self.vector_store_path = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
         
@@ -100,11 +107,7 @@ class BatchPDFPreprocessor:
         
         # 임베딩 생성
         print("\n임베딩 생성 시작...")
-        texts = [chunk['text'] for chunk in all_chunks]
-        embeddings = self.embedder.embed_texts(texts)
-        
-        for i, chunk in enumerate(all_chunks):
-            chunk['embedding'] = embeddings[i]
+        embed_chunks(self.embedder, all_chunks)
         
         print("임베딩 생성 완료")
         
@@ -143,6 +146,7 @@ class BatchPDFPreprocessor:
         metadata_list = []
         for chunk in valid_chunks:
             metadata = {
+                "id": make_chunk_id(chunk['text']),
                 "text": chunk['text'],
                 "metadata": chunk['metadata']
             }
@@ -172,6 +176,9 @@ class BatchPDFPreprocessor:
             print(f"⚠️  BM25 인덱스 생성 실패: {str(e)}")
             print("   (FAISS 검색은 정상 작동합니다)")
         
+        # 새 인덱스 버전 발행 (서버의 답변 캐시 무효화)
+        publish_index_version(self.vector_store_path)
+        
         print(f"\n총 {len(valid_chunks)}개 벡터가 인덱스에 추가되었습니다.")
 
 
@@ -9,22 +9,29 @@ import glob
 from typing import List, Dict, Any, Set
 import numpy as np
 import faiss
-from dotenv import load_dotenv
 from datetime import datetime
 
-from tools.embedder_tool import TitanEmbedder
+from tools.env import load_env
+from tools.embedding_backend import EmbeddingBackend, create_embedder, embed_chunks
+from tools.index_version import publish_index_version
+from tools.chunk_ids import make_chunk_id, assign_chunk_ids
 from tools.document_loader import DocumentLoader
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 class IncrementalPDFPreprocessor:
     """증분 학습을 지원하는 PDF 전처리 클래스"""
     
-    def __init__(self):
-        """초기화"""
-        self.embedder = TitanEmbedder()
+    def __init__(self, embedder: EmbeddingBackend = None):
+        """
+        초기화
+        
+        Args:
+            embedder: 임베딩 백엔드 (None이면 EMBEDDING_BACKEND 설정으로 생성)
+        """
+        self.embedder = embedder if embedder is not None else create_embedder()
         self.loader = DocumentLoader()
         self.vector_store_path = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
         self.processed_files_path = os.path.join(self.vector_store_path, "processed_files.json")
@@ -53,7 +60,8 @@ class IncrementalPDFPreprocessor:
         # 메타데이터 로드
         if os.path.exists(metadata_path):
             with open(metadata_path, 'rb') as f:
-                self.metadata = pickle.load(f)
+                # ID 도입 전에 만든 항목에도 청크 ID 부여
+                self.metadata = assign_chunk_ids(pickle.load(f))
             print(f"[OK] 기존 메타데이터 로드: {len(self.metadata)}개 항목")
         else:
             print("[INFO] 기존 메타데이터 없음 (새로 생성)")
@@ -69,6 +77,23 @@ class IncrementalPDFPreprocessor:
         else:
             print("[INFO] 처리된 파일 목록 없음")
     
+    def _check_dimensions(self):
+        """
+        기존 인덱스 차원과 임베딩 차원 확인
+        
+        Raises:
+            ValueError: 기존 FAISS 인덱스 차원과 EMBEDDING_DIMENSIONS가 다름
+        """
+        if self.index is None:
+            return
+        dimensions = getattr(self.embedder, "dimensions", self.index.d)
+        if self.index.d != dimensions:
+            raise ValueError(
+                f"기존 FAISS 인덱스 차원({self.index.d})과 EMBEDDING_DIMENSIONS({dimensions})가 달라 "
+                "새 벡터를 추가할 수 없습니다. EMBEDDING_DIMENSIONS를 인덱스에 맞추거나, "
+                "기존 인덱스(faiss_index.bin, metadata.pkl)를 삭제한 뒤 --force로 모든 PDF를 다시 처리해주세요."
+            )
+    
     def _save_processed_files(self):
         """처리된 파일 목록 저장"""
         data = {
@@ -90,6 +115,9 @@ class IncrementalPDFPreprocessor:
         print("증분 학습: 새로운 PDF만 추가")
         print("=" * 60)
         
+        # 임베딩 비용을 쓰기 전에 기존 인덱스에 추가할 수 있는지 확인
+        self._check_dimensions()
+        
         # PDF 파일 목록 가져오기
         pdf_pattern = os.path.join(pdf_folder, "*.pdf")
         all_pdf_files = glob.glob(pdf_pattern)
@@ -170,11 +198,7 @@ class IncrementalPDFPreprocessor:
         
         # 임베딩 생성
         print("\n임베딩 생성 시작...")
-        texts = [chunk['text'] for chunk in new_chunks]
-        embeddings = self.embedder.embed_texts(texts)
-        
-        for i, chunk in enumerate(new_chunks):
-            chunk['embedding'] = embeddings[i]
+        embed_chunks(self.embedder, new_chunks)
         
         print("[OK] 임베딩 생성 완료")
         
@@ -217,6 +241,7 @@ class IncrementalPDFPreprocessor:
         # 메타데이터 추가
         for chunk in valid_chunks:
             metadata = {
+                "id": make_chunk_id(chunk['text']),
                 "text": chunk['text'],
                 "metadata": chunk['metadata']
             }
@@ -256,6 +281,9 @@ class IncrementalPDFPreprocessor:
         except Exception as e:
             print(f"[WARNING] BM25 인덱스 업데이트 실패: {str(e)}")
             print("   (FAISS 검색은 정상 작동합니다)")
+        
+        # 모든 인덱스 파일 저장 후 새 버전 발행 (서버의 답변 캐시 무효화)
+        publish_index_version(self.vector_store_path)
     
     def reset_processed_files(self):
         """처리된 파일 목록 초기화 (전체 재학습용)"""
@@ -1,12 +1,35 @@
-"""Tools 패키지"""
+"""Tools 패키지
 
-from .embedder_tool import TitanEmbedder, create_embedder_tool
-from .faiss_retriever import FAISSRetriever, create_retriever_tool
+하위 모듈(tools.metrics 등)만 import해도 패키지 __init__이 실행되므로
+임베더/FAISS 같은 무거운 모듈은 처음 접근할 때 로드합니다.
+"""
+
+import importlib
+
+_LAZY_EXPORTS = {
+    'TitanEmbedder': '.embedder_tool',
+    'create_embedder_tool': '.embedder_tool',
+    'EmbeddingBackend': '.embedding_backend',
+    'LocalHashEmbedder': '.embedding_backend',
+    'create_embedder': '.embedding_backend',
+    'FAISSRetriever': '.faiss_retriever',
+    'create_retriever_tool': '.faiss_retriever'
+}
 
 __all__ = [
     'TitanEmbedder',
     'create_embedder_tool',
+    'EmbeddingBackend',
+    'LocalHashEmbedder',
+    'create_embedder',
     'FAISSRetriever',
     'create_retriever_tool'
 ]
 
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
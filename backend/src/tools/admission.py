@@ -0,0 +1,225 @@
+"""
+Bedrock 호출 앞단의 승인 제어 (동시 실행 제한 + 제한된 대기열)
+버스트 부하가 그대로 Bedrock으로 전달되어 스로틀이 연쇄적으로 발생하지 않도록,
+동시에 Claude를 호출하는 요청 수를 제한하고 대기열이 가득 차면 즉시 거부
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+from tools.metrics import (
+    ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_LIMIT,
+    ADMISSION_WAIT, ADMISSION_REJECTED, STAGE_ADMISSION_WAIT, current_timings
+)
+
+
+class AdmissionRejected(Exception):
+    """
+    과부하로 요청 거부 (API에서 status_code와 Retry-After 헤더로 응답)
+    
+    Attributes:
+        status_code: HTTP 상태 코드 (대기열 가득 참 429, 대기 시간 초과 503)
+        retry_after: 재시도까지 권장 대기 시간(초)
+        reason: 거부 사유 (queue_full, timeout, throttled)
+    """
+    
+    def __init__(self, message: str, status_code: int = 503, retry_after: int = 1, reason: str = "timeout"):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class BedrockThrottled(AdmissionRejected):
+    """Bedrock이 요청을 스로틀함 (재시도 권장, 503)"""
+    
+    def __init__(self, message: str, retry_after: int = 2):
+        super().__init__(message, status_code=503, retry_after=retry_after, reason="throttled")
+
+
+class AdmissionController:
+    """
+    동시 실행 제한 + 제한된 대기열 (AIMD 한도 조정)
+    
+    Bedrock 스로틀이 발생하면 동시 실행 한도를 절반으로 줄이고, 정상 완료될 때마다
+    조금씩(1/한도) 늘려 지속 가능한 Bedrock 처리량 근처에서 동작하도록 합니다.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        max_queue: int = None,
+        queue_timeout: float = None,
+        min_concurrency: int = None
+    ):
+        """
+        초기화
+        
+        Args:
+            max_concurrency: 최대 동시 실행 수 (기본 ADMISSION_MAX_CONCURRENCY 또는 8)
+            max_queue: 최대 대기 요청 수 (기본 ADMISSION_QUEUE_SIZE 또는 32), 초과 시 429
+            queue_timeout: 최대 대기 시간(초) (기본 ADMISSION_QUEUE_TIMEOUT 또는 15), 초과 시 503
+            min_concurrency: 스로틀 시 줄어드는 한도의 하한 (기본 ADMISSION_MIN_CONCURRENCY 또는 1)
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8"))
+        if max_queue is None:
+            max_queue = int(os.getenv("ADMISSION_QUEUE_SIZE", "32"))
+        if queue_timeout is None:
+            queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "15"))
+        if min_concurrency is None:
+            min_concurrency = int(os.getenv("ADMISSION_MIN_CONCURRENCY", "1"))
+        
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        
+        self.limit = float(self.max_concurrency)  # 현재 한도 (AIMD로 조정)
+        self.in_flight = 0
+        self._waiters = deque()  # 대기 중인 Future (FIFO)
+        self._service_time = 5.0  # 슬롯 점유 시간 이동 평균(초), Retry-After 추정용
+        
+        self.admitted = 0
+        self.rejected = 0
+        self.throttled = 0
+        ADMISSION_LIMIT.set(self.max_concurrency)
+    
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+    
+    def _retry_after(self) -> int:
+        """대기열이 빠지는 데 걸릴 예상 시간(초)"""
+        slots = max(1, int(self.limit))
+        return max(1, math.ceil(self._service_time * (self.queue_depth + 1) / slots))
+    
+    def _reject(self, message: str, status_code: int, reason: str):
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(reason=reason).inc()
+        raise AdmissionRejected(message, status_code=status_code, retry_after=self._retry_after(), reason=reason)
+    
+    async def acquire(self, timeout: float = None):
+        """
+        슬롯 획득 (빈 슬롯이 없으면 대기열에서 순서대로 대기)
+        
+        Args:
+            timeout: 최대 대기 시간(초) (요청 마감 시간까지 남은 시간, queue_timeout보다 길면 무시)
+        
+        Raises:
+            AdmissionRejected: 대기열이 가득 참(429) 또는 대기 시간 초과(503)
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self._admit()
+            return
+        
+        if len(self._waiters) >= self.max_queue:
+            self._reject("요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.", 429, "queue_full")
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.inc()
+        try:
+            wait = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+            await asyncio.wait_for(asyncio.shield(waiter), wait)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+            elif not waiter.cancelled():
+                # 시간 초과와 동시에 슬롯을 넘겨받은 경우 반납
+                self.release()
+            self._reject("대기 시간이 초과되었습니다. 잠시 후 다시 시도해주세요.", 503, "timeout")
+        except asyncio.CancelledError:
+            # 클라이언트 연결 종료 등으로 취소됨 → 넘겨받은 슬롯이 있으면 반납
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                ADMISSION_QUEUE_DEPTH.dec()
+    
+    def _admit(self):
+        self.in_flight += 1
+        self.admitted += 1
+        ADMISSION_IN_FLIGHT.inc()
+    
+    def release(self):
+        """슬롯 반납 후 대기 중인 요청에 넘겨줌"""
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.dec()
+        self._wake()
+    
+    def _wake(self):
+        """한도 안에서 대기 요청에 슬롯을 넘겨줌"""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            ADMISSION_QUEUE_DEPTH.dec()
+            if waiter.done():
+                continue  # 시간 초과/취소된 대기자
+            self._admit()
+            waiter.set_result(None)
+    
+    def on_success(self, service_time: float):
+        """정상 완료: 한도를 조금 늘림 (additive increase)"""
+        self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        if self.limit < self.max_concurrency:
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            ADMISSION_LIMIT.set(int(self.limit))
+            self._wake()
+    
+    def on_throttle(self):
+        """Bedrock 스로틀: 한도를 절반으로 줄임 (multiplicative decrease)"""
+        self.throttled += 1
+        self.limit = max(float(self.min_concurrency), self.limit / 2)
+        ADMISSION_LIMIT.set(int(self.limit))
+        print(f"[WARNING] Bedrock 스로틀 감지 → 동시 실행 한도 {int(self.limit)}로 감소")
+    
+    @asynccontextmanager
+    async def slot(self, timeout: float = None):
+        """
+        슬롯을 점유한 채 블록 실행
+        
+        블록에서 BedrockThrottled가 발생하면 한도를 줄이고, 정상 종료하면 한도를 늘립니다.
+        
+        Args:
+            timeout: 최대 대기 시간(초) (None이면 queue_timeout)
+        """
+        start = time.perf_counter()
+        await self.acquire(timeout)
+        waited = time.perf_counter() - start
+        ADMISSION_WAIT.observe(waited)
+        timings = current_timings()
+        if timings is not None:
+            timings.add_stage(STAGE_ADMISSION_WAIT, waited)
+        
+        admitted_at = time.perf_counter()
+        try:
+            yield
+        except BedrockThrottled:
+            self.on_throttle()
+            raise
+        else:
+            self.on_success(time.perf_counter() - admitted_at)
+        finally:
+            self.release()
+    
+    def stats(self) -> Dict[str, Any]:
+        """현재 한도, 실행/대기 수, 누적 승인/거부 수"""
+        return {
+            "limit": int(self.limit),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "throttled": self.throttled
+        }
@@ -0,0 +1,283 @@
+"""
+답변 캐시 (2단계)
+1단계: 프로세스 메모리 LRU(TTL), 2단계: 모든 uvicorn 워커가 공유하는 SQLite 디스크 캐시
+
+키는 정규화된 질문, 재료/시술코드, 제외 청크 ID, 대화 히스토리 해시, 인덱스 버전으로 구성되며
+파이프라인이 새 인덱스 버전을 발행하면 이전 버전의 항목은 자동으로 무효화됩니다.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from tools.lru_cache import LRUCache
+from tools.metrics import count_cache
+
+
+# 캐시된 답변 형식 버전 (sources 형식이 바뀌면 올려 이전 형식의 항목을 무시)
+CACHE_FORMAT_VERSION = "2"
+
+
+class AnswerCache:
+    """질의 답변 2단계 캐시 (메모리 LRU + SQLite)"""
+    
+    def __init__(
+        self,
+        max_entries: int = None,
+        ttl: float = None,
+        db_path: str = None
+    ):
+        """
+        초기화
+        
+        Args:
+            max_entries: 메모리 캐시 최대 항목 수 (기본 ANSWER_CACHE_SIZE 또는 1024)
+            ttl: 항목 만료 시간(초) (기본 ANSWER_CACHE_TTL 또는 86400)
+            db_path: SQLite 파일 경로 (기본 ANSWER_CACHE_DB, 빈 문자열이면 디스크 캐시 비활성화)
+        """
+        if max_entries is None:
+            max_entries = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+        if ttl is None:
+            ttl = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+        if db_path is None:
+            db_path = os.getenv("ANSWER_CACHE_DB", "./data/cache/answer_cache.sqlite")
+        
+        self.ttl = ttl
+        self.memory = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.db_path = db_path or None
+        
+        self._lock = threading.Lock()
+        self._index_version = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        
+        if self.db_path:
+            self._init_db()
+    
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """질문 정규화 (유니코드 NFKC, 소문자, 공백 정리, 끝 문장부호 제거)"""
+        text = unicodedata.normalize("NFKC", question or "").lower()
+        text = re.sub(r"\s+", " ", text).strip()
+        return text.rstrip("?!.。 ")
+    
+    @staticmethod
+    def _normalize_code(code: Optional[str]) -> str:
+        return (code or "").strip().upper()
+    
+    @classmethod
+    def make_key(
+        cls,
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None,
+        excluded_ids: List[str] = None,
+        conversation_history: List[Dict[str, str]] = None,
+        index_version: str = ""
+    ) -> str:
+        """
+        캐시 키 생성
+        
+        Args:
+            question: 질문
+            material_code: 재료코드
+            procedure_code: 시술코드
+            excluded_ids: 제외할 청크 ID 목록
+            conversation_history: 이전 대화 내역
+            index_version: 현재 인덱스 버전
+        
+        Returns:
+            SHA-256 해시 키
+        """
+        history_hash = ""
+        if conversation_history:
+            history_hash = hashlib.sha256(
+                json.dumps(conversation_history, ensure_ascii=False, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+        
+        excluded_hash = ""
+        if excluded_ids:
+            excluded_hash = hashlib.sha256(
+                "\x00".join(sorted(set(excluded_ids))).encode("utf-8")
+            ).hexdigest()
+        
+        payload = json.dumps([
+            cls.normalize_question(question),
+            cls._normalize_code(material_code),
+            cls._normalize_code(procedure_code),
+            excluded_hash,
+            history_hash,
+            index_version,
+            CACHE_FORMAT_VERSION
+        ], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """SQLite 연결 (워커 프로세스/스레드마다 별도 연결 사용)"""
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _init_db(self):
+        """디스크 캐시 테이블 생성"""
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    key TEXT PRIMARY KEY,
+                    index_version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_answers_version ON answers(index_version)"
+            )
+    
+    def _disk_get(self, key: str, index_version: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value, created_at FROM answers WHERE key = ? AND index_version = ?",
+                    (key, index_version)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[WARNING] 답변 캐시(디스크) 조회 실패: {str(e)}")
+            return None
+        
+        if row is None:
+            return None
+        value, created_at = row
+        if self.ttl and created_at + self.ttl <= time.time():
+            return None
+        return json.loads(value)
+    
+    def _disk_set(self, key: str, value: Dict[str, Any], index_version: str):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO answers (key, index_version, value, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, index_version, json.dumps(value, ensure_ascii=False), time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"[WARNING] 답변 캐시(디스크) 저장 실패: {str(e)}")
+    
+    def _check_version(self, index_version: str):
+        """인덱스 버전이 바뀌었으면 이전 버전 항목 무효화"""
+        if index_version == self._index_version:
+            return
+        
+        with self._lock:
+            if index_version == self._index_version:
+                return
+            previous = self._index_version
+            self._index_version = index_version
+            
+            if previous is None:
+                return
+            
+            self.memory.clear()
+            self.invalidations += 1
+            print(f"[답변 캐시] 인덱스 버전 변경 ({previous} → {index_version}), 캐시 무효화")
+            
+            if self.db_path:
+                try:
+                    with self._connect() as conn:
+                        conn.execute(
+                            "DELETE FROM answers WHERE index_version != ?",
+                            (index_version,)
+                        )
+                except sqlite3.Error as e:
+                    print(f"[WARNING] 답변 캐시(디스크) 무효화 실패: {str(e)}")
+    
+    def get(self, key: str, index_version: str) -> Optional[Dict[str, Any]]:
+        """
+        캐시 조회 (메모리 → 디스크 순)
+        
+        Args:
+            key: make_key로 만든 키
+            index_version: 현재 인덱스 버전
+        
+        Returns:
+            캐시된 답변 (없으면 None)
+        """
+        self._check_version(index_version)
+        
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            count_cache("answer", "memory_hit")
+            return value
+        
+        if self.db_path:
+            value = self._disk_get(key, index_version)
+            if value is not None:
+                # 디스크 hit은 메모리로 승격
+                self.memory.set(key, value)
+                self.disk_hits += 1
+                count_cache("answer", "disk_hit")
+                return value
+        
+        self.misses += 1
+        count_cache("answer", "miss")
+        return None
+    
+    def set(self, key: str, value: Dict[str, Any], index_version: str):
+        """
+        캐시 저장 (메모리 + 디스크)
+        
+        Args:
+            key: make_key로 만든 키
+            value: 답변 결과
+            index_version: 답변 생성에 사용한 인덱스 버전
+        """
+        self._check_version(index_version)
+        self.memory.set(key, value)
+        if self.db_path:
+            self._disk_set(key, value, index_version)
+    
+    def clear(self):
+        """모든 캐시 항목 삭제"""
+        self.memory.clear()
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM answers")
+            except sqlite3.Error as e:
+                print(f"[WARNING] 답변 캐시(디스크) 삭제 실패: {str(e)}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """hit/miss 카운터 및 항목 수"""
+        disk_entries = None
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    disk_entries = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            except sqlite3.Error:
+                pass
+        
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "index_version": self._index_version,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "memory_entries": len(self.memory),
+            "disk_entries": disk_entries
+        }
@@ -0,0 +1,329 @@
+"""
+AWS Bedrock Runtime 공용 클라이언트 계층
+- 프로세스당 하나의 boto3 bedrock-runtime 클라이언트 (연결 풀, 적응형 재시도 + 지터 공유)
+- 모델별 token bucket 한도 (초당 요청 수, 초당 토큰 수)
+- boto3 호출(네트워크 I/O)을 전용 I/O 스레드 풀에서 실행하여 이벤트 루프를 막지 않도록 함
+
+Titan 임베딩, Cohere Rerank, Claude가 같은 클라이언트를 쓰므로 TLS/연결 설정은 프로세스당 한 번이고,
+모델별 한도가 분리되어 있어 전처리 임베딩 버스트가 Claude 호출 몫을 가져가지 않습니다.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Optional
+
+import boto3
+from botocore.config import Config
+
+from tools.metrics import BEDROCK_RATE_LIMIT_WAIT
+from tools.tokens import estimate_tokens
+
+
+# 싱글톤 I/O 스레드 풀
+_io_executor = None
+_io_executor_lock = threading.Lock()
+
+# botocore 재시도 사용 여부 → 싱글톤 boto3 클라이언트
+_runtimes: Dict[bool, Any] = {}
+_runtime_lock = threading.Lock()
+
+# 모델 ID → RateLimiter
+_limiters: Dict[str, "RateLimiter"] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_bedrock_io_executor() -> ThreadPoolExecutor:
+    """Bedrock 호출 전용 I/O 스레드 풀 싱글톤 반환"""
+    global _io_executor
+    if _io_executor is None:
+        with _io_executor_lock:
+            if _io_executor is None:
+                _io_executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("BEDROCK_IO_WORKERS", "32")),
+                    thread_name_prefix="bedrock-io"
+                )
+    return _io_executor
+
+
+def get_bedrock_runtime(retries: bool = True):
+    """
+    공용 boto3 bedrock-runtime 클라이언트 싱글톤 반환 (스레드 안전)
+    
+    연결 풀 크기는 BEDROCK_MAX_POOL_CONNECTIONS(기본 64, I/O 스레드 수보다 크게),
+    재시도는 BEDROCK_RETRY_MODE(기본 adaptive: 지수 백오프 + 지터 + 클라이언트 측 속도 조절)와
+    BEDROCK_MAX_ATTEMPTS(기본 4)로 설정합니다.
+    
+    Args:
+        retries: False면 botocore 재시도를 끈 (호출당 1회 시도) 별도 클라이언트 반환.
+            자체 재시도 예산이 있는 경로(전처리 배치 임베딩)에서 재시도 계층을 하나만 두기 위해 사용
+    """
+    runtime = _runtimes.get(retries)
+    if runtime is None:
+        with _runtime_lock:
+            runtime = _runtimes.get(retries)
+            if runtime is None:
+                retry_config = {"mode": os.getenv("BEDROCK_RETRY_MODE", "adaptive")}
+                if retries:
+                    retry_config["max_attempts"] = int(os.getenv("BEDROCK_MAX_ATTEMPTS", "4"))
+                else:
+                    retry_config["total_max_attempts"] = 1
+                config = Config(
+                    max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "64")),
+                    retries=retry_config,
+                    connect_timeout=float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "5")),
+                    read_timeout=float(os.getenv("BEDROCK_READ_TIMEOUT", "120"))
+                )
+                runtime = boto3.client(
+                    service_name="bedrock-runtime",
+                    region_name=os.getenv("AWS_REGION", "us-east-1"),
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    config=config
+                )
+                _runtimes[retries] = runtime
+    return runtime
+
+
+class RateLimiter:
+    """
+    모델별 token bucket (초당 요청 수 + 초당 토큰 수)
+    
+    요청마다 버킷에서 미리 차감(예약)하고 부족한 만큼 대기 시간을 돌려주므로,
+    대기 순서대로 처리되며 한 번에 버킷 크기보다 큰 요청도 대기 후 통과합니다.
+    """
+    
+    def __init__(self, requests_per_second: float = 0, tokens_per_second: float = 0, model_id: str = ""):
+        """
+        초기화
+        
+        Args:
+            requests_per_second: 초당 요청 수 한도 (0이면 제한 없음, 버킷 크기는 1초분)
+            tokens_per_second: 초당 토큰 수 한도 (0이면 제한 없음, 버킷 크기는 1초분)
+            model_id: 메트릭 라벨용 모델 ID
+        """
+        self.requests_per_second = requests_per_second
+        self.tokens_per_second = tokens_per_second
+        self.model_id = model_id
+        self._request_capacity = max(1.0, requests_per_second)
+        self._requests = self._request_capacity
+        self._tokens = float(tokens_per_second)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        요청 1건과 tokens만큼 예약
+        
+        Args:
+            tokens: 요청의 예상 토큰 수 (입력 + 최대 출력)
+        
+        Returns:
+            예약분이 채워질 때까지 기다려야 하는 시간(초)
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            
+            wait = 0.0
+            if self.requests_per_second > 0:
+                self._requests = min(self._request_capacity, self._requests + elapsed * self.requests_per_second)
+                self._requests -= 1
+                wait = max(wait, -self._requests / self.requests_per_second)
+            if self.tokens_per_second > 0:
+                self._tokens = min(self.tokens_per_second, self._tokens + elapsed * self.tokens_per_second)
+                self._tokens -= tokens
+                wait = max(wait, -self._tokens / self.tokens_per_second)
+        
+        BEDROCK_RATE_LIMIT_WAIT.labels(model=self.model_id).observe(wait)
+        return wait
+    
+    def acquire(self, tokens: int = 0):
+        """예약 후 필요한 만큼 대기 (블로킹, 동기 경로용)"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def aacquire(self, tokens: int = 0):
+        """예약 후 필요한 만큼 대기 (이벤트 루프에서 대기하므로 I/O 스레드를 점유하지 않음)"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def get_rate_limiter(model_id: str, env_prefix: str) -> Optional[RateLimiter]:
+    """
+    모델별 RateLimiter 싱글톤 반환
+    
+    한도는 {env_prefix}_RATE_LIMIT_RPS, {env_prefix}_RATE_LIMIT_TPS 환경 변수로 설정합니다
+    (예: CLAUDE_RATE_LIMIT_RPS=5, EMBEDDING_RATE_LIMIT_TPS=20000).
+    
+    Args:
+        model_id: Bedrock 모델 ID (같은 모델을 쓰는 컴포넌트는 한도를 공유)
+        env_prefix: 환경 변수 접두어 (CLAUDE, EMBEDDING, RERANK)
+    
+    Returns:
+        RateLimiter (두 한도 모두 0이면 None)
+    """
+    with _limiters_lock:
+        if model_id not in _limiters:
+            rps = float(os.getenv(f"{env_prefix}_RATE_LIMIT_RPS", "0"))
+            tps = float(os.getenv(f"{env_prefix}_RATE_LIMIT_TPS", "0"))
+            _limiters[model_id] = RateLimiter(rps, tps, model_id) if rps > 0 or tps > 0 else None
+        return _limiters[model_id]
+
+
+def estimate_request_tokens(body: Dict[str, Any]) -> int:
+    """요청 본문의 예상 토큰 수 (입력 전체 + 최대 출력 토큰)"""
+    return estimate_tokens(json.dumps(body, ensure_ascii=False)) + int(body.get("max_tokens", 0))
+
+
+class AsyncBedrockClient:
+    """boto3 bedrock-runtime 클라이언트를 await 가능하게 감싸는 클래스"""
+    
+    def __init__(self, client=None, executor: ThreadPoolExecutor = None, limiter: RateLimiter = None):
+        """
+        초기화
+        
+        Args:
+            client: boto3 bedrock-runtime 클라이언트 (스레드 안전, None이면 공용 클라이언트)
+            executor: 호출을 실행할 스레드 풀 (None이면 공용 I/O 풀 사용)
+            limiter: 모델 요청/토큰 한도 (None이면 제한 없음)
+        """
+        self.client = client if client is not None else get_bedrock_runtime()
+        self.executor = executor
+        self.limiter = limiter
+    
+    def _invoke_model_json(self, model_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """invoke_model 호출 후 응답 본문까지 읽어서 JSON으로 반환 (블로킹)"""
+        response = self.client.invoke_model(
+            modelId=model_id,
+            body=json.dumps(body),
+            contentType="application/json",
+            accept="application/json"
+        )
+        return json.loads(response["body"].read())
+    
+    def invoke_model_json_blocking(self, model_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        invoke_model 동기 호출 (CLI, 전처리 등 이벤트 루프 밖의 경로용)
+        
+        Args:
+            model_id: Bedrock 모델 ID
+            body: 요청 본문 (dict)
+        
+        Returns:
+            파싱된 응답 본문
+        """
+        if self.limiter is not None:
+            self.limiter.acquire(estimate_request_tokens(body))
+        return self._invoke_model_json(model_id, body)
+    
+    async def invoke_model_json(self, model_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        invoke_model 비동기 호출
+        
+        응답 본문(StreamingBody) 읽기도 블로킹 I/O이므로 같은 워커 스레드에서 처리합니다.
+        
+        Args:
+            model_id: Bedrock 모델 ID
+            body: 요청 본문 (dict)
+        
+        Returns:
+            파싱된 응답 본문
+        """
+        if self.limiter is not None:
+            await self.limiter.aacquire(estimate_request_tokens(body))
+        loop = asyncio.get_running_loop()
+        executor = self.executor or get_bedrock_io_executor()
+        return await loop.run_in_executor(
+            executor,
+            self._invoke_model_json,
+            model_id,
+            body
+        )
+    
+    def _pump_stream(
+        self,
+        model_id: str,
+        body: Dict[str, Any],
+        loop: asyncio.AbstractEventLoop,
+        queue: asyncio.Queue,
+        stop: threading.Event
+    ):
+        """
+        invoke_model_with_response_stream 이벤트를 읽어 asyncio 큐로 전달 (블로킹)
+        
+        큐에는 파싱된 청크(dict), 예외, 종료 표시(None) 순으로 들어갑니다.
+        """
+        try:
+            response = self.client.invoke_model_with_response_stream(
+                modelId=model_id,
+                body=json.dumps(body),
+                contentType="application/json",
+                accept="application/json"
+            )
+            stream = response["body"]
+            for event in stream:
+                if stop.is_set():
+                    # 소비자가 중단됨 → 업스트림 연결 정리
+                    close = getattr(stream, "close", None)
+                    if close:
+                        close()
+                    break
+                chunk = event.get("chunk")
+                if not chunk:
+                    continue
+                loop.call_soon_threadsafe(queue.put_nowait, json.loads(chunk["bytes"]))
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+    
+    async def invoke_model_stream(
+        self,
+        model_id: str,
+        body: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        invoke_model_with_response_stream 비동기 호출
+        
+        스트림 읽기는 I/O 스레드에서 수행하고, 도착한 청크를 즉시 yield합니다.
+        
+        Args:
+            model_id: Bedrock 모델 ID
+            body: 요청 본문 (dict)
+            
+        Yields:
+            파싱된 스트림 청크 (dict)
+        """
+        if self.limiter is not None:
+            await self.limiter.aacquire(estimate_request_tokens(body))
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+        executor = self.executor or get_bedrock_io_executor()
+        loop.run_in_executor(
+            executor,
+            self._pump_stream,
+            model_id,
+            body,
+            loop,
+            queue,
+            stop
+        )
+        
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
@@ -5,21 +5,30 @@ BM25 키워드 검색 툴
 
 import os
 import pickle
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set
 import numpy as np
 from rank_bm25 import BM25Okapi
-from dotenv import load_dotenv
+
+from tools.env import load_env
+from tools.chunk_ids import make_chunk_id
+from tools.mmap_store import mmap_enabled, current_mmap_dir, ChunkStore, MmapBM25
+from tools.metrics import stage_timer, count_candidates, STAGE_BM25_SCORES
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 class BM25Retriever:
     """BM25 키워드 검색 클래스"""
     
-    def __init__(self):
-        """초기화 및 BM25 인덱스 로드"""
-        self.vector_store_path = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
+    def __init__(self, vector_store_path: str = None):
+        """
+        초기화 및 BM25 인덱스 로드
+        
+        Args:
+            vector_store_path: 벡터 스토어 디렉토리 (None이면 VECTOR_STORE_PATH)
+        """
+        self.vector_store_path = vector_store_path or os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
         self.bm25 = None
         self.corpus = None
         self.metadata = None
@@ -31,7 +40,7 @@ class BM25Retriever:
         
         Args:
             text: 입력 텍스트
-            
+        
         Returns:
             토큰 리스트
         """
@@ -41,7 +50,10 @@ class BM25Retriever:
         return tokens
     
     def _load_index(self):
-        """BM25 인덱스 및 메타데이터 로드"""
+        """BM25 인덱스 및 메타데이터 로드 (INDEX_MMAP=true면 mmap 저장소 우선)"""
+        if mmap_enabled() and self._load_mmap_index():
+            return
+        
         bm25_path = os.path.join(self.vector_store_path, "bm25_index.pkl")
         
         try:
@@ -58,10 +70,37 @@ class BM25Retriever:
         except Exception as e:
             print(f"BM25 인덱스 로드 중 오류 발생: {str(e)}")
     
+    def _load_mmap_index(self) -> bool:
+        """
+        mmap 저장소의 CSR 역색인과 청크 텍스트 로드
+        
+        Returns:
+            로드 성공 여부 (False면 pickle 인덱스로 로드)
+        """
+        directory = current_mmap_dir(self.vector_store_path)
+        if directory is None or not os.path.exists(os.path.join(directory, "bm25_meta.json")):
+            return False
+        
+        try:
+            store = ChunkStore(directory)
+            self.bm25 = MmapBM25(directory)
+            self.corpus = store.field("text")
+            self.metadata = store.field("metadata")
+        except Exception as e:
+            print(f"[WARNING] BM25 mmap 인덱스 로드 실패, pickle 인덱스 사용: {str(e)}")
+            self.bm25 = None
+            self.corpus = None
+            self.metadata = None
+            return False
+        
+        print(f"BM25 인덱스 로드 완료 (mmap): {len(self.corpus)}개 문서")
+        return True
+    
     def search(
         self, 
         query: str, 
-        top_k: int = 5
+        top_k: int = 5,
+        exclude_ids: Set[str] = None
     ) -> List[Dict[str, Any]]:
         """
         질문과 관련된 문서를 BM25로 검색
@@ -69,9 +108,10 @@ class BM25Retriever:
         Args:
             query: 검색 질문
             top_k: 반환할 결과 수
-            
+            exclude_ids: 제외할 청크 ID 집합 (제외한 만큼 더 가져와 top_k를 채움)
+        
         Returns:
-            검색 결과 리스트 (각 결과는 text, metadata, score 포함)
+            검색 결과 리스트 (각 결과는 id, text, metadata, score 포함)
         """
         if self.bm25 is None or self.corpus is None:
             return []
@@ -81,29 +121,40 @@ class BM25Retriever:
             query_tokens = self._tokenize(query)
             
             # 2. BM25 점수 계산
-            scores = self.bm25.get_scores(query_tokens)
+            with stage_timer(STAGE_BM25_SCORES):
+                scores = self.bm25.get_scores(query_tokens)
             
             # 3. 상위 k개 문서 선택
-            top_indices = np.argsort(scores)[::-1][:top_k]
+            fetch_k = top_k + len(exclude_ids) if exclude_ids else top_k
+            top_indices = np.argsort(scores)[::-1][:fetch_k]
             
             # 4. 결과 구성
             results = []
             for rank, idx in enumerate(top_indices):
+                if len(results) >= top_k:
+                    break
                 if scores[idx] > 0:  # 점수가 0보다 큰 것만
+                    text = self.corpus[idx]
+                    chunk_id = make_chunk_id(text)
+                    if exclude_ids and chunk_id in exclude_ids:
+                        continue
+                    
                     # 점수 정규화 (0-1 범위로, 최대값 기준)
                     max_score = scores[top_indices[0]] if len(top_indices) > 0 else 1.0
                     normalized_score = scores[idx] / max_score if max_score > 0 else 0.0
                     
                     results.append({
-                        "text": self.corpus[idx],
+                        "id": chunk_id,
+                        "text": text,
                         "metadata": self.metadata[idx],
                         "score": float(normalized_score),
                         "raw_score": float(scores[idx]),
                         "rank": rank + 1
                     })
             
+            count_candidates(STAGE_BM25_SCORES, len(results))
             return results
-            
+        
         except Exception as e:
             print(f"BM25 검색 중 오류 발생: {str(e)}")
             return []
@@ -126,7 +177,7 @@ class BM25Retriever:
             self.metadata = metadata_list
             
             print(f"BM25 인덱스 생성 완료: {len(documents)}개 문서")
-            
+        
         except Exception as e:
             print(f"BM25 인덱스 생성 중 오류 발생: {str(e)}")
             raise
@@ -152,7 +203,7 @@ class BM25Retriever:
                 pickle.dump(data, f)
             
             print(f"BM25 인덱스 저장 완료: {bm25_path}")
-            
+        
         except Exception as e:
             print(f"BM25 인덱스 저장 중 오류 발생: {str(e)}")
             raise
@@ -0,0 +1,72 @@
+"""
+청크 ID
+청크 텍스트의 SHA-1 해시로 만든 안정적인 ID (같은 내용이면 재처리해도 같은 ID)
+
+참고 문서(sources)는 전체 텍스트 대신 ID와 짧은 미리보기만 보내고,
+전체 텍스트는 GET /api/chunks/{id}로 필요할 때만 가져옵니다.
+제외 문서도 ID 집합으로 전달되어 검색 단계에서 바로 걸러집니다.
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+CHUNK_ID_LENGTH = 16
+
+
+def make_chunk_id(text: str) -> str:
+    """청크 텍스트로 ID 생성 (청크 내용이 바뀌면 ID도 바뀜)"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:CHUNK_ID_LENGTH]
+
+
+def chunk_id_of(item: Dict[str, Any]) -> str:
+    """
+    청크 항목의 ID
+    
+    ID 도입 전에 만든 인덱스는 항목에 "id"가 없으므로 텍스트로 계산합니다
+    (계산 결과는 수집 시 저장한 ID와 같음).
+    """
+    return item.get("id") or make_chunk_id(item["text"])
+
+
+def assign_chunk_ids(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """수집 시 각 청크 항목에 "id" 필드 추가 (항목을 직접 수정하고 그대로 반환)"""
+    for item in items:
+        item["id"] = chunk_id_of(item)
+    return items
+
+
+def resolve_excluded_ids(
+    excluded_ids: Optional[Iterable[str]] = None,
+    excluded_sources: Optional[Iterable[str]] = None
+) -> Optional[List[str]]:
+    """
+    제외 문서 ID 목록 (중복 제거, 정렬)
+    
+    Args:
+        excluded_ids: 제외할 청크 ID
+        excluded_sources: 제외할 문서 텍스트 (이전 클라이언트 호환용, ID로 변환)
+    
+    Returns:
+        정렬된 ID 목록 (제외 문서가 없으면 None)
+    """
+    ids: Set[str] = set(excluded_ids or ())
+    ids.update(make_chunk_id(text) for text in excluded_sources or ())
+    return sorted(ids) if ids else None
+
+
+def make_snippet(text: str, max_chars: int = None) -> str:
+    """
+    참고 문서 미리보기 (공백 정리 후 앞부분)
+    
+    Args:
+        text: 청크 텍스트
+        max_chars: 최대 길이 (None이면 SOURCE_SNIPPET_CHARS 또는 160)
+    """
+    if max_chars is None:
+        max_chars = int(os.getenv("SOURCE_SNIPPET_CHARS", "160"))
+    snippet = " ".join(text.split())
+    if len(snippet) <= max_chars:
+        return snippet
+    return snippet[:max_chars].rstrip() + "…"
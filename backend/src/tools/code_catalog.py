@@ -0,0 +1,248 @@
+"""
+코드 카탈로그 (치료코드, 재료코드, 약제코드)
+CODE_CATALOG_PATH의 JSON을 프로세스당 한 번 로드하여 코드/EDI는 접두어 트라이,
+코드/이름/EDI 부분 문자열은 문자 n-gram 역색인으로 검색 (요청마다 전체 목록을 훑지 않음)
+
+각 항목은 코드, EDI, 이름에 나오는 분류번호(자654-1 등)를 연결 코드로 가지며,
+연결 코드로 코드 역색인(code_index)을 조회하면 해당 항목을 언급하는 청크를 찾을 수 있습니다.
+"""
+
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Set
+
+from tools.code_index import extract_codes, normalize_code
+
+
+CODE_TYPES = ["treatment", "material", "medicine"]
+SEARCH_FIELDS = ["all", "code", "name", "edi"]
+SORT_KEYS = ["code", "name", "edi"]
+
+# 트라이 노드에서 하위 항목 목록을 담는 키 (문자 키와 겹치지 않음)
+_ITEMS = "\0"
+
+
+def _normalize(text: str) -> str:
+    """검색용 정규화 (소문자, 공백 제거)"""
+    return re.sub(r"\s+", "", text or "").lower()
+
+
+class PrefixTrie:
+    """접두어 → 항목 번호 (노드마다 하위 항목 목록을 보관하여 조회가 접두어 길이에만 비례)"""
+    
+    def __init__(self):
+        self.root = {}
+    
+    def insert(self, key: str, item: int):
+        node = self.root
+        node.setdefault(_ITEMS, []).append(item)
+        for ch in key:
+            node = node.setdefault(ch, {})
+            node.setdefault(_ITEMS, []).append(item)
+    
+    def prefix(self, prefix: str) -> List[int]:
+        """접두어로 시작하는 항목 번호 (삽입 순서)"""
+        node = self.root
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node.get(_ITEMS, [])
+
+
+class NgramIndex:
+    """문자 1-gram/2-gram → 항목 번호 역색인 (부분 문자열 검색)"""
+    
+    def __init__(self, texts: Iterable[str]):
+        self.texts = [_normalize(text) for text in texts]
+        self.postings = {}
+        for i, text in enumerate(self.texts):
+            grams = set(text) | {text[j:j + 2] for j in range(len(text) - 1)}
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(i)
+    
+    def search(self, term: str) -> Set[int]:
+        """
+        term을 포함하는 항목 번호
+        
+        2-gram 목록의 교집합으로 후보를 좁힌 뒤 실제 포함 여부를 확인합니다.
+        """
+        term = _normalize(term)
+        if len(term) <= 1:
+            return set(self.postings.get(term, ())) if term else set(range(len(self.texts)))
+        
+        grams = sorted(
+            (self.postings.get(term[j:j + 2], set()) for j in range(len(term) - 1)),
+            key=len
+        )
+        candidates = set(grams[0])
+        for posting in grams[1:]:
+            candidates &= posting
+            if not candidates:
+                return set()
+        if len(term) == 2:
+            return candidates
+        return {i for i in candidates if term in self.texts[i]}
+
+
+class CodeCatalog:
+    """코드 카탈로그 검색 (페이지네이션, 정렬, 자동완성)"""
+    
+    def __init__(self, catalog: Dict[str, List[Dict[str, str]]] = None):
+        """
+        초기화 및 색인 생성
+        
+        Args:
+            catalog: {"treatment": [{"code", "name", "edi"}], "material": [...], "medicine": [...]}
+        """
+        self.entries = []
+        for code_type, items in (catalog or {}).items():
+            for item in items:
+                entry = {
+                    "type": code_type,
+                    "code": item["code"],
+                    "name": item.get("name", ""),
+                    "edi": item.get("edi", "")
+                }
+                entry["linked_codes"] = self._linked_codes(entry)
+                self.entries.append(entry)
+        
+        self.code_trie = PrefixTrie()
+        self.edi_trie = PrefixTrie()
+        self._by_code = {}
+        for i, entry in enumerate(self.entries):
+            self.code_trie.insert(_normalize(entry["code"]), i)
+            self.edi_trie.insert(_normalize(entry["edi"]), i)
+            self._by_code.setdefault(_normalize(entry["code"]), []).append(i)
+        
+        self.grams = {field: NgramIndex(entry[field] for entry in self.entries) for field in SORT_KEYS}
+        
+        # 정렬 키별 순위 (결과 정렬 시 문자열 비교 대신 정수 비교)
+        self._ranks = {}
+        for key in SORT_KEYS:
+            order = sorted(range(len(self.entries)), key=lambda i: (self.entries[i][key], i))
+            ranks = [0] * len(self.entries)
+            for rank, i in enumerate(order):
+                ranks[i] = rank
+            self._ranks[key] = ranks
+    
+    @staticmethod
+    def _linked_codes(entry: Dict[str, str]) -> List[str]:
+        """청크 연결용 코드 (코드, EDI, 이름에 나오는 분류번호)"""
+        codes = {normalize_code(entry["code"])}
+        if entry["edi"]:
+            codes.add(normalize_code(entry["edi"]))
+        codes.update(extract_codes(entry["name"]))
+        return sorted(codes)
+    
+    @classmethod
+    def load(cls, path: str = None) -> "CodeCatalog":
+        """
+        JSON 파일에서 로드
+        
+        Args:
+            path: 카탈로그 파일 경로 (기본 CODE_CATALOG_PATH 또는 ./data/codes/code_catalog.json)
+        
+        Returns:
+            CodeCatalog (파일이 없으면 빈 카탈로그)
+        """
+        path = path or os.getenv("CODE_CATALOG_PATH", "./data/codes/code_catalog.json")
+        if not os.path.exists(path):
+            print(f"[WARNING] 코드 카탈로그 파일이 없습니다: {path}")
+            return cls()
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            catalog = cls(json.load(f))
+        print(f"[OK] 코드 카탈로그 로드: {len(catalog.entries)}개 코드")
+        return catalog
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def _match(self, q: str, field: str) -> Set[int]:
+        """검색어를 포함하는 항목 번호"""
+        fields = SORT_KEYS if field == "all" else [field]
+        matches = set()
+        for name in fields:
+            matches |= self.grams[name].search(q)
+        return matches
+    
+    def search(
+        self,
+        q: str = "",
+        code_type: str = None,
+        field: str = "all",
+        sort: str = "code",
+        order: str = "asc",
+        page: int = 1,
+        page_size: int = 100
+    ) -> Dict[str, Any]:
+        """
+        코드 검색 (부분 문자열, 대소문자/공백 무시)
+        
+        Args:
+            q: 검색어 (빈 문자열이면 전체)
+            code_type: treatment/material/medicine (None이면 전체)
+            field: all/code/name/edi
+            sort: 정렬 키 (code/name/edi)
+            order: asc/desc
+            page: 페이지 번호 (1부터)
+            page_size: 페이지 크기
+        
+        Returns:
+            {"total", "page", "page_size", "items"}
+        """
+        matches = self._match(q, field)
+        if code_type:
+            matches = [i for i in matches if self.entries[i]["type"] == code_type]
+        
+        ranks = self._ranks[sort]
+        ordered = sorted(matches, key=ranks.__getitem__, reverse=(order == "desc"))
+        start = (page - 1) * page_size
+        return {
+            "total": len(ordered),
+            "page": page,
+            "page_size": page_size,
+            "items": [self.entries[i] for i in ordered[start:start + page_size]]
+        }
+    
+    def typeahead(self, q: str, code_type: str = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        자동완성 (코드/EDI 접두어 일치 → 이름 부분 일치 순)
+        
+        Args:
+            q: 입력 중인 검색어
+            code_type: treatment/material/medicine (None이면 전체)
+            limit: 최대 항목 수
+        
+        Returns:
+            항목 리스트
+        """
+        term = _normalize(q)
+        if not term:
+            return []
+        
+        code_ranks = self._ranks["code"]
+        groups = [
+            sorted(set(self.code_trie.prefix(term)) | set(self.edi_trie.prefix(term)), key=code_ranks.__getitem__),
+            sorted(self.grams["name"].search(term), key=self._ranks["name"].__getitem__)
+        ]
+        
+        results, seen = [], set()
+        for group in groups:
+            for i in group:
+                if i in seen or (code_type and self.entries[i]["type"] != code_type):
+                    continue
+                seen.add(i)
+                results.append(self.entries[i])
+                if len(results) >= limit:
+                    return results
+        return results
+    
+    def get(self, code: str, code_type: str = None) -> List[Dict[str, Any]]:
+        """코드가 정확히 일치하는 항목 (코드 타입이 다르면 여러 개일 수 있음)"""
+        entries = [self.entries[i] for i in self._by_code.get(_normalize(code), [])]
+        if code_type:
+            entries = [entry for entry in entries if entry["type"] == code_type]
+        return entries
@@ -0,0 +1,166 @@
+"""
+코드 역색인
+청크 메타데이터와 본문에 나오는 코드(재료코드, 시술코드, 자651-2 같은 분류번호, 고시번호)
+→ 청크 ID 목록
+
+코드만으로 인정기준을 찾는 질의는 임베딩/벡터 검색 없이 사전 조회로 처리합니다.
+인덱스는 발행(publish_index_version) 시 code_index.pkl로 저장되며, 파일이 없거나
+메타데이터와 맞지 않으면 검색기가 로드 시 메모리에서 다시 만듭니다.
+"""
+
+import os
+import pickle
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from tools.chunk_ids import chunk_id_of
+
+
+CODE_INDEX_FILENAME = "code_index.pkl"
+
+# 메타데이터에서 코드로 색인하는 필드
+CODE_FIELDS = ["재료코드", "시술코드", "doc_code"]
+
+# 본문 코드 패턴
+# - 분류번호: 자656, 나721-1 (앞이 한글이 아니고 뒤에 숫자가 이어지지 않음, "제2022" 제외)
+# - 고시번호: 제2024-102호
+# - EDI 코드: M6561, J4083031, A12345
+CODE_PATTERNS = [
+    re.compile(r"(?<![가-힣])[가-힣]\d{3}(?:-\d+)?(?![\d-])"),
+    re.compile(r"제\d{4}-\d+호"),
+    re.compile(r"(?<![A-Za-z0-9])[A-Z]{1,2}\d{4,8}(?![A-Za-z0-9])")
+]
+
+
+def normalize_code(code: str) -> str:
+    """코드 정규화 (공백 제거, 영문 대문자)"""
+    return re.sub(r"\s+", "", code or "").upper()
+
+
+def extract_codes(text: str) -> Set[str]:
+    """
+    텍스트에서 코드 추출
+    
+    Args:
+        text: 질문 또는 청크 본문
+    
+    Returns:
+        정규화된 코드 집합
+    """
+    codes = set()
+    for pattern in CODE_PATTERNS:
+        codes.update(normalize_code(match) for match in pattern.findall(text or ""))
+    return codes
+
+
+class CodeIndex:
+    """코드 → 청크 ID 역색인"""
+    
+    def __init__(self, postings: Dict[str, List[str]] = None, chunk_count: int = 0):
+        """
+        초기화
+        
+        Args:
+            postings: 코드 → 청크 ID 목록 (메타데이터 순서)
+            chunk_count: 색인한 청크 수 (메타데이터와 일치 여부 확인용)
+        """
+        self.postings = postings or {}
+        self.chunk_count = chunk_count
+    
+    @classmethod
+    def build(cls, items: Iterable[Dict[str, Any]]) -> "CodeIndex":
+        """
+        청크 목록으로 역색인 생성
+        
+        Args:
+            items: {"id"(선택), "text", "metadata"} 청크 목록
+        
+        Returns:
+            CodeIndex
+        """
+        postings = {}
+        chunk_count = 0
+        for item in items:
+            chunk_count += 1
+            chunk_id = chunk_id_of(item)
+            metadata = item.get('metadata') or {}
+            
+            codes = extract_codes(item.get('text', ''))
+            for field in CODE_FIELDS:
+                if metadata.get(field):
+                    codes.add(normalize_code(str(metadata[field])))
+            
+            for code in codes:
+                postings.setdefault(code, []).append(chunk_id)
+        
+        # 같은 텍스트의 중복 청크는 ID가 같으므로 한 번만
+        return cls({code: list(dict.fromkeys(ids)) for code, ids in postings.items()}, chunk_count)
+    
+    def lookup(self, codes: Iterable[str]) -> List[str]:
+        """
+        모든 코드를 포함하는 청크 ID (메타데이터 순서)
+        
+        Args:
+            codes: 조회할 코드 목록
+        
+        Returns:
+            청크 ID 목록 (일치하는 청크가 없으면 빈 리스트)
+        """
+        codes = [normalize_code(code) for code in codes if code]
+        if not codes:
+            return []
+        
+        # 가장 짧은 목록을 기준으로 교집합
+        lists = sorted((self.postings.get(code, []) for code in codes), key=len)
+        others = [set(ids) for ids in lists[1:]]
+        return [chunk_id for chunk_id in lists[0] if all(chunk_id in ids for ids in others)]
+    
+    def __contains__(self, code: str) -> bool:
+        return normalize_code(code) in self.postings
+    
+    def __len__(self) -> int:
+        return len(self.postings)
+    
+    def save(self, vector_store_path: str):
+        """code_index.pkl 저장 (임시 파일에 쓴 후 교체)"""
+        path = os.path.join(vector_store_path, CODE_INDEX_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"postings": self.postings, "chunk_count": self.chunk_count}, f)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, vector_store_path: str) -> Optional["CodeIndex"]:
+        """code_index.pkl 로드 (없거나 읽을 수 없으면 None)"""
+        path = os.path.join(vector_store_path, CODE_INDEX_FILENAME)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            print(f"[WARNING] 코드 색인 로드 실패: {str(e)}")
+            return None
+        return cls(data["postings"], data["chunk_count"])
+
+
+def export_code_index(vector_store_path: str) -> Optional[CodeIndex]:
+    """
+    metadata.pkl로 코드 색인을 만들어 code_index.pkl로 저장 (인덱스 발행 시 호출)
+    
+    Args:
+        vector_store_path: 벡터 스토어 디렉토리
+    
+    Returns:
+        생성된 CodeIndex (메타데이터가 없으면 None)
+    """
+    metadata_path = os.path.join(vector_store_path, "metadata.pkl")
+    if not os.path.exists(metadata_path):
+        return None
+    
+    with open(metadata_path, 'rb') as f:
+        metadata = pickle.load(f)
+    code_index = CodeIndex.build(metadata)
+    code_index.save(vector_store_path)
+    print(f"[OK] 코드 색인 저장: {len(code_index)}개 코드, {code_index.chunk_count}개 청크")
+    return code_index
@@ -0,0 +1,257 @@
+"""
+요청별 마감 시간(deadline)과 부하 적응형 기능 축소
+질의 요청마다 REQUEST_DEADLINE(초) 예산을 잡고 모든 단계(승인 대기, 검색, 리랭크, Claude)에 전달
+
+남은 시간이 줄어들거나 승인 대기열이 길어지면 선택적인 작업을 순서대로 생략합니다.
+1. primary_field 없는 문서의 전체 청크 추가(Fallback)
+2. Cohere Rerank / BM25 로컬 리랭크
+3. Claude max_tokens 축소 (DEGRADED_MAX_TOKENS)
+질의 임베딩은 별도 제한 시간(DEADLINE_EMBEDDING_TIMEOUT)을 넘기면 벡터 검색을 생략하고 BM25 결과만 사용
+Claude 호출 전에 이미 마감 시간이 지났거나 호출이 마감 시간을 넘기면 DeadlineExceeded(504)
+
+마감 시간은 timings와 같이 contextvars로 현재 요청에 연결되므로 검색기/에이전트는
+current_deadline()으로 확인하며, 마감 시간이 없는 호출(CLI, 테스트)은 그대로 동작합니다.
+"""
+
+import asyncio
+import contextvars
+import os
+import time
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+from tools.admission import AdmissionRejected
+from tools.metrics import SHED_STEPS, DEADLINE_EXCEEDED, STAGE_QUERY_EMBEDDING, record_value
+
+
+# 생략 순서 (앞의 단계부터 생략)
+SHED_FALLBACK = "fallback"
+SHED_RERANK = "rerank"
+SHED_MAX_TOKENS = "max_tokens"
+SHED_ORDER = [SHED_FALLBACK, SHED_RERANK, SHED_MAX_TOKENS]
+# 축소 단계와 별개로, 질의 임베딩이 제한 시간을 넘겨 벡터 검색을 생략함
+SHED_VECTOR = "vector"
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(AdmissionRejected):
+    """요청 마감 시간 초과 (504)"""
+    
+    def __init__(self, stage: str):
+        super().__init__(
+            f"처리 시간이 초과되었습니다 ({stage}). 잠시 후 다시 시도해주세요.",
+            status_code=504,
+            retry_after=1,
+            reason="deadline"
+        )
+        self.stage = stage
+
+
+class DeadlinePolicy:
+    """
+    마감 시간 예산과 축소 기준 (프로세스당 하나, QueryEngine이 보유)
+    
+    축소 단계는 남은 시간 기준 단계와 승인 대기열 길이 기준 단계 중 큰 값입니다.
+    """
+    
+    def __init__(
+        self,
+        budget: float = None,
+        skip_fallback_below: float = None,
+        skip_rerank_below: float = None,
+        reduce_tokens_below: float = None,
+        degraded_max_tokens: int = None,
+        queue_depth_step: int = None,
+        embedding_timeout: float = None
+    ):
+        """
+        초기화
+        
+        Args:
+            budget: 요청당 예산(초) (기본 REQUEST_DEADLINE 또는 60, 0이면 비활성화)
+            skip_fallback_below: 남은 시간이 이보다 적으면 Fallback 생략 (기본 DEADLINE_SKIP_FALLBACK_BELOW 또는 45)
+            skip_rerank_below: 남은 시간이 이보다 적으면 리랭크 생략 (기본 DEADLINE_SKIP_RERANK_BELOW 또는 35)
+            reduce_tokens_below: 남은 시간이 이보다 적으면 max_tokens 축소 (기본 DEADLINE_REDUCE_TOKENS_BELOW 또는 25)
+            degraded_max_tokens: 축소 시 Claude max_tokens (기본 DEGRADED_MAX_TOKENS 또는 1500)
+            queue_depth_step: 대기열이 이 길이만큼 늘 때마다 한 단계씩 축소
+                (기본 LOAD_SHED_QUEUE_DEPTH 또는 8, 0이면 대기열 기준 축소 안 함)
+            embedding_timeout: 질의 임베딩 제한 시간(초), 넘기면 BM25 결과만 사용
+                (기본 DEADLINE_EMBEDDING_TIMEOUT 또는 5, 0이면 요청 마감 시간만 적용)
+        """
+        if budget is None:
+            budget = float(os.getenv("REQUEST_DEADLINE", "60"))
+        if skip_fallback_below is None:
+            skip_fallback_below = float(os.getenv("DEADLINE_SKIP_FALLBACK_BELOW", "45"))
+        if skip_rerank_below is None:
+            skip_rerank_below = float(os.getenv("DEADLINE_SKIP_RERANK_BELOW", "35"))
+        if reduce_tokens_below is None:
+            reduce_tokens_below = float(os.getenv("DEADLINE_REDUCE_TOKENS_BELOW", "25"))
+        if degraded_max_tokens is None:
+            degraded_max_tokens = int(os.getenv("DEGRADED_MAX_TOKENS", "1500"))
+        if queue_depth_step is None:
+            queue_depth_step = int(os.getenv("LOAD_SHED_QUEUE_DEPTH", "8"))
+        if embedding_timeout is None:
+            embedding_timeout = float(os.getenv("DEADLINE_EMBEDDING_TIMEOUT", "5"))
+        
+        self.budget = budget
+        self.thresholds = [skip_fallback_below, skip_rerank_below, reduce_tokens_below]
+        self.degraded_max_tokens = degraded_max_tokens
+        self.queue_depth_step = queue_depth_step
+        self.embedding_timeout = embedding_timeout
+    
+    def time_level(self, remaining: float) -> int:
+        """남은 시간 기준 축소 단계 (0: 없음 ~ 3: max_tokens 축소까지)"""
+        return sum(remaining < threshold for threshold in self.thresholds)
+    
+    def load_level(self, queue_depth: int) -> int:
+        """승인 대기열 길이 기준 축소 단계"""
+        if self.queue_depth_step <= 0:
+            return 0
+        return min(len(SHED_ORDER), queue_depth // self.queue_depth_step)
+    
+    def start(self, queue_depth: Callable[[], int] = None) -> Optional["Deadline"]:
+        """
+        현재 요청(컨텍스트)의 마감 시간 시작
+        
+        Args:
+            queue_depth: 현재 승인 대기열 길이를 반환하는 함수 (없으면 시간 기준만 사용)
+        
+        Returns:
+            Deadline (예산이 0이면 None)
+        """
+        deadline = Deadline(self, queue_depth) if self.budget > 0 else None
+        _request_deadline.set(deadline)
+        return deadline
+
+
+class Deadline:
+    """한 요청의 마감 시간과 생략한 단계"""
+    
+    def __init__(self, policy: DeadlinePolicy, queue_depth: Callable[[], int] = None):
+        self.policy = policy
+        self.expires_at = time.monotonic() + policy.budget
+        self.queue_depth = queue_depth
+        self.shed_steps: List[str] = []
+    
+    def remaining(self) -> float:
+        """남은 시간(초, 음수면 초과)"""
+        return self.expires_at - time.monotonic()
+    
+    def level(self) -> int:
+        """현재 축소 단계 (확인할 때마다 다시 계산)"""
+        level = self.policy.time_level(self.remaining())
+        if self.queue_depth is not None:
+            level = max(level, self.policy.load_level(self.queue_depth()))
+        return level
+    
+    def shed(self, step: str) -> bool:
+        """
+        step을 생략(축소)해야 하는지 확인
+        
+        생략한 단계는 요청 timings의 shed 값과 rag_shed_steps 메트릭에 기록됩니다.
+        """
+        if self.level() <= SHED_ORDER.index(step):
+            return False
+        self.mark(step)
+        return True
+    
+    def mark(self, step: str):
+        """step을 생략한 것으로 기록 (축소 단계와 관계없이 생략한 경우, 예: SHED_VECTOR)"""
+        if step not in self.shed_steps:
+            self.shed_steps.append(step)
+            SHED_STEPS.labels(step=step).inc()
+            record_value("shed", list(self.shed_steps))
+    
+    def check(self, stage: str):
+        """마감 시간이 지났으면 DeadlineExceeded"""
+        if self.remaining() <= 0:
+            DEADLINE_EXCEEDED.labels(stage=stage).inc()
+            raise DeadlineExceeded(stage)
+
+
+_request_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """현재 요청의 Deadline (마감 시간이 없으면 None)"""
+    return _request_deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """현재 요청의 남은 시간(초) (마감 시간이 없으면 None)"""
+    deadline = _request_deadline.get()
+    return max(0.0, deadline.remaining()) if deadline is not None else None
+
+
+def should_shed(step: str) -> bool:
+    """현재 요청에서 step(SHED_*)을 생략해야 하면 True"""
+    deadline = _request_deadline.get()
+    return deadline is not None and deadline.shed(step)
+
+
+def was_shed(step: str) -> bool:
+    """현재 요청에서 step을 이미 생략했으면 True (확인만 하고 새로 생략하지 않음)"""
+    deadline = _request_deadline.get()
+    return deadline is not None and step in deadline.shed_steps
+
+
+def answer_max_tokens(max_tokens: int) -> int:
+    """현재 요청의 Claude max_tokens (축소 단계면 DEGRADED_MAX_TOKENS 이하)"""
+    deadline = _request_deadline.get()
+    if deadline is not None and deadline.shed(SHED_MAX_TOKENS):
+        return min(max_tokens, deadline.policy.degraded_max_tokens)
+    return max_tokens
+
+
+def check_deadline(stage: str):
+    """현재 요청의 마감 시간이 지났으면 DeadlineExceeded"""
+    deadline = _request_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+async def run_with_deadline(stage: str, awaitable: Awaitable[T]) -> T:
+    """
+    남은 시간 안에 awaitable 실행 (넘기면 취소 후 DeadlineExceeded)
+    
+    Args:
+        stage: 단계 이름 (오류 메시지, 메트릭용)
+        awaitable: 실행할 코루틴
+    
+    Returns:
+        awaitable 결과
+    """
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(0.0, deadline.remaining()))
+    except asyncio.TimeoutError:
+        DEADLINE_EXCEEDED.labels(stage=stage).inc()
+        raise DeadlineExceeded(stage)
+
+
+async def run_query_embedding(awaitable: Awaitable[T]) -> Optional[T]:
+    """
+    질의 임베딩 제한 시간(embedding_timeout) 안에 awaitable 실행
+    
+    제한 시간을 넘기면 취소하고 SHED_VECTOR를 기록한 뒤 None을 반환하므로 호출자는 BM25 결과만 사용합니다.
+    남은 시간이 제한 시간보다 짧으면 run_with_deadline과 같이 DeadlineExceeded
+    
+    Args:
+        awaitable: 임베딩 코루틴
+    
+    Returns:
+        임베딩 (제한 시간 초과 시 None)
+    """
+    deadline = _request_deadline.get()
+    if deadline is None:
+        return await awaitable
+    limit = deadline.policy.embedding_timeout
+    if limit <= 0 or deadline.remaining() <= limit:
+        return await run_with_deadline(STAGE_QUERY_EMBEDDING, awaitable)
+    try:
+        return await asyncio.wait_for(awaitable, limit)
+    except asyncio.TimeoutError:
+        deadline.mark(SHED_VECTOR)
+        return None
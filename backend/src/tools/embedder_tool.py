@@ -1,20 +1,50 @@
 """
 AWS Bedrock Titan Embeddings 툴
 텍스트를 벡터로 변환하는 임베딩 생성 기능
+
+배치 임베딩(embed_texts)은 영구 캐시(EmbeddingStore)에 없는 텍스트만 EMBEDDING_CONCURRENCY개씩
+동시에 요청하고 스로틀 오류는 지수 백오프(jitter 포함)로 재시도하며, 입력 순서대로 float32 행렬을 반환합니다.
+검색 질의 임베딩(embed_text)은 프로세스 메모리 LRU(QUERY_EMBEDDING_CACHE_SIZE/TTL)에 보관하여
+반복되는 질의는 Bedrock 왕복 없이 반환합니다.
 """
 
-import json
 import os
-from typing import List, Union
-import boto3
-from dotenv import load_dotenv
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Union
+
+import numpy as np
+
+from tools.env import load_env
+from tools.embedding_backend import EmbeddingError
+from tools.embedding_store import EmbeddingStore
+from tools.lru_cache import LRUCache
+from tools.bedrock_client import AsyncBedrockClient, get_bedrock_runtime, get_rate_limiter
+from tools.metrics import record_bedrock_error, bedrock_error_code, count_cache, THROTTLE_ERROR_CODES
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
+
+# Titan Embeddings V2가 지원하는 출력 차원
+TITAN_V2_DIMENSIONS = (256, 512, 1024)
+
+# 배치 임베딩에서 재시도하는 오류 (스로틀 + 일시적인 서버/네트워크 오류)
+RETRYABLE_ERROR_CODES = THROTTLE_ERROR_CODES | {
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelTimeoutException",
+    "ReadTimeoutError",
+    "ConnectTimeoutError",
+    "EndpointConnectionError"
+}
 
 
 class TitanEmbedder:
-    """AWS Bedrock Titan Embeddings를 사용한 임베딩 생성 클래스"""
+    """AWS Bedrock Titan Embeddings를 사용한 임베딩 생성 클래스 (EmbeddingBackend 구현)"""
+    
+    # 새로 받은 임베딩을 캐시에 모아 저장하는 단위
+    CACHE_FLUSH_SIZE = 64
     
     def __init__(self):
         """AWS Bedrock 클라이언트 초기화"""
@@ -23,75 +53,265 @@ class TitanEmbedder:
             "EMBEDDING_MODEL_ID", 
             "amazon.titan-embed-text-v2:0"
         )
+        # Titan V2 출력 차원 (256/512/1024, 바꾸면 인덱스를 다시 만들어야 함)
+        self.dimensions = int(os.getenv("EMBEDDING_DIMENSIONS", "1024"))
+        if self.dimensions not in TITAN_V2_DIMENSIONS:
+            raise ValueError(
+                f"EMBEDDING_DIMENSIONS는 {', '.join(map(str, TITAN_V2_DIMENSIONS))} 중 하나여야 합니다: {self.dimensions}"
+            )
+        self.normalize = True  # 정규화된 벡터 반환
         
-        # Bedrock Runtime 클라이언트 생성
-        self.bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name=self.aws_region,
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-        )
+        # 배치 임베딩 동시 요청 수와 스로틀 재시도 (EMBEDDING_RATE_LIMIT_*와 함께 처리량 조절)
+        self.concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", "8"))
+        self.max_retries = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))
+        self.retry_base_delay = float(os.getenv("EMBEDDING_RETRY_BASE_DELAY", "0.5"))
+        self.retry_max_delay = float(os.getenv("EMBEDDING_RETRY_MAX_DELAY", "20"))
+        
+        # 프로세스 공용 Bedrock Runtime 클라이언트 (연결 풀, 재시도 공유)
+        self.bedrock_runtime = get_bedrock_runtime()
+        
+        # 임베딩 모델 한도(EMBEDDING_RATE_LIMIT_*)를 적용하는 호출 래퍼
+        limiter = get_rate_limiter(self.embedding_model_id, "EMBEDDING")
+        self.async_client = AsyncBedrockClient(self.bedrock_runtime, limiter=limiter)
+        
+        # 배치 임베딩은 _embed_with_retry가 EMBEDDING_MAX_RETRIES 예산으로 직접 재시도하므로
+        # botocore 재시도를 끈 클라이언트 사용 (재시도 계층이 겹치면 호출 수와 대기 시간이 곱해짐)
+        self.batch_client = AsyncBedrockClient(get_bedrock_runtime(retries=False), limiter=limiter)
+        
+        # 전처리 배치 임베딩 영구 캐시 (EMBEDDING_CACHE_DB, 빈 문자열이면 비활성화)
+        self.store = EmbeddingStore()
+        
+        # 질의 문자열 → 임베딩 메모리 LRU (QUERY_EMBEDDING_CACHE_SIZE가 0이면 비활성화)
+        # 인덱스 리로드 시에도 임베더를 재사용하므로 캐시가 유지됨
+        query_cache_size = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+        self.query_cache = LRUCache(
+            max_entries=query_cache_size,
+            ttl=float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "86400")) or None
+        ) if query_cache_size > 0 else None
+    
+    def _build_body(self, text: str) -> dict:
+        """Titan Embeddings V2 요청 본문 구성"""
+        return {
+            "inputText": text,
+            "dimensions": self.dimensions,
+            "normalize": self.normalize
+        }
+    
+    def cache_key(self, text: str) -> str:
+        """임베딩 캐시 키 (모델, 차원, 정규화 여부가 같을 때만 재사용)"""
+        return EmbeddingStore.make_key(self.embedding_model_id, self.dimensions, self.normalize, text)
     
-    def embed_text(self, text: str) -> List[float]:
+    def _cached_query(self, text: str):
+        """질의 임베딩 캐시 조회 (없거나 캐시 비활성화면 None)"""
+        if self.query_cache is None:
+            return None
+        vector = self.query_cache.get(text)
+        count_cache("query_embedding", "miss" if vector is None else "hit")
+        return vector
+    
+    def _remember_query(self, text: str, embedding: List[float]) -> np.ndarray:
+        """질의 임베딩을 읽기 전용 float32 벡터로 캐시에 저장"""
+        vector = np.array(embedding, dtype='float32')
+        vector.flags.writeable = False
+        if self.query_cache is not None:
+            self.query_cache.set(text, vector)
+        return vector
+    
+    def embed_text(self, text: str) -> np.ndarray:
         """
-        단일 텍스트를 임베딩 벡터로 변환
+        단일 텍스트를 임베딩 벡터로 변환 (같은 질의는 메모리 LRU 캐시에서 반환)
         
         Args:
             text: 임베딩할 텍스트
             
         Returns:
-            임베딩 벡터 (리스트)
+            임베딩 벡터 (읽기 전용 float32 배열)
         """
+        vector = self._cached_query(text)
+        if vector is not None:
+            return vector
+        
         try:
             # Titan Embeddings V2 API 호출
-            body = json.dumps({
-                "inputText": text,
-                "dimensions": 1024,  # Titan V2는 최대 1024 차원
-                "normalize": True     # 정규화된 벡터 반환
-            })
-            
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.embedding_model_id,
-                body=body,
-                contentType="application/json",
-                accept="application/json"
+            response_body = self.async_client.invoke_model_json_blocking(
+                self.embedding_model_id,
+                self._build_body(text)
             )
-            
-            # 응답 파싱
-            response_body = json.loads(response["body"].read())
             embedding = response_body.get("embedding", [])
             
-            return embedding
+            return self._remember_query(text, embedding)
             
         except Exception as e:
+            record_bedrock_error(self.embedding_model_id, e)
             print(f"임베딩 생성 중 오류 발생: {str(e)}")
             raise
     
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+    async def aembed_text(self, text: str) -> np.ndarray:
         """
-        여러 텍스트를 배치로 임베딩 벡터로 변환
+        단일 텍스트를 임베딩 벡터로 변환 (비동기, 같은 질의는 메모리 LRU 캐시에서 반환)
         
         Args:
-            texts: 임베딩할 텍스트 리스트
+            text: 임베딩할 텍스트
             
         Returns:
-            임베딩 벡터 리스트
+            임베딩 벡터 (읽기 전용 float32 배열)
+        """
+        vector = self._cached_query(text)
+        if vector is not None:
+            return vector
+        
+        try:
+            response_body = await self.async_client.invoke_model_json(
+                self.embedding_model_id,
+                self._build_body(text)
+            )
+            return self._remember_query(text, response_body.get("embedding", []))
+            
+        except Exception as e:
+            record_bedrock_error(self.embedding_model_id, e)
+            print(f"임베딩 생성 중 오류 발생: {str(e)}")
+            raise
+    
+    def seed_query_cache(self, texts: List[str]) -> int:
+        """
+        질의 임베딩 캐시 미리 채우기 (서버 시작 시 자주 쓰는 질의)
+        
+        배치 경로(embed_texts)를 사용하므로 영구 캐시에 있는 질의는 Bedrock을 호출하지 않습니다.
+        
+        Args:
+            texts: 질의 목록 (검색에 쓰는 형태, 즉 확장된 질의)
+        
+        Returns:
+            캐시에 넣은 질의 수
         """
-        embeddings = []
+        texts = [text for text in dict.fromkeys(texts) if text]
+        if self.query_cache is None or not texts:
+            return 0
+        
+        failed = {}
+        try:
+            embeddings = self.embed_texts(texts)
+        except EmbeddingError as e:
+            print(f"[WARNING] 질의 임베딩 캐시 일부 실패: {e}")
+            embeddings, failed = e.embeddings, e.failed
         
         for i, text in enumerate(texts):
+            if i not in failed:
+                self._remember_query(text, embeddings[i])
+        return len(texts) - len(failed)
+    
+    def _embed_with_retry(self, text: str) -> List[float]:
+        """
+        스로틀/일시적 오류는 지수 백오프(jitter 포함)로 최대 max_retries번 재시도
+        
+        botocore 재시도를 끈 batch_client를 사용하므로 텍스트당 호출은 최대 1 + max_retries번입니다.
+        """
+        attempt = 0
+        while True:
             try:
-                embedding = self.embed_text(text)
-                embeddings.append(embedding)
-                
-                if (i + 1) % 10 == 0:
-                    print(f"임베딩 진행 중: {i + 1}/{len(texts)}")
-                    
+                response_body = self.batch_client.invoke_model_json_blocking(
+                    self.embedding_model_id,
+                    self._build_body(text)
+                )
+                return response_body.get("embedding", [])
             except Exception as e:
-                print(f"텍스트 {i} 임베딩 실패: {str(e)}")
-                # 실패한 경우 None 추가
-                embeddings.append(None)
+                record_bedrock_error(self.embedding_model_id, e)
+                if bedrock_error_code(e) not in RETRYABLE_ERROR_CODES or attempt >= self.max_retries:
+                    raise
+                delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+                attempt += 1
+    
+    def embed_texts(
+        self,
+        texts: List[str],
+        progress_callback: Callable[[int], None] = None,
+        concurrency: int = None
+    ) -> np.ndarray:
+        """
+        여러 텍스트를 동시에 임베딩하여 입력 순서대로 반환
+        
+        Args:
+            texts: 임베딩할 텍스트 리스트
+            progress_callback: 텍스트 하나를 처리할 때마다 호출 (처리 수 전달, 예외 시 남은 요청 취소 후 중단)
+            concurrency: 동시 요청 수 (기본 EMBEDDING_CONCURRENCY 또는 8)
+            
+        Returns:
+            (len(texts), dimensions) float32 행렬 (C 연속)
+        
+        Raises:
+            EmbeddingError: 재시도 후에도 실패한 텍스트가 있는 경우 (성공한 행렬 포함)
+        """
+        total = len(texts)
+        if total == 0:
+            return np.zeros((0, self.dimensions), dtype='float32')
+        
+        # 이미 임베딩한 텍스트는 캐시에서 가져오고, 같은 텍스트는 한 번만 요청
+        keys = [self.cache_key(text) for text in texts]
+        cached = self.store.get_many(keys)
+        pending: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            if key not in cached:
+                pending.setdefault(key, []).append(i)
+        
+        embeddings = None
+        failed = {}
+        done = total - sum(len(indices) for indices in pending.values())
+        
+        if cached:
+            embeddings = np.zeros((total, len(next(iter(cached.values())))), dtype='float32')
+            for i, key in enumerate(keys):
+                if key in cached:
+                    embeddings[i] = cached[key]
+            print(f"임베딩 캐시 hit: {done}/{total}")
+            if progress_callback is not None:
+                progress_callback(done)
+        
+        if pending:
+            workers = max(1, min(concurrency or self.concurrency, len(pending)))
+            new_embeddings = {}
+            
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as executor:
+                futures = {
+                    executor.submit(self._embed_with_retry, texts[indices[0]]): key
+                    for key, indices in pending.items()
+                }
+                try:
+                    for future in as_completed(futures):
+                        indices = pending[futures[future]]
+                        try:
+                            vector = future.result()
+                            if embeddings is None:
+                                embeddings = np.zeros((total, len(vector)), dtype='float32')
+                            embeddings[indices] = vector
+                            new_embeddings[futures[future]] = embeddings[indices[0]]
+                        except Exception as e:
+                            print(f"텍스트 {indices[0]} 임베딩 실패: {str(e)}")
+                            for i in indices:
+                                failed[i] = str(e)
+                        
+                        if len(new_embeddings) >= self.CACHE_FLUSH_SIZE:
+                            self.store.put_many(new_embeddings, self.embedding_model_id)
+                            new_embeddings = {}
+                        
+                        previous, done = done, done + len(indices)
+                        if done // 10 > previous // 10:
+                            print(f"임베딩 진행 중: {done}/{total}")
+                        
+                        if progress_callback is not None:
+                            progress_callback(len(indices))
+                except BaseException:
+                    # 취소(JobCancelled 등) 시 아직 시작하지 않은 요청은 보내지 않음
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+                finally:
+                    # 중단되어도 이미 받은 임베딩은 캐시에 남겨 다음 실행에서 재사용
+                    self.store.put_many(new_embeddings, self.embedding_model_id)
         
+        if embeddings is None:
+            embeddings = np.zeros((total, self.dimensions), dtype='float32')
+        if failed:
+            raise EmbeddingError(failed, embeddings)
         return embeddings
 
 
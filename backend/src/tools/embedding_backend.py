@@ -0,0 +1,229 @@
+"""
+임베딩 백엔드 인터페이스와 로컬(오프라인) 백엔드
+검색기(FAISSRetriever)와 전처리 파이프라인은 EMBEDDING_BACKEND로 고른 백엔드(create_embedder)를 사용합니다.
+
+- bedrock: AWS Bedrock Titan Embeddings (TitanEmbedder, 기본값)
+- local: 문자 n-gram을 해싱하여 EMBEDDING_DIMENSIONS차원으로 투영하는 결정적 CPU 임베딩 (네트워크 없음)
+
+local 백엔드는 검색 품질이 Titan보다 낮으므로 AWS 자격 증명 없이 전체 파이프라인을 실행하거나
+청크 분할/인덱싱/검색 처리량을 측정할 때 사용합니다. 백엔드를 바꾸면 데이터 전처리를 다시 실행해야 합니다.
+"""
+
+import os
+import unicodedata
+import zlib
+from typing import Any, Callable, Dict, List, Protocol, runtime_checkable
+
+import numpy as np
+
+from tools.env import load_env
+
+# 환경 변수 로드
+load_env()
+
+EMBEDDING_BACKENDS = ("bedrock", "local")
+
+
+class EmbeddingError(Exception):
+    """
+    재시도 후에도 일부 텍스트의 임베딩에 실패함
+    
+    Attributes:
+        failed: 실패한 텍스트 인덱스 → 오류 메시지
+        embeddings: 성공한 행만 채워진 (len(texts), dimensions) float32 행렬 (실패한 행은 0)
+    """
+    
+    def __init__(self, failed: Dict[int, str], embeddings: np.ndarray):
+        index = min(failed)
+        super().__init__(
+            f"{len(failed)}/{len(embeddings)}개 텍스트 임베딩 실패 (텍스트 {index}: {failed[index]})"
+        )
+        self.failed = failed
+        self.embeddings = embeddings
+
+
+def embed_chunks(
+    embedder: "EmbeddingBackend",
+    chunks: List[Dict[str, Any]],
+    progress_callback: Callable[[int], None] = None
+) -> List[Dict[str, Any]]:
+    """
+    청크 텍스트를 임베딩하여 각 청크의 'embedding'에 저장 (전처리 파이프라인 공통)
+    
+    재시도 후에도 실패한 청크는 embedding이 None이 되어 인덱스에서 제외됩니다.
+    
+    Args:
+        embedder: 임베딩 백엔드
+        chunks: {"text", ...} 청크 리스트 (제자리에서 수정)
+        progress_callback: 청크 하나를 임베딩할 때마다 호출 (진행률 보고/취소용)
+    
+    Returns:
+        임베딩이 추가된 청크 리스트
+    """
+    texts = [chunk['text'] for chunk in chunks]
+    try:
+        embeddings = embedder.embed_texts(texts, progress_callback=progress_callback)
+        failed = {}
+    except EmbeddingError as e:
+        print(f"[WARNING] {e}")
+        print(f"[WARNING] 임베딩에 실패한 청크 {len(e.failed)}개는 인덱스에서 제외합니다.")
+        embeddings, failed = e.embeddings, e.failed
+    
+    for i, chunk in enumerate(chunks):
+        chunk['embedding'] = None if i in failed else embeddings[i]
+    return chunks
+
+
+@runtime_checkable
+class EmbeddingBackend(Protocol):
+    """
+    검색기/전처리 파이프라인이 사용하는 임베딩 백엔드
+    
+    Attributes:
+        embedding_model_id: 모델 ID (임베딩 캐시 키와 인덱스 구분에 사용)
+        dimensions: 출력 벡터 차원
+    """
+    
+    embedding_model_id: str
+    dimensions: int
+    
+    def embed_text(self, text: str) -> np.ndarray:
+        """검색 질의 하나를 float32 벡터로 변환"""
+        ...
+    
+    async def aembed_text(self, text: str) -> np.ndarray:
+        """검색 질의 하나를 float32 벡터로 변환 (비동기)"""
+        ...
+    
+    def embed_texts(
+        self,
+        texts: List[str],
+        progress_callback: Callable[[int], None] = None,
+        concurrency: int = None
+    ) -> np.ndarray:
+        """여러 텍스트를 입력 순서대로 (len(texts), dimensions) float32 행렬로 변환 (실패 시 EmbeddingError)"""
+        ...
+    
+    def seed_query_cache(self, texts: List[str]) -> int:
+        """질의 임베딩 캐시 미리 채우기 (캐시가 없는 백엔드는 0 반환)"""
+        ...
+
+
+class LocalHashEmbedder:
+    """
+    문자 n-gram 해싱 임베딩 (결정적, CPU 전용)
+    
+    NFKC 정규화/소문자화한 텍스트의 문자 1~3-gram을 CRC32로 해싱하여 차원과 부호(±1)를 정하고
+    (feature hashing, 희소 무작위 투영과 같음) 빈도를 log로 완화한 뒤 L2 정규화합니다.
+    같은 텍스트는 프로세스/머신과 관계없이 항상 같은 벡터가 됩니다.
+    """
+    
+    NGRAM_RANGE = (1, 3)
+    
+    def __init__(self, dimensions: int = None):
+        """
+        초기화
+        
+        Args:
+            dimensions: 출력 차원 (기본 EMBEDDING_DIMENSIONS 또는 1024)
+        """
+        self.dimensions = int(dimensions or os.getenv("EMBEDDING_DIMENSIONS", "1024"))
+        if self.dimensions <= 0:
+            raise ValueError(f"EMBEDDING_DIMENSIONS는 양수여야 합니다: {self.dimensions}")
+        self.embedding_model_id = f"local-hash-ngram-{self.NGRAM_RANGE[0]}-{self.NGRAM_RANGE[1]}"
+        self.normalize = True
+        
+        # 계산이 빨라 질의 캐시를 두지 않음 (/api/cache/stats의 query_embedding은 비어 있음)
+        self.query_cache = None
+    
+    def _ngram_hashes(self, text: str) -> np.ndarray:
+        """텍스트의 문자 n-gram 해시 (uint32)"""
+        text = " ".join(unicodedata.normalize("NFKC", text).lower().split())
+        low, high = self.NGRAM_RANGE
+        grams = [
+            text[i:i + n]
+            for n in range(low, high + 1)
+            for i in range(len(text) - n + 1)
+        ]
+        return np.fromiter(
+            (zlib.crc32(gram.encode("utf-8")) for gram in grams),
+            dtype=np.uint32,
+            count=len(grams)
+        )
+    
+    def _embed(self, text: str) -> np.ndarray:
+        """단일 텍스트 임베딩 (L2 정규화된 float32, 빈 텍스트는 0 벡터)"""
+        hashes = self._ngram_hashes(text)
+        signs = np.where(hashes >> np.uint32(31), -1.0, 1.0)
+        counts = np.bincount(hashes % np.uint32(self.dimensions), weights=signs, minlength=self.dimensions)
+        vector = (np.sign(counts) * np.log1p(np.abs(counts))).astype('float32')
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+    
+    def embed_text(self, text: str) -> np.ndarray:
+        """
+        단일 텍스트를 임베딩 벡터로 변환
+        
+        Args:
+            text: 임베딩할 텍스트
+        
+        Returns:
+            임베딩 벡터 (float32 배열)
+        """
+        return self._embed(text)
+    
+    async def aembed_text(self, text: str) -> np.ndarray:
+        """단일 텍스트를 임베딩 벡터로 변환 (CPU 계산이 짧아 이벤트 루프에서 바로 실행)"""
+        return self._embed(text)
+    
+    def embed_texts(
+        self,
+        texts: List[str],
+        progress_callback: Callable[[int], None] = None,
+        concurrency: int = None
+    ) -> np.ndarray:
+        """
+        여러 텍스트를 임베딩하여 입력 순서대로 반환
+        
+        Args:
+            texts: 임베딩할 텍스트 리스트
+            progress_callback: 텍스트 하나를 처리할 때마다 호출 (처리 수 전달, 예외 시 중단)
+            concurrency: 사용하지 않음 (TitanEmbedder와 같은 시그니처)
+        
+        Returns:
+            (len(texts), dimensions) float32 행렬 (C 연속)
+        """
+        embeddings = np.zeros((len(texts), self.dimensions), dtype='float32')
+        for i, text in enumerate(texts):
+            embeddings[i] = self._embed(text)
+            if progress_callback is not None:
+                progress_callback(1)
+        return embeddings
+    
+    def seed_query_cache(self, texts: List[str]) -> int:
+        """질의 캐시가 없으므로 아무것도 하지 않음"""
+        return 0
+
+
+def create_embedder(backend: str = None) -> EmbeddingBackend:
+    """
+    설정된 임베딩 백엔드 생성
+    
+    Args:
+        backend: "bedrock" 또는 "local" (None이면 EMBEDDING_BACKEND, 기본 bedrock)
+    
+    Returns:
+        임베딩 백엔드 인스턴스
+    """
+    name = (backend or os.getenv("EMBEDDING_BACKEND", "bedrock")).strip().lower()
+    if name == "local":
+        return LocalHashEmbedder()
+    if name == "bedrock":
+        # boto3 클라이언트는 Bedrock 백엔드를 쓸 때만 로드
+        from tools.embedder_tool import TitanEmbedder
+        return TitanEmbedder()
+    raise ValueError(
+        f"EMBEDDING_BACKEND는 {', '.join(EMBEDDING_BACKENDS)} 중 하나여야 합니다: {name}"
+    )
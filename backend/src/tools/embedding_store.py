@@ -0,0 +1,257 @@
+"""
+임베딩 영구 캐시 (전처리용, SQLite)
+청크 텍스트의 임베딩을 (모델 ID, 차원, 정규화 여부, 텍스트) 해시를 키로 float32 BLOB으로 저장
+
+텍스트가 같으면 임베딩도 같으므로 전체 재학습(pipeline_pdf_batch, --force)이나
+청크 분할 실험에서 이미 임베딩한 텍스트는 Bedrock을 다시 호출하지 않습니다.
+모델/차원 설정이 바뀌면 키가 달라지므로 이전 항목은 compact()로 정리합니다.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+# SQLite 변수 개수 제한 안에서 IN (...) 조회/갱신할 키 수
+_BATCH_SIZE = 500
+
+
+class EmbeddingStore:
+    """내용 주소 기반 임베딩 캐시 (SQLite, 여러 전처리 프로세스가 공유)"""
+    
+    def __init__(self, db_path: str = None):
+        """
+        초기화 (파일은 처음 사용할 때 생성)
+        
+        Args:
+            db_path: SQLite 파일 경로 (기본 EMBEDDING_CACHE_DB, 빈 문자열이면 비활성화)
+        """
+        if db_path is None:
+            db_path = os.getenv("EMBEDDING_CACHE_DB", "./data/cache/embedding_cache.sqlite")
+        
+        self.db_path = db_path or None
+        self._lock = threading.Lock()
+        self._initialized = False
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.db_path is not None
+    
+    @staticmethod
+    def make_key(model_id: str, dimensions: int, normalize: bool, text: str) -> str:
+        """
+        캐시 키 생성
+        
+        Args:
+            model_id: 임베딩 모델 ID
+            dimensions: 임베딩 차원
+            normalize: 정규화 여부
+            text: 임베딩한 텍스트
+        
+        Returns:
+            SHA-256 해시 키
+        """
+        payload = json.dumps([model_id, int(dimensions), bool(normalize), text], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """SQLite 연결 (프로세스/스레드마다 별도 연결 사용)"""
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _init_db(self):
+        """캐시 테이블 생성 (최초 1회)"""
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS embeddings (
+                        key TEXT PRIMARY KEY,
+                        model_id TEXT NOT NULL,
+                        dimensions INTEGER NOT NULL,
+                        vector BLOB NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_used_at REAL NOT NULL
+                    )
+                    """
+                )
+            self._initialized = True
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        여러 키를 한 번에 조회 (조회된 항목은 마지막 사용 시각 갱신)
+        
+        Args:
+            keys: make_key로 만든 키들
+        
+        Returns:
+            키 → float32 벡터 (없는 키는 포함하지 않음)
+        """
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return {}
+        
+        found = {}
+        try:
+            self._init_db()
+            with self._connect() as conn:
+                for start in range(0, len(keys), _BATCH_SIZE):
+                    batch = keys[start:start + _BATCH_SIZE]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        batch
+                    ).fetchall()
+                    for key, vector in rows:
+                        found[key] = np.frombuffer(vector, dtype='float32')
+                    if rows:
+                        hit_keys = [key for key, _ in rows]
+                        conn.execute(
+                            f"UPDATE embeddings SET last_used_at = ? "
+                            f"WHERE key IN ({','.join('?' * len(hit_keys))})",
+                            [time.time()] + hit_keys
+                        )
+        except sqlite3.Error as e:
+            print(f"[WARNING] 임베딩 캐시 조회 실패: {str(e)}")
+            return {}
+        
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+    
+    def put_many(self, items: Dict[str, np.ndarray], model_id: str):
+        """
+        여러 임베딩을 한 번에 저장
+        
+        Args:
+            items: 키 → 벡터
+            model_id: 임베딩 모델 ID (compact 시 모델별 정리용)
+        """
+        if not self.enabled or not items:
+            return
+        
+        now = time.time()
+        rows = [
+            (key, model_id, len(vector), np.asarray(vector, dtype='float32').tobytes(), now, now)
+            for key, vector in items.items()
+        ]
+        try:
+            self._init_db()
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings "
+                    "(key, model_id, dimensions, vector, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except sqlite3.Error as e:
+            print(f"[WARNING] 임베딩 캐시 저장 실패: {str(e)}")
+    
+    def _file_size(self) -> int:
+        """DB 파일 크기 (WAL 포함, 바이트)"""
+        return sum(
+            os.path.getsize(path)
+            for path in (self.db_path, self.db_path + "-wal")
+            if os.path.exists(path)
+        )
+    
+    def stats(self) -> Dict[str, object]:
+        """
+        항목 수, 파일 크기와 모델/차원별 항목 수
+        
+        Returns:
+            {"entries", "bytes", "models": [{"model_id", "dimensions", "entries"}], "hits", "misses"}
+        """
+        result = {"entries": 0, "bytes": 0, "models": [], "hits": self.hits, "misses": self.misses}
+        if not self.enabled or not os.path.exists(self.db_path):
+            return result
+        
+        try:
+            self._init_db()
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT model_id, dimensions, COUNT(*) FROM embeddings "
+                    "GROUP BY model_id, dimensions ORDER BY model_id, dimensions"
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"[WARNING] 임베딩 캐시 통계 조회 실패: {str(e)}")
+            return result
+        
+        result["models"] = [
+            {"model_id": model_id, "dimensions": dimensions, "entries": count}
+            for model_id, dimensions, count in rows
+        ]
+        result["entries"] = sum(count for _, _, count in rows)
+        result["bytes"] = self._file_size()
+        return result
+    
+    def compact(
+        self,
+        model_id: str = None,
+        dimensions: int = None,
+        max_age_days: float = None
+    ) -> Dict[str, int]:
+        """
+        오래되었거나 현재 설정과 다른 항목을 지우고 파일 크기 축소 (VACUUM)
+        
+        Args:
+            model_id: 지정하면 다른 모델의 항목 삭제
+            dimensions: 지정하면 다른 차원의 항목 삭제
+            max_age_days: 지정하면 이 기간 동안 사용되지 않은 항목 삭제
+        
+        Returns:
+            {"removed", "bytes_before", "bytes_after"}
+        """
+        if not self.enabled or not os.path.exists(self.db_path):
+            return {"removed": 0, "bytes_before": 0, "bytes_after": 0}
+        
+        conditions: List[str] = []
+        params: List[object] = []
+        if model_id is not None:
+            conditions.append("model_id != ?")
+            params.append(model_id)
+        if dimensions is not None:
+            conditions.append("dimensions != ?")
+            params.append(int(dimensions))
+        if max_age_days is not None:
+            conditions.append("last_used_at < ?")
+            params.append(time.time() - max_age_days * 86400)
+        
+        self._init_db()
+        bytes_before = self._file_size()
+        removed = 0
+        with self._connect() as conn:
+            if conditions:
+                removed = conn.execute(
+                    f"DELETE FROM embeddings WHERE {' OR '.join(conditions)}",
+                    params
+                ).rowcount
+        
+        # VACUUM은 트랜잭션 밖에서 실행해야 하므로 autocommit 연결 사용
+        conn = self._connect()
+        try:
+            conn.isolation_level = None
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+        
+        return {"removed": removed, "bytes_before": bytes_before, "bytes_after": self._file_size()}
+
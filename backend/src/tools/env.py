@@ -0,0 +1,31 @@
+"""
+환경 변수(.env) 로드
+모듈마다 load_dotenv()를 호출하면 import할 때마다 .env 파일을 찾고 다시 읽으므로
+프로세스당 한 번만 읽도록 한 곳에서 관리합니다.
+"""
+
+import threading
+
+from dotenv import load_dotenv
+
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> bool:
+    """
+    .env를 프로세스당 한 번만 로드 (이미 설정된 환경 변수는 덮어쓰지 않음)
+    
+    Returns:
+        이번 호출에서 로드했으면 True, 이미 로드되어 있었으면 False
+    """
+    global _loaded
+    if _loaded:
+        return False
+    with _lock:
+        if _loaded:
+            return False
+        load_dotenv()
+        _loaded = True
+    return True
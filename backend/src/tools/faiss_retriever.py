@@ -5,33 +5,111 @@ FAISS 벡터 검색 툴
 
 import os
 import pickle
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 import numpy as np
 import faiss
-from dotenv import load_dotenv
 
-from tools.embedder_tool import TitanEmbedder
+from tools.env import load_env
+from tools.embedding_backend import EmbeddingBackend, create_embedder
+from tools.chunk_ids import chunk_id_of, assign_chunk_ids
+from tools.code_index import CodeIndex, normalize_code
+from tools.mmap_store import mmap_enabled, current_mmap_dir, read_faiss_index_mmap, ChunkStore
+from tools.metrics import (
+    stage_timer, count_candidates, STAGE_QUERY_EMBEDDING, STAGE_FAISS_SEARCH, STAGE_CODE_LOOKUP
+)
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
+
+
+def build_coarse_index(index, dimensions: int, block_size: int = 8192):
+    """
+    2단계 검색용 저차원 인덱스 (전체 차원 벡터의 앞 dimensions 차원을 L2 재정규화, 내적 검색)
+    
+    저차원 벡터만 메모리에 복사하므로 INDEX_MMAP=true면 전체 차원 벡터는 페이지 캐시에 두고
+    재채점할 후보의 페이지만 읽습니다.
+    
+    Args:
+        index: 전체 차원 FAISS 인덱스 (reconstruct 지원, 예: IndexFlatL2)
+        dimensions: 저차원 인덱스 차원
+        block_size: 한 번에 복사할 벡터 수
+    
+    Returns:
+        faiss.IndexFlatIP
+    """
+    coarse_index = faiss.IndexFlatIP(dimensions)
+    for start in range(0, index.ntotal, block_size):
+        count = min(block_size, index.ntotal - start)
+        block = np.ascontiguousarray(index.reconstruct_n(start, count)[:, :dimensions])
+        faiss.normalize_L2(block)
+        coarse_index.add(block)
+    return coarse_index
+
+
+def two_stage_search(index, coarse_index, query_vector: np.ndarray, k: int, candidates: int = 10):
+    """
+    저차원 인덱스로 k * candidates개 후보를 고르고 전체 차원 L2 거리로 재채점
+    
+    Args:
+        index: 전체 차원 FAISS 인덱스
+        coarse_index: build_coarse_index로 만든 저차원 인덱스
+        query_vector: (1, d) float32 질의 벡터
+        k: 반환할 결과 수
+        candidates: 결과 수 대비 후보 배수
+    
+    Returns:
+        (distances, indices) - index.search와 같은 형식 (L2 제곱 거리, 작을수록 유사)
+    """
+    coarse_query = np.array(query_vector[:, :coarse_index.d], dtype='float32')
+    faiss.normalize_L2(coarse_query)
+    _, ids = coarse_index.search(coarse_query, k * max(1, candidates))
+    ids = ids[0][ids[0] >= 0]
+    
+    vectors = index.reconstruct_batch(ids)
+    distances = ((vectors - query_vector) ** 2).sum(axis=1)
+    order = np.argsort(distances, kind="stable")[:k]
+    return distances[order][None, :], ids[order][None, :]
 
 
 class FAISSRetriever:
     """FAISS 벡터 검색 클래스"""
     
-    def __init__(self):
-        """초기화 및 인덱스 로드"""
-        self.embedder = TitanEmbedder()
-        self.vector_store_path = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
+    def __init__(self, embedder: EmbeddingBackend = None, vector_store_path: str = None):
+        """
+        초기화 및 인덱스 로드
+        
+        Args:
+            embedder: 사용할 임베딩 백엔드 (None이면 EMBEDDING_BACKEND 설정으로 생성, 리로드 시 기존 임베더 재사용)
+            vector_store_path: 벡터 스토어 디렉토리 (None이면 VECTOR_STORE_PATH)
+        """
+        self.embedder = embedder if embedder is not None else create_embedder()
+        self.vector_store_path = vector_store_path or os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
         self.top_k = int(os.getenv("TOP_K_RESULTS", "5"))
         
         # FAISS 인덱스 로드
         self.index = None
         self.metadata = None
+        self._chunk_positions = {}  # 청크 ID → 메타데이터 위치
+        self._title_positions = {}  # PDF 제목 → 메타데이터 위치 목록
+        self.code_index = None  # 코드 → 청크 ID 역색인
+        
+        # 2단계 검색: 앞 FAISS_COARSE_DIMENSIONS 차원(재정규화)의 작은 인덱스로 후보를 고르고
+        # 후보만 전체 차원 벡터로 재채점 (0이면 전체 차원 한 번에 검색)
+        self.coarse_dimensions = int(os.getenv("FAISS_COARSE_DIMENSIONS", "0"))
+        self.coarse_candidates = int(os.getenv("FAISS_COARSE_CANDIDATES", "10"))
+        self.coarse_index = None
+        
         self._load_index()
+        self._check_dimensions()
+        self._build_coarse_index()
+        self._build_positions()
+        self._load_code_index()
     
     def _load_index(self):
-        """FAISS 인덱스 및 메타데이터 로드"""
+        """FAISS 인덱스 및 메타데이터 로드 (INDEX_MMAP=true면 mmap 저장소 우선)"""
+        if mmap_enabled() and self._load_mmap_index():
+            return
+        
         index_path = os.path.join(self.vector_store_path, "faiss_index.bin")
         metadata_path = os.path.join(self.vector_store_path, "metadata.pkl")
         
@@ -47,20 +125,236 @@ class FAISSRetriever:
             # 메타데이터 로드
             if os.path.exists(metadata_path):
                 with open(metadata_path, 'rb') as f:
-                    self.metadata = pickle.load(f)
+                    # ID 도입 전에 만든 메타데이터에도 청크 ID 부여
+                    self.metadata = assign_chunk_ids(pickle.load(f))
                 print(f"메타데이터 로드 완료: {len(self.metadata)}개 항목")
             else:
                 print(f"경고: 메타데이터 파일이 없습니다: {metadata_path}")
-                
+        
         except Exception as e:
             print(f"인덱스 로드 중 오류 발생: {str(e)}")
             raise
     
+    def _load_mmap_index(self) -> bool:
+        """
+        mmap 저장소에서 로드 (워커 간 페이지 캐시 공유, unpickle 없음)
+        
+        Returns:
+            로드 성공 여부 (False면 pickle 인덱스로 로드)
+        """
+        directory = current_mmap_dir(self.vector_store_path)
+        if directory is None:
+            print("[INFO] mmap 저장소가 없어 pickle 인덱스를 로드합니다.")
+            return False
+        
+        try:
+            self.index = read_faiss_index_mmap(directory)
+            self.metadata = ChunkStore(directory)
+        except Exception as e:
+            print(f"[WARNING] mmap 인덱스 로드 실패, pickle 인덱스 사용: {str(e)}")
+            self.index = None
+            self.metadata = None
+            return False
+        
+        print(f"FAISS 인덱스 로드 완료 (mmap): {self.index.ntotal}개 벡터, {len(self.metadata)}개 청크")
+        return True
+    
+    def _check_dimensions(self):
+        """
+        인덱스 차원과 임베딩 차원 확인
+        
+        다르면 모든 벡터 검색이 실패하여 BM25 결과만 남으므로, 로드(리로드) 자체를 거부합니다.
+        
+        Raises:
+            ValueError: FAISS 인덱스 차원과 EMBEDDING_DIMENSIONS가 다름
+        """
+        if self.index is None:
+            return
+        dimensions = getattr(self.embedder, "dimensions", self.index.d)
+        if self.index.d != dimensions:
+            raise ValueError(
+                f"FAISS 인덱스 차원({self.index.d})과 EMBEDDING_DIMENSIONS({dimensions})가 다릅니다. "
+                "EMBEDDING_DIMENSIONS를 인덱스에 맞추거나 데이터 전처리를 다시 실행해주세요."
+            )
+    
+    def _build_coarse_index(self):
+        """2단계 검색용 저차원 인덱스 생성 (FAISS_COARSE_DIMENSIONS > 0일 때)"""
+        if self.index is None:
+            return
+        
+        if self.coarse_dimensions <= 0:
+            return
+        if self.coarse_dimensions >= self.index.d:
+            print(f"[INFO] FAISS_COARSE_DIMENSIONS({self.coarse_dimensions})가 인덱스 차원({self.index.d}) 이상이라 2단계 검색을 사용하지 않습니다.")
+            return
+        
+        try:
+            self.coarse_index = build_coarse_index(self.index, self.coarse_dimensions)
+        except RuntimeError as e:
+            # reconstruct를 지원하지 않는 인덱스 형식
+            print(f"[WARNING] 2단계 검색 인덱스 생성 실패, 전체 차원 검색 사용: {str(e)}")
+            return
+        print(f"2단계 검색 인덱스 생성 완료: {self.index.d} → {self.coarse_dimensions}차원, {self.coarse_index.ntotal}개 벡터")
+        if not isinstance(self.metadata, ChunkStore):
+            # mmap이 아니면 전체 인덱스도 메모리에 그대로 있으므로 상주 메모리는 오히려 늘어남
+            print(
+                f"[WARNING] INDEX_MMAP=true(mmap 저장소)가 아니면 2단계 검색은 스캔 비용만 줄이고 "
+                f"상주 벡터 메모리는 약 {self.coarse_dimensions / self.index.d:.0%} 늘어납니다."
+            )
+    
+    def _search_index(self, query_vector: np.ndarray, k: int):
+        """FAISS 검색 (2단계 검색이 켜져 있으면 two_stage_search)"""
+        if self.coarse_index is None:
+            return self.index.search(query_vector, k)
+        return two_stage_search(self.index, self.coarse_index, query_vector, k, self.coarse_candidates)
+    
+    def _build_positions(self):
+        """
+        청크 ID/PDF 제목 → 메타데이터 위치 생성 (로드 시 한 번 전체를 읽음)
+        
+        mmap 저장소(ChunkStore)는 항목에 접근할 때마다 JSON을 디코딩하므로,
+        요청 경로(get_chunk, 문서 전체 청크 조회)는 이 위치로 필요한 항목만 읽습니다.
+        """
+        if self.metadata is None:
+            return
+        
+        positions = {}
+        titles = {}
+        for i, item in enumerate(self.metadata):
+            positions.setdefault(chunk_id_of(item), i)
+            title = (item.get('metadata') or {}).get('pdf_title')
+            if title:
+                titles.setdefault(title, []).append(i)
+        self._chunk_positions = positions
+        self._title_positions = titles
+    
+    def _load_code_index(self):
+        """코드 역색인 로드 (파일이 없거나 메타데이터와 청크 수가 다르면 메타데이터로 생성)"""
+        if self.metadata is None:
+            return
+        
+        code_index = CodeIndex.load(self.vector_store_path)
+        if code_index is None or code_index.chunk_count != len(self.metadata):
+            print("[INFO] 코드 색인 파일이 없거나 메타데이터와 달라 새로 생성합니다.")
+            code_index = CodeIndex.build(self.metadata)
+        self.code_index = code_index
+        print(f"코드 색인 로드 완료: {len(code_index)}개 코드")
+    
+    def lookup_codes(self, codes: List[str], exclude_ids: Set[str] = None) -> List[Dict[str, Any]]:
+        """
+        코드 역색인으로 청크 조회 (임베딩/벡터 검색 없음)
+        
+        Args:
+            codes: 재료코드, 시술코드, 분류번호(자651-2), 고시번호 등 (여러 개면 모두 포함하는 청크)
+            exclude_ids: 제외할 청크 ID 집합
+        
+        Returns:
+            일치하는 청크 전체 (메타데이터 순서, score는 1.0)
+        """
+        if self.code_index is None:
+            return []
+        
+        with stage_timer(STAGE_CODE_LOOKUP):
+            results = []
+            for chunk_id in self.code_index.lookup(codes):
+                if exclude_ids and chunk_id in exclude_ids:
+                    continue
+                chunk = self.get_chunk(chunk_id)
+                if chunk is None:
+                    continue
+                chunk.update(score=1.0, rank=len(results) + 1)
+                results.append(chunk)
+        count_candidates(STAGE_CODE_LOOKUP, len(results))
+        return results
+    
+    def get_chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """
+        청크 ID로 청크 조회
+        
+        Args:
+            chunk_id: 청크 ID
+        
+        Returns:
+            {"id", "text", "metadata"} (없으면 None)
+        """
+        position = self._chunk_positions.get(chunk_id)
+        if position is None:
+            return None
+        item = self.metadata[position]
+        return {"id": chunk_id, "text": item['text'], "metadata": item['metadata']}
+    
+    def _chunks_at(self, positions: List[int], max_chunks: int, exclude_ids: Set[str] = None, match=None):
+        """위치 목록(메타데이터 순서)의 청크 중 match를 만족하는 것만 디코딩하여 반환"""
+        chunks = []
+        for position in positions:
+            item = self.metadata[position]
+            chunk_id = chunk_id_of(item)
+            if exclude_ids and chunk_id in exclude_ids:
+                continue
+            if match is not None and not match(item['metadata']):
+                continue
+            chunks.append({"id": chunk_id, "text": item['text'], "metadata": item['metadata']})
+            if len(chunks) >= max_chunks:
+                break
+        return chunks
+    
+    def get_chunks_by_doc_code(
+        self,
+        doc_code: str,
+        max_chunks: int = 100,
+        exclude_ids: Set[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        문서 코드가 일치하는 청크 조회 (코드 역색인으로 후보 위치만 읽음)
+        
+        Args:
+            doc_code: 문서 코드 (예: "자656", "제2022-264호")
+            max_chunks: 최대 반환 청크 수
+            exclude_ids: 제외할 청크 ID 집합
+        
+        Returns:
+            {"id", "text", "metadata"} 목록 (메타데이터 순서)
+        """
+        if self.code_index is None:
+            return []
+        
+        # 역색인에는 본문에 코드가 나오는 청크도 있으므로 메타데이터의 doc_code로 다시 확인
+        positions = sorted(
+            self._chunk_positions[chunk_id]
+            for chunk_id in self.code_index.postings.get(normalize_code(doc_code), [])
+            if chunk_id in self._chunk_positions
+        )
+        return self._chunks_at(
+            positions, max_chunks, exclude_ids,
+            match=lambda metadata: metadata.get('doc_code', '') == doc_code
+        )
+    
+    def get_chunks_by_pdf_title(self, pdf_title_keyword: str, max_chunks: int = 100) -> List[Dict[str, Any]]:
+        """
+        PDF 제목에 키워드가 포함된 청크 조회 (제목 → 위치 맵으로 후보 위치만 읽음)
+        
+        Args:
+            pdf_title_keyword: PDF 제목에 포함된 키워드 (대소문자 무시)
+            max_chunks: 최대 반환 청크 수
+        
+        Returns:
+            {"id", "text", "metadata"} 목록 (메타데이터 순서)
+        """
+        keyword = pdf_title_keyword.lower()
+        positions = sorted(
+            position
+            for title, title_positions in self._title_positions.items()
+            if keyword in title.lower()
+            for position in title_positions
+        )
+        return self._chunks_at(positions, max_chunks)
+    
     def search(
         self, 
         query: str, 
         top_k: int = None,
-        filter_codes: Dict[str, str] = None
+        filter_codes: Dict[str, str] = None,
+        exclude_ids: Set[str] = None
     ) -> List[Dict[str, Any]]:
         """
         질문과 유사한 문서 검색
@@ -69,37 +363,76 @@ class FAISSRetriever:
             query: 검색 질문
             top_k: 반환할 결과 수 (None이면 기본값 사용)
             filter_codes: 필터링할 코드 (예: {"재료코드": "A12345"})
-            
+            exclude_ids: 제외할 청크 ID 집합
+        
         Returns:
-            검색 결과 리스트 (각 결과는 text, metadata, score 포함)
+            검색 결과 리스트 (각 결과는 id, text, metadata, score 포함)
         """
         if self.index is None or self.metadata is None:
             print("⚠️  FAISS 인덱스가 로드되지 않았습니다. 빈 결과를 반환합니다.")
             return []  # 빈 리스트 반환 (딕셔너리 대신)
         
         try:
-            # 1. 질문을 임베딩으로 변환
-            query_embedding = self.embedder.embed_text(query)
+            # 질문을 임베딩으로 변환
+            with stage_timer(STAGE_QUERY_EMBEDDING):
+                query_embedding = self.embedder.embed_text(query)
+        except Exception as e:
+            print(f"❌ 검색 중 오류 발생: {str(e)}")
+            return []
+        
+        return self.search_by_vector(query_embedding, top_k, filter_codes, exclude_ids)
+    
+    def search_by_vector(
+        self,
+        query_embedding: List[float],
+        top_k: int = None,
+        filter_codes: Dict[str, str] = None,
+        exclude_ids: Set[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        미리 계산된 질의 임베딩으로 유사한 문서 검색 (임베딩 호출 없음)
+        
+        Args:
+            query_embedding: 질의 임베딩 벡터
+            top_k: 반환할 결과 수 (None이면 기본값 사용)
+            filter_codes: 필터링할 코드 (예: {"재료코드": "A12345"})
+            exclude_ids: 제외할 청크 ID 집합 (제외한 만큼 더 검색하여 top_k를 채움)
+        
+        Returns:
+            검색 결과 리스트 (각 결과는 id, text, metadata, score 포함)
+        """
+        if self.index is None or self.metadata is None:
+            return []
+        
+        try:
+            # 1. FAISS 검색 (더 많은 후보 검색)
             query_vector = np.array([query_embedding], dtype='float32')
-            
-            # 2. FAISS 검색 (더 많은 후보 검색)
             k = top_k if top_k else self.top_k
             search_k = k * 3 if filter_codes else k  # 필터링이 있으면 더 많이 검색
+            if exclude_ids:
+                search_k += len(exclude_ids)
             
-            distances, indices = self.index.search(query_vector, search_k)
+            with stage_timer(STAGE_FAISS_SEARCH):
+                distances, indices = self._search_index(query_vector, search_k)
             
-            # 3. 결과 구성
+            # 2. 결과 구성
             results = []
             for i, (dist, idx) in enumerate(zip(distances[0], indices[0])):
                 if idx >= 0 and idx < len(self.metadata):
+                    item = self.metadata[idx]
+                    chunk_id = chunk_id_of(item)
+                    if exclude_ids and chunk_id in exclude_ids:
+                        continue
+                    
                     result = {
-                        "text": self.metadata[idx]['text'],
-                        "metadata": self.metadata[idx]['metadata'],
+                        "id": chunk_id,
+                        "text": item['text'],
+                        "metadata": item['metadata'],
                         "score": float(dist),  # L2 거리 (작을수록 유사)
                         "rank": i + 1
                     }
                     
-                    # 4. 필터링 적용
+                    # 3. 필터링 적용
                     if filter_codes:
                         match = True
                         for key, value in filter_codes.items():
@@ -115,8 +448,9 @@ class FAISSRetriever:
                     if len(results) >= k:
                         break
             
+            count_candidates(STAGE_FAISS_SEARCH, len(results))
             return results
-            
+        
         except Exception as e:
             print(f"❌ 검색 중 오류 발생: {str(e)}")
             return []  # 빈 리스트 반환 (딕셔너리 대신)
@@ -131,15 +465,23 @@ class FAISSRetriever:
         """
         재료코드/시술코드로 필터링하여 검색
         
+        질문 없이 코드만 주어지면 코드 역색인으로 바로 조회하고,
+        일치하는 청크가 없을 때만 임베딩 검색을 수행합니다.
+        
         Args:
             material_code: 재료코드
             procedure_code: 시술코드
             query: 검색 질문 (선택사항)
-            top_k: 반환할 결과 수
-            
+            top_k: 반환할 결과 수 (코드 조회 시 None이면 일치하는 청크 전체)
+        
         Returns:
             검색 결과 리스트
         """
+        if not query:
+            results = self.lookup_codes([material_code, procedure_code])
+            if results:
+                return results[:top_k] if top_k else results
+        
         # 필터 구성
         filter_codes = {}
         if material_code:
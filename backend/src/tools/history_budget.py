@@ -0,0 +1,180 @@
+"""
+대화 히스토리 토큰 예산
+Claude에 보내는 이전 대화를 토큰 예산(HISTORY_TOKEN_BUDGET) 안으로 줄이고,
+예산을 넘는 오래된 턴은 요약 한 쌍(user/assistant)으로 대체
+
+요약은 잘려 나간 메시지 앞부분(prefix)의 누적 해시를 키로 캐시합니다. 대화가 길어져
+턴이 더 잘려 나가면, 캐시된 가장 긴 prefix의 요약에 새로 잘린 턴만 덧붙여 다시 요약하므로
+각 턴은 한 번만 요약됩니다. 긴 대화에서도 턴당 프롬프트 크기와 지연 시간이 일정하게 유지됩니다.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.lru_cache import LRUCache
+from tools.metrics import count_cache, stage_timer, record_value, STAGE_HISTORY_SUMMARY
+from tools.tokens import estimate_tokens
+
+
+SUMMARY_PREFIX = "[이전 대화 요약]"
+SUMMARY_ACK = "네, 이전 대화 내용을 참고하여 답변하겠습니다."
+
+
+def _prefix_keys(messages: List[Dict[str, str]]) -> List[str]:
+    """messages[:i+1]의 누적 해시 목록 (앞부분이 같으면 키도 같음)"""
+    keys = []
+    digest = ""
+    for message in messages:
+        digest = hashlib.sha256(
+            (digest + json.dumps([message.get("role"), message.get("content")], ensure_ascii=False)).encode("utf-8")
+        ).hexdigest()
+        keys.append(digest)
+    return keys
+
+
+class HistoryBudget:
+    """이전 대화를 토큰 예산 안으로 줄이고 오래된 턴은 캐시된 요약으로 대체"""
+    
+    def __init__(
+        self,
+        token_budget: int = None,
+        summary_enabled: bool = None,
+        summary_cache_size: int = None
+    ):
+        """
+        초기화
+        
+        Args:
+            token_budget: 이전 대화 토큰 예산 (기본 HISTORY_TOKEN_BUDGET 또는 2000, 0이면 제한 없음)
+            summary_enabled: 예산을 넘는 턴 요약 여부 (기본 HISTORY_SUMMARY_ENABLED 또는 true, false면 잘라내기만)
+            summary_cache_size: 요약 캐시 최대 항목 수 (기본 HISTORY_SUMMARY_CACHE_SIZE 또는 1024)
+        """
+        if token_budget is None:
+            token_budget = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+        if summary_enabled is None:
+            summary_enabled = os.getenv("HISTORY_SUMMARY_ENABLED", "true").lower() == "true"
+        if summary_cache_size is None:
+            summary_cache_size = int(os.getenv("HISTORY_SUMMARY_CACHE_SIZE", "1024"))
+        
+        self.token_budget = token_budget
+        self.summary_enabled = summary_enabled
+        self.summaries = LRUCache(max_entries=summary_cache_size)
+        self.summarized = 0  # 요약 생성 횟수 (Claude 호출)
+        self.truncated = 0  # 예산 초과로 줄인 요청 수
+    
+    def split(self, messages: List[Dict[str, str]]) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        예산 안에 들어가는 최근 메시지와 그 이전 메시지로 분리
+        
+        최근 쪽은 항상 user 메시지로 시작하도록 턴 경계에서 자릅니다.
+        
+        Returns:
+            (오래된 메시지, 최근 메시지)
+        """
+        if self.token_budget <= 0 or not messages:
+            return [], list(messages or [])
+        
+        total = 0
+        cut = len(messages)
+        for i in range(len(messages) - 1, -1, -1):
+            total += estimate_tokens(messages[i].get("content"))
+            if total > self.token_budget:
+                break
+            if messages[i].get("role") == "user":
+                cut = i
+        return list(messages[:cut]), list(messages[cut:])
+    
+    def _plan(
+        self,
+        messages: List[Dict[str, str]]
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]], List[str], Optional[str], int]:
+        """
+        요약 계획
+        
+        Returns:
+            (오래된 메시지, 최근 메시지, prefix 키, 캐시된 요약, 캐시된 요약이 덮는 메시지 수)
+        """
+        older, recent = self.split(messages)
+        if not older or not self.summary_enabled:
+            return older, recent, [], None, 0
+        
+        keys = _prefix_keys(older)
+        for covered in range(len(older), 0, -1):
+            summary = self.summaries.get(keys[covered - 1])
+            if summary is not None:
+                return older, recent, keys, summary, covered
+        return older, recent, keys, None, 0
+    
+    def _finish(
+        self,
+        older: List[Dict[str, str]],
+        recent: List[Dict[str, str]],
+        summary: Optional[str]
+    ) -> List[Dict[str, str]]:
+        """요약 한 쌍 + 최근 메시지"""
+        if older:
+            self.truncated += 1
+            record_value("history_dropped_messages", len(older))
+        if not summary:
+            return recent
+        return [
+            {"role": "user", "content": f"{SUMMARY_PREFIX}\n{summary}"},
+            {"role": "assistant", "content": SUMMARY_ACK}
+        ] + recent
+    
+    def fit(self, messages: List[Dict[str, str]], summarizer=None) -> List[Dict[str, str]]:
+        """
+        예산에 맞춘 이전 대화
+        
+        Args:
+            messages: 전체 이전 대화
+            summarizer: summarize_history(이전 요약, 새로 요약할 메시지)를 제공하는 객체 (예: 답변 에이전트)
+        
+        Returns:
+            Claude에 보낼 이전 대화 (요약 실패 시 캐시된 요약 + 최근 메시지)
+        """
+        older, recent, keys, summary, covered = self._plan(messages)
+        if keys and covered == len(older):
+            count_cache("history_summary", "hit")
+        elif keys and summarizer is not None:
+            count_cache("history_summary", "miss")
+            try:
+                with stage_timer(STAGE_HISTORY_SUMMARY):
+                    summary = summarizer.summarize_history(summary, older[covered:])
+                self._store(keys, summary)
+            except Exception as e:
+                # 이미 캐시된 앞부분 요약(있으면)과 최근 대화로 계속 진행
+                print(f"[WARNING] 대화 요약 실패: {str(e)}")
+        return self._finish(older, recent, summary)
+    
+    async def afit(self, messages: List[Dict[str, str]], summarizer=None) -> List[Dict[str, str]]:
+        """fit의 비동기 버전 (요약 Claude 호출을 await)"""
+        older, recent, keys, summary, covered = self._plan(messages)
+        if keys and covered == len(older):
+            count_cache("history_summary", "hit")
+        elif keys and summarizer is not None:
+            count_cache("history_summary", "miss")
+            try:
+                with stage_timer(STAGE_HISTORY_SUMMARY):
+                    summary = await summarizer.asummarize_history(summary, older[covered:])
+                self._store(keys, summary)
+            except Exception as e:
+                # 이미 캐시된 앞부분 요약(있으면)과 최근 대화로 계속 진행
+                print(f"[WARNING] 대화 요약 실패: {str(e)}")
+        return self._finish(older, recent, summary)
+    
+    def _store(self, keys: List[str], summary: str):
+        self.summarized += 1
+        self.summaries.set(keys[-1], summary)
+    
+    def stats(self) -> Dict[str, Any]:
+        """토큰 예산, 요약 캐시 통계"""
+        return {
+            "token_budget": self.token_budget,
+            "summary_enabled": self.summary_enabled,
+            "truncated": self.truncated,
+            "summarized": self.summarized,
+            "summary_cache": self.summaries.stats()
+        }
@@ -3,18 +3,29 @@
 FAISS 벡터 검색과 BM25 키워드 검색을 결합하여 정확도 향상
 """
 
+import asyncio
 import os
-from typing import List, Dict, Any
-from dotenv import load_dotenv
+from concurrent.futures import Executor
+from functools import partial
+from typing import List, Dict, Any, Iterable, Optional, Set
 
+from tools.env import load_env
 from tools.faiss_retriever import FAISSRetriever
 from tools.bm25_retriever import BM25Retriever
 from tools.query_expander import get_query_expander
 from tools.reranker import get_reranker
 from tools.bm25_reranker import get_bm25_reranker
+from tools.deadline import (
+    DeadlineExceeded, should_shed, was_shed, run_query_embedding, SHED_FALLBACK, SHED_RERANK, SHED_VECTOR
+)
+from tools.metrics import (
+    stage_timer, count_candidates, context_bound,
+    STAGE_QUERY_EXPANSION, STAGE_QUERY_EMBEDDING, STAGE_FUSION,
+    STAGE_FALLBACK, STAGE_LOCAL_RERANK, STAGE_COHERE_RERANK
+)
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 class HybridRetriever:
@@ -25,7 +36,9 @@ class HybridRetriever:
         vector_weight: float = 0.7,
         bm25_weight: float = 0.3,
         use_rrf: bool = False,
-        use_reranker: bool = True
+        use_reranker: bool = True,
+        embedder=None,
+        vector_store_path: str = None
     ):
         """
         초기화
@@ -35,9 +48,11 @@ class HybridRetriever:
             bm25_weight: BM25 검색 가중치 (기본 0.3)
             use_rrf: Reciprocal Rank Fusion 사용 여부
             use_reranker: Cohere Rerank 사용 여부 (기본 True)
+            embedder: 질의 임베더 (None이면 생성, 인덱스 리로드 시 기존 임베더 재사용)
+            vector_store_path: 벡터 스토어 디렉토리 (None이면 VECTOR_STORE_PATH)
         """
-        self.faiss_retriever = FAISSRetriever()
-        self.bm25_retriever = BM25Retriever()
+        self.faiss_retriever = FAISSRetriever(embedder=embedder, vector_store_path=vector_store_path)
+        self.bm25_retriever = BM25Retriever(vector_store_path=vector_store_path)
         self.vector_weight = vector_weight
         self.bm25_weight = bm25_weight
         self.use_rrf = use_rrf
@@ -66,7 +81,7 @@ class HybridRetriever:
         Args:
             vector_results: 벡터 검색 결과
             bm25_results: BM25 검색 결과
-            
+        
         Returns:
             통합된 검색 결과
         """
@@ -75,7 +90,7 @@ class HybridRetriever:
         
         # 벡터 검색 결과 처리
         for result in vector_results:
-            doc_id = id(result['text'])  # 문서 고유 ID
+            doc_id = result['id']  # 청크 ID
             rank = result['rank']
             rrf_score = 1.0 / (self.rrf_k + rank)
             
@@ -91,7 +106,7 @@ class HybridRetriever:
         
         # BM25 검색 결과 처리
         for result in bm25_results:
-            doc_id = id(result['text'])
+            doc_id = result['id']
             rank = result['rank']
             rrf_score = 1.0 / (self.rrf_k + rank)
             
@@ -137,52 +152,52 @@ class HybridRetriever:
         Args:
             vector_results: 벡터 검색 결과
             bm25_results: BM25 검색 결과
-            
+        
         Returns:
             통합된 검색 결과
         """
         # 문서별 점수 계산
         doc_scores = {}
         
-        # 벡터 검색 결과 처리
+        # 벡터 검색 결과 처리 (청크 ID 기준으로 합침)
         for result in vector_results:
-            doc_text = result['text']
+            doc_id = result['id']
             
             # FAISS는 L2 distance를 반환 (작을수록 유사)
             # 유사도로 변환: 1 / (1 + distance)
             vector_similarity = 1.0 / (1.0 + result['score'])
             
-            if doc_text not in doc_scores:
-                doc_scores[doc_text] = {
+            if doc_id not in doc_scores:
+                doc_scores[doc_id] = {
                     'result': result,
                     'vector_score': vector_similarity,
                     'bm25_score': 0.0
                 }
             else:
-                doc_scores[doc_text]['vector_score'] = max(
-                    doc_scores[doc_text]['vector_score'],
+                doc_scores[doc_id]['vector_score'] = max(
+                    doc_scores[doc_id]['vector_score'],
                     vector_similarity
                 )
         
         # BM25 검색 결과 처리
         for result in bm25_results:
-            doc_text = result['text']
+            doc_id = result['id']
             
-            if doc_text not in doc_scores:
-                doc_scores[doc_text] = {
+            if doc_id not in doc_scores:
+                doc_scores[doc_id] = {
                     'result': result,
                     'vector_score': 0.0,
                     'bm25_score': result['score']
                 }
             else:
-                doc_scores[doc_text]['bm25_score'] = max(
-                    doc_scores[doc_text]['bm25_score'],
+                doc_scores[doc_id]['bm25_score'] = max(
+                    doc_scores[doc_id]['bm25_score'],
                     result['score']
                 )
         
         # 최종 점수 계산 및 정렬
         final_results = []
-        for doc_text, doc_data in doc_scores.items():
+        for doc_id, doc_data in doc_scores.items():
             combined_score = (
                 self.vector_weight * doc_data['vector_score'] +
                 self.bm25_weight * doc_data['bm25_score']
@@ -203,47 +218,165 @@ class HybridRetriever:
         
         return final_results
     
-    def search(
-        self, 
-        query: str, 
-        top_k: int = 5,
-        filter_codes: Dict[str, str] = None
-    ) -> List[Dict[str, Any]]:
+    def _expand_query(self, query: str) -> str:
         """
-        하이브리드 검색 (벡터 + BM25)
+        쿼리 확장 (도메인 특화 키워드 추가)
         
         Args:
-            query: 검색 질문
-            top_k: 반환할 결과 수
-            filter_codes: 필터링할 코드 (예: {"재료코드": "A12345"})
-            
+            query: 원본 질문
+        
         Returns:
-            검색 결과 리스트
+            확장된 질문
         """
-        # 쿼리 확장 (도메인 특화 키워드 추가)
         expander = get_query_expander()
-        expanded_query = expander.expand_query(query)
+        with stage_timer(STAGE_QUERY_EXPANSION):
+            expanded_query = expander.expand_query(query)
         
         # 쿼리가 확장되었으면 로그 출력
         if expanded_query != query:
             print(f"[쿼리 확장] 원본: {query}")
             print(f"[쿼리 확장] 확장: {expanded_query}")
         
-        # 각 검색기에서 더 많은 후보를 가져옴
-        # Reranker 사용 시 더 많은 후보 검색 (top_k * 4)
-        search_k = top_k * 4 if self.use_reranker else top_k * 2
+        return expanded_query
+    
+    def embed_query(self, query: str) -> Optional[List[float]]:
+        """
+        확장된 질의의 임베딩 (검색과 시맨틱 캐시에서 같은 임베딩을 재사용)
+        
+        Args:
+            query: 원본 질문
+        
+        Returns:
+            질의 임베딩 (인덱스 미로드 또는 임베딩 실패 시 None)
+        """
+        if self.faiss_retriever.index is None:
+            return None
+        expanded_query = self._expand_query(query)
+        try:
+            with stage_timer(STAGE_QUERY_EMBEDDING):
+                return self.faiss_retriever.embedder.embed_text(expanded_query)
+        except Exception as e:
+            print(f"❌ 질의 임베딩 실패: {str(e)}")
+            return None
+    
+    async def aembed_query(self, query: str) -> Optional[List[float]]:
+        """embed_query의 비동기 버전 (질의 임베딩 제한 시간을 넘기면 None, 이후 검색은 BM25만 사용)"""
+        if self.faiss_retriever.index is None or was_shed(SHED_VECTOR):
+            return None
+        expanded_query = self._expand_query(query)
+        try:
+            with stage_timer(STAGE_QUERY_EMBEDDING):
+                embedding = await run_query_embedding(self.faiss_retriever.embedder.aembed_text(expanded_query))
+            if embedding is None:
+                print("❌ 질의 임베딩 시간 초과, BM25 결과만 사용")
+            return embedding
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"❌ 질의 임베딩 실패: {str(e)}")
+            return None
+    
+    def warm_query_embeddings(self, queries: List[str]) -> int:
+        """
+        자주 쓰는 질의의 임베딩을 미리 계산하여 임베더의 질의 캐시에 저장
         
+        Args:
+            queries: 원본 질문 목록 (검색과 같은 방식으로 확장 후 임베딩)
+        
+        Returns:
+            캐시에 넣은 질의 수 (인덱스 미로드 시 0)
+        """
+        if self.faiss_retriever.index is None:
+            return 0
+        expanded = [self._expand_query(query) for query in queries]
+        return self.faiss_retriever.embedder.seed_query_cache(expanded)
+    
+    def _candidate_k(self, top_k: int, use_reranker: bool = None) -> int:
+        """각 검색기에서 가져올 후보 수 (Reranker 사용 시 top_k * 4)"""
+        return top_k * 4 if self._use_reranker(use_reranker) else top_k * 2
+    
+    def _use_reranker(self, use_reranker: bool = None) -> bool:
+        """요청별 Cohere Rerank 사용 여부 (None이면 설정값, 설정에서 꺼져 있으면 항상 False)"""
+        return self.use_reranker and use_reranker is not False
+    
+    @staticmethod
+    def _exclude_set(exclude_ids: Optional[Iterable[str]]) -> Optional[Set[str]]:
+        """제외할 청크 ID 집합 (없으면 None)"""
+        return set(exclude_ids) if exclude_ids else None
+    
+    def get_chunk(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """
+        청크 ID로 청크 조회 (참고 문서 전체 텍스트 지연 로딩용)
+        
+        Args:
+            chunk_id: 청크 ID
+        
+        Returns:
+            {"id", "text", "metadata"} (없으면 None)
+        """
+        return self.faiss_retriever.get_chunk(chunk_id)
+    
+    def lookup_codes(self, codes: List[str], exclude_ids: Iterable[str] = None) -> List[Dict[str, Any]]:
+        """
+        코드 역색인으로 청크 조회 (임베딩/벡터 검색 없음)
+        
+        Args:
+            codes: 재료코드, 시술코드, 분류번호(자651-2), 고시번호 등 (여러 개면 모두 포함하는 청크)
+            exclude_ids: 제외할 청크 ID
+        
+        Returns:
+            일치하는 청크 전체 (메타데이터 순서)
+        """
+        return self.faiss_retriever.lookup_codes(codes, exclude_ids=self._exclude_set(exclude_ids))
+    
+    def _hybrid_candidates(
+        self,
+        expanded_query: str,
+        search_k: int,
+        filter_codes: Dict[str, str] = None,
+        query_embedding: List[float] = None,
+        use_vector: bool = True,
+        exclude_ids: Set[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        벡터 + BM25 검색 후 결과 통합 (Reranking 전 후보 목록)
+        
+        제외 문서는 각 검색기 안에서 걸러지므로 통합/Reranking 후보에 들어오지 않습니다.
+        
+        Args:
+            expanded_query: 확장된 검색 질문
+            search_k: 각 검색기에서 가져올 후보 수
+            filter_codes: 필터링할 코드
+            query_embedding: 미리 계산된 질의 임베딩 (None이면 FAISSRetriever가 임베딩)
+            use_vector: False면 벡터 검색 생략 (임베딩 실패 시)
+            exclude_ids: 제외할 청크 ID 집합
+        
+        Returns:
+            통합된 검색 결과
+        """
         # 1. FAISS 벡터 검색 (확장된 쿼리 사용)
-        vector_results = self.faiss_retriever.search(
-            query=expanded_query,
-            top_k=search_k,
-            filter_codes=filter_codes
-        )
+        if not use_vector:
+            vector_results = []
+        elif query_embedding is not None:
+            vector_results = self.faiss_retriever.search_by_vector(
+                query_embedding,
+                top_k=search_k,
+                filter_codes=filter_codes,
+                exclude_ids=exclude_ids
+            )
+        else:
+            vector_results = self.faiss_retriever.search(
+                query=expanded_query,
+                top_k=search_k,
+                filter_codes=filter_codes,
+                exclude_ids=exclude_ids
+            )
         
         # 2. BM25 키워드 검색 (확장된 쿼리 사용)
         bm25_results = self.bm25_retriever.search(
             query=expanded_query,
-            top_k=search_k
+            top_k=search_k,
+            exclude_ids=exclude_ids
         )
         
         # 필터링 적용 (BM25 결과에도)
@@ -260,15 +393,55 @@ class HybridRetriever:
             bm25_results = filtered_bm25
         
         # 3. 결과 통합
-        if self.use_rrf:
-            final_results = self._reciprocal_rank_fusion(vector_results, bm25_results)
-        else:
-            final_results = self._weighted_combination(vector_results, bm25_results)
+        with stage_timer(STAGE_FUSION):
+            if self.use_rrf:
+                results = self._reciprocal_rank_fusion(vector_results, bm25_results)
+            else:
+                results = self._weighted_combination(vector_results, bm25_results)
+        count_candidates(STAGE_FUSION, len(results))
+        return results
+    
+    def search(
+        self, 
+        query: str, 
+        top_k: int = 5,
+        filter_codes: Dict[str, str] = None,
+        query_embedding: List[float] = None,
+        exclude_ids: Iterable[str] = None,
+        use_reranker: bool = None
+    ) -> List[Dict[str, Any]]:
+        """
+        하이브리드 검색 (벡터 + BM25)
         
-        # 4. Reranking (선택적)
-        if self.use_reranker and final_results:
+        Args:
+            query: 검색 질문
+            top_k: 반환할 결과 수
+            filter_codes: 필터링할 코드 (예: {"재료코드": "A12345"})
+            query_embedding: 미리 계산된 질의 임베딩 (embed_query 결과)
+            exclude_ids: 제외할 청크 ID
+            use_reranker: False면 Cohere Rerank 생략 (None이면 설정값)
+        
+        Returns:
+            검색 결과 리스트
+        """
+        # 쿼리 확장 (도메인 특화 키워드 추가)
+        expanded_query = self._expand_query(query)
+        
+        # 각 검색기에서 더 많은 후보를 가져옴
+        final_results = self._hybrid_candidates(
+            expanded_query,
+            self._candidate_k(top_k, use_reranker),
+            filter_codes,
+            query_embedding=query_embedding,
+            exclude_ids=self._exclude_set(exclude_ids)
+        )
+        
+        # 4. Reranking (선택적, 마감 시간이 부족하면 생략)
+        if self._use_reranker(use_reranker) and final_results and not should_shed(SHED_RERANK):
             print(f"\n[Reranking] {len(final_results)}개 결과를 Cohere Rerank로 재정렬")
-            final_results = self.reranker.rerank(query, final_results, top_k=top_k)
+            with stage_timer(STAGE_COHERE_RERANK):
+                final_results = self.reranker.rerank(query, final_results, top_k=top_k)
+            count_candidates(STAGE_COHERE_RERANK, len(final_results))
             return final_results
         
         # 5. top_k 개수만큼만 반환 (reranking 미사용 시)
@@ -284,15 +457,23 @@ class HybridRetriever:
         """
         재료코드/시술코드로 필터링하여 하이브리드 검색
         
+        질문 없이 코드만 주어지면 코드 역색인으로 바로 조회하고,
+        일치하는 청크가 없을 때만 하이브리드 검색을 수행합니다.
+        
         Args:
             material_code: 재료코드
             procedure_code: 시술코드
             query: 검색 질문 (선택사항)
-            top_k: 반환할 결과 수
-            
+            top_k: 반환할 결과 수 (코드 조회 시 None이면 일치하는 청크 전체)
+        
         Returns:
             검색 결과 리스트
         """
+        if not query:
+            results = self.lookup_codes([material_code, procedure_code])
+            if results:
+                return results[:top_k] if top_k else results
+        
         # 필터 구성
         filter_codes = {}
         if material_code:
@@ -311,7 +492,8 @@ class HybridRetriever:
     def get_all_chunks_by_doc_code(
         self,
         doc_code: str,
-        max_chunks: int = 100
+        max_chunks: int = 100,
+        exclude_ids: Set[str] = None
     ) -> List[Dict[str, Any]]:
         """
         문서 코드로 해당 문서의 모든 청크 반환
@@ -319,7 +501,8 @@ class HybridRetriever:
         Args:
             doc_code: 문서 코드 (예: "자656", "제2022-264호")
             max_chunks: 최대 반환 청크 수 (토큰 제한 방지)
-            
+            exclude_ids: 제외할 청크 ID 집합
+        
         Returns:
             해당 문서의 모든 청크 리스트
         """
@@ -329,26 +512,12 @@ class HybridRetriever:
         
         print(f"\n[문서 검색] 문서 코드: '{doc_code}'")
         
-        # 메타데이터에서 doc_code가 일치하는 청크 찾기
-        matching_chunks = []
-        
-        for item in self.faiss_retriever.metadata:
-            metadata = item.get('metadata', {})
-            item_doc_code = metadata.get('doc_code', '')
-            
-            # 문서 코드 매칭
-            if item_doc_code == doc_code:
-                chunk = {
-                    "text": item['text'],
-                    "metadata": metadata,
-                    "score": 1.0,  # 필터링된 결과는 모두 관련성 높음
-                    "rank": len(matching_chunks) + 1
-                }
-                matching_chunks.append(chunk)
-                
-                # 최대 개수 제한
-                if len(matching_chunks) >= max_chunks:
-                    break
+        # 코드 역색인으로 doc_code가 일치하는 청크만 읽음 (mmap 저장소 전체 디코딩 없음)
+        matching_chunks = self.faiss_retriever.get_chunks_by_doc_code(
+            doc_code, max_chunks=max_chunks, exclude_ids=exclude_ids
+        )
+        for rank, chunk in enumerate(matching_chunks, 1):
+            chunk.update(score=1.0, rank=rank)  # 필터링된 결과는 모두 관련성 높음
         
         if matching_chunks:
             print(f"[OK] {len(matching_chunks)}개 청크 발견")
@@ -368,7 +537,7 @@ class HybridRetriever:
         Args:
             pdf_title_keyword: PDF 제목에 포함된 키워드
             max_chunks: 최대 반환 청크 수
-            
+        
         Returns:
             해당 문서의 모든 청크 리스트
         """
@@ -378,26 +547,10 @@ class HybridRetriever:
         
         print(f"\n[문서 검색] PDF 제목 키워드: '{pdf_title_keyword}'")
         
-        # 메타데이터에서 pdf_title이 키워드를 포함하는 청크 찾기
-        matching_chunks = []
-        
-        for item in self.faiss_retriever.metadata:
-            metadata = item.get('metadata', {})
-            pdf_title = metadata.get('pdf_title', '')
-            
-            # PDF 제목에 키워드가 포함되어 있는지 확인
-            if pdf_title_keyword.lower() in pdf_title.lower():
-                chunk = {
-                    "text": item['text'],
-                    "metadata": metadata,
-                    "score": 1.0,
-                    "rank": len(matching_chunks) + 1
-                }
-                matching_chunks.append(chunk)
-                
-                # 최대 개수 제한
-                if len(matching_chunks) >= max_chunks:
-                    break
+        # 로드 시 만든 제목 → 위치 맵으로 키워드가 포함된 제목의 청크만 읽음
+        matching_chunks = self.faiss_retriever.get_chunks_by_pdf_title(pdf_title_keyword, max_chunks=max_chunks)
+        for rank, chunk in enumerate(matching_chunks, 1):
+            chunk.update(score=1.0, rank=rank)
         
         if matching_chunks:
             print(f"[OK] {len(matching_chunks)}개 청크 발견")
@@ -406,64 +559,193 @@ class HybridRetriever:
         
         return matching_chunks
     
-    def search_with_fallback(
+    def _apply_fallback(
         self,
         query: str,
+        results: List[Dict[str, Any]],
         top_k: int = 5,
-        filter_codes: Dict[str, str] = None,
-        use_local_rerank: bool = True
+        use_local_rerank: bool = True,
+        exclude_ids: Set[str] = None,
+        use_fallback: bool = True
     ) -> List[Dict[str, Any]]:
         """
-        하이브리드 검색 + BM25 리랭크 + Fallback (primary_field 없는 문서 전체 검색)
+        primary_field 없는 문서의 전체 청크 추가 후 BM25 로컬 리랭크
         
         Args:
             query: 검색 질문
+            results: 하이브리드 검색 결과
             top_k: 반환할 결과 수
-            filter_codes: 필터링할 코드
             use_local_rerank: BM25 로컬 리랭크 사용 여부
-            
+            exclude_ids: 제외할 청크 ID 집합 (추가되는 청크에도 적용)
+            use_fallback: False면 전체 청크 추가(Fallback) 생략
+        
         Returns:
             검색 결과 리스트
         """
-        # 1. 일반 하이브리드 검색
-        results = self.search(query, top_k, filter_codes)
-        
-        # 2. 결과가 있는지 확인
+        # 1. 결과가 있는지 확인
         if not results:
             print("[INFO] 검색 결과가 없습니다.")
             return []
         
-        # 3. primary_field가 없는 문서 감지
-        docs_without_primary = set()
+        # 마감 시간이 부족하거나 대기열이 길면 Fallback부터 생략
+        use_fallback = use_fallback and not should_shed(SHED_FALLBACK)
         
-        for result in results:
-            metadata = result.get('metadata', {})
+        with stage_timer(STAGE_FALLBACK):
+            # 2. primary_field가 없는 문서 감지
+            docs_without_primary = set()
             
-            # primary_field가 없고, doc_code가 있는 경우
-            if not metadata.get('primary_field') and metadata.get('doc_code'):
-                doc_code = metadata['doc_code']
-                docs_without_primary.add(doc_code)
-        
-        # 4. primary_field 없는 문서의 전체 청크 추가
-        additional_chunks = []
-        if docs_without_primary:
-            print(f"\n[Fallback] primary_field 없는 문서 {len(docs_without_primary)}개 발견")
-            for doc_code in docs_without_primary:
-                print(f"  → {doc_code} 문서 전체 청크 추가")
-                doc_chunks = self.get_all_chunks_by_doc_code(doc_code, max_chunks=50)
-                additional_chunks.extend(doc_chunks)
-        
-        # 5. 기존 결과와 추가 청크 합치기
-        all_results = results + additional_chunks
-        
-        # 6. BM25 로컬 리랭크 적용
-        if use_local_rerank and len(all_results) > top_k:
+            for result in results:
+                metadata = result.get('metadata', {})
+                
+                # primary_field가 없고, doc_code가 있는 경우 (use_fallback=False면 추가하지 않음)
+                if use_fallback and not metadata.get('primary_field') and metadata.get('doc_code'):
+                    doc_code = metadata['doc_code']
+                    docs_without_primary.add(doc_code)
+            
+            # 3. primary_field 없는 문서의 전체 청크 추가
+            additional_chunks = []
+            if docs_without_primary:
+                print(f"\n[Fallback] primary_field 없는 문서 {len(docs_without_primary)}개 발견")
+                for doc_code in docs_without_primary:
+                    print(f"  → {doc_code} 문서 전체 청크 추가")
+                    doc_chunks = self.get_all_chunks_by_doc_code(
+                        doc_code, max_chunks=50, exclude_ids=exclude_ids
+                    )
+                    additional_chunks.extend(doc_chunks)
+            
+            # 4. 기존 결과와 추가 청크 합치기
+            all_results = results + additional_chunks
+        count_candidates(STAGE_FALLBACK, len(all_results))
+        
+        # 5. BM25 로컬 리랭크 적용
+        if use_local_rerank and len(all_results) > top_k and not should_shed(SHED_RERANK):
             print(f"\n[Local Rerank] BM25로 {len(all_results)}개 청크 재정렬")
             local_reranker = get_bm25_reranker()
-            all_results = local_reranker.rerank(query, all_results, top_k=top_k * 2)
+            with stage_timer(STAGE_LOCAL_RERANK):
+                all_results = local_reranker.rerank(query, all_results, top_k=top_k * 2)
+            count_candidates(STAGE_LOCAL_RERANK, len(all_results))
         
-        # 7. 최종 결과 반환
+        # 6. 최종 결과 반환
         return all_results[:top_k]  # top_k 개수만큼 반환
+    
+    def search_with_fallback(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_codes: Dict[str, str] = None,
+        use_local_rerank: bool = True,
+        query_embedding: List[float] = None,
+        exclude_ids: Iterable[str] = None,
+        use_fallback: bool = True,
+        use_reranker: bool = None
+    ) -> List[Dict[str, Any]]:
+        """
+        하이브리드 검색 + BM25 리랭크 + Fallback (primary_field 없는 문서 전체 검색)
+        
+        Args:
+            query: 검색 질문
+            top_k: 반환할 결과 수
+            filter_codes: 필터링할 코드
+            use_local_rerank: BM25 로컬 리랭크 사용 여부
+            query_embedding: 미리 계산된 질의 임베딩 (embed_query 결과)
+            exclude_ids: 제외할 청크 ID (검색 단계에서 걸러짐)
+            use_fallback: False면 전체 청크 추가(Fallback) 생략
+            use_reranker: False면 Cohere Rerank 생략 (None이면 설정값)
+        
+        Returns:
+            검색 결과 리스트
+        """
+        exclude_ids = self._exclude_set(exclude_ids)
+        results = self.search(
+            query, top_k, filter_codes,
+            query_embedding=query_embedding, exclude_ids=exclude_ids, use_reranker=use_reranker
+        )
+        return self._apply_fallback(query, results, top_k, use_local_rerank, exclude_ids, use_fallback)
+    
+    async def asearch_with_fallback(
+        self,
+        query: str,
+        top_k: int = 5,
+        filter_codes: Dict[str, str] = None,
+        use_local_rerank: bool = True,
+        executor: Executor = None,
+        query_embedding: List[float] = None,
+        exclude_ids: Iterable[str] = None,
+        use_fallback: bool = True,
+        use_reranker: bool = None
+    ) -> List[Dict[str, Any]]:
+        """
+        search_with_fallback의 비동기 버전
+        
+        Titan 임베딩과 Cohere Rerank 호출은 await하고,
+        CPU 작업(FAISS, BM25, 결과 통합, 로컬 리랭크)은 executor에서 실행합니다.
+        
+        Args:
+            query: 검색 질문
+            top_k: 반환할 결과 수
+            filter_codes: 필터링할 코드
+            use_local_rerank: BM25 로컬 리랭크 사용 여부
+            executor: CPU 작업을 실행할 스레드 풀 (None이면 기본 executor)
+            query_embedding: 미리 계산된 질의 임베딩 (aembed_query 결과)
+            exclude_ids: 제외할 청크 ID (검색 단계에서 걸러짐)
+            use_fallback: False면 전체 청크 추가(Fallback) 생략
+            use_reranker: False면 Cohere Rerank 생략 (None이면 설정값)
+        
+        Returns:
+            검색 결과 리스트
+        """
+        loop = asyncio.get_running_loop()
+        expanded_query = self._expand_query(query)
+        exclude_ids = self._exclude_set(exclude_ids)
+        
+        # 1. 질의 임베딩 (인덱스가 로드되었고 미리 계산된 임베딩이 없을 때만 Bedrock 호출,
+        #    이번 요청에서 이미 제한 시간을 넘겼으면 다시 호출하지 않고 BM25 결과만 사용)
+        use_vector = self.faiss_retriever.index is not None and not was_shed(SHED_VECTOR)
+        if use_vector and query_embedding is None:
+            try:
+                with stage_timer(STAGE_QUERY_EMBEDDING):
+                    query_embedding = await run_query_embedding(
+                        self.faiss_retriever.embedder.aembed_text(expanded_query)
+                    )
+                if query_embedding is None:
+                    print("❌ 질의 임베딩 시간 초과, BM25 결과만 사용")
+                    use_vector = False
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                print(f"❌ 질의 임베딩 실패, BM25 결과만 사용: {str(e)}")
+                use_vector = False
+        
+        # 2. 벡터 + BM25 검색 및 통합 (CPU)
+        results = await loop.run_in_executor(
+            executor,
+            context_bound(partial(
+                self._hybrid_candidates,
+                expanded_query,
+                self._candidate_k(top_k, use_reranker),
+                filter_codes,
+                query_embedding=query_embedding,
+                use_vector=use_vector,
+                exclude_ids=exclude_ids
+            ))
+        )
+        
+        # 3. Reranking (선택적, 마감 시간이 부족하면 생략)
+        if self._use_reranker(use_reranker) and results and not should_shed(SHED_RERANK):
+            print(f"\n[Reranking] {len(results)}개 결과를 Cohere Rerank로 재정렬")
+            with stage_timer(STAGE_COHERE_RERANK):
+                results = await self.reranker.arerank(query, results, top_k=top_k)
+            count_candidates(STAGE_COHERE_RERANK, len(results))
+        else:
+            results = results[:top_k]
+        
+        # 4. Fallback + 로컬 리랭크 (CPU)
+        return await loop.run_in_executor(
+            executor,
+            context_bound(partial(
+                self._apply_fallback, query, results, top_k, use_local_rerank, exclude_ids, use_fallback
+            ))
+        )
 
 
 # 테스트용 메인 함수
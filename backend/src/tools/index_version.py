@@ -0,0 +1,110 @@
+"""
+인덱스 버전 관리
+파이프라인이 새 인덱스를 저장하면 버전을 발행하고, 서버는 이를 읽어 캐시 무효화에 사용
+"""
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+from tools.mmap_store import mmap_enabled, export_mmap_store
+from tools.code_index import export_code_index
+
+
+INDEX_VERSION_FILENAME = "index_version.json"
+
+# 버전 파일이 없을 때 버전 계산에 사용하는 인덱스 파일들
+INDEX_FILES = ["faiss_index.bin", "metadata.pkl", "bm25_index.pkl"]
+
+# (경로, mtime, 크기) → 버전 캐시 (매 요청마다 파일을 다시 읽지 않도록)
+_version_cache = {}
+_version_lock = threading.Lock()
+
+
+def publish_index_version(vector_store_path: str) -> str:
+    """
+    새 인덱스 버전 발행
+    
+    인덱스 파일 저장이 모두 끝난 뒤 호출합니다. 임시 파일에 쓴 후 교체하므로
+    읽는 쪽에서 반쯤 쓰인 파일을 보지 않습니다. 버전 발행 전에 코드 역색인(code_index.pkl)을,
+    INDEX_MMAP=true면 mmap 저장소도 새로 내보냅니다.
+    
+    Args:
+        vector_store_path: 벡터 스토어 디렉토리
+    
+    Returns:
+        발행된 버전 문자열
+    """
+    try:
+        export_code_index(vector_store_path)
+    except Exception as e:
+        # 검색기가 로드 시 메타데이터로 다시 만들므로 발행은 계속 진행
+        print(f"[WARNING] 코드 색인 저장 실패: {str(e)}")
+    
+    if mmap_enabled():
+        export_mmap_store(vector_store_path)
+    
+    version = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    data = {
+        "version": version,
+        "published_at": datetime.now().isoformat()
+    }
+    
+    os.makedirs(vector_store_path, exist_ok=True)
+    version_path = os.path.join(vector_store_path, INDEX_VERSION_FILENAME)
+    tmp_path = f"{version_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, version_path)
+    
+    print(f"[OK] 인덱스 버전 발행: {version}")
+    return version
+
+
+def _legacy_version(vector_store_path: str) -> str:
+    """버전 파일이 없는 기존 인덱스는 파일 mtime/크기로 버전 계산"""
+    h = hashlib.sha1()
+    for filename in INDEX_FILES:
+        path = os.path.join(vector_store_path, filename)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            h.update(f"{filename}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return f"legacy-{h.hexdigest()[:12]}"
+
+
+def read_index_version(vector_store_path: str) -> str:
+    """
+    현재 발행된 인덱스 버전 조회
+    
+    Args:
+        vector_store_path: 벡터 스토어 디렉토리
+    
+    Returns:
+        버전 문자열
+    """
+    version_path = os.path.join(vector_store_path, INDEX_VERSION_FILENAME)
+    
+    try:
+        stat = os.stat(version_path)
+    except FileNotFoundError:
+        return _legacy_version(vector_store_path)
+    
+    cache_key = (version_path, stat.st_mtime_ns, stat.st_size)
+    with _version_lock:
+        version = _version_cache.get(cache_key)
+    if version is not None:
+        return version
+    
+    try:
+        with open(version_path, 'r', encoding='utf-8') as f:
+            version = json.load(f).get("version") or _legacy_version(vector_store_path)
+    except (OSError, ValueError):
+        return _legacy_version(vector_store_path)
+    
+    with _version_lock:
+        _version_cache.clear()
+        _version_cache[cache_key] = version
+    return version
@@ -0,0 +1,469 @@
+"""
+백그라운드 데이터 전처리 작업 관리
+전처리(파싱 → 청크 → 임베딩 → 인덱스)를 별도 워커 프로세스에서 실행하고
+단계별 진행률/처리량 조회와 취소를 지원
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+# 전처리 단계 (순서대로 진행)
+STAGES = ("parsed", "chunked", "embedded", "indexed")
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청으로 중단됨"""
+
+
+class JobReporter:
+    """
+    워커 프로세스에서 진행 상황을 부모 프로세스로 보내는 객체
+    
+    파이프라인은 stage()로 단계 시작을, advance()로 처리한 항목 수를 알립니다.
+    advance()/check_cancelled()는 취소 요청이 있으면 JobCancelled를 발생시킵니다.
+    """
+    
+    # 진행률 메시지 최소 간격(초) (큐 트래픽 제한)
+    REPORT_INTERVAL = 0.5
+    
+    def __init__(self, job_id: str, events, cancel_event):
+        self.job_id = job_id
+        self._events = events
+        self._cancel_event = cancel_event
+        self._stage = None
+        self._done = 0
+        self._last_report = 0.0
+    
+    def check_cancelled(self):
+        """취소 요청 확인"""
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+    
+    def stage(self, name: str, total: int = None):
+        """
+        단계 시작 알림 (이전 단계는 완료 처리)
+        
+        Args:
+            name: 단계 이름 (STAGES 중 하나)
+            total: 처리할 항목 수 (모르면 None)
+        """
+        self.check_cancelled()
+        self._flush()
+        self._stage = name
+        self._done = 0
+        self._last_report = time.time()
+        self._events.put(("stage", self.job_id, name, total))
+    
+    def advance(self, count: int = 1):
+        """
+        현재 단계에서 처리한 항목 수 증가
+        
+        Args:
+            count: 새로 처리한 항목 수
+        """
+        self._done += count
+        now = time.time()
+        if now - self._last_report >= self.REPORT_INTERVAL:
+            self._last_report = now
+            self._events.put(("progress", self.job_id, self._stage, self._done))
+        self.check_cancelled()
+    
+    def complete(self, count: int = None):
+        """
+        현재 단계 완료 알림
+        
+        Args:
+            count: 최종 처리 항목 수 (None이면 advance로 누적한 값)
+        """
+        if count is not None:
+            self._done = count
+        self._flush()
+    
+    def _flush(self):
+        if self._stage is not None:
+            self._events.put(("progress", self.job_id, self._stage, self._done))
+
+
+def run_preprocess_job(reporter: JobReporter, data_path: str):
+    """
+    JSON 데이터 전처리 작업 (워커 프로세스에서 실행)
+    
+    Args:
+        reporter: 진행 상황 보고 객체
+        data_path: 전처리할 데이터 파일 경로
+    """
+    from pipeline import DataPreprocessor
+    
+    preprocessor = DataPreprocessor()
+    preprocessor.run_pipeline(data_path, reporter=reporter)
+
+
+def _job_main(job_id: str, target: Callable, args: tuple, events, cancel_event, nice: int):
+    """워커 프로세스 진입점 (결과 상태를 이벤트 큐로 보고)"""
+    if nice and hasattr(os, "nice"):
+        try:
+            # 서비스 중인 API 워커보다 낮은 CPU 우선순위로 실행
+            os.nice(nice)
+        except OSError:
+            pass
+    
+    reporter = JobReporter(job_id, events, cancel_event)
+    try:
+        target(reporter, *args)
+        reporter.complete()
+        events.put(("status", job_id, SUCCEEDED, None))
+    except JobCancelled:
+        events.put(("status", job_id, CANCELLED, None))
+    except Exception as e:
+        traceback.print_exc()
+        events.put(("status", job_id, FAILED, str(e)))
+
+
+class JobManager:
+    """
+    백그라운드 작업 관리자
+    
+    작업마다 별도 프로세스(spawn)를 띄워 API 워커의 이벤트 루프와 GIL에 영향을 주지 않습니다.
+    동시에 실행하는 작업 수는 max_running으로 제한하며, 나머지는 대기열에서 순서대로 실행됩니다.
+    """
+    
+    def __init__(
+        self,
+        max_running: int = None,
+        max_history: int = None,
+        cancel_grace: float = None,
+        nice: int = None
+    ):
+        """
+        초기화
+        
+        Args:
+            max_running: 동시 실행 작업 수 (기본 INGEST_MAX_RUNNING 또는 1)
+            max_history: 보관할 완료 작업 수 (기본 INGEST_JOB_HISTORY 또는 50)
+            cancel_grace: 취소 요청 후 강제 종료까지 대기 시간(초) (기본 INGEST_CANCEL_GRACE 또는 10)
+            nice: 워커 프로세스 nice 값 (기본 INGEST_NICE 또는 10)
+        """
+        if max_running is None:
+            max_running = int(os.getenv("INGEST_MAX_RUNNING", "1"))
+        if max_history is None:
+            max_history = int(os.getenv("INGEST_JOB_HISTORY", "50"))
+        if cancel_grace is None:
+            cancel_grace = float(os.getenv("INGEST_CANCEL_GRACE", "10"))
+        if nice is None:
+            nice = int(os.getenv("INGEST_NICE", "10"))
+        
+        self.max_running = max(1, max_running)
+        self.max_history = max_history
+        self.cancel_grace = cancel_grace
+        self.nice = nice
+        
+        self._ctx = multiprocessing.get_context("spawn")
+        self._events = self._ctx.Queue()
+        self._jobs = OrderedDict()  # job_id → 작업 상태 (제출 순서)
+        self._pending = []  # 대기 중인 job_id
+        self._procs = {}  # job_id → (Process, 취소 Event, 취소 요청 시각)
+        self._specs = {}  # job_id → (target, args)
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._stopping = False
+    
+    def submit(self, kind: str, target: Callable, args: tuple = (), params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        작업 제출
+        
+        Args:
+            kind: 작업 종류 (예: "preprocess")
+            target: 워커에서 실행할 모듈 수준 함수 (첫 인자로 JobReporter를 받음)
+            args: target에 전달할 인자
+            params: 조회 시 보여줄 요청 파라미터
+        
+        Returns:
+            작업 상태
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "params": params or {},
+            "status": QUEUED,
+            "stage": None,
+            "stages": OrderedDict(),
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None
+        }
+        
+        with self._lock:
+            if self._stopping:
+                raise RuntimeError("작업 관리자가 종료 중입니다.")
+            self._jobs[job_id] = job
+            self._specs[job_id] = (target, args)
+            self._pending.append(job_id)
+            self._start_pending()
+            self._ensure_monitor()
+            return self._snapshot(job)
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 조회 (없으면 None)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job is not None else None
+    
+    def list(self) -> List[Dict[str, Any]]:
+        """전체 작업 상태 (최근 제출 순)"""
+        with self._lock:
+            return [self._snapshot(job) for job in reversed(self._jobs.values())]
+    
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 취소
+        
+        대기 중인 작업은 즉시 취소되고, 실행 중인 작업은 다음 진행 보고 시점에 중단됩니다.
+        cancel_grace 안에 끝나지 않으면 프로세스를 강제 종료합니다
+        (인덱스 저장 단계에서는 파일이 깨지지 않도록 강제 종료하지 않음).
+        
+        Args:
+            job_id: 작업 ID
+        
+        Returns:
+            작업 상태 (없으면 None)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            
+            if job["status"] == QUEUED:
+                self._pending.remove(job_id)
+                self._specs.pop(job_id, None)
+                self._finish(job, CANCELLED)
+            elif job["status"] == RUNNING and job_id in self._procs:
+                process, cancel_event, requested_at = self._procs[job_id]
+                cancel_event.set()
+                if requested_at is None:
+                    self._procs[job_id] = (process, cancel_event, time.time())
+                job["cancel_requested"] = True
+            
+            return self._snapshot(job)
+    
+    def shutdown(self, timeout: float = 5.0):
+        """
+        실행 중인 작업을 취소하고 모니터 종료 (앱 종료 시 호출)
+        
+        Args:
+            timeout: 프로세스별 종료 대기 시간(초)
+        """
+        with self._lock:
+            self._stopping = True
+            for job_id in list(self._pending):
+                self._finish(self._jobs[job_id], CANCELLED)
+            self._pending.clear()
+            procs = list(self._procs.items())
+            for _, (_, cancel_event, _) in procs:
+                cancel_event.set()
+        
+        for job_id, (process, _, _) in procs:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+        
+        if self._monitor is not None:
+            self._monitor.join(timeout)
+        
+        self._drain()
+        with self._lock:
+            for job_id, _ in procs:
+                job = self._jobs[job_id]
+                if job["status"] not in FINISHED_STATUSES:
+                    self._finish(job, CANCELLED)
+            self._procs.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """상태별 작업 수"""
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {"max_running": self.max_running, "counts": counts}
+    
+    def _ensure_monitor(self):
+        """모니터 스레드 시작 (lock을 잡은 상태에서 호출)"""
+        if self._monitor is None or not self._monitor.is_alive():
+            self._monitor = threading.Thread(target=self._monitor_loop, name="ingest-job-monitor", daemon=True)
+            self._monitor.start()
+    
+    def _start_pending(self):
+        """빈 슬롯만큼 대기 작업 실행 (lock을 잡은 상태에서 호출)"""
+        while self._pending and len(self._procs) < self.max_running:
+            job_id = self._pending.pop(0)
+            target, args = self._specs.pop(job_id)
+            cancel_event = self._ctx.Event()
+            process = self._ctx.Process(
+                target=_job_main,
+                args=(job_id, target, args, self._events, cancel_event, self.nice),
+                name=f"ingest-job-{job_id}",
+                daemon=True
+            )
+            process.start()
+            
+            job = self._jobs[job_id]
+            job["status"] = RUNNING
+            job["started_at"] = time.time()
+            job["pid"] = process.pid
+            self._procs[job_id] = (process, cancel_event, None)
+            print(f"[INFO] 작업 시작: {job_id} ({job['kind']}, pid={process.pid})")
+    
+    def _monitor_loop(self):
+        """진행 메시지 반영, 종료된 프로세스 정리, 대기 작업 실행"""
+        while True:
+            self._drain(timeout=0.2)
+            
+            with self._lock:
+                self._reap()
+                if not self._stopping:
+                    self._start_pending()
+                if not self._procs and (self._stopping or not self._pending):
+                    self._monitor = None
+                    return
+    
+    def _drain(self, timeout: float = 0.0):
+        """이벤트 큐의 메시지를 모두 반영"""
+        block = timeout > 0
+        while True:
+            try:
+                message = self._events.get(block, timeout) if block else self._events.get_nowait()
+            except queue.Empty:
+                return
+            block = False
+            with self._lock:
+                self._apply(message)
+    
+    def _apply_queued(self):
+        """이미 도착한 메시지 반영 (lock을 잡은 상태에서 호출)"""
+        while True:
+            try:
+                message = self._events.get_nowait()
+            except queue.Empty:
+                return
+            self._apply(message)
+    
+    def _apply(self, message: tuple):
+        """워커 메시지 반영 (lock을 잡은 상태에서 호출)"""
+        kind, job_id = message[0], message[1]
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] in FINISHED_STATUSES:
+            return
+        
+        now = time.time()
+        if kind == "stage":
+            _, _, name, total = message
+            if job["stage"] in job["stages"]:
+                job["stages"][job["stage"]]["finished_at"] = now
+            job["stage"] = name
+            job["stages"][name] = {
+                "total": total,
+                "done": 0,
+                "started_at": now,
+                "finished_at": None
+            }
+        elif kind == "progress":
+            _, _, name, done = message
+            if name in job["stages"]:
+                job["stages"][name]["done"] = done
+        elif kind == "status":
+            _, _, status, error = message
+            self._finish(job, status, error)
+    
+    def _reap(self):
+        """종료된 프로세스 정리 및 취소 유예 시간 초과 시 강제 종료 (lock을 잡은 상태에서 호출)"""
+        now = time.time()
+        for job_id, (process, cancel_event, requested_at) in list(self._procs.items()):
+            job = self._jobs[job_id]
+            
+            if not process.is_alive():
+                process.join()
+                del self._procs[job_id]
+                # 프로세스 종료 직전에 보낸 상태 메시지 반영
+                self._apply_queued()
+                if job["status"] not in FINISHED_STATUSES:
+                    # 상태 메시지 없이 종료 (강제 종료 또는 비정상 종료)
+                    if requested_at is not None:
+                        self._finish(job, CANCELLED)
+                    else:
+                        self._finish(job, FAILED, f"워커 프로세스 비정상 종료 (exit code {process.exitcode})")
+                continue
+            
+            if (
+                requested_at is not None
+                and now - requested_at > self.cancel_grace
+                and job["stage"] != "indexed"
+            ):
+                print(f"[WARNING] 작업 {job_id}이 취소 요청에 응답하지 않아 강제 종료합니다.")
+                process.terminate()
+    
+    def _finish(self, job: Dict[str, Any], status: str, error: str = None):
+        """작업 종료 처리 및 오래된 완료 작업 정리 (lock을 잡은 상태에서 호출)"""
+        now = time.time()
+        job["status"] = status
+        job["error"] = error
+        job["finished_at"] = now
+        if job["stage"] in job["stages"] and job["stages"][job["stage"]]["finished_at"] is None:
+            job["stages"][job["stage"]]["finished_at"] = now
+        print(f"[INFO] 작업 종료: {job['job_id']} ({status})")
+        
+        finished = [job_id for job_id, j in self._jobs.items() if j["status"] in FINISHED_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.max_history)]:
+            del self._jobs[job_id]
+    
+    @staticmethod
+    def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+        """조회용 작업 상태 (단계별 진행률, 처리량 계산)"""
+        now = time.time()
+        stages = []
+        for name, stage in job["stages"].items():
+            end = stage["finished_at"] or now
+            elapsed = max(end - stage["started_at"], 0.0)
+            total = stage["total"]
+            stages.append({
+                "name": name,
+                "done": stage["done"],
+                "total": total,
+                "progress": (stage["done"] / total if total else (1.0 if stage["finished_at"] else 0.0)),
+                "elapsed": round(elapsed, 3),
+                "throughput": round(stage["done"] / elapsed, 2) if elapsed > 0 else 0.0,
+                "finished": stage["finished_at"] is not None
+            })
+        
+        end = job["finished_at"] or now
+        return {
+            "job_id": job["job_id"],
+            "kind": job["kind"],
+            "params": job["params"],
+            "status": job["status"],
+            "stage": job["stage"],
+            "stages": stages,
+            "error": job["error"],
+            "cancel_requested": job.get("cancel_requested", False),
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "elapsed": round(end - job["started_at"], 3) if job["started_at"] else 0.0
+        }
@@ -0,0 +1,88 @@
+"""
+스레드 안전 LRU 캐시 (선택적 TTL)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class LRUCache:
+    """크기 제한 + 만료 시간(TTL)을 지원하는 LRU 캐시"""
+    
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """
+        초기화
+        
+        Args:
+            max_entries: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목 제거)
+            ttl: 항목 만료 시간 (초, None이면 만료 없음)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Any, default: Any = None) -> Any:
+        """항목 조회 (만료된 항목은 제거 후 miss 처리)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None):
+        """항목 저장 (ttl 미지정 시 기본 TTL 사용)"""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: Any):
+        """항목 삭제"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """모든 항목 삭제"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and (item[1] is None or item[1] > time.monotonic())
+    
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (항목 수, hit/miss, hit rate)"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,293 @@
+"""
+Prometheus 메트릭
+질의 경로의 단계별 지연 시간(검색, 임베딩, 리랭크, Claude 호출)과
+단계별 후보 수, 캐시 hit, Bedrock 오류/스로틀 카운터를 수집
+
+요청별 단계 시간(Server-Timing 헤더, 응답 timings 필드)은 contextvars로
+현재 요청의 RequestTimings에 함께 기록됩니다.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+
+# 단계 이름
+STAGE_QUERY_EXPANSION = "query_expansion"
+STAGE_QUERY_EMBEDDING = "query_embedding"
+STAGE_FAISS_SEARCH = "faiss_search"
+STAGE_BM25_SCORES = "bm25_scores"
+STAGE_FUSION = "fusion"
+STAGE_FALLBACK = "fallback_expansion"
+STAGE_LOCAL_RERANK = "local_rerank"
+STAGE_COHERE_RERANK = "cohere_rerank"
+STAGE_CLAUDE = "claude"
+STAGE_CLAUDE_FIRST_TOKEN = "claude_first_token"
+STAGE_ANSWER_CACHE = "answer_cache"
+STAGE_SEMANTIC_CACHE = "semantic_cache"
+STAGE_ADMISSION_WAIT = "admission_wait"
+STAGE_HISTORY_SUMMARY = "history_summary"
+STAGE_CODE_LOOKUP = "code_lookup"
+
+# 수 ms(BM25, FAISS)부터 수십 초(Claude)까지
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0
+)
+
+# Bedrock 스로틀 오류 코드
+THROTTLE_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceQuotaExceededException",
+    "ModelNotReadyException"
+}
+
+STAGE_LATENCY = Histogram(
+    "rag_stage_latency_seconds",
+    "질의 처리 단계별 지연 시간",
+    ["stage"],
+    buckets=LATENCY_BUCKETS
+)
+
+STAGE_CANDIDATES = Counter(
+    "rag_stage_candidates",
+    "단계별 출력 후보 문서 수 (누적)",
+    ["stage"]
+)
+
+CACHE_REQUESTS = Counter(
+    "rag_cache_requests",
+    "캐시 조회 결과",
+    ["cache", "result"]
+)
+
+BEDROCK_ERRORS = Counter(
+    "rag_bedrock_errors",
+    "Bedrock 호출 오류",
+    ["model", "code"]
+)
+
+BEDROCK_THROTTLES = Counter(
+    "rag_bedrock_throttles",
+    "Bedrock 스로틀 (요청 한도 초과)",
+    ["model"]
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "rag_admission_in_flight",
+    "Bedrock 호출 슬롯을 사용 중인 요청 수",
+    multiprocess_mode="livesum"
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "rag_admission_queue_depth",
+    "슬롯 대기 중인 요청 수",
+    multiprocess_mode="livesum"
+)
+
+ADMISSION_LIMIT = Gauge(
+    "rag_admission_limit",
+    "현재 동시 실행 한도 (Bedrock 스로틀 시 감소)",
+    multiprocess_mode="livesum"
+)
+
+ADMISSION_WAIT = Histogram(
+    "rag_admission_wait_seconds",
+    "슬롯 대기 시간",
+    buckets=LATENCY_BUCKETS
+)
+
+ADMISSION_REJECTED = Counter(
+    "rag_admission_rejected",
+    "거부된 요청 (queue_full: 429, timeout/throttled: 503)",
+    ["reason"]
+)
+
+BEDROCK_RATE_LIMIT_WAIT = Histogram(
+    "rag_bedrock_rate_limit_wait_seconds",
+    "모델별 요청/토큰 한도(token bucket) 대기 시간",
+    ["model"],
+    buckets=LATENCY_BUCKETS
+)
+
+SHED_STEPS = Counter(
+    "rag_shed_steps",
+    "마감 시간/부하로 생략하거나 축소한 단계 (fallback, rerank, max_tokens)",
+    ["step"]
+)
+
+DEADLINE_EXCEEDED = Counter(
+    "rag_deadline_exceeded",
+    "마감 시간을 넘겨 중단된 요청 (단계별)",
+    ["stage"]
+)
+
+
+class RequestTimings:
+    """한 요청의 단계별 소요 시간, 후보 수, 프롬프트 크기"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = OrderedDict()  # 단계 → 소요 시간(초) (같은 단계가 반복되면 합산)
+        self.candidates = OrderedDict()  # 단계 → 출력 후보 수
+        self.values = OrderedDict()  # 기타 값 (prompt_chars 등)
+        self._lock = threading.Lock()
+    
+    def add_stage(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+    
+    def add_candidates(self, stage: str, count: int):
+        with self._lock:
+            self.candidates[stage] = self.candidates.get(stage, 0) + count
+    
+    def set_value(self, name: str, value: Any):
+        with self._lock:
+            self.values[name] = value
+    
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self.started
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """응답 timings 필드 (시간 단위 ms)"""
+        with self._lock:
+            return {
+                "total_ms": round(self.total_seconds() * 1000, 1),
+                "stages": {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()},
+                "candidates": dict(self.candidates),
+                **self.values
+            }
+    
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (예: "faiss_search;dur=3.2, claude;dur=2810.4, total;dur=2900.1")"""
+        with self._lock:
+            entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items()]
+        entries.append(f"total;dur={self.total_seconds() * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_request_timings: contextvars.ContextVar = contextvars.ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> RequestTimings:
+    """현재 요청(컨텍스트)의 단계 시간 수집 시작"""
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """현재 요청의 RequestTimings (수집 중이 아니면 None)"""
+    return _request_timings.get()
+
+
+def record_value(name: str, value: Any):
+    """현재 요청의 timings에 값 기록 (예: 프롬프트 크기)"""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.set_value(name, value)
+
+
+def context_bound(fn: Callable) -> Callable:
+    """
+    현재 컨텍스트에서 실행되도록 감싼 함수
+    
+    run_in_executor는 contextvars를 전달하지 않으므로, 스레드 풀에서 실행되는
+    단계도 요청의 timings에 기록되도록 executor에 넘기기 전에 감쌉니다.
+    """
+    return partial(contextvars.copy_context().run, fn)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    블록 실행 시간을 단계 지연 히스토그램에 기록
+    
+    Args:
+        stage: 단계 이름 (STAGE_* 상수)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start)
+
+
+def observe_stage(stage: str, seconds: float):
+    """측정한 시간을 단계 지연 히스토그램에 기록 (with 블록으로 감쌀 수 없는 경우)"""
+    STAGE_LATENCY.labels(stage=stage).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add_stage(stage, seconds)
+
+
+def count_candidates(stage: str, count: int):
+    """단계 출력 후보 수 기록"""
+    STAGE_CANDIDATES.labels(stage=stage).inc(count)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add_candidates(stage, count)
+
+
+def count_cache(cache: str, result: str):
+    """
+    캐시 조회 결과 기록
+    
+    Args:
+        cache: 캐시 종류 (answer, semantic, singleflight)
+        result: 조회 결과 (memory_hit, disk_hit, hit, miss, coalesced 등)
+    """
+    CACHE_REQUESTS.labels(cache=cache, result=result).inc()
+
+
+def bedrock_error_code(error: BaseException) -> str:
+    """botocore ClientError의 오류 코드 (그 외 예외는 클래스 이름)"""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code")
+        if code:
+            return code
+    return type(error).__name__
+
+
+def record_bedrock_error(model_id: str, error: BaseException):
+    """
+    Bedrock 호출 오류 기록 (스로틀은 별도 카운터에도 기록)
+    
+    Args:
+        model_id: Bedrock 모델 ID
+        error: 발생한 예외
+    """
+    code = bedrock_error_code(error)
+    BEDROCK_ERRORS.labels(model=model_id, code=code).inc()
+    if code in THROTTLE_ERROR_CODES:
+        BEDROCK_THROTTLES.labels(model=model_id).inc()
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    /metrics 응답 본문과 Content-Type
+    
+    PROMETHEUS_MULTIPROC_DIR이 설정된 경우(uvicorn 다중 워커) 모든 워커의 값을 합산합니다.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,289 @@
+"""
+메모리 매핑(mmap) 인덱스 저장소
+여러 uvicorn 워커가 FAISS 인덱스, 청크 텍스트/메타데이터, BM25 인덱스를 OS 페이지 캐시에서
+하나의 물리 사본으로 공유하도록 pickle 대신 mmap 가능한 파일로 내보냄
+
+디렉토리 구조:
+    {vector_store}/mmap/CURRENT            현재 버전 디렉토리 이름
+    {vector_store}/mmap/{버전}/faiss_index.bin
+    {vector_store}/mmap/{버전}/chunks.bin, chunks_offsets.npy   청크 JSON 레코드 + 오프셋
+    {vector_store}/mmap/{버전}/bm25_*.npy, bm25_meta.json       BM25 역색인 (CSR)
+    {vector_store}/mmap/{버전}/manifest.json                    원본 파일 서명
+
+매핑 중인 파일을 덮어쓰면 읽는 워커가 손상되므로, 내보내기는 항상 새 버전 디렉토리에
+쓰고 CURRENT만 원자적으로 교체합니다.
+"""
+
+import json
+import mmap
+import os
+import pickle
+import shutil
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import faiss
+
+from tools.chunk_ids import chunk_id_of
+
+
+MMAP_DIRNAME = "mmap"
+CURRENT_FILENAME = "CURRENT"
+
+# 서명에 사용하는 원본 파일 (pickle 인덱스가 바뀌면 mmap 저장소는 무효)
+SOURCE_FILES = ["faiss_index.bin", "metadata.pkl", "bm25_index.pkl"]
+
+
+def mmap_enabled() -> bool:
+    """INDEX_MMAP 설정 확인"""
+    return os.getenv("INDEX_MMAP", "false").lower() == "true"
+
+
+def _source_signature(vector_store_path: str) -> Dict[str, Any]:
+    """원본 인덱스 파일의 (크기, mtime) 서명"""
+    signature = {}
+    for filename in SOURCE_FILES:
+        path = os.path.join(vector_store_path, filename)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature[filename] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def current_mmap_dir(vector_store_path: str) -> Optional[str]:
+    """
+    현재 원본 인덱스와 일치하는 mmap 저장소 디렉토리
+    
+    Args:
+        vector_store_path: 벡터 스토어 디렉토리
+    
+    Returns:
+        디렉토리 경로 (없거나 원본보다 오래되었으면 None)
+    """
+    root = os.path.join(vector_store_path, MMAP_DIRNAME)
+    try:
+        with open(os.path.join(root, CURRENT_FILENAME), 'r', encoding='utf-8') as f:
+            directory = os.path.join(root, f.read().strip())
+        with open(os.path.join(directory, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if manifest.get("source_signature") != _source_signature(vector_store_path):
+        print("[WARNING] mmap 저장소가 현재 인덱스보다 오래되었습니다 (build_mmap_store.py 실행 필요)")
+        return None
+    return directory
+
+
+def _save_npy(directory: str, name: str, array: np.ndarray):
+    np.save(os.path.join(directory, f"{name}.npy"), array)
+
+
+def _write_chunks(directory: str, items: List[Dict[str, Any]]):
+    """청크를 JSON 레코드로 이어 쓰고 오프셋 배열 저장"""
+    offsets = np.zeros(len(items) + 1, dtype='int64')
+    with open(os.path.join(directory, "chunks.bin"), 'wb') as f:
+        for i, item in enumerate(items):
+            record = json.dumps(
+                {"id": chunk_id_of(item), "text": item['text'], "metadata": item['metadata']},
+                ensure_ascii=False
+            ).encode("utf-8")
+            f.write(record)
+            offsets[i + 1] = offsets[i] + len(record)
+    _save_npy(directory, "chunks_offsets", offsets)
+
+
+def _write_bm25(directory: str, bm25) -> Dict[str, Any]:
+    """rank_bm25 BM25Okapi를 CSR 역색인(용어 → 문서, 빈도) 배열로 저장"""
+    vocab = {term: i for i, term in enumerate(sorted(bm25.idf))}
+    
+    postings = [[] for _ in range(len(vocab))]
+    for doc_id, freqs in enumerate(bm25.doc_freqs):
+        for term, tf in freqs.items():
+            postings[vocab[term]].append((doc_id, tf))
+    
+    indptr = np.zeros(len(vocab) + 1, dtype='int64')
+    for term_id, plist in enumerate(postings):
+        indptr[term_id + 1] = indptr[term_id] + len(plist)
+    doc_ids = np.fromiter((d for plist in postings for d, _ in plist), dtype='int32', count=indptr[-1])
+    tfs = np.fromiter((tf for plist in postings for _, tf in plist), dtype='float32', count=indptr[-1])
+    idf = np.array([bm25.idf[term] for term in sorted(vocab, key=vocab.get)], dtype='float64')
+    
+    _save_npy(directory, "bm25_indptr", indptr)
+    _save_npy(directory, "bm25_doc_ids", doc_ids)
+    _save_npy(directory, "bm25_tfs", tfs)
+    _save_npy(directory, "bm25_idf", idf)
+    _save_npy(directory, "bm25_doc_len", np.asarray(bm25.doc_len, dtype='float64'))
+    
+    meta = {
+        "vocab": vocab,
+        "corpus_size": bm25.corpus_size,
+        "avgdl": bm25.avgdl,
+        "k1": bm25.k1,
+        "b": bm25.b
+    }
+    with open(os.path.join(directory, "bm25_meta.json"), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return meta
+
+
+def export_mmap_store(vector_store_path: str, keep: int = 2) -> Optional[str]:
+    """
+    pickle 인덱스를 mmap 저장소로 내보내기
+    
+    파이프라인이 인덱스 파일을 모두 저장한 뒤 (버전 발행 전에) 호출합니다.
+    
+    Args:
+        vector_store_path: 벡터 스토어 디렉토리
+        keep: 보존할 이전 버전 디렉토리 수 (매핑 중인 워커용)
+    
+    Returns:
+        생성된 디렉토리 경로 (FAISS 인덱스/메타데이터가 없으면 None)
+    """
+    index_path = os.path.join(vector_store_path, "faiss_index.bin")
+    metadata_path = os.path.join(vector_store_path, "metadata.pkl")
+    bm25_path = os.path.join(vector_store_path, "bm25_index.pkl")
+    if not os.path.exists(index_path) or not os.path.exists(metadata_path):
+        print("[WARNING] mmap 저장소 생성 생략: FAISS 인덱스 또는 메타데이터가 없습니다")
+        return None
+    
+    signature = _source_signature(vector_store_path)
+    root = os.path.join(vector_store_path, MMAP_DIRNAME)
+    name = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+    directory = os.path.join(root, name)
+    os.makedirs(directory)
+    
+    shutil.copyfile(index_path, os.path.join(directory, "faiss_index.bin"))
+    
+    with open(metadata_path, 'rb') as f:
+        metadata = pickle.load(f)
+    _write_chunks(directory, metadata)
+    
+    bm25_docs = None
+    if os.path.exists(bm25_path):
+        with open(bm25_path, 'rb') as f:
+            bm25_data = pickle.load(f)
+        if len(bm25_data['corpus']) != len(metadata):
+            print("[WARNING] BM25 문서 수가 메타데이터와 달라 BM25 mmap 생성 생략")
+        else:
+            bm25_docs = _write_bm25(directory, bm25_data['bm25'])["corpus_size"]
+    
+    with open(os.path.join(directory, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump({
+            "chunks": len(metadata),
+            "bm25_docs": bm25_docs,
+            "source_signature": signature,
+            "created_at": datetime.now().isoformat()
+        }, f, ensure_ascii=False, indent=2)
+    
+    # CURRENT 원자적 교체
+    tmp_path = os.path.join(root, f"{CURRENT_FILENAME}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILENAME))
+    
+    # 오래된 버전 정리 (이미 매핑한 워커는 삭제 후에도 기존 inode를 계속 사용)
+    versions = sorted(
+        d for d in os.listdir(root)
+        if os.path.isdir(os.path.join(root, d)) and d != name
+    )
+    for old in versions[:max(len(versions) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    
+    print(f"[OK] mmap 저장소 생성: {directory} ({len(metadata)}개 청크)")
+    return directory
+
+
+def read_faiss_index_mmap(directory: str):
+    """FAISS 인덱스를 메모리 매핑으로 읽기 (벡터 데이터는 페이지 캐시 공유)"""
+    flags = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+    return faiss.read_index(os.path.join(directory, "faiss_index.bin"), flags)
+
+
+class ChunkStore:
+    """mmap 기반 읽기 전용 청크 시퀀스 (항목: {"id", "text", "metadata"}, 접근 시 디코딩)"""
+    
+    def __init__(self, directory: str):
+        self.offsets = np.load(os.path.join(directory, "chunks_offsets.npy"), mmap_mode='r')
+        with open(os.path.join(directory, "chunks.bin"), 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return json.loads(self._data[int(self.offsets[i]):int(self.offsets[i + 1])])
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+    
+    def field(self, name: str) -> "ChunkFieldView":
+        """한 필드만 보는 시퀀스 (BM25Retriever의 corpus/metadata용)"""
+        return ChunkFieldView(self, name)
+
+
+class ChunkFieldView:
+    """ChunkStore 항목의 한 필드(text 또는 metadata) 시퀀스"""
+    
+    def __init__(self, store: ChunkStore, name: str):
+        self.store = store
+        self.name = name
+    
+    def __len__(self) -> int:
+        return len(self.store)
+    
+    def __getitem__(self, i: int) -> Any:
+        return self.store[i][self.name]
+    
+    def __iter__(self) -> Iterator[Any]:
+        for item in self.store:
+            yield item[self.name]
+
+
+class MmapBM25:
+    """CSR 역색인 기반 BM25Okapi (rank_bm25와 같은 점수, 배열은 mmap 공유)"""
+    
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "bm25_meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.vocab = meta["vocab"]
+        self.corpus_size = meta["corpus_size"]
+        self.avgdl = meta["avgdl"]
+        self.k1 = meta["k1"]
+        self.b = meta["b"]
+        
+        def load(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+        
+        self.indptr = load("bm25_indptr")
+        self.doc_ids = load("bm25_doc_ids")
+        self.tfs = load("bm25_tfs")
+        self.idf = load("bm25_idf")
+        self.doc_len = load("bm25_doc_len")
+    
+    def get_scores(self, query: List[str]) -> np.ndarray:
+        """
+        질의 토큰별 BM25 점수 (문서 수 길이의 배열)
+        
+        질의 용어가 나오는 문서만 계산하므로 전체 문서를 순회하는 rank_bm25보다 빠릅니다.
+        """
+        scores = np.zeros(self.corpus_size)
+        for token in query:
+            term_id = self.vocab.get(token)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.tfs[start:end].astype('float64')
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[docs] / self.avgdl)
+            scores[docs] += self.idf[term_id] * (tf * (self.k1 + 1) / (tf + norm))
+        return scores
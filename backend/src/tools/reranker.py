@@ -3,14 +3,15 @@ AWS Bedrock Cohere Rerank 3.5 API
 검색 결과를 재정렬하여 정확도 향상
 """
 
-import json
 import os
 from typing import List, Dict, Any
-import boto3
-from dotenv import load_dotenv
+
+from tools.env import load_env
+from tools.bedrock_client import AsyncBedrockClient, get_bedrock_runtime, get_rate_limiter
+from tools.metrics import record_bedrock_error
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 
 class CohereReranker:
@@ -21,18 +22,72 @@ class CohereReranker:
         self.aws_region = os.getenv("AWS_REGION", "us-east-1")
         self.model_id = os.getenv("RERANK_MODEL_ID", "cohere.rerank-v3-5:0")
         
-        # Bedrock Runtime 클라이언트 생성
-        self.bedrock_runtime = boto3.client(
-            service_name="bedrock-runtime",
-            region_name=self.aws_region,
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+        # 프로세스 공용 Bedrock Runtime 클라이언트 (연결 풀, 재시도 공유)
+        self.bedrock_runtime = get_bedrock_runtime()
+        
+        # Rerank 모델 한도(RERANK_RATE_LIMIT_*)를 적용하는 호출 래퍼
+        self.async_client = AsyncBedrockClient(
+            self.bedrock_runtime,
+            limiter=get_rate_limiter(self.model_id, "RERANK")
         )
         
         print(f"[OK] CohereReranker 초기화")
         print(f"    리전: {self.aws_region}")
         print(f"    모델: {self.model_id}")
     
+    def _build_body(self, query: str, documents: List[Dict[str, Any]], top_k: int) -> dict:
+        """Cohere Rerank 요청 본문 구성 (AWS Bedrock 형식)"""
+        return {
+            "query": query,
+            "documents": [doc['text'] for doc in documents],
+            "top_n": min(top_k, len(documents)),
+            "return_documents": False
+        }
+    
+    def _apply_results(
+        self,
+        documents: List[Dict[str, Any]],
+        results: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Rerank 응답을 원본 문서에 반영
+        
+        Args:
+            documents: rerank 요청에 사용한 문서 리스트
+            results: Cohere 응답의 results 필드
+            
+        Returns:
+            relevance_score로 재정렬된 문서 리스트
+        """
+        reranked_docs = []
+        for result in results:
+            index = result["index"]
+            relevance_score = result["relevance_score"]
+            
+            # 원본 문서에 relevance_score 추가
+            doc = documents[index].copy()
+            doc['rerank_score'] = relevance_score
+            doc['original_rank'] = index + 1
+            
+            # 기존 score를 original_score로 보존
+            if 'score' in doc:
+                doc['original_score'] = doc['score']
+            
+            # rerank_score를 새로운 score로 설정
+            doc['score'] = relevance_score
+            
+            reranked_docs.append(doc)
+        
+        print(f"✅ Reranking 완료: {len(documents)}개 → {len(reranked_docs)}개")
+        
+        # 상위 몇 개의 점수 출력 (디버깅용)
+        for i, doc in enumerate(reranked_docs[:3], 1):
+            print(f"   [{i}] Rerank: {doc['rerank_score']:.4f} "
+                  f"(원본 순위: {doc['original_rank']}, "
+                  f"원본 점수: {doc.get('original_score', 0):.4f})")
+        
+        return reranked_docs
+    
     def rerank(
         self,
         query: str,
@@ -59,65 +114,61 @@ class CohereReranker:
             documents = documents[:100]
         
         try:
-            # 1. 문서를 Cohere API 형식으로 변환
-            doc_texts = [doc['text'] for doc in documents]
-            
-            # 2. Cohere Rerank API 호출 (AWS Bedrock 형식)
-            body = json.dumps({
-                "query": query,
-                "documents": doc_texts,
-                "top_n": min(top_k, len(documents)),
-                "return_documents": False
-            })
-            
-            response = self.bedrock_runtime.invoke_model(
-                modelId=self.model_id,
-                body=body,
-                contentType="application/json",
-                accept="application/json"
+            # Cohere Rerank API 호출 (AWS Bedrock 형식)
+            response_body = self.async_client.invoke_model_json_blocking(
+                self.model_id,
+                self._build_body(query, documents, top_k)
             )
             
-            # 3. 응답 파싱
-            response_body = json.loads(response["body"].read())
-            results = response_body.get("results", [])
-            
-            # 4. relevance_score로 재정렬된 결과 구성
-            reranked_docs = []
-            for result in results:
-                index = result["index"]
-                relevance_score = result["relevance_score"]
-                
-                # 원본 문서에 relevance_score 추가
-                doc = documents[index].copy()
-                doc['rerank_score'] = relevance_score
-                doc['original_rank'] = index + 1
-                
-                # 기존 score를 original_score로 보존
-                if 'score' in doc:
-                    doc['original_score'] = doc['score']
-                
-                # rerank_score를 새로운 score로 설정
-                doc['score'] = relevance_score
-                
-                reranked_docs.append(doc)
-            
-            print(f"✅ Reranking 완료: {len(documents)}개 → {len(reranked_docs)}개")
-            
-            # 상위 몇 개의 점수 출력 (디버깅용)
-            for i, doc in enumerate(reranked_docs[:3], 1):
-                print(f"   [{i}] Rerank: {doc['rerank_score']:.4f} "
-                      f"(원본 순위: {doc['original_rank']}, "
-                      f"원본 점수: {doc.get('original_score', 0):.4f})")
-            
-            return reranked_docs
+            # relevance_score로 재정렬
+            return self._apply_results(documents, response_body.get("results", []))
             
         except Exception as e:
+            record_bedrock_error(self.model_id, e)
             error_msg = f"Reranking 중 오류 발생: {str(e)}"
             print(f"❌ {error_msg}")
             
             # 오류 시 원본 결과 반환
             print("   → 원본 검색 결과를 반환합니다.")
             return documents[:top_k]
+    
+    async def arerank(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        top_k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        검색 결과를 Cohere Rerank로 재정렬 (비동기)
+        
+        Args:
+            query: 검색 질문
+            documents: 검색 결과 리스트 (각 문서는 'text'와 'metadata' 포함)
+            top_k: 반환할 상위 결과 수
+            
+        Returns:
+            재정렬된 검색 결과 리스트
+        """
+        if not documents:
+            return []
+        
+        # 최대 100개까지만 rerank 가능 (Cohere 제한)
+        if len(documents) > 100:
+            print(f"⚠️  문서 수가 100개를 초과하여 상위 100개만 rerank합니다.")
+            documents = documents[:100]
+        
+        try:
+            response_body = await self.async_client.invoke_model_json(
+                self.model_id,
+                self._build_body(query, documents, top_k)
+            )
+            return self._apply_results(documents, response_body.get("results", []))
+            
+        except Exception as e:
+            record_bedrock_error(self.model_id, e)
+            print(f"❌ Reranking 중 오류 발생: {str(e)}")
+            print("   → 원본 검색 결과를 반환합니다.")
+            return documents[:top_k]
 
 
 # 싱글톤 인스턴스
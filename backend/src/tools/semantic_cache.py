@@ -0,0 +1,269 @@
+"""
+시맨틱 답변 캐시
+이전 질문의 임베딩을 메모리 FAISS 인덱스에 저장하여, 표현만 다른 같은 질문
+("스텐트 2개 삭감돼?" / "스텐트 두 개 쓰면 삭감되나요")에 저장된 답변을 재사용
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import faiss
+
+from tools.chunk_ids import make_chunk_id, chunk_id_of
+from tools.metrics import count_cache
+
+
+# 고유어 수사 + 단위 → 숫자 (예: "두 개" → 2)
+_NATIVE_NUMBERS = {
+    "한": 1, "하나": 1, "두": 2, "둘": 2, "세": 3, "셋": 3, "석": 3,
+    "네": 4, "넷": 4, "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9, "열": 10
+}
+_NATIVE_NUMBER_PATTERN = re.compile(
+    r"(하나|다섯|여섯|일곱|여덟|아홉|한|두|둘|세|셋|석|네|넷|열)\s*(개|가지|번|회|곳|군데|부위|차례|병|장)"
+)
+_NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+
+
+def chunk_fingerprint(text: str) -> str:
+    """청크 텍스트 지문 (청크 ID와 같은 값, 청크 내용이 바뀌면 지문도 바뀜)"""
+    return make_chunk_id(text)
+
+
+def chunk_fingerprints(metadata: Iterable[Dict[str, Any]]) -> Set[str]:
+    """
+    로드된 인덱스의 청크 지문 집합
+    
+    Args:
+        metadata: 검색기에 로드된 청크 메타데이터 (리스트 또는 mmap ChunkStore)
+    
+    Returns:
+        청크 지문 집합
+    """
+    return {chunk_id_of(item) for item in metadata}
+
+
+class SemanticAnswerCache:
+    """질문 임베딩 유사도 기반 답변 캐시 (FAISS 내적 인덱스 + LRU)"""
+    
+    # 유사 질문 후보 수 (필터가 다른 항목을 건너뛰기 위해 여러 개 조회)
+    SEARCH_K = 8
+    
+    def __init__(
+        self,
+        max_entries: int = None,
+        threshold: float = None,
+        ttl: float = None
+    ):
+        """
+        초기화
+        
+        Args:
+            max_entries: 최대 항목 수 (기본 SEMANTIC_CACHE_SIZE 또는 512)
+            threshold: hit으로 판단할 최소 코사인 유사도 (기본 SEMANTIC_CACHE_THRESHOLD 또는 0.95)
+            ttl: 항목 만료 시간(초) (기본 ANSWER_CACHE_TTL 또는 86400)
+        """
+        if max_entries is None:
+            max_entries = int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))
+        if threshold is None:
+            threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+        if ttl is None:
+            ttl = float(os.getenv("ANSWER_CACHE_TTL", "86400"))
+        
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        
+        self._index = None  # 첫 항목 추가 시 차원에 맞춰 생성
+        self._entries = OrderedDict()  # id → 항목 (LRU 순서)
+        self._next_id = 0
+        self._lock = threading.Lock()
+        
+        # 항목이 검증된 인덱스 버전 (이전 인덱스 스냅샷으로 만든 답변은 저장하지 않음)
+        self.index_version = None
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_filter_key(
+        question: str,
+        material_code: str = None,
+        procedure_code: str = None
+    ) -> str:
+        """
+        재사용 조건 키 (코드 필터 + 질문 속 숫자)
+        
+        "스텐트 2개"와 "스텐트 3개"처럼 임베딩은 비슷하지만 판단이 달라지는
+        질문을 구분하기 위해 숫자(고유어 수사 포함)도 일치해야 합니다.
+        """
+        text = unicodedata.normalize("NFKC", question or "")
+        text = _NATIVE_NUMBER_PATTERN.sub(
+            lambda m: f"{_NATIVE_NUMBERS[m.group(1)]}{m.group(2)}", text
+        )
+        numbers = sorted(_NUMBER_PATTERN.findall(text))
+        return json.dumps([
+            (material_code or "").strip().upper(),
+            (procedure_code or "").strip().upper(),
+            numbers
+        ])
+    
+    @staticmethod
+    def _to_vector(embedding: List[float]) -> np.ndarray:
+        """L2 정규화된 (1, d) float32 벡터 (내적 = 코사인 유사도)"""
+        # 복사본을 정규화 (임베더가 캐시한 질의 임베딩은 읽기 전용)
+        vector = np.array(embedding, dtype='float32').reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+    
+    def _remove(self, ids: Iterable[int]):
+        """항목 제거 (lock을 잡은 상태에서 호출)"""
+        ids = [i for i in ids if i in self._entries]
+        if not ids:
+            return
+        for i in ids:
+            del self._entries[i]
+        self._index.remove_ids(np.array(ids, dtype='int64'))
+    
+    def lookup(self, embedding: List[float], filter_key: str) -> Optional[Dict[str, Any]]:
+        """
+        유사 질문의 캐시된 답변 조회
+        
+        Args:
+            embedding: 질문 임베딩
+            filter_key: make_filter_key로 만든 키
+        
+        Returns:
+            캐시된 답변 (없으면 None)
+        """
+        vector = self._to_vector(embedding)
+        
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0 or self._index.d != vector.shape[1]:
+                self.misses += 1
+                count_cache("semantic", "miss")
+                return None
+            
+            scores, ids = self._index.search(vector, min(self.SEARCH_K, self._index.ntotal))
+            now = time.time()
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break  # 유사도 내림차순
+                entry = self._entries.get(int(entry_id))
+                if entry is None or entry["filter_key"] != filter_key:
+                    continue
+                if self.ttl and entry["created_at"] + self.ttl <= now:
+                    self._remove([int(entry_id)])
+                    continue
+                
+                self._entries.move_to_end(int(entry_id))
+                self.hits += 1
+                count_cache("semantic", "hit")
+                print(f"[시맨틱 캐시] hit (유사도 {score:.4f})")
+                return entry["value"]
+            
+            self.misses += 1
+            count_cache("semantic", "miss")
+            return None
+    
+    def add(
+        self,
+        embedding: List[float],
+        filter_key: str,
+        value: Dict[str, Any],
+        chunk_fingerprints: Iterable[str] = (),
+        index_version: str = None
+    ):
+        """
+        답변 저장
+        
+        Args:
+            embedding: 질문 임베딩
+            filter_key: make_filter_key로 만든 키
+            value: 답변 결과
+            chunk_fingerprints: 답변 생성에 사용한 청크 지문 (청크 변경 시 무효화용)
+            index_version: 답변을 만든 검색기의 인덱스 버전 (현재 검증된 버전과 다르면 저장하지 않음)
+        """
+        vector = self._to_vector(embedding)
+        
+        with self._lock:
+            if (index_version is not None and self.index_version is not None
+                    and index_version != self.index_version):
+                # 리로드 전에 시작한 요청의 답변: 새 인덱스 기준 무효화를 거치지 않았으므로 버림
+                return
+            
+            if self._index is None or self._index.d != vector.shape[1]:
+                # 첫 항목이거나 임베딩 차원이 바뀐 경우 새로 생성
+                self._index = faiss.IndexIDMap(faiss.IndexFlatIP(vector.shape[1]))
+                self._entries.clear()
+            
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.array([entry_id], dtype='int64'))
+            self._entries[entry_id] = {
+                "filter_key": filter_key,
+                "value": value,
+                "chunks": frozenset(chunk_fingerprints),
+                "created_at": time.time()
+            }
+            
+            if len(self._entries) > self.max_entries:
+                overflow = len(self._entries) - self.max_entries
+                self._remove(list(self._entries)[:overflow])
+                self.evictions += overflow
+    
+    def invalidate_missing_chunks(self, current_fingerprints: Set[str], index_version: str = None) -> int:
+        """
+        사용한 청크 중 하나라도 현재 인덱스에 없는 (삭제/변경된) 항목 제거
+        
+        Args:
+            current_fingerprints: 현재 인덱스의 청크 지문 집합
+            index_version: 현재 인덱스 버전 (지정하면 이후 다른 버전의 답변은 저장하지 않음)
+        
+        Returns:
+            제거된 항목 수
+        """
+        with self._lock:
+            stale = [
+                entry_id for entry_id, entry in self._entries.items()
+                if not entry["chunks"] <= current_fingerprints
+            ]
+            self._remove(stale)
+            self.invalidations += len(stale)
+            if index_version is not None:
+                self.index_version = index_version
+        
+        if stale:
+            print(f"[시맨틱 캐시] 청크 변경으로 {len(stale)}개 항목 무효화")
+        return len(stale)
+    
+    def clear(self):
+        """모든 항목 삭제"""
+        with self._lock:
+            self._index = None
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        """hit/miss 카운터 및 항목 수"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,180 @@
+"""
+대화 세션 저장소
+세션 ID → 대화 메시지 목록을 서버에 보관하여 클라이언트가 매 요청마다
+전체 conversation_history를 다시 보내지 않아도 되도록 함
+
+기본은 프로세스 메모리 LRU(TTL)이며, SESSION_DB를 설정하면 모든 uvicorn 워커가 공유하는
+SQLite가 기준 저장소가 됩니다 (메모리 사본은 디스크 오류 시 대체용).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from tools.lru_cache import LRUCache
+
+
+# 클라이언트가 만든 세션 ID도 허용 (영문, 숫자, -, _ 최대 64자)
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def new_session_id() -> str:
+    """새 세션 ID"""
+    return uuid.uuid4().hex
+
+
+class SessionStore:
+    """대화 세션 저장소 (메모리 LRU, 선택적 SQLite)"""
+    
+    def __init__(
+        self,
+        max_sessions: int = None,
+        ttl: float = None,
+        max_messages: int = None,
+        db_path: str = None
+    ):
+        """
+        초기화
+        
+        Args:
+            max_sessions: 메모리에 보관할 최대 세션 수 (기본 SESSION_CACHE_SIZE 또는 1000)
+            ttl: 마지막 사용 후 세션 만료 시간(초) (기본 SESSION_TTL 또는 86400)
+            max_messages: 세션당 보관할 최대 메시지 수 (기본 SESSION_MAX_MESSAGES 또는 200, 초과 시 오래된 것부터 삭제)
+            db_path: SQLite 파일 경로 (기본 SESSION_DB, 빈 문자열이면 메모리만 사용)
+        """
+        if max_sessions is None:
+            max_sessions = int(os.getenv("SESSION_CACHE_SIZE", "1000"))
+        if ttl is None:
+            ttl = float(os.getenv("SESSION_TTL", "86400"))
+        if max_messages is None:
+            max_messages = int(os.getenv("SESSION_MAX_MESSAGES", "200"))
+        if db_path is None:
+            db_path = os.getenv("SESSION_DB", "")
+        
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.memory = LRUCache(max_entries=max_sessions, ttl=ttl)
+        self.db_path = db_path or None
+        self._lock = threading.Lock()
+        
+        if self.db_path:
+            self._init_db()
+    
+    @staticmethod
+    def is_valid_id(session_id: str) -> bool:
+        return bool(session_id) and SESSION_ID_PATTERN.match(session_id) is not None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """SQLite 연결 (워커 프로세스/스레드마다 별도 연결 사용)"""
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _init_db(self):
+        """세션 테이블 생성"""
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    messages TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+    
+    def _disk_get(self, session_id: str) -> Optional[List[Dict[str, str]]]:
+        """디스크 조회 (없거나 만료되었으면 빈 리스트, 오류 시 None)"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT messages, updated_at FROM sessions WHERE session_id = ?",
+                    (session_id,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[WARNING] 세션(디스크) 조회 실패: {str(e)}")
+            return None
+        
+        if row is None:
+            return []
+        messages, updated_at = row
+        if self.ttl and updated_at + self.ttl <= time.time():
+            return []
+        return json.loads(messages)
+    
+    def _disk_set(self, session_id: str, messages: List[Dict[str, str]]):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (session_id, messages, updated_at) VALUES (?, ?, ?)",
+                    (session_id, json.dumps(messages, ensure_ascii=False), time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"[WARNING] 세션(디스크) 저장 실패: {str(e)}")
+    
+    def get(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        세션의 대화 메시지 (디스크 사용 시 다른 워커가 추가한 턴도 보이도록 디스크 기준)
+        
+        Args:
+            session_id: 세션 ID
+        
+        Returns:
+            [{"role": "user/assistant", "content": "..."}] (없거나 만료되었으면 빈 리스트)
+        """
+        if self.db_path:
+            messages = self._disk_get(session_id)
+            if messages is not None:
+                return messages
+        return list(self.memory.get(session_id) or [])
+    
+    def append_turn(self, session_id: str, question: str, answer: str):
+        """
+        질문/답변 한 턴 추가
+        
+        Args:
+            session_id: 세션 ID
+            question: 사용자 질문
+            answer: 생성된 답변
+        """
+        with self._lock:
+            messages = self.get(session_id)
+            messages.extend([
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": answer}
+            ])
+            if len(messages) > self.max_messages:
+                # 턴 단위(user/assistant)로 오래된 것부터 삭제
+                overflow = len(messages) - self.max_messages
+                messages = messages[overflow + overflow % 2:]
+            self.memory.set(session_id, messages)
+            if self.db_path:
+                self._disk_set(session_id, messages)
+    
+    def delete(self, session_id: str):
+        """세션 삭제"""
+        self.memory.delete(session_id)
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            except sqlite3.Error as e:
+                print(f"[WARNING] 세션(디스크) 삭제 실패: {str(e)}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """세션 저장소 통계"""
+        return {
+            "memory_sessions": len(self.memory),
+            "max_sessions": self.memory.max_entries,
+            "evictions": self.memory.evictions,
+            "disk_enabled": self.db_path is not None
+        }
@@ -0,0 +1,151 @@
+"""
+동시 요청 합치기 (single-flight)
+같은 키로 동시에 들어온 요청은 하나의 진행 중 작업(또는 업스트림 스트림)을 공유
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from tools.metrics import count_cache, record_value
+
+
+class _Broadcast:
+    """하나의 업스트림 스트림을 여러 구독자에게 전달 (늦게 합류한 구독자는 처음부터 재생)"""
+    
+    def __init__(self):
+        self.events: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+    
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+    
+    def publish(self, item: Any):
+        self.events.append(item)
+        self._notify()
+    
+    def finish(self, error: BaseException = None):
+        self.error = error
+        self.done = True
+        self._notify()
+    
+    async def subscribe(self) -> AsyncIterator[Any]:
+        position = 0
+        while True:
+            while position < len(self.events):
+                yield self.events[position]
+                position += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class SingleFlight:
+    """키별 진행 중 작업 공유 (asyncio 이벤트 루프 안에서 사용)"""
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _Broadcast] = {}
+        self.leaders = 0
+        self.followers = 0
+    
+    async def do(self, key: Optional[str], fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        같은 키의 작업이 진행 중이면 그 결과를 기다리고, 없으면 새로 실행
+        
+        작업은 별도 Task로 실행되고 shield로 감싸므로, 기다리던 요청 하나가
+        취소되어도(클라이언트 연결 종료 등) 나머지 요청의 작업은 계속됩니다.
+        
+        Args:
+            key: 합치기 키 (None이면 합치지 않고 바로 실행)
+            fn: 작업 코루틴을 만드는 함수
+        
+        Returns:
+            작업 결과 (같은 키의 모든 요청이 같은 객체를 받음)
+        """
+        if key is None:
+            return await fn()
+        
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._release(self._calls, key, t))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            count_cache("singleflight", "coalesced")
+            record_value("coalesced", True)
+        
+        return await asyncio.shield(task)
+    
+    async def stream(
+        self,
+        key: Optional[str],
+        fn: Callable[[], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        """
+        같은 키의 스트림이 진행 중이면 구독하고, 없으면 업스트림을 새로 시작
+        
+        업스트림은 구독자와 독립된 Task에서 끝까지 읽으므로, 구독자 하나가
+        중간에 끊어져도 다른 구독자(및 완료 후 캐시 저장)에 영향이 없습니다.
+        
+        Args:
+            key: 합치기 키 (None이면 합치지 않고 바로 스트리밍)
+            fn: 비동기 제너레이터를 만드는 함수
+        
+        Yields:
+            업스트림 항목 (합류 시점 이전 항목 포함)
+        """
+        if key is None:
+            async for item in fn():
+                yield item
+            return
+        
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast()
+            self._streams[key] = broadcast
+            broadcast.task = asyncio.ensure_future(self._pump(key, broadcast, fn))
+            self.leaders += 1
+        else:
+            self.followers += 1
+            count_cache("singleflight", "coalesced")
+            record_value("coalesced", True)
+        
+        async for item in broadcast.subscribe():
+            yield item
+    
+    async def _pump(self, key: str, broadcast: _Broadcast, fn: Callable[[], AsyncIterator[Any]]):
+        """업스트림 스트림을 읽어 구독자들에게 전달"""
+        try:
+            async for item in fn():
+                broadcast.publish(item)
+        except asyncio.CancelledError as e:
+            broadcast.finish(e)
+            raise
+        except Exception as e:
+            broadcast.finish(e)
+        else:
+            broadcast.finish()
+        finally:
+            self._release(self._streams, key, broadcast)
+    
+    @staticmethod
+    def _release(table: Dict[str, Any], key: str, value: Any):
+        """완료된 작업 제거 (같은 키로 새 작업이 이미 등록된 경우는 유지)"""
+        if table.get(key) is value:
+            del table[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """진행 중 작업 수 및 합쳐진 요청 수"""
+        return {
+            "in_flight": len(self._calls) + len(self._streams),
+            "leaders": self.leaders,
+            "followers": self.followers
+        }
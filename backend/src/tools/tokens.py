@@ -0,0 +1,15 @@
+"""
+토큰 수 추정
+대화 히스토리 예산(history_budget)과 Bedrock 토큰 한도(bedrock_client)가 같은 기준으로 토큰을 셉니다.
+"""
+
+import math
+
+
+# 토큰 수 추정용 (한국어 위주 텍스트 기준 대략 2자당 1토큰)
+CHARS_PER_TOKEN = 2.0
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 대략적인 토큰 수"""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
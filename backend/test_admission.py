@@ -0,0 +1,129 @@
+"""
+승인 제어 테스트 (동시 실행 제한, 대기열 초과 429, 대기 시간 초과/스로틀 503 + Retry-After)
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.query_engine import QueryEngine
+from tools.admission import AdmissionController, AdmissionRejected, BedrockThrottled
+from conftest import FakeAgent, FakeRetriever
+
+
+class GatedAgent(FakeAgent):
+    """gate가 열릴 때까지 답변을 붙잡거나 Bedrock 스로틀을 흉내내는 가짜 답변 에이전트"""
+
+    def __init__(self, gate=None, throttle=False):
+        super().__init__()
+        self.gate = gate
+        self.throttle = throttle
+
+    async def aanswer_query(self, question, **kwargs):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.throttle:
+            raise BedrockThrottled("Bedrock 요청 한도 초과 (ThrottlingException)")
+        return await super().aanswer_query(question, **kwargs)
+
+
+def make_engine(monkeypatch, agent, admission):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    retriever = FakeRetriever([{"text": "스텐트 인정기준", "metadata": {}, "score": 1.0}])
+    return QueryEngine(retriever=retriever, agent=agent, admission=admission)
+
+
+def test_queue_full_rejected_with_429_and_waiter_admitted_on_release():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5)
+        await admission.acquire()
+
+        waiter = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 1
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await admission.acquire()
+        assert excinfo.value.status_code == 429
+        assert excinfo.value.retry_after >= 1
+
+        admission.release()
+        await asyncio.wait_for(waiter, 1)
+        assert admission.in_flight == 1 and admission.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_rejected_with_503():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout=0.05)
+        await admission.acquire()
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await admission.acquire()
+        assert excinfo.value.status_code == 503
+        assert admission.queue_depth == 0 and admission.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_throttle_halves_limit_and_success_recovers():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=8, max_queue=4)
+        with pytest.raises(BedrockThrottled):
+            async with admission.slot():
+                raise BedrockThrottled("throttled")
+        assert int(admission.limit) == 4 and admission.in_flight == 0
+
+        for _ in range(40):
+            async with admission.slot():
+                pass
+        assert int(admission.limit) == 8
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_misses_beyond_queue_are_rejected(monkeypatch):
+    async def scenario():
+        gate = asyncio.Event()
+        engine = make_engine(
+            monkeypatch, GatedAgent(gate=gate),
+            AdmissionController(max_concurrency=1, max_queue=0)
+        )
+        first = asyncio.ensure_future(engine.aanswer(question="스텐트 1개 삭감돼?"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            await engine.aanswer(question="스텐트 2개 삭감돼?")
+        assert excinfo.value.status_code == 429
+
+        gate.set()
+        assert (await first)["answer"] == "판단: 인정됨"
+
+    asyncio.run(scenario())
+
+
+def test_api_returns_retry_after(monkeypatch):
+    throttled = make_engine(monkeypatch, GatedAgent(throttle=True), AdmissionController(max_concurrency=2))
+    app.dependency_overrides[get_engine] = lambda: throttled
+    try:
+        client = TestClient(app)
+        response = client.post("/api/query", json={"question": "스텐트 삭감돼?"})
+        assert response.status_code == 503
+        assert int(response.headers["retry-after"]) >= 1
+
+        full = AdmissionController(max_concurrency=1, max_queue=0)
+        asyncio.run(full.acquire())
+        app.dependency_overrides[get_engine] = lambda: make_engine(monkeypatch, GatedAgent(), full)
+        response = client.post("/api/query/stream", json={"question": "스텐트 삭감돼?"})
+        assert response.status_code == 429
+        assert "retry-after" in response.headers
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,101 @@
+"""
+답변 캐시 테스트 (메모리/SQLite 2단계, 인덱스 버전 무효화)
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from agent.answer_agent import CLAUDE_ERROR_PREFIX
+from agent.query_engine import QueryEngine
+from tools.answer_cache import AnswerCache
+from tools.index_version import publish_index_version, read_index_version
+from conftest import FakeAgent, FakeRetriever
+
+
+def test_key_normalizes_question_and_codes():
+    cache = AnswerCache(db_path="")
+    a = cache.make_key("스텐트  2개 삭감돼?", material_code="a12345", index_version="v1")
+    b = cache.make_key("스텐트 2개 삭감돼", material_code="A12345 ", index_version="v1")
+    assert a == b
+
+    assert a != cache.make_key("스텐트 2개 삭감돼", material_code="A12345", index_version="v2")
+    assert a != cache.make_key(
+        "스텐트 2개 삭감돼", material_code="A12345", index_version="v1",
+        conversation_history=[{"role": "user", "content": "이전 질문"}]
+    )
+    assert a != cache.make_key(
+        "스텐트 2개 삭감돼", material_code="A12345", index_version="v1",
+        excluded_ids=["3f2a9c0d1b7e4a56"]
+    )
+
+
+def test_disk_tier_is_shared_and_invalidated_by_version(tmp_path):
+    db_path = str(tmp_path / "answers.sqlite")
+    writer = AnswerCache(db_path=db_path)
+    key = writer.make_key("질문", index_version="v1")
+    writer.set(key, {"answer": "답변"}, "v1")
+
+    # 다른 워커 프로세스를 흉내: 메모리는 비어있고 디스크에서 hit
+    reader = AnswerCache(db_path=db_path)
+    assert reader.get(key, "v1") == {"answer": "답변"}
+    assert reader.get(key, "v1") == {"answer": "답변"}
+    stats = reader.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+
+    # 새 버전 발행 → 이전 버전 항목 제거
+    assert reader.get(key, "v2") is None
+    assert reader.stats()["invalidations"] == 1
+    assert reader.stats()["disk_entries"] == 0
+
+
+def test_engine_caches_until_index_version_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("VECTOR_STORE_PATH", str(tmp_path))
+    publish_index_version(str(tmp_path))
+    agent = FakeAgent()
+    engine = QueryEngine(
+        retriever=FakeRetriever(), agent=agent,
+        answer_cache=AnswerCache(db_path=str(tmp_path / "answers.sqlite")),
+        retriever_factory=FakeRetriever
+    )
+
+    async def ask(question):
+        return await engine.aanswer(question=question, procedure_code="M6561")
+
+    first = asyncio.run(ask("스텐트 2개 삭감돼?"))
+    second = asyncio.run(ask("스텐트 2개  삭감돼"))
+    assert agent.calls == 1
+    assert second["answer"] == first["answer"]
+    assert second["question"] == "스텐트 2개  삭감돼"
+
+    # 새 인덱스가 발행되어도 리로드 전에는 이전 인덱스로 서비스하므로 캐시 유지
+    # (이전 검색기로 만든 답변이 새 버전 키로 저장되지 않음)
+    previous = engine.loaded_index_version
+    publish_index_version(str(tmp_path))
+    assert read_index_version(str(tmp_path)) != previous
+    asyncio.run(ask("스텐트 2개 삭감돼?"))
+    assert agent.calls == 1
+    assert engine.answer_cache.get(
+        AnswerCache.make_key("스텐트 2개 삭감돼?", procedure_code="M6561",
+                             index_version=read_index_version(str(tmp_path))),
+        read_index_version(str(tmp_path))
+    ) is None
+
+    # 새 검색기로 교체되면 다시 생성
+    engine.reload_index()
+    asyncio.run(ask("스텐트 2개 삭감돼?"))
+    assert agent.calls == 2
+
+
+def test_engine_does_not_cache_model_errors():
+    agent = FakeAgent(answer=f"{CLAUDE_ERROR_PREFIX}: ThrottlingException")
+    engine = QueryEngine(
+        retriever=FakeRetriever(), agent=agent, answer_cache=AnswerCache(db_path="")
+    )
+
+    asyncio.run(engine.aanswer(question="스텐트 2개 삭감돼?"))
+    asyncio.run(engine.aanswer(question="스텐트 2개 삭감돼?"))
+    assert agent.calls == 2
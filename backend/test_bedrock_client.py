@@ -0,0 +1,79 @@
+"""
+공용 Bedrock 클라이언트 계층 테스트 (공유 클라이언트, 연결 풀/재시도 설정, 모델별 token bucket)
+"""
+
+import sys
+import os
+import io
+import json
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from agent.answer_agent import InsuranceAnswerAgent
+from tools.bedrock_client import (
+    AsyncBedrockClient, RateLimiter, get_bedrock_runtime, get_rate_limiter, estimate_request_tokens
+)
+from tools.embedder_tool import TitanEmbedder
+from tools.reranker import CohereReranker
+
+
+def test_components_share_one_tuned_client():
+    runtime = get_bedrock_runtime()
+    assert TitanEmbedder().bedrock_runtime is runtime
+    assert CohereReranker().bedrock_runtime is runtime
+    assert InsuranceAnswerAgent().async_client.client is runtime
+
+    config = runtime.meta.config
+    assert config.max_pool_connections >= int(os.getenv("BEDROCK_IO_WORKERS", "32"))
+    assert config.retries["mode"] == "adaptive"
+
+
+def test_batch_embedding_uses_single_retry_layer():
+    embedder = TitanEmbedder()
+    # 배치 임베딩은 자체 재시도(EMBEDDING_MAX_RETRIES)만 사용하고 botocore 재시도는 끔
+    batch_runtime = embedder.batch_client.client
+    assert batch_runtime is get_bedrock_runtime(retries=False)
+    assert batch_runtime is not get_bedrock_runtime()
+    assert batch_runtime.meta.config.retries["total_max_attempts"] == 1
+    assert embedder.batch_client.limiter is embedder.async_client.limiter
+
+
+def test_token_bucket_reserves_requests_and_tokens():
+    limiter = RateLimiter(requests_per_second=2)
+    waits = [limiter.reserve() for _ in range(3)]
+    assert waits[:2] == [0.0, 0.0]
+    assert 0.4 < waits[2] <= 0.5
+
+    # 버킷보다 큰 요청도 통과하되 초과분만큼 뒤 요청이 기다림
+    limiter = RateLimiter(tokens_per_second=100)
+    assert limiter.reserve(150) > 0.45
+    assert limiter.reserve(10) > 0.5
+
+
+def test_rate_limits_are_per_model_from_env(monkeypatch):
+    monkeypatch.setenv("TESTMODEL_RATE_LIMIT_RPS", "5")
+    limiter = get_rate_limiter("test-model-a", "TESTMODEL")
+    assert limiter.requests_per_second == 5
+    assert get_rate_limiter("test-model-a", "TESTMODEL") is limiter
+    assert get_rate_limiter("test-model-b", "UNSET") is None
+
+
+class FakeRuntime:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke_model(self, modelId, body, **kwargs):
+        self.calls += 1
+        return {"body": io.BytesIO(json.dumps({"embedding": [0.1]}).encode())}
+
+
+def test_sync_and_async_calls_go_through_limiter():
+    limiter = RateLimiter(tokens_per_second=1000, model_id="m")
+    client = AsyncBedrockClient(FakeRuntime(), limiter=limiter)
+    body = {"inputText": "가" * 100, "max_tokens": 50}
+
+    assert client.invoke_model_json_blocking("m", body) == {"embedding": [0.1]}
+    assert asyncio.run(client.invoke_model_json("m", body)) == {"embedding": [0.1]}
+    assert client.client.calls == 2
+    assert limiter._tokens < 1000 - estimate_request_tokens(body)
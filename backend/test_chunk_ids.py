@@ -0,0 +1,106 @@
+"""
+청크 ID 테스트 (검색 단계 제외 필터, ID + 미리보기 sources, GET /api/chunks/{id})
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.answer_agent import InsuranceAnswerAgent
+from agent.query_engine import QueryEngine
+from tools.answer_cache import AnswerCache
+from tools.bm25_retriever import BM25Retriever
+from tools.chunk_ids import make_chunk_id, resolve_excluded_ids
+from tools.faiss_retriever import FAISSRetriever
+from conftest import FakeAgent, FakeEmbedder, FakeRetriever
+
+
+DOCUMENTS = [
+    "스텐트 삽입 인정기준 첫 번째 문서",
+    "스텐트 삽입 인정기준 두 번째 문서",
+    "스텐트 삽입 제외사항 세 번째 문서",
+    "고관절 전치환술 인정기준"
+]
+# 벡터 스토어는 ID 도입 전 형식 (id 필드 없음)
+METADATA = [{"doc_code": f"D{i}"} for i in range(len(DOCUMENTS))]
+
+
+def test_excluded_ids_are_filtered_inside_retrievers(vector_store):
+    path = vector_store(DOCUMENTS, METADATA)
+    faiss_retriever = FAISSRetriever(embedder=FakeEmbedder(), vector_store_path=path)
+    bm25_retriever = BM25Retriever(vector_store_path=path)
+
+    first = faiss_retriever.search("스텐트", top_k=2)
+    assert [r["id"] for r in first] == [make_chunk_id(DOCUMENTS[0]), make_chunk_id(DOCUMENTS[1])]
+
+    excluded = {make_chunk_id(DOCUMENTS[0])}
+    results = faiss_retriever.search("스텐트", top_k=2, exclude_ids=excluded)
+    assert [r["text"] for r in results] == [DOCUMENTS[1], DOCUMENTS[2]]
+
+    results = bm25_retriever.search("스텐트 삽입", top_k=3, exclude_ids=excluded)
+    assert len(results) == 2
+    assert DOCUMENTS[0] not in [r["text"] for r in results]
+
+
+def test_get_chunk_resolves_ids_from_old_metadata(vector_store):
+    path = vector_store(DOCUMENTS, METADATA)
+    retriever = FAISSRetriever(embedder=FakeEmbedder(), vector_store_path=path)
+
+    chunk = retriever.get_chunk(make_chunk_id(DOCUMENTS[3]))
+    assert chunk["text"] == DOCUMENTS[3]
+    assert chunk["metadata"] == {"doc_code": "D3"}
+    assert retriever.get_chunk("0000000000000000") is None
+
+
+def test_sources_carry_id_and_snippet_instead_of_text(monkeypatch):
+    monkeypatch.setenv("SOURCE_SNIPPET_CHARS", "10")
+    text = "스텐트   삽입 인정기준\n" + "본문 " * 100
+    _, context, sources = InsuranceAnswerAgent().prepare_query(
+        "스텐트 삭감돼?", retrieved_docs=[{"text": text, "metadata": {"type": "인정기준"}, "score": 0.1}]
+    )
+
+    assert text in context
+    assert "text" not in sources[0]
+    assert sources[0]["id"] == make_chunk_id(text)
+    assert sources[0]["snippet"] == "스텐트 삽입 인정기…"
+
+
+def test_excluded_sources_texts_map_to_same_ids():
+    ids = resolve_excluded_ids(["b", make_chunk_id("노이즈")], ["노이즈"])
+    assert ids == sorted({"b", make_chunk_id("노이즈")})
+    assert resolve_excluded_ids(None, []) is None
+    assert AnswerCache.make_key("질문", excluded_ids=ids) == AnswerCache.make_key("질문", excluded_ids=list(reversed(ids)))
+
+
+class ChunkRetriever(FakeRetriever):
+    def get_chunk(self, chunk_id):
+        if chunk_id == "abc":
+            return {"id": "abc", "text": "전체 텍스트", "metadata": {}}
+        return None
+
+
+def test_api_passes_excluded_ids_to_retrieval_and_serves_chunks(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    retriever = ChunkRetriever()
+    engine = QueryEngine(retriever=retriever, agent=FakeAgent())
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        response = client.post("/api/query", json={
+            "question": "스텐트 삭감돼?",
+            "excluded_ids": ["abc"],
+            "excluded_sources": ["노이즈"]
+        })
+        assert response.status_code == 200
+        assert retriever.received == [sorted(["abc", make_chunk_id("노이즈")])]
+
+        assert client.get("/api/chunks/abc").json() == {"id": "abc", "text": "전체 텍스트", "metadata": {}}
+        assert client.get("/api/chunks/missing").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,102 @@
+"""
+코드 카탈로그 테스트 (n-gram/접두어 검색, 페이지네이션, 자동완성, 청크 연결)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine, get_catalog
+from tools.code_catalog import CodeCatalog
+from conftest import FakeRetriever
+
+
+CATALOG = {
+    "treatment": [
+        {"code": "FE651", "name": "Cardiac Catheterization (심도자술)", "edi": "자651"},
+        {"code": "FE6541", "name": "경피적 관상동맥 스텐트 삽입술 (자654-1)", "edi": "M6541"},
+        {"code": "BZ001", "name": "혈액 검사", "edi": "B0010"}
+    ],
+    "material": [
+        {"code": "FE651", "name": "심도자 카테터", "edi": "J5083001"}
+    ]
+}
+
+
+def test_search_matches_substrings_and_paginates_sorted():
+    catalog = CodeCatalog(CATALOG)
+
+    result = catalog.search("catheter")
+    assert [item["code"] for item in result["items"]] == ["FE651"]
+    assert catalog.search("심도자")["total"] == 2
+    assert catalog.search("심 도자", code_type="material")["items"][0]["edi"] == "J5083001"
+    assert catalog.search("FE", field="name")["total"] == 0
+    assert catalog.search("스텐트삽입", field="name")["total"] == 1
+
+    page = catalog.search("", sort="name", order="desc", page=2, page_size=3)
+    assert page["total"] == 4
+    assert [item["name"] for item in page["items"]] == ["Cardiac Catheterization (심도자술)"]
+
+
+def test_typeahead_puts_code_prefix_before_name_matches():
+    catalog = CodeCatalog(CATALOG)
+
+    assert [item["code"] for item in catalog.typeahead("fe65", code_type="treatment")] == ["FE651", "FE6541"]
+    assert catalog.typeahead("m65")[0]["code"] == "FE6541"
+    assert [item["code"] for item in catalog.typeahead("혈액")] == ["BZ001"]
+    assert catalog.typeahead("") == []
+    assert len(catalog.typeahead("fe", limit=1)) == 1
+
+
+def test_linked_codes_include_edi_and_codes_in_name():
+    catalog = CodeCatalog(CATALOG)
+    entry = catalog.get("fe6541")[0]
+    assert entry["linked_codes"] == ["FE6541", "M6541", "자654-1"]
+    assert len(catalog.get("FE651")) == 2
+    assert catalog.get("FE651", code_type="material")[0]["name"] == "심도자 카테터"
+
+
+class LookupRetriever(FakeRetriever):
+    def lookup_codes(self, codes, exclude_ids=None):
+        chunks = {
+            "자654-1": [{"id": "a", "text": "자654-1 스텐트 인정기준", "metadata": {}, "score": 1.0}],
+            "M6541": [{"id": "a", "text": "자654-1 스텐트 인정기준", "metadata": {}, "score": 1.0},
+                      {"id": "b", "text": "M6541 산정 기준", "metadata": {}, "score": 1.0}]
+        }
+        return chunks.get(codes[0], [])
+
+
+class FakeEngine:
+    retriever = LookupRetriever()
+
+
+def test_api_codes_endpoints():
+    catalog = CodeCatalog(CATALOG)
+    app.dependency_overrides[get_catalog] = lambda: catalog
+    app.dependency_overrides[get_engine] = lambda: FakeEngine()
+    try:
+        client = TestClient(app)
+        response = client.get("/api/codes", params={"q": "심도자", "type": "treatment"})
+        assert response.status_code == 200
+        assert "Server-Timing" in response.headers
+        assert response.json()["total"] == 1
+
+        assert client.get("/api/codes/typeahead", params={"q": "BZ"}).json()[0]["code"] == "BZ001"
+        assert client.get("/api/codes", params={"sort": "type"}).status_code == 422
+
+        linked = client.get("/api/codes/FE6541/chunks").json()
+        assert [r["id"] for r in linked["results"]] == ["a", "b"]
+        assert client.get("/api/codes/없는코드/chunks").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_bundled_catalog_loads():
+    path = os.path.join(os.path.dirname(__file__), "data", "codes", "code_catalog.json")
+    catalog = CodeCatalog.load(path)
+    assert len(catalog) > 100
+    assert catalog.search("", code_type="material")["total"] > 0
@@ -0,0 +1,111 @@
+"""
+코드 역색인 테스트 (코드 → 청크, 임베딩 없는 조회, GET /api/lookup)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.query_engine import QueryEngine
+from tools.chunk_ids import make_chunk_id
+from tools.code_index import CodeIndex, extract_codes, CODE_INDEX_FILENAME
+from tools.faiss_retriever import FAISSRetriever
+from tools.index_version import publish_index_version
+from conftest import FakeRetriever
+
+
+CHUNKS = [
+    {"text": "자651-2 경피적 좌심방이 폐색술 (제2022-267호)", "metadata": {"doc_code": "자651-2"}},
+    {"text": "스텐트 M6561, M6562 산정 시 치료재료 J4083031 인정", "metadata": {"시술코드": "M6561"}},
+    {"text": "제2022년 개정 사항 참가123명", "metadata": {}},
+    {"text": "자656 스텐트 급여기준: M6561 시 3개까지 인정", "metadata": {"doc_code": "자656"}}
+]
+
+
+class NoEmbedder:
+    """코드 조회는 임베딩을 호출하지 않아야 함"""
+    def embed_text(self, text):
+        raise AssertionError("embed_text 호출됨")
+
+
+def _write_store(vector_store):
+    return vector_store(
+        [chunk["text"] for chunk in CHUNKS],
+        [chunk["metadata"] for chunk in CHUNKS],
+        np.zeros((len(CHUNKS), 4))
+    )
+
+
+def test_extract_codes_skips_years_and_words():
+    assert extract_codes(CHUNKS[0]["text"]) == {"자651-2", "제2022-267호"}
+    assert extract_codes(CHUNKS[1]["text"]) == {"M6561", "M6562", "J4083031"}
+    assert extract_codes(CHUNKS[2]["text"]) == set()
+    assert extract_codes("m6561 문의") == set()
+
+
+def test_lookup_intersects_codes_from_text_and_metadata():
+    code_index = CodeIndex.build(CHUNKS)
+    ids = [make_chunk_id(chunk["text"]) for chunk in CHUNKS]
+
+    assert code_index.lookup(["m6561"]) == [ids[1], ids[3]]
+    assert code_index.lookup(["M6561", "자656"]) == [ids[3]]
+    assert code_index.lookup(["M6561", "자651-2"]) == []
+    assert code_index.lookup(["없는코드"]) == []
+
+
+def test_publish_writes_index_and_retriever_serves_it_without_embedding(vector_store):
+    path = _write_store(vector_store)
+    publish_index_version(path)
+    assert os.path.exists(os.path.join(path, CODE_INDEX_FILENAME))
+
+    retriever = FAISSRetriever(embedder=NoEmbedder(), vector_store_path=path)
+    results = retriever.search_by_codes(procedure_code="M6561")
+    assert [r["text"] for r in results] == [CHUNKS[1]["text"], CHUNKS[3]["text"]]
+    assert results[0]["metadata"] == {"시술코드": "M6561"}
+
+
+def test_stale_index_file_is_rebuilt_from_metadata(vector_store):
+    path = _write_store(vector_store)
+    CodeIndex.build(CHUNKS[:1]).save(path)
+
+    retriever = FAISSRetriever(embedder=NoEmbedder(), vector_store_path=path)
+    assert retriever.code_index.chunk_count == len(CHUNKS)
+    assert len(retriever.lookup_codes(["J4083031"])) == 1
+
+
+class LookupRetriever(FakeRetriever):
+    def lookup_codes(self, codes, exclude_ids=None):
+        if codes == ["자656"]:
+            return [{"id": "abc", "text": "자656 급여기준", "metadata": {}, "score": 1.0}]
+        return []
+
+
+def test_api_lookup_falls_back_to_search_only_without_exact_hit(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    retriever = LookupRetriever([{"text": "유사 문서", "metadata": {}, "score": 0.5}])
+    engine = QueryEngine(retriever=retriever, agent=object())
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        exact = client.get("/api/lookup", params={"code": "자656"}).json()
+        assert exact["match"] == "exact"
+        assert exact["results"][0]["id"] == "abc"
+        assert retriever.queries == []
+
+        fallback = client.get("/api/lookup", params={"code": "m9999"}).json()
+        assert fallback["codes"] == ["M9999"]
+        assert fallback["match"] == "search"
+        assert retriever.queries == ["M9999 보험 인정기준"]
+
+        none = client.get("/api/lookup", params={"code": "M9999", "fallback": "false"}).json()
+        assert none["match"] == "none"
+        assert none["results"] == []
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,165 @@
+"""
+요청 마감 시간 전파 + 부하 적응형 기능 축소 테스트
+"""
+
+import sys
+import os
+import json
+import asyncio
+import contextvars
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.answer_agent import InsuranceAnswerAgent
+from agent.query_engine import QueryEngine
+from tools.answer_cache import AnswerCache
+from tools.deadline import (
+    DeadlinePolicy, answer_max_tokens, should_shed, SHED_FALLBACK, SHED_RERANK, SHED_MAX_TOKENS, SHED_VECTOR
+)
+from test_query_stream import FakeStreamingBedrock, _parse_sse
+from test_search_api import _make_engine
+from conftest import FakeAgent, FakeEmbedder, FakeRetriever
+
+
+def _policy(budget, queue_depth_step=0, embedding_timeout=0):
+    return DeadlinePolicy(
+        budget=budget,
+        skip_fallback_below=45,
+        skip_rerank_below=35,
+        reduce_tokens_below=25,
+        degraded_max_tokens=1500,
+        queue_depth_step=queue_depth_step,
+        embedding_timeout=embedding_timeout
+    )
+
+
+def test_shed_order_follows_remaining_time_and_queue_depth():
+    def run():
+        queue = {"depth": 0}
+        deadline = _policy(40, queue_depth_step=4).start(lambda: queue["depth"])
+        assert should_shed(SHED_FALLBACK)
+        assert not should_shed(SHED_RERANK)
+        assert answer_max_tokens(4000) == 4000
+
+        # 대기열이 길어지면 남은 시간과 관계없이 다음 단계까지 축소
+        queue["depth"] = 12
+        assert should_shed(SHED_RERANK)
+        assert answer_max_tokens(4000) == 1500
+        assert deadline.shed_steps == [SHED_FALLBACK, SHED_RERANK, SHED_MAX_TOKENS]
+
+    contextvars.copy_context().run(run)
+    # 마감 시간이 없는 호출(CLI, 테스트)은 축소하지 않음
+    assert not should_shed(SHED_FALLBACK)
+    assert answer_max_tokens(4000) == 4000
+
+
+class SheddingRetriever(FakeRetriever):
+    """검색기 안에서도 요청 마감 시간이 보이는지 확인"""
+    def __init__(self):
+        super().__init__([{"text": "자656 스텐트 급여기준", "metadata": {"source_file": "자656.pdf"}, "score": 0.1}])
+        self.shed = []
+
+    async def asearch_with_fallback(self, query, **kwargs):
+        self.shed.append((should_shed(SHED_FALLBACK), should_shed(SHED_RERANK)))
+        return await super().asearch_with_fallback(query, **kwargs)
+
+
+def test_low_budget_sheds_in_order_and_skips_cache():
+    agent = InsuranceAnswerAgent()
+    bedrock = FakeStreamingBedrock(["인정됨"])
+    agent.async_client.client = bedrock
+    retriever = SheddingRetriever()
+    engine = QueryEngine(
+        retriever=retriever,
+        agent=agent,
+        answer_cache=AnswerCache(db_path=""),
+        deadline_policy=_policy(30)
+    )
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        request = {"question": "스텐트 삭감돼?", "include_timings": True}
+        events = _parse_sse(client.post("/api/query/stream", json=request).text)
+        assert events[-1][0] == "done"
+        assert events[-1][1]["timings"]["shed"] == [SHED_FALLBACK, SHED_RERANK]
+        assert retriever.shed == [(True, True)]
+        assert bedrock.requests[0]["max_tokens"] == 4000
+
+        # 축소된 답변은 캐시하지 않으므로 같은 질문도 다시 생성
+        engine.deadline_policy = _policy(10)
+        client.post("/api/query/stream", json=request)
+        assert len(bedrock.requests) == 2
+        assert bedrock.requests[1]["max_tokens"] == 1500
+    finally:
+        app.dependency_overrides.clear()
+
+
+class SlowAgent(FakeAgent):
+    async def aanswer_query(self, question, **kwargs):
+        await asyncio.sleep(5)
+        return await super().aanswer_query(question, **kwargs)
+
+
+def test_claude_call_is_cut_at_deadline():
+    engine = QueryEngine(
+        retriever=SheddingRetriever(),
+        agent=SlowAgent("늦은 답변"),
+        answer_cache=AnswerCache(db_path=""),
+        deadline_policy=_policy(0.2)
+    )
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        response = TestClient(app).post("/api/query", json={"question": "스텐트 삭감돼?"})
+        assert response.status_code == 504
+        assert "claude" in response.json()["detail"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+class SlowEmbedder(FakeEmbedder):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    async def aembed_text(self, text):
+        self.calls += 1
+        await asyncio.sleep(5)
+        return self.embed_text(text)
+
+
+def test_slow_query_embedding_falls_back_to_bm25(vector_store, monkeypatch):
+    retriever = _make_engine(vector_store, monkeypatch).retriever
+    embedder = SlowEmbedder()
+    retriever.faiss_retriever.embedder = embedder
+    policy = _policy(60, embedding_timeout=0.1)
+
+    async def search():
+        deadline = policy.start()
+        assert await retriever.aembed_query("스텐트 삽입") is None
+        results = await retriever.asearch_with_fallback("스텐트 삽입", top_k=2, use_fallback=False)
+        return deadline, results
+
+    # 제한 시간을 넘긴 임베딩은 같은 요청에서 다시 호출하지 않고 BM25 결과만 사용
+    deadline, results = contextvars.copy_context().run(asyncio.run, search())
+    assert embedder.calls == 1
+    assert deadline.shed_steps == [SHED_VECTOR]
+    assert results and all(not result["vector_score"] for result in results)
+
+    # BM25만으로 만든 답변은 캐시하지 않음
+    agent = FakeAgent("인정됨")
+    engine = QueryEngine(retriever=retriever, agent=agent, answer_cache=AnswerCache(db_path=""), deadline_policy=policy)
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        request = {"question": "스텐트 삽입", "include_timings": True}
+        response = client.post("/api/query", json=request)
+        assert response.status_code == 200
+        assert response.json()["timings"]["shed"] == [SHED_VECTOR]
+        client.post("/api/query", json=request)
+        assert agent.calls == 2
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,234 @@
+"""
+배치 임베딩 테스트 (동시 요청, 입력 순서 유지, 스로틀 재시도, float32 행렬, 실패/취소 처리)
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import threading
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+from botocore.exceptions import ClientError
+
+from tools.bedrock_client import AsyncBedrockClient
+from tools.embedder_tool import TitanEmbedder, EmbeddingError
+from tools.embedding_backend import embed_chunks
+from tools.embedding_store import EmbeddingStore
+from tools.ingest_jobs import JobCancelled
+from tools.lru_cache import LRUCache
+from tools.semantic_cache import SemanticAnswerCache
+from tools.answer_cache import AnswerCache
+from agent.query_engine import QueryEngine
+
+
+class FakeTitanRuntime:
+    """텍스트 번호를 벡터로 돌려주는 지연 있는 Titan (지정한 텍스트는 스로틀/실패)"""
+    def __init__(self, latency=0.05, throttle=None, fail=None):
+        self.latency = latency
+        self.throttle = dict(throttle or {})
+        self.fail = set(fail or [])
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def invoke_model(self, modelId, body, **kwargs):
+        text = json.loads(body)["inputText"]
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            with self.lock:
+                if self.throttle.get(text, 0) > 0:
+                    self.throttle[text] -= 1
+                    raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "InvokeModel")
+            if text in self.fail:
+                raise ClientError({"Error": {"Code": "ValidationException", "Message": "too long"}}, "InvokeModel")
+            value = float(text.split("-")[1])
+            return {"body": io.BytesIO(json.dumps({"embedding": [value, value + 0.5, 1.0]}).encode())}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def _embedder(runtime, store=None):
+    embedder = TitanEmbedder()
+    embedder.async_client = AsyncBedrockClient(runtime)
+    embedder.batch_client = embedder.async_client
+    embedder.store = store or EmbeddingStore(db_path="")
+    embedder.retry_base_delay = 0.01
+    return embedder
+
+
+def test_results_keep_input_order_as_float32_matrix():
+    runtime = FakeTitanRuntime(latency=0.0)
+    texts = [f"chunk-{i}" for i in range(25)]
+    embeddings = _embedder(runtime).embed_texts(texts, concurrency=4)
+
+    assert embeddings.dtype == np.float32
+    assert embeddings.flags["C_CONTIGUOUS"]
+    assert embeddings.shape == (25, 3)
+    assert embeddings[:, 0].tolist() == list(range(25))
+    assert _embedder(runtime).embed_texts([]).shape == (0, 1024)
+
+
+def test_throughput_scales_with_concurrency():
+    texts = [f"chunk-{i}" for i in range(16)]
+
+    runtime = FakeTitanRuntime(latency=0.05)
+    start = time.perf_counter()
+    _embedder(runtime).embed_texts(texts, concurrency=1)
+    serial = time.perf_counter() - start
+
+    runtime = FakeTitanRuntime(latency=0.05)
+    start = time.perf_counter()
+    _embedder(runtime).embed_texts(texts, concurrency=8)
+    concurrent = time.perf_counter() - start
+
+    assert runtime.max_in_flight == 8
+    assert concurrent < serial / 4
+
+
+def test_throttled_texts_are_retried_and_failures_reported():
+    runtime = FakeTitanRuntime(latency=0.0, throttle={"chunk-1": 2}, fail={"chunk-3"})
+    progress = []
+    try:
+        _embedder(runtime).embed_texts([f"chunk-{i}" for i in range(5)], progress_callback=progress.append)
+        assert False, "EmbeddingError가 발생해야 함"
+    except EmbeddingError as e:
+        assert list(e.failed) == [3]
+        assert e.embeddings[1, 0] == 1.0
+        assert not e.embeddings[3].any()
+    assert runtime.calls == 7
+    assert sum(progress) == 5
+
+    # 파이프라인 공통 처리: 실패한 청크만 embedding None (인덱스에서 제외)
+    chunks = embed_chunks(
+        _embedder(FakeTitanRuntime(latency=0.0, fail={"chunk-3"})),
+        [{"text": f"chunk-{i}"} for i in range(5)]
+    )
+    assert [chunk["embedding"] is None for chunk in chunks] == [False, False, False, True, False]
+
+
+def test_progress_callback_exception_cancels_remaining_requests():
+    runtime = FakeTitanRuntime(latency=0.02)
+
+    def cancel(count):
+        raise JobCancelled()
+
+    try:
+        _embedder(runtime).embed_texts([f"chunk-{i}" for i in range(50)], progress_callback=cancel, concurrency=2)
+        assert False, "취소되어야 함"
+    except JobCancelled:
+        pass
+    assert runtime.calls < 10
+
+
+def test_cached_texts_skip_bedrock_across_runs(tmp_path):
+    store = EmbeddingStore(db_path=str(tmp_path / "embeddings.sqlite"))
+    runtime = FakeTitanRuntime(latency=0.0)
+    texts = ["chunk-1", "chunk-2", "chunk-1"]
+
+    first = _embedder(runtime, store).embed_texts(texts)
+    assert runtime.calls == 2  # 같은 텍스트는 한 번만 요청
+
+    # 청크 분할을 바꿔 다시 실행해도 이미 본 텍스트는 캐시에서 가져옴
+    progress = []
+    second = _embedder(runtime, EmbeddingStore(db_path=store.db_path)).embed_texts(
+        ["chunk-2", "chunk-7", "chunk-1"], progress_callback=progress.append
+    )
+    assert runtime.calls == 3
+    assert second.tolist() == [first[1].tolist(), [7.0, 7.5, 1.0], first[0].tolist()]
+    assert progress == [2, 1]
+
+    # 모델/차원이 다르면 다른 키
+    embedder = _embedder(runtime, store)
+    embedder.dimensions = 256
+    embedder.embed_texts(["chunk-1"])
+    assert runtime.calls == 4
+
+
+def test_store_stats_and_compact(tmp_path):
+    store = EmbeddingStore(db_path=str(tmp_path / "embeddings.sqlite"))
+    assert store.stats()["entries"] == 0
+
+    vectors = {EmbeddingStore.make_key("m", 3, True, f"t{i}"): np.full(3, i, dtype='float32') for i in range(4)}
+    store.put_many(vectors, "m")
+    store.put_many({EmbeddingStore.make_key("old", 3, True, "t"): np.zeros(3)}, "old")
+
+    found = store.get_many(list(vectors) + ["missing"])
+    assert len(found) == 4 and found[list(vectors)[2]].tolist() == [2.0, 2.0, 2.0]
+
+    stats = store.stats()
+    assert stats["entries"] == 5 and stats["bytes"] > 0
+    assert {m["model_id"] for m in stats["models"]} == {"m", "old"}
+
+    result = store.compact(model_id="m")
+    assert result["removed"] == 1
+    assert store.stats()["entries"] == 4
+    assert store.compact(max_age_days=-1)["removed"] == 4
+
+
+def test_repeat_queries_are_served_from_query_cache():
+    runtime = FakeTitanRuntime(latency=0.0)
+    embedder = _embedder(runtime)
+    embedder.query_cache = LRUCache(max_entries=2, ttl=60)
+
+    first = embedder.embed_text("chunk-1")
+    assert embedder.embed_text("chunk-1") is first
+    assert asyncio.run(embedder.aembed_text("chunk-1")) is first
+    assert runtime.calls == 1
+    assert first.dtype == np.float32 and not first.flags.writeable
+
+    # 캐시한 벡터를 정규화해도 원본은 바뀌지 않음
+    SemanticAnswerCache._to_vector(first)
+    assert first.tolist() == [1.0, 1.5, 1.0]
+
+    embedder.embed_text("chunk-2")
+    embedder.embed_text("chunk-3")
+    embedder.embed_text("chunk-1")
+    assert runtime.calls == 4
+    assert embedder.query_cache.stats()["hits"] == 2
+
+
+def test_seeded_queries_skip_bedrock_on_first_request(tmp_path):
+    runtime = FakeTitanRuntime(latency=0.0)
+    embedder = _embedder(runtime)
+    assert embedder.seed_query_cache(["chunk-4", "chunk-5", "chunk-4", ""]) == 2
+    assert runtime.calls == 2
+
+    assert embedder.embed_text("chunk-5").tolist() == [5.0, 5.5, 1.0]
+    assert runtime.calls == 2
+
+    class WarmRetriever:
+        def warm_query_embeddings(self, queries):
+            return embedder.seed_query_cache(queries)
+
+    path = tmp_path / "warmup.txt"
+    path.write_text("# 자주 묻는 질문\nchunk-6\n\nchunk-7\n", encoding="utf-8")
+    engine = QueryEngine(retriever=WarmRetriever(), agent=object(), answer_cache=AnswerCache(db_path=""))
+    assert engine.warm_query_embeddings(str(path)) == 2
+    assert runtime.calls == 4
+
+
+def test_warmup_failure_is_logged(capsys):
+    from api.main import _log_warmup_failure
+
+    def fail():
+        raise RuntimeError("throttled")
+
+    async def run():
+        task = asyncio.create_task(asyncio.to_thread(fail))
+        task.add_done_callback(_log_warmup_failure)
+        await asyncio.wait([task])
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert "[WARNING] 질의 임베딩 warmup 실패: throttled" in capsys.readouterr().out
@@ -0,0 +1,76 @@
+"""
+임베딩 백엔드 선택(EMBEDDING_BACKEND) + 로컬 해싱 임베딩 오프라인 파이프라인 테스트
+"""
+
+import sys
+import os
+import asyncio
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+import pytest
+
+from benchmark_ingestion import synthetic_items
+from tools.embedding_backend import EmbeddingBackend, LocalHashEmbedder, create_embedder
+from tools.embedder_tool import TitanEmbedder
+from tools.faiss_retriever import FAISSRetriever
+from pipeline import DataPreprocessor
+
+
+def test_local_embedding_is_deterministic_and_normalized():
+    texts = ["고관절 전치환술 인정기준", "슬관절 인공관절 재치환술", ""]
+    embeddings = LocalHashEmbedder(dimensions=256).embed_texts(texts)
+    assert embeddings.shape == (3, 256) and embeddings.dtype == np.float32
+
+    # 다른 인스턴스에서도 같은 벡터 (CRC32 해싱, 프로세스별 hash seed와 무관)
+    again = LocalHashEmbedder(dimensions=256)
+    assert np.array_equal(embeddings[0], again.embed_text(texts[0]))
+    assert np.array_equal(embeddings[1], asyncio.run(again.aembed_text(texts[1])))
+
+    assert np.isclose(np.linalg.norm(embeddings[0]), 1.0)
+    assert not embeddings[2].any()
+
+    # 문자 n-gram이 겹치는 텍스트가 더 가까움
+    query = again.embed_text("고관절 전치환술")
+    assert query @ embeddings[0] > query @ embeddings[1]
+
+
+def test_create_embedder_follows_embedding_backend(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_BACKEND", "local")
+    monkeypatch.setenv("EMBEDDING_DIMENSIONS", "512")
+    embedder = create_embedder()
+    assert isinstance(embedder, LocalHashEmbedder) and embedder.dimensions == 512
+    assert isinstance(embedder, EmbeddingBackend)
+
+    monkeypatch.setenv("EMBEDDING_BACKEND", "bedrock")
+    assert isinstance(create_embedder(), TitanEmbedder)
+    assert isinstance(create_embedder(), EmbeddingBackend)
+
+    with pytest.raises(ValueError):
+        create_embedder("openai")
+
+
+def test_pipeline_and_retriever_run_offline_with_local_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_BACKEND", "local")
+    monkeypatch.setenv("EMBEDDING_DIMENSIONS", "256")
+    monkeypatch.setenv("VECTOR_STORE_PATH", str(tmp_path / "vector_store"))
+    monkeypatch.setenv("INDEX_MMAP", "false")
+    monkeypatch.setenv("FAISS_COARSE_DIMENSIONS", "0")
+
+    items = synthetic_items(20)
+    items[7]["인정기준"] = "경피적 좌심방이 폐색술은 항응고제 투여가 어려운 비판막성 심방세동 환자에게 인정"
+    raw_path = tmp_path / "criteria.json"
+    raw_path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+
+    preprocessor = DataPreprocessor()
+    assert isinstance(preprocessor.embedder, LocalHashEmbedder)
+    preprocessor.run_pipeline(str(raw_path))
+
+    retriever = FAISSRetriever()
+    assert isinstance(retriever.embedder, LocalHashEmbedder)
+    assert retriever.index.d == 256 and retriever.index.ntotal == 20 * 3 + 10
+
+    results = retriever.search("좌심방이 폐색술 항응고제", top_k=3)
+    assert results[0]["metadata"]["chunk_id"] == "synthetic_7_basic"
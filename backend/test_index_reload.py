@@ -0,0 +1,143 @@
+"""
+인덱스 무중단 리로드 테스트 (RCU 교체, 진행 중 요청은 이전 스냅샷 사용)
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.query_engine import QueryEngine
+from tools.index_version import publish_index_version
+from conftest import FakeAgent, FakeEmbedder, FakeRetriever
+
+
+class EchoAgent(FakeAgent):
+    """검색된 문서를 그대로 출처로 돌려주는 가짜 답변 에이전트"""
+
+    async def aanswer_query(self, question, **kwargs):
+        result = await super().aanswer_query(question, **kwargs)
+        return dict(result, sources=[{"text": doc["text"]} for doc in kwargs["retrieved_docs"]])
+
+
+class GatedRetriever(FakeRetriever):
+    """gate가 열릴 때까지 검색을 붙잡아 두는 가짜 검색기"""
+
+    def __init__(self, name, gate=None):
+        super().__init__([{"text": f"{name} 문서", "metadata": {}, "score": 1.0}])
+        self.gate = gate
+
+    async def asearch_with_fallback(self, query, **kwargs):
+        if self.gate is not None:
+            await self.gate.wait()
+        return await super().asearch_with_fallback(query, **kwargs)
+
+
+def test_inflight_query_finishes_on_old_snapshot(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+
+    async def scenario():
+        gate = asyncio.Event()
+        engine = QueryEngine(
+            retriever=GatedRetriever("이전", gate),
+            agent=EchoAgent(),
+            retriever_factory=lambda: GatedRetriever("새")
+        )
+
+        inflight = asyncio.ensure_future(engine.aanswer(question="스텐트 2개 삭감돼?"))
+        await asyncio.sleep(0.01)
+        engine.reload_index()
+        after = await engine.aanswer(question="스텐트 3개 삭감돼?")
+        gate.set()
+        return (await inflight), after
+
+    before, after = asyncio.run(scenario())
+    assert before["sources"] == [{"text": "이전 문서"}]
+    assert after["sources"] == [{"text": "새 문서"}]
+
+
+def test_failed_reload_keeps_serving_old_index(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+
+    def broken_factory():
+        raise RuntimeError("faiss_index.bin 손상")
+
+    old = GatedRetriever("이전")
+    engine = QueryEngine(retriever=old, agent=FakeAgent(), retriever_factory=broken_factory)
+
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        response = TestClient(app).post("/api/admin/reload", headers={"X-Admin-Token": "secret"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 500
+    assert "기존 인덱스 유지" in response.json()["detail"]
+    assert engine.retriever is old
+
+
+def test_admin_endpoints_are_closed_without_valid_token(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    engine = QueryEngine(retriever=GatedRetriever("이전"), agent=FakeAgent())
+
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        # ADMIN_TOKEN 미설정이면 헤더와 관계없이 비활성화
+        assert client.post("/api/admin/reload").status_code == 503
+        assert client.get("/api/admin/index", headers={"X-Admin-Token": ""}).status_code == 503
+
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        assert client.get("/api/admin/index").status_code == 403
+        assert client.get("/api/admin/index", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        assert client.get("/api/admin/index", headers={"X-Admin-Token": "secret"}).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _write_and_publish(vector_store, texts):
+    """작은 벡터 스토어 저장 후 버전 발행 (파이프라인과 같은 순서)"""
+    path = vector_store(texts, [{"type": "인정기준"}] * len(texts), np.eye(len(texts), 4))
+    return publish_index_version(path)
+
+
+def test_watcher_reloads_published_index(tmp_path, vector_store, monkeypatch):
+    path = str(tmp_path)
+    monkeypatch.setenv("VECTOR_STORE_PATH", path)
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    _write_and_publish(vector_store, ["자656 스텐트", "뇌동맥류 코일"])
+
+    from tools.hybrid_retriever import HybridRetriever
+    first = HybridRetriever(use_reranker=False, embedder=FakeEmbedder([1.0, 0.0, 0.0, 0.0]))
+    engine = QueryEngine(retriever=first, agent=FakeAgent())
+    assert engine.index_info()["vectors"] == 2
+
+    async def scenario():
+        watcher = asyncio.ensure_future(engine.watch_index(0.01))
+        version = _write_and_publish(vector_store, ["자656 스텐트", "뇌동맥류 코일", "새 고시"])
+        for _ in range(200):
+            if engine.loaded_index_version == version:
+                break
+            await asyncio.sleep(0.01)
+        watcher.cancel()
+        return version
+
+    version = asyncio.run(scenario())
+    assert engine.loaded_index_version == version
+    assert engine.index_info()["vectors"] == 3
+    assert engine.index_info()["bm25_docs"] == 3
+    # 새 검색기는 기존 임베더(Bedrock 클라이언트)를 재사용
+    assert engine.retriever is not first
+    assert engine.retriever.faiss_retriever.embedder is first.faiss_retriever.embedder
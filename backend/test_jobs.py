@@ -0,0 +1,114 @@
+"""
+백그라운드 전처리 작업 테스트 (별도 프로세스 실행, 단계별 진행률, 취소)
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_jobs
+from tools.ingest_jobs import JobManager
+
+
+def staged_job(reporter, count):
+    reporter.stage("parsed")
+    reporter.complete(count)
+    reporter.stage("embedded", total=count)
+    for _ in range(count):
+        reporter.advance()
+    reporter.stage("indexed", total=count)
+    reporter.complete(count)
+
+
+def endless_job(reporter):
+    reporter.stage("embedded", total=1000)
+    while True:
+        time.sleep(0.05)
+        reporter.advance()
+
+
+def failing_job(reporter):
+    reporter.stage("parsed")
+    raise ValueError("잘못된 데이터 형식")
+
+
+def wait_finished(jobs, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = jobs.get(job_id)
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"작업이 끝나지 않음: {jobs.get(job_id)}")
+
+
+def test_job_reports_stage_progress():
+    jobs = JobManager(nice=0)
+    try:
+        job = jobs.submit("test", staged_job, args=(5,))
+        assert job["status"] in ("queued", "running")
+
+        job = wait_finished(jobs, job["job_id"])
+        assert job["status"] == "succeeded"
+        assert [stage["name"] for stage in job["stages"]] == ["parsed", "embedded", "indexed"]
+        embedded = job["stages"][1]
+        assert embedded["done"] == 5 and embedded["total"] == 5
+        assert embedded["progress"] == 1.0 and embedded["finished"]
+    finally:
+        jobs.shutdown()
+
+
+def test_running_job_can_be_cancelled():
+    jobs = JobManager(nice=0)
+    try:
+        job_id = jobs.submit("test", endless_job)["job_id"]
+        deadline = time.time() + 30
+        while not jobs.get(job_id)["stages"] and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert jobs.cancel(job_id)["cancel_requested"]
+        job = wait_finished(jobs, job_id)
+        assert job["status"] == "cancelled"
+    finally:
+        jobs.shutdown()
+
+
+def test_queued_job_cancelled_and_failure_reported():
+    jobs = JobManager(max_running=1, nice=0)
+    try:
+        first = jobs.submit("test", failing_job)["job_id"]
+        second = jobs.submit("test", staged_job, args=(3,))["job_id"]
+        assert jobs.get(second)["status"] == "queued"
+        assert jobs.cancel(second)["status"] == "cancelled"
+
+        job = wait_finished(jobs, first)
+        assert job["status"] == "failed"
+        assert "잘못된 데이터 형식" in job["error"]
+    finally:
+        jobs.shutdown()
+
+
+def test_job_endpoints():
+    jobs = JobManager(nice=0)
+    app.dependency_overrides[get_jobs] = lambda: jobs
+    try:
+        client = TestClient(app)
+        response = client.post("/api/preprocess", json={"data_path": "./data/raw/없는파일.json"})
+        assert response.status_code == 400
+
+        job_id = jobs.submit("test", staged_job, args=(2,))["job_id"]
+        wait_finished(jobs, job_id)
+        response = client.get(f"/api/jobs/{job_id}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "succeeded"
+        assert client.get("/api/jobs").json()["jobs"][0]["job_id"] == job_id
+        assert client.get("/api/jobs/unknown").status_code == 404
+        assert client.post("/api/jobs/unknown/cancel").status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+        jobs.shutdown()
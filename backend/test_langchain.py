@@ -8,10 +8,10 @@ import os
 # src 경로 추가
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from dotenv import load_dotenv
+from tools.env import load_env
 
 # 환경 변수 로드
-load_dotenv()
+load_env()
 
 print("=" * 60)
 print("🦜🔗 LangChain Agent 테스트")
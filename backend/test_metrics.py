@@ -0,0 +1,67 @@
+"""
+Prometheus 메트릭 테스트 (단계별 지연 시간, 후보 수, Bedrock 스로틀, /metrics 엔드포인트)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from api.main import app
+from tools.bm25_retriever import BM25Retriever
+from tools.metrics import stage_timer, record_bedrock_error, count_cache
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_stage_timer_records_latency_even_on_error():
+    before = sample("rag_stage_latency_seconds_count", stage="test_stage")
+    with stage_timer("test_stage"):
+        pass
+    try:
+        with stage_timer("test_stage"):
+            raise ValueError()
+    except ValueError:
+        pass
+    assert sample("rag_stage_latency_seconds_count", stage="test_stage") == before + 2
+
+
+def test_bm25_search_records_stage_and_candidates(tmp_path):
+    retriever = BM25Retriever(vector_store_path=str(tmp_path))
+    retriever.build_index(
+        ["스텐트 삽입 인정기준", "스텐트 제외사항", "고관절 치환술"],
+        [{"id": 1}, {"id": 2}, {"id": 3}]
+    )
+    latency_before = sample("rag_stage_latency_seconds_count", stage="bm25_scores")
+    candidates_before = sample("rag_stage_candidates_total", stage="bm25_scores")
+
+    results = retriever.search("스텐트", top_k=5)
+
+    assert len(results) == 2
+    assert sample("rag_stage_latency_seconds_count", stage="bm25_scores") == latency_before + 1
+    assert sample("rag_stage_candidates_total", stage="bm25_scores") == candidates_before + 2
+
+
+def test_bedrock_throttle_counted_separately():
+    model = "test-model"
+    throttle = ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "InvokeModel")
+    record_bedrock_error(model, throttle)
+    record_bedrock_error(model, TimeoutError())
+
+    assert sample("rag_bedrock_errors_total", model=model, code="ThrottlingException") == 1
+    assert sample("rag_bedrock_errors_total", model=model, code="TimeoutError") == 1
+    assert sample("rag_bedrock_throttles_total", model=model) == 1
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    count_cache("answer", "memory_hit")
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'rag_cache_requests_total{cache="answer",result="memory_hit"}' in response.text
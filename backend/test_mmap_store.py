@@ -0,0 +1,125 @@
+"""
+mmap 인덱스 저장소 테스트 (pickle 로드와 같은 검색 결과, BM25 점수 일치)
+"""
+
+import sys
+import os
+import pickle
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+
+from tools.bm25_retriever import BM25Retriever
+from tools.faiss_retriever import FAISSRetriever
+from tools.hybrid_retriever import HybridRetriever
+from tools.mmap_store import export_mmap_store, current_mmap_dir, ChunkStore, MmapBM25
+from conftest import FakeEmbedder
+
+
+DOCUMENTS = [
+    "직경 10mm 이상의 비파열성 뇌동맥류에 Flow-diverter 사용 시 급여 인정",
+    "직경 10mm 미만의 비파열성 뇌동맥류는 제외",
+    "LM과 LAD에 스텐트 삽입 시 단일혈관 및 추가혈관 수가 산정",
+    "스텐트 2개 이상 삽입 시 추가 산정 기준",
+    "스텐트 스텐트 스텐트 반복 문서"
+]
+METADATA = [
+    {
+        "doc_code": f"D{i}",
+        "시술코드": "M6561" if i % 2 else "M6562",
+        "pdf_title": "뇌동맥류 고시" if i < 2 else "스텐트 고시"
+    }
+    for i in range(len(DOCUMENTS))
+]
+VECTORS = np.random.default_rng(0).random((len(DOCUMENTS), 8), dtype='float32')
+
+
+def _embedder():
+    return FakeEmbedder([1.0] + [0.0] * 7)
+
+
+def test_mmap_bm25_scores_match_rank_bm25(vector_store, monkeypatch):
+    path = vector_store(DOCUMENTS, METADATA, VECTORS)
+    monkeypatch.setenv("INDEX_MMAP", "false")
+    bm25 = BM25Retriever(vector_store_path=path)
+    directory = export_mmap_store(path)
+    mmap_bm25 = MmapBM25(directory)
+
+    for query in ["스텐트 삽입", "10mm 이상 뇌동맥류", "없는 단어", "스텐트 스텐트"]:
+        tokens = bm25._tokenize(query)
+        np.testing.assert_allclose(
+            mmap_bm25.get_scores(tokens), bm25.bm25.get_scores(tokens), rtol=1e-6, atol=1e-9
+        )
+
+
+def test_mmap_mode_returns_same_results_as_pickle(vector_store, monkeypatch):
+    path = vector_store(DOCUMENTS, METADATA, VECTORS)
+    export_mmap_store(path)
+
+    monkeypatch.setenv("INDEX_MMAP", "false")
+    faiss_pickle = FAISSRetriever(embedder=_embedder(), vector_store_path=path)
+    bm25_pickle = BM25Retriever(vector_store_path=path)
+
+    monkeypatch.setenv("INDEX_MMAP", "true")
+    faiss_mmap = FAISSRetriever(embedder=_embedder(), vector_store_path=path)
+    bm25_mmap = BM25Retriever(vector_store_path=path)
+
+    assert isinstance(faiss_mmap.metadata, ChunkStore)
+    assert isinstance(bm25_mmap.bm25, MmapBM25)
+
+    filters = {"시술코드": "M6561"}
+    assert faiss_mmap.search("스텐트", top_k=3) == faiss_pickle.search("스텐트", top_k=3)
+    assert faiss_mmap.search("스텐트", top_k=2, filter_codes=filters) == \
+        faiss_pickle.search("스텐트", top_k=2, filter_codes=filters)
+    assert bm25_mmap.search("스텐트 삽입", top_k=3) == bm25_pickle.search("스텐트 삽입", top_k=3)
+    assert list(faiss_mmap.metadata) == list(faiss_pickle.metadata)
+
+
+def test_document_fallback_decodes_only_matching_chunks(vector_store, monkeypatch):
+    path = vector_store(DOCUMENTS, METADATA, VECTORS)
+    export_mmap_store(path)
+    monkeypatch.setenv("INDEX_MMAP", "true")
+    retriever = HybridRetriever(use_reranker=False, embedder=_embedder(), vector_store_path=path)
+    assert isinstance(retriever.faiss_retriever.metadata, ChunkStore)
+
+    # 로드 이후에는 요청마다 저장소 전체를 디코딩하지 않고 일치하는 청크만 읽음
+    decoded = []
+    getitem = ChunkStore.__getitem__
+    monkeypatch.setattr(ChunkStore, "__getitem__", lambda self, i: decoded.append(i) or getitem(self, i))
+
+    chunks = retriever.get_all_chunks_by_doc_code("D3")
+    assert [chunk["text"] for chunk in chunks] == [DOCUMENTS[3]]
+    assert decoded == [3]
+
+    decoded.clear()
+    chunks = retriever.get_all_chunks_by_pdf_title("뇌동맥류", max_chunks=5)
+    assert [chunk["text"] for chunk in chunks] == DOCUMENTS[:2]
+    assert [chunk["rank"] for chunk in chunks] == [1, 2]
+    assert decoded == [0, 1]
+
+
+def test_stale_mmap_store_falls_back_to_pickle(vector_store, monkeypatch):
+    path = vector_store(DOCUMENTS, METADATA, VECTORS)
+    export_mmap_store(path)
+    assert current_mmap_dir(path) is not None
+
+    # 파이프라인이 pickle 인덱스만 다시 저장한 경우
+    with open(os.path.join(path, "metadata.pkl"), 'wb') as f:
+        pickle.dump([{"text": "새 문서", "metadata": {}}], f)
+    assert current_mmap_dir(path) is None
+
+    monkeypatch.setenv("INDEX_MMAP", "true")
+    retriever = FAISSRetriever(embedder=_embedder(), vector_store_path=path)
+    assert not isinstance(retriever.metadata, ChunkStore)
+
+
+def test_export_keeps_previous_version_for_mapped_workers(vector_store):
+    path = vector_store(DOCUMENTS, METADATA, VECTORS)
+    first = export_mmap_store(path)
+    second = export_mmap_store(path)
+    third = export_mmap_store(path)
+
+    assert current_mmap_dir(path) == third
+    assert os.path.isdir(second)
+    assert not os.path.exists(first)
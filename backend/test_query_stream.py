@@ -0,0 +1,107 @@
+"""
+SSE 스트리밍 질의 테스트 (로컬 가짜 스트리밍 모델 사용, AWS 자격증명 불필요)
+"""
+
+import sys
+import os
+import json
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.answer_agent import InsuranceAnswerAgent
+from agent.query_engine import QueryEngine
+from tools.answer_cache import AnswerCache
+from conftest import FakeRetriever
+
+
+class FakeStreamingBedrock:
+    """invoke_model_with_response_stream을 흉내내는 가짜 Bedrock 클라이언트"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.requests = []
+
+    def invoke_model_with_response_stream(self, modelId, body, **kwargs):
+        self.requests.append(json.loads(body))
+        events = [{"chunk": {"bytes": json.dumps({"type": "message_start"}).encode()}}]
+        for token in self.tokens:
+            payload = {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": token}
+            }
+            events.append({"chunk": {"bytes": json.dumps(payload).encode()}})
+        events.append({"chunk": {"bytes": json.dumps({"type": "message_stop"}).encode()}})
+        return {"body": iter(events)}
+
+
+STENT_DOCUMENT = {
+    "text": "자656 경피적 관상동맥 스텐트 삽입술 급여기준",
+    "metadata": {"type": "인정기준", "source_file": "자656.pdf"},
+    "score": 0.1
+}
+
+
+def _parse_sse(body: str):
+    """SSE 응답 본문을 (이벤트명, 데이터) 리스트로 변환"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_query_stream_sends_sources_first_then_tokens():
+    tokens = ["📋 문서 분석", "\n판단: ", "인정됨"]
+    agent = InsuranceAnswerAgent()
+    agent.async_client.client = FakeStreamingBedrock(tokens)
+    engine = QueryEngine(
+        retriever=FakeRetriever([STENT_DOCUMENT]), agent=agent, answer_cache=AnswerCache(db_path="")
+    )
+
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        response = client.post("/api/query/stream", json={"question": "스텐트 2개 삭감돼?"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(response.text)
+    names = [name for name, _ in events]
+    assert names[0] == "sources"
+    assert names[-1] == "done"
+    assert names[1:-1] == ["token"] * len(tokens)
+
+    assert events[0][1]["sources"][0]["filename"] == "자656.pdf"
+    assert "".join(data["text"] for name, data in events if name == "token") == "".join(tokens)
+    assert events[-1][1]["answer"] == "".join(tokens)
+
+
+def test_query_stream_reports_model_error_as_event():
+    class FailingBedrock:
+        def invoke_model_with_response_stream(self, **kwargs):
+            raise RuntimeError("ThrottlingException")
+
+    agent = InsuranceAnswerAgent()
+    agent.async_client.client = FailingBedrock()
+    engine = QueryEngine(
+        retriever=FakeRetriever([STENT_DOCUMENT]), agent=agent, answer_cache=AnswerCache(db_path="")
+    )
+
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        response = client.post("/api/query/stream", json={"question": "스텐트 2개 삭감돼?"})
+    finally:
+        app.dependency_overrides.clear()
+
+    events = _parse_sse(response.text)
+    assert [name for name, _ in events] == ["sources", "error"]
+    assert "ThrottlingException" in events[-1][1]["detail"]
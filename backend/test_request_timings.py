@@ -0,0 +1,102 @@
+"""
+요청별 단계 시간 테스트 (Server-Timing 헤더, include_timings 응답 필드)
+"""
+
+import sys
+import os
+import asyncio
+import json
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.query_engine import QueryEngine
+from tools.metrics import stage_timer, count_candidates, context_bound, record_value
+from conftest import FakeAgent, FakeRetriever
+
+
+class TimedRetriever(FakeRetriever):
+    """FAISS 검색은 스레드 풀에서, 리랭크는 이벤트 루프에서 기록하는 가짜 검색기"""
+
+    def _search(self):
+        with stage_timer("faiss_search"):
+            pass
+        count_candidates("faiss_search", 7)
+        return [{"text": "스텐트 인정기준", "metadata": {}, "score": 1.0}]
+
+    async def asearch_with_fallback(self, query, executor=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(executor, context_bound(partial(self._search)))
+        with stage_timer("cohere_rerank"):
+            await asyncio.sleep(0)
+        return results
+
+
+def _sources(retrieved_docs):
+    return [{"type": "인정기준", "score": 1.0, "id": "c1", "snippet": d["text"]} for d in retrieved_docs]
+
+
+class TimedAgent(FakeAgent):
+    def prepare_query(self, question, material_code, procedure_code, retrieved_docs):
+        return question, "", _sources(retrieved_docs)
+
+    async def aanswer_query(self, question, **kwargs):
+        record_value("prompt_chars", 1234)
+        with stage_timer("claude"):
+            await asyncio.sleep(0.01)
+        result = await super().aanswer_query(question, **kwargs)
+        return dict(result, sources=_sources(kwargs["retrieved_docs"]))
+
+    async def astream_claude(self, user_question, context, conversation_history=None):
+        with stage_timer("claude"):
+            yield "판단: 인정됨"
+
+
+def make_client(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    engine = QueryEngine(retriever=TimedRetriever(), agent=TimedAgent())
+    app.dependency_overrides[get_engine] = lambda: engine
+    return TestClient(app)
+
+
+def test_query_returns_server_timing_and_opt_in_timings(monkeypatch):
+    client = make_client(monkeypatch)
+    try:
+        response = client.post("/api/query", json={"question": "스텐트 삭감돼?"})
+        assert response.status_code == 200
+        header = response.headers["server-timing"]
+        assert "faiss_search;dur=" in header
+        assert "cohere_rerank;dur=" in header
+        assert "claude;dur=" in header
+        assert "total;dur=" in header
+        assert response.json()["timings"] is None
+
+        response = client.post("/api/query", json={"question": "스텐트 삭감돼?", "include_timings": True})
+        timings = response.json()["timings"]
+        assert timings["stages"]["claude"] >= 10
+        assert timings["candidates"]["faiss_search"] == 7
+        assert timings["prompt_chars"] == 1234
+        assert timings["total_ms"] >= timings["stages"]["claude"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_stream_done_event_includes_timings(monkeypatch):
+    client = make_client(monkeypatch)
+    try:
+        response = client.post("/api/query/stream", json={"question": "스텐트 삭감돼?", "include_timings": True})
+        events = {}
+        for message in response.text.strip().split("\n\n"):
+            event_line, data_line = message.split("\n")
+            events[event_line[len("event: "):]] = json.loads(data_line[len("data: "):])
+
+        timings = events["done"]["timings"]
+        assert "faiss_search" in timings["stages"]
+        assert "claude" in timings["stages"]
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,116 @@
+"""
+/api/search 테스트 (답변 생성 없이 검색 결과 + 검색기별 점수 + 처리 시간)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.query_engine import QueryEngine
+from tools.chunk_ids import make_chunk_id
+from tools.hybrid_retriever import HybridRetriever
+from conftest import FakeEmbedder
+
+
+DOCUMENTS = [
+    "스텐트 삽입 인정기준 첫 번째 문서",
+    "스텐트 삽입 인정기준 두 번째 문서",
+    "스텐트 삽입 제외사항 세 번째 문서",
+    "고관절 전치환술 인정기준",
+    "고관절 전치환술 재료 개수 기준"
+]
+
+
+class TopicEmbedder(FakeEmbedder):
+    """고관절 질문은 마지막 문서 벡터, 그 외는 첫 문서 벡터"""
+    def embed_text(self, text):
+        return [0.4] * 4 if "고관절" in text else super().embed_text(text)
+
+
+class NoAgent:
+    """검색 API는 답변 에이전트를 호출하지 않아야 함"""
+    def __getattr__(self, name):
+        raise AssertionError(f"agent.{name} 호출됨")
+
+
+def _make_engine(vector_store, monkeypatch):
+    # 고관절 문서는 primary_field가 없어 fallback 시 같은 문서의 전체 청크가 추가됨
+    metadata = [
+        {"doc_code": "D1" if i >= 3 else f"S{i}", "primary_field": i < 3}
+        for i in range(len(DOCUMENTS))
+    ]
+    path = vector_store(DOCUMENTS, metadata)
+
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    retriever = HybridRetriever(use_reranker=False, embedder=TopicEmbedder(), vector_store_path=path)
+    return QueryEngine(retriever=retriever, agent=NoAgent())
+
+
+def test_search_returns_per_leg_scores_and_timings(vector_store, monkeypatch):
+    engine = _make_engine(vector_store, monkeypatch)
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        response = client.post("/api/search", json={
+            "query": "스텐트 삽입",
+            "top_k": 2,
+            "fallback": False,
+            "rerank": False
+        })
+        assert response.status_code == 200
+        assert "Server-Timing" in response.headers
+
+        body = response.json()
+        assert len(body["results"]) == 2
+        first = body["results"][0]
+        assert first["id"] == make_chunk_id(first["text"])
+        assert first["bm25_score"] > 0
+        assert first["vector_score"] is not None
+        assert first["rerank_score"] is None
+        assert "fusion" in body["timings"]["stages"]
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_search_fallback_and_rerank_are_optional(vector_store, monkeypatch):
+    engine = _make_engine(vector_store, monkeypatch)
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        request = {"query": "고관절 전치환술", "top_k": 1}
+
+        # fallback으로 같은 문서 청크가 추가되어 후보가 top_k * 2를 넘으면 로컬 리랭크
+        full = client.post("/api/search", json=request).json()
+        assert full["results"][0]["rerank_score"] is not None
+        assert "local_rerank" in full["timings"]["stages"]
+
+        plain = client.post("/api/search", json=dict(request, fallback=False, rerank=False)).json()
+        assert len(plain["results"]) == 1
+        assert plain["results"][0]["rerank_score"] is None
+        assert "local_rerank" not in plain["timings"]["stages"]
+
+        excluded = client.post("/api/search", json=dict(request, excluded_ids=[make_chunk_id(DOCUMENTS[4])])).json()
+        assert DOCUMENTS[4] not in [r["text"] for r in excluded["results"]]
+
+        assert client.post("/api/search", json={"query": "q", "top_k": 0}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_root_lists_every_api_route():
+    from api.routes import router
+
+    listed = set(TestClient(app).get("/api/").json()["endpoints"])
+    routes = {
+        f"{method} {route.path}"
+        for route in router.routes
+        for method in route.methods
+        if route.path != "/"
+    }
+    assert listed == routes
@@ -0,0 +1,148 @@
+"""
+시맨틱 답변 캐시 테스트 (임베딩 유사도, 필터 키, LRU 제거, 청크 변경 무효화)
+"""
+
+import sys
+import os
+import asyncio
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from agent.query_engine import QueryEngine
+from tools.answer_cache import AnswerCache
+from tools.index_version import publish_index_version
+from tools.semantic_cache import SemanticAnswerCache, chunk_fingerprint
+from conftest import FakeAgent, FakeRetriever
+
+
+def test_native_numbers_match_digits_in_filter_key():
+    key = SemanticAnswerCache.make_filter_key
+    assert key("스텐트 2개 삭감돼?", procedure_code="m6561") == \
+        key("스텐트 두 개 쓰면 삭감되나요", procedure_code="M6561")
+    assert key("스텐트 2개 삭감돼?") != key("스텐트 3개 삭감돼?")
+    assert key("스텐트 2개 삭감돼?") != key("스텐트 2개 삭감돼?", material_code="A12345")
+
+
+def test_lookup_uses_threshold_and_filter_key():
+    cache = SemanticAnswerCache(max_entries=10, threshold=0.95)
+    cache.add([1.0, 0.0, 0.0], "k1", {"answer": "답변"})
+
+    assert cache.lookup([0.99, 0.05, 0.0], "k1") == {"answer": "답변"}
+    assert cache.lookup([0.99, 0.05, 0.0], "k2") is None
+    assert cache.lookup([0.7, 0.7, 0.0], "k1") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = SemanticAnswerCache(max_entries=2, threshold=0.99)
+    cache.add([1.0, 0.0, 0.0], "k", {"answer": "a"})
+    cache.add([0.0, 1.0, 0.0], "k", {"answer": "b"})
+    assert cache.lookup([1.0, 0.0, 0.0], "k") == {"answer": "a"}
+
+    cache.add([0.0, 0.0, 1.0], "k", {"answer": "c"})
+    assert len(cache) == 2
+    assert cache.lookup([0.0, 1.0, 0.0], "k") is None
+    assert cache.lookup([1.0, 0.0, 0.0], "k") == {"answer": "a"}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidates_only_entries_whose_chunks_changed():
+    cache = SemanticAnswerCache(max_entries=10, threshold=0.99)
+    cache.add([1.0, 0.0], "k", {"answer": "a"}, chunk_fingerprints=["c1", "c2"])
+    cache.add([0.0, 1.0], "k", {"answer": "b"}, chunk_fingerprints=["c3"])
+
+    assert cache.invalidate_missing_chunks({"c1", "c3"}) == 1
+    assert cache.lookup([1.0, 0.0], "k") is None
+    assert cache.lookup([0.0, 1.0], "k") == {"answer": "b"}
+
+
+def test_skips_answers_built_from_previous_index_version():
+    cache = SemanticAnswerCache(max_entries=10, threshold=0.99)
+    cache.invalidate_missing_chunks({"c1"}, index_version="v2")
+
+    # 리로드 전에 시작한 요청이 이전 인덱스로 만든 답변은 무효화 이후에 도착해도 저장하지 않음
+    cache.add([1.0, 0.0], "k", {"answer": "old"}, chunk_fingerprints=["c0"], index_version="v1")
+    assert len(cache) == 0
+
+    cache.add([1.0, 0.0], "k", {"answer": "new"}, chunk_fingerprints=["c1"], index_version="v2")
+    assert cache.lookup([1.0, 0.0], "k") == {"answer": "new"}
+
+
+class EmbeddingRetriever(FakeRetriever):
+    """질문별로 고정된 임베딩과 문서를 돌려주는 가짜 검색기 (texts: 로드된 청크)"""
+
+    def __init__(self, embeddings, doc_text, texts):
+        super().__init__([{"text": doc_text, "metadata": {}, "score": 1.0}])
+        self.embeddings = embeddings
+        self.faiss_retriever = SimpleNamespace(
+            index=SimpleNamespace(ntotal=len(texts)),
+            metadata=[{"text": text, "metadata": {}} for text in texts]
+        )
+        self.embed_calls = 0
+        self.received_embeddings = []
+
+    async def aembed_query(self, query):
+        self.embed_calls += 1
+        return self.embeddings[query]
+
+    async def asearch_with_fallback(self, query, query_embedding=None, **kwargs):
+        self.received_embeddings.append(query_embedding)
+        return await super().asearch_with_fallback(query, query_embedding=query_embedding, **kwargs)
+
+
+def test_engine_reuses_answer_for_paraphrase_until_chunk_changes(tmp_path, monkeypatch):
+    path = str(tmp_path)
+    monkeypatch.setenv("VECTOR_STORE_PATH", path)
+    publish_index_version(path)
+
+    embeddings = {
+        "스텐트 2개 삭감돼?": [1.0, 0.0, 0.0],
+        "스텐트 두 개 쓰면 삭감되나요": [0.98, 0.1, 0.0]
+    }
+    loaded_texts = ["자656 스텐트 급여기준", "다른 문서"]
+
+    def load_retriever():
+        # 리로드 시점의 청크로 새 검색기 생성 (디스크가 아니라 로드된 검색기 기준으로 무효화)
+        return EmbeddingRetriever(embeddings, doc_text=loaded_texts[0], texts=list(loaded_texts))
+
+    retriever = load_retriever()
+    agent = FakeAgent()
+    engine = QueryEngine(
+        retriever=retriever, agent=agent,
+        answer_cache=AnswerCache(db_path=""),
+        semantic_cache=SemanticAnswerCache(threshold=0.95),
+        retriever_factory=load_retriever
+    )
+
+    async def ask(question):
+        return await engine.aanswer(question=question, procedure_code="M6561")
+
+    asyncio.run(ask("스텐트 2개 삭감돼?"))
+    # 검색에 시맨틱 캐시용 임베딩을 재사용 (Bedrock 임베딩 호출 1회)
+    assert retriever.received_embeddings == [[1.0, 0.0, 0.0]]
+
+    result = asyncio.run(ask("스텐트 두 개 쓰면 삭감되나요"))
+    assert agent.calls == 1
+    assert result["question"] == "스텐트 두 개 쓰면 삭감되나요"
+
+    # 발행만 되고 리로드 전이면 서비스 중인 청크가 그대로이므로 유지
+    loaded_texts[:] = ["자656 스텐트 급여기준 (개정)", "새 문서"]
+    publish_index_version(path)
+    asyncio.run(ask("스텐트 두 개 쓰면 삭감되나요"))
+    assert agent.calls == 1
+
+    # 관련 없는 청크만 바뀐 인덱스로 교체되면 유지
+    loaded_texts[:] = ["자656 스텐트 급여기준", "새 문서"]
+    engine.reload_index()
+    asyncio.run(ask("스텐트 두 개 쓰면 삭감되나요"))
+    assert agent.calls == 1
+
+    # 답변에 사용한 청크가 바뀐 인덱스로 교체되면 무효화
+    loaded_texts[:] = ["자656 스텐트 급여기준 (개정)", "새 문서"]
+    publish_index_version(path)
+    engine.reload_index()
+    asyncio.run(ask("스텐트 두 개 쓰면 삭감되나요"))
+    assert agent.calls == 2
+    assert chunk_fingerprint("자656 스텐트 급여기준") != chunk_fingerprint("자656 스텐트 급여기준 (개정)")
@@ -0,0 +1,134 @@
+"""
+서버측 대화 세션 + 이전 대화 토큰 예산 테스트
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from api.routes import get_engine
+from agent.query_engine import QueryEngine
+from tools.history_budget import HistoryBudget, SUMMARY_PREFIX
+from tools.session_store import SessionStore
+from conftest import FakeAgent, FakeRetriever
+
+
+def _turns(n, size=10, start=0):
+    messages = []
+    for i in range(start, start + n):
+        messages.append({"role": "user", "content": f"질문{i}" + "가" * size})
+        messages.append({"role": "assistant", "content": f"답변{i}" + "나" * size})
+    return messages
+
+
+def test_session_store_trims_whole_turns_and_shares_disk(tmp_path):
+    db_path = str(tmp_path / "sessions.sqlite")
+    store = SessionStore(max_sessions=10, ttl=60, max_messages=4, db_path=db_path)
+    for i in range(3):
+        store.append_turn("s1", f"질문{i}", f"답변{i}")
+
+    assert [m["content"] for m in store.get("s1")] == ["질문1", "답변1", "질문2", "답변2"]
+    # 다른 워커(별도 메모리)도 디스크에서 같은 세션을 봄
+    other = SessionStore(max_sessions=10, ttl=60, max_messages=4, db_path=db_path)
+    assert other.get("s1") == store.get("s1")
+
+    other.delete("s1")
+    assert store.get("s1") == []
+    assert not SessionStore.is_valid_id("../etc")
+
+
+def test_history_budget_keeps_recent_turns_from_user_message():
+    budget = HistoryBudget(token_budget=30, summary_enabled=False)
+    older, recent = budget.split(_turns(4))
+
+    assert len(older) + len(recent) == 8
+    assert recent[0]["role"] == "user"
+    assert sum(len(m["content"]) for m in recent) <= 60
+    assert budget.fit(_turns(4)) == recent
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.calls = []
+
+    def summarize_history(self, previous_summary, messages):
+        self.calls.append((previous_summary, [m["content"] for m in messages]))
+        return f"요약{len(self.calls)}"
+
+
+def test_history_summary_is_cached_and_extended_incrementally():
+    budget = HistoryBudget(token_budget=30, summary_enabled=True, summary_cache_size=16)
+    summarizer = FakeSummarizer()
+    history = _turns(4)
+
+    fitted = budget.fit(history, summarizer)
+    assert fitted[0]["content"] == f"{SUMMARY_PREFIX}\n요약1"
+    assert budget.fit(history, summarizer) == fitted
+    assert len(summarizer.calls) == 1
+
+    # 대화가 길어지면 이전 요약에 새로 밀려난 턴만 덧붙여 요약
+    fitted = budget.fit(history + _turns(1, start=4), summarizer)
+    assert summarizer.calls[0] == (None, [m["content"] for m in _turns(2)])
+    assert summarizer.calls[1] == ("요약1", [m["content"] for m in _turns(1, start=2)])
+    assert fitted[0]["content"] == f"{SUMMARY_PREFIX}\n요약2"
+    assert fitted[2:] == _turns(2, start=3)
+
+
+class FailingSummarizer:
+    def summarize_history(self, previous_summary, messages):
+        raise RuntimeError("throttled")
+
+
+def test_history_summary_failure_falls_back_to_recent_turns():
+    budget = HistoryBudget(token_budget=30, summary_enabled=True)
+    _, recent = budget.split(_turns(4))
+    assert budget.fit(_turns(4), FailingSummarizer()) == recent
+
+
+class HistoryAgent(FakeAgent):
+    """받은 이전 대화를 기록하고 질문을 되풀이하는 가짜 답변 에이전트"""
+
+    def __init__(self):
+        super().__init__()
+        self.histories = []
+
+    async def aanswer_query(self, question, conversation_history=None, **kwargs):
+        self.histories.append(conversation_history)
+        result = await super().aanswer_query(question, conversation_history=conversation_history, **kwargs)
+        return dict(result, answer=f"{question} 답변")
+
+
+def test_api_session_replaces_client_history(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    agent = HistoryAgent()
+    engine = QueryEngine(
+        retriever=FakeRetriever(),
+        agent=agent,
+        session_store=SessionStore(max_sessions=10, ttl=60, max_messages=20, db_path="")
+    )
+    app.dependency_overrides[get_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        session_id = client.post("/api/sessions").json()["session_id"]
+
+        first = client.post("/api/query", json={"question": "스텐트 삭감돼?", "session_id": session_id})
+        assert first.json()["session_id"] == session_id
+        client.post("/api/query", json={"question": "개수 제한은?", "session_id": session_id})
+
+        assert agent.histories[0] is None
+        assert agent.histories[1] == [
+            {"role": "user", "content": "스텐트 삭감돼?"},
+            {"role": "assistant", "content": "스텐트 삭감돼? 답변"}
+        ]
+        assert len(client.get(f"/api/sessions/{session_id}").json()["messages"]) == 4
+
+        assert client.delete(f"/api/sessions/{session_id}").status_code == 204
+        assert client.get(f"/api/sessions/{session_id}").json()["messages"] == []
+        assert client.post("/api/query", json={"question": "q", "session_id": "bad id!"}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,128 @@
+"""
+동시 요청 합치기 테스트 (같은 질문의 동시 요청은 Claude 호출 1회)
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from agent.query_engine import QueryEngine
+from tools.singleflight import SingleFlight
+from conftest import FakeAgent, FakeRetriever
+
+
+class SlowAgent(FakeAgent):
+    """응답이 느린 가짜 답변 에이전트"""
+
+    def __init__(self, tokens=("판단: ", "인정됨")):
+        super().__init__(answer="".join(tokens))
+        self.tokens = tokens
+
+    async def aanswer_query(self, question, **kwargs):
+        await asyncio.sleep(0.05)
+        return await super().aanswer_query(question, **kwargs)
+
+    def prepare_query(self, question, material_code, procedure_code, retrieved_docs):
+        return question, "", []
+
+    async def astream_claude(self, user_message, context="", conversation_history=None):
+        self.calls += 1
+        for token in self.tokens:
+            await asyncio.sleep(0.02)
+            yield token
+
+
+def _engine(agent, retriever):
+    # 캐시 없이 합치기 동작만 확인 (ANSWER_CACHE_ENABLED/SEMANTIC_CACHE_ENABLED=false)
+    return QueryEngine(retriever=retriever, agent=agent)
+
+
+def test_concurrent_identical_queries_share_one_generation(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    agent, retriever = SlowAgent(), FakeRetriever()
+    engine = _engine(agent, retriever)
+
+    async def burst():
+        return await asyncio.gather(
+            engine.aanswer(question="스텐트 2개 삭감돼?", procedure_code="M6561"),
+            engine.aanswer(question="스텐트 2개  삭감돼", procedure_code="m6561"),
+            engine.aanswer(question="스텐트 2개 삭감돼?", procedure_code="M6561"),
+            engine.aanswer(question="스텐트 3개 삭감돼?", procedure_code="M6561")
+        )
+
+    results = asyncio.run(burst())
+    assert agent.calls == 2
+    assert retriever.calls == 2
+    assert results[1]["question"] == "스텐트 2개  삭감돼"
+    assert engine.singleflight.stats() == {"in_flight": 0, "leaders": 2, "followers": 2}
+
+
+def test_concurrent_streams_share_one_upstream(monkeypatch):
+    monkeypatch.setenv("ANSWER_CACHE_ENABLED", "false")
+    monkeypatch.setenv("SEMANTIC_CACHE_ENABLED", "false")
+    agent, retriever = SlowAgent(), FakeRetriever()
+    engine = _engine(agent, retriever)
+
+    async def collect(question, delay):
+        await asyncio.sleep(delay)
+        return [event async for event in engine.astream(question=question)]
+
+    async def burst():
+        # 두 번째 요청은 첫 토큰 이후에 합류해도 처음부터 전체 이벤트를 받음
+        return await asyncio.gather(
+            collect("스텐트 2개 삭감돼?", 0),
+            collect("스텐트 2개 삭감돼", 0.03)
+        )
+
+    first, second = asyncio.run(burst())
+    assert agent.calls == 1
+    assert [name for name, _ in first] == ["sources", "token", "token", "done"]
+    assert [name for name, _ in second] == [name for name, _ in first]
+    assert second[0][1]["question"] == "스텐트 2개 삭감돼"
+    assert second[-1][1]["answer"] == "판단: 인정됨"
+
+
+def test_cancelled_waiter_does_not_cancel_shared_work():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "ok"
+    assert calls == [1]
+
+
+def test_stream_error_reaches_every_subscriber():
+    flight = SingleFlight()
+
+    async def failing():
+        yield "sources"
+        await asyncio.sleep(0.01)
+        raise RuntimeError("ThrottlingException")
+
+    async def subscriber():
+        items = []
+        try:
+            async for item in flight.stream("k", failing):
+                items.append(item)
+        except RuntimeError as e:
+            items.append(str(e))
+        return items
+
+    async def scenario():
+        return await asyncio.gather(subscriber(), subscriber())
+
+    assert asyncio.run(scenario()) == [["sources", "ThrottlingException"]] * 2
@@ -0,0 +1,35 @@
+"""
+서빙 경로 지연 로딩 테스트 (api.main import 시 전처리/PDF 스택을 로드하지 않음)
+"""
+
+import sys
+import os
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from benchmark_startup import DEFERRED_MODULES
+from tools.env import load_env
+
+
+def test_api_import_does_not_load_ingestion_stack():
+    code = (
+        "import sys, api.main; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.join(os.path.dirname(__file__), 'src'),
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_package_exports_load_on_first_access():
+    import tools
+    import agent
+    assert tools.TitanEmbedder.__module__ == "tools.embedder_tool"
+    assert agent.QueryEngine.__module__ == "agent.query_engine"
+    assert not load_env()
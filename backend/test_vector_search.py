@@ -0,0 +1,78 @@
+"""
+임베딩 차원 설정 + 2단계(저차원 후보 → 전체 차원 재채점) 벡터 검색 테스트
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import numpy as np
+import faiss
+import pytest
+
+from benchmark_vector_search import synthetic_vectors, sample_queries, evaluate
+from tools.embedder_tool import TitanEmbedder
+from tools.faiss_retriever import FAISSRetriever
+from pipeline_pdf_incremental import IncrementalPDFPreprocessor
+from conftest import FakeEmbedder
+
+
+def test_two_stage_recall_stays_within_tolerance():
+    index = faiss.IndexFlatL2(1024)
+    index.add(synthetic_vectors(3000, clusters=64))
+    queries = sample_queries(index.reconstruct_n(0, index.ntotal), 50)
+
+    result = evaluate(index, queries, k=10, coarse_dimensions=256, candidates=10)
+    assert result["recall"] >= 0.95
+    assert result["full_bytes"] == index.ntotal * index.d * 4
+    assert result["coarse_bytes"] * 4 == result["full_bytes"]
+
+
+def test_retriever_rescores_coarse_candidates_with_full_vectors(vector_store, monkeypatch):
+    vectors = synthetic_vectors(500, clusters=16)
+    path = vector_store([f"청크 {i}" for i in range(len(vectors))], vectors=vectors)
+    index = faiss.read_index(os.path.join(path, "faiss_index.bin"))
+
+    monkeypatch.setenv("FAISS_COARSE_DIMENSIONS", "256")
+    retriever = FAISSRetriever(embedder=FakeEmbedder(), vector_store_path=path)
+    assert retriever.coarse_index.d == 256
+
+    query = sample_queries(vectors, 1)[0]
+    results = retriever.search_by_vector(query, top_k=5)
+    distances, ids = index.search(query[None, :], 5)
+    assert [r["text"] for r in results] == [f"청크 {i}" for i in ids[0]]
+    assert np.allclose([r["score"] for r in results], distances[0], atol=1e-5)
+
+
+def test_embedding_dimensions_are_configurable(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_DIMENSIONS", "256")
+    embedder = TitanEmbedder()
+    assert embedder._build_body("질의")["dimensions"] == 256
+
+    monkeypatch.setenv("EMBEDDING_DIMENSIONS", "300")
+    with pytest.raises(ValueError):
+        TitanEmbedder()
+
+
+class MismatchedEmbedder(FakeEmbedder):
+    dimensions = 256
+
+    def embed_texts(self, texts, progress_callback=None, concurrency=None):
+        raise AssertionError("차원이 다르면 임베딩 전에 중단해야 함")
+
+
+def test_dimension_mismatch_fails_at_load_and_before_embedding(tmp_path, vector_store, monkeypatch):
+    vector_store([f"청크 {i}" for i in range(10)], vectors=synthetic_vectors(10, clusters=2))
+
+    # 벡터 검색이 조용히 빈 결과를 반환하는 대신 로드(리로드)를 거부
+    with pytest.raises(ValueError, match="EMBEDDING_DIMENSIONS"):
+        FAISSRetriever(embedder=MismatchedEmbedder(), vector_store_path=str(tmp_path))
+
+    # 증분 학습은 PDF 처리/임베딩 전에 중단
+    monkeypatch.setenv("VECTOR_STORE_PATH", str(tmp_path))
+    (tmp_path / "pdfs").mkdir()
+    (tmp_path / "pdfs" / "new.pdf").write_bytes(b"")
+    preprocessor = IncrementalPDFPreprocessor(embedder=MismatchedEmbedder())
+    with pytest.raises(ValueError, match="--force"):
+        preprocessor.process_new_pdfs(str(tmp_path / "pdfs"))
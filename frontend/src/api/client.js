@@ -3,6 +3,9 @@ import axios from 'axios'
 // API 기본 URL 설정
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api'
 
+// 단계별 처리 시간 표시 (파워 유저/디버그용)
+const SHOW_TIMINGS = import.meta.env.VITE_SHOW_TIMINGS === 'true'
+
 // axios 인스턴스 생성
 const apiClient = axios.create({
   baseURL: API_BASE_URL,
@@ -41,7 +44,7 @@ apiClient.interceptors.response.use(
 export const queryInsuranceCriteria = async (
   question, 
   conversationHistory = null,
-  excludedSources = null
+  excludedIds = null
 ) => {
   try {
     const requestBody = {
@@ -53,9 +56,13 @@ export const queryInsuranceCriteria = async (
       requestBody.conversation_history = conversationHistory
     }
     
-    // 제외할 문서 목록이 있을 때만 추가
-    if (excludedSources && excludedSources.length > 0) {
-      requestBody.excluded_sources = excludedSources
+    // 제외할 문서 ID 목록이 있을 때만 추가
+    if (excludedIds && excludedIds.length > 0) {
+      requestBody.excluded_ids = excludedIds
+    }
+    
+    if (SHOW_TIMINGS) {
+      requestBody.include_timings = true
     }
     
     const response = await apiClient.post('/query', requestBody)
@@ -69,6 +76,119 @@ export const queryInsuranceCriteria = async (
   }
 }
 
+/**
+ * 보험 인정기준 질의 API (SSE 스트리밍)
+ *
+ * 검색이 끝나면 onSources로 참고 문서를 먼저 받고,
+ * 답변은 onToken으로 생성되는 대로 받습니다.
+ * axios는 브라우저에서 응답 스트림을 읽을 수 없으므로 fetch를 사용합니다.
+ */
+export const streamInsuranceCriteria = async (
+  question,
+  conversationHistory = null,
+  excludedIds = null,
+  { onSources, onToken, sessionId } = {}
+) => {
+  const requestBody = {
+    question: question
+  }
+
+  // 세션을 쓰면 이전 대화는 서버가 보관하므로 전체 히스토리를 보내지 않음
+  if (sessionId) {
+    requestBody.session_id = sessionId
+  } else if (conversationHistory && conversationHistory.length > 0) {
+    requestBody.conversation_history = conversationHistory
+  }
+
+  // 제외할 문서 ID 목록이 있을 때만 추가
+  if (excludedIds && excludedIds.length > 0) {
+    requestBody.excluded_ids = excludedIds
+  }
+
+  if (SHOW_TIMINGS) {
+    requestBody.include_timings = true
+  }
+
+  const response = await fetch(`${API_BASE_URL}/query/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Accept': 'text/event-stream',
+    },
+    body: JSON.stringify(requestBody),
+  })
+
+  if (!response.ok || !response.body) {
+    let detail = null
+    try {
+      detail = (await response.json()).detail
+    } catch (e) {
+      // 본문이 JSON이 아닌 경우 무시
+    }
+    throw new Error(detail || '서버와의 통신 중 오류가 발생했습니다.')
+  }
+
+  const result = { answer: '', sources: [] }
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  // SSE 메시지 하나("event: ...\ndata: ...") 처리
+  const handleMessage = (message) => {
+    let event = 'message'
+    let data = ''
+    for (const line of message.split('\n')) {
+      if (line.startsWith('event: ')) event = line.slice(7)
+      else if (line.startsWith('data: ')) data += line.slice(6)
+    }
+    if (!data) return
+
+    const payload = JSON.parse(data)
+    if (event === 'sources') {
+      Object.assign(result, payload)
+      onSources?.(payload)
+    } else if (event === 'token') {
+      result.answer += payload.text
+      onToken?.(payload.text)
+    } else if (event === 'done') {
+      result.answer = payload.answer
+      if (payload.timings) result.timings = payload.timings
+    } else if (event === 'error') {
+      throw new Error(payload.detail)
+    }
+  }
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary !== -1) {
+      handleMessage(buffer.slice(0, boundary))
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf('\n\n')
+    }
+  }
+
+  return result
+}
+
+/**
+ * 대화 세션 삭제 API (대화 초기화)
+ */
+export const deleteSession = async (sessionId) => {
+  try {
+    await apiClient.delete(`/sessions/${sessionId}`)
+  } catch (error) {
+    throw new Error(
+      error.response?.data?.detail ||
+      error.message ||
+      '세션 삭제 중 오류가 발생했습니다.'
+    )
+  }
+}
+
 /**
  * 데이터 전처리 API
  */
@@ -87,6 +207,95 @@ export const preprocessData = async (dataPath = './data/raw/sample_criteria.json
   }
 }
 
+/**
+ * 전처리 작업 상태 조회 API
+ */
+export const getJob = async (jobId) => {
+  try {
+    const response = await apiClient.get(`/jobs/${jobId}`)
+    return response.data
+  } catch (error) {
+    throw new Error(
+      error.response?.data?.detail || 
+      error.message || 
+      '작업 상태 조회 중 오류가 발생했습니다.'
+    )
+  }
+}
+
+/**
+ * 전처리 작업 취소 API
+ */
+export const cancelJob = async (jobId) => {
+  try {
+    const response = await apiClient.post(`/jobs/${jobId}/cancel`)
+    return response.data
+  } catch (error) {
+    throw new Error(
+      error.response?.data?.detail || 
+      error.message || 
+      '작업 취소 중 오류가 발생했습니다.'
+    )
+  }
+}
+
+/**
+ * 참고 문서 전체 텍스트 조회 API (sources에는 ID와 미리보기만 포함)
+ */
+export const getChunk = async (chunkId) => {
+  try {
+    const response = await apiClient.get(`/chunks/${encodeURIComponent(chunkId)}`)
+    return response.data
+  } catch (error) {
+    throw new Error(
+      error.response?.data?.detail || 
+      error.message || 
+      '문서 조회 중 오류가 발생했습니다.'
+    )
+  }
+}
+
+/**
+ * 코드 카탈로그 검색 API (서버에서 검색, 정렬, 페이지네이션)
+ */
+export const searchCodes = async (
+  { q = '', type, field = 'all', sort = 'code', order = 'asc', page = 1, pageSize = 100 },
+  signal
+) => {
+  try {
+    const response = await apiClient.get('/codes', {
+      params: { q, type, field, sort, order, page, page_size: pageSize },
+      signal,
+    })
+    return response.data
+  } catch (error) {
+    throw new Error(
+      error.response?.data?.detail || 
+      error.message || 
+      '코드 검색 중 오류가 발생했습니다.'
+    )
+  }
+}
+
+/**
+ * 코드 자동완성 API
+ */
+export const codeTypeahead = async (q, type, signal, limit = 10) => {
+  try {
+    const response = await apiClient.get('/codes/typeahead', {
+      params: { q, type, limit },
+      signal,
+    })
+    return response.data
+  } catch (error) {
+    throw new Error(
+      error.response?.data?.detail || 
+      error.message || 
+      '코드 자동완성 중 오류가 발생했습니다.'
+    )
+  }
+}
+
 /**
  * 헬스 체크 API
  */
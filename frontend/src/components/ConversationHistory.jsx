@@ -4,7 +4,7 @@ import { parseAnswer } from '../utils/parseAnswer'
 const ConversationHistory = ({ 
   conversations, 
   onClearHistory, 
-  excludedSources = [], 
+  excludedIds = [], 
   onExcludeSource, 
   onRequery 
 }) => {
@@ -123,7 +123,7 @@ const ConversationHistory = ({
                 <div className="mt-4 p-4 bg-amber-50 rounded-xl border border-amber-200 shadow-sm">
                   <SourcesList 
                     sources={conversation.sources}
-                    excludedSources={isLastConversation(index) ? excludedSources : []}
+                    excludedIds={isLastConversation(index) ? excludedIds : []}
                     onExclude={isLastConversation(index) ? onExcludeSource : null}
                     onRequery={isLastConversation(index) ? onRequery : null}
                   />
@@ -1,15 +1,42 @@
 import { useState } from 'react'
-import { queryInsuranceCriteria } from '../api/client'
+import { streamInsuranceCriteria, deleteSession } from '../api/client'
 import ConversationHistory from './ConversationHistory'
 import LoadingSpinner from './LoadingSpinner'
 
+// 서버측 대화 세션 ID (이전 대화는 서버가 보관)
+const newSessionId = () => crypto.randomUUID().replace(/-/g, '')
+
 function MainView() {
   const [query, setQuery] = useState('')
   const [loading, setLoading] = useState(false)
+  const [streaming, setStreaming] = useState(false)
   const [error, setError] = useState(null)
   const [conversations, setConversations] = useState([])
-  const [excludedSources, setExcludedSources] = useState([])
+  const [excludedIds, setExcludedIds] = useState([])
   const [lastQuery, setLastQuery] = useState(null)
+  const [sessionId, setSessionId] = useState(newSessionId)
+
+  // 스트리밍 질의: 참고 문서가 도착하면 답변 말풍선을 만들고 토큰을 이어 붙임
+  const runStreamingQuery = async (question, excluded) => {
+    await streamInsuranceCriteria(
+      question,
+      null,
+      excluded,
+      {
+        sessionId,
+        onSources: (data) => {
+          setStreaming(true)
+          setConversations(prev => [...prev, { ...data, answer: '' }])
+        },
+        onToken: (text) => {
+          setConversations(prev => {
+            const last = prev[prev.length - 1]
+            return [...prev.slice(0, -1), { ...last, answer: last.answer + text }]
+          })
+        },
+      }
+    )
+  }
 
   const handleSubmit = async (e) => {
     e.preventDefault()
@@ -20,19 +47,7 @@ function MainView() {
     setLastQuery({ question: currentQuery })
 
     try {
-      // 대화 히스토리를 API 형식으로 변환
-      const apiConversationHistory = conversations.map(conv => [
-        { role: 'user', content: conv.question },
-        { role: 'assistant', content: conv.answer }
-      ]).flat()
-
-      const response = await queryInsuranceCriteria(
-        currentQuery,
-        apiConversationHistory.length > 0 ? apiConversationHistory : null,
-        excludedSources
-      )
-      
-      setConversations(prev => [...prev, response])
+      await runStreamingQuery(currentQuery, excludedIds)
       setQuery('')
       setError(null)
     } catch (err) {
@@ -40,45 +55,37 @@ function MainView() {
       setError(err.message || '오류가 발생했습니다.')
     } finally {
       setLoading(false)
+      setStreaming(false)
     }
   }
 
   const handleClearHistory = () => {
+    deleteSession(sessionId).catch(() => {}) // 실패해도 새 세션으로 시작 (이전 세션은 TTL로 만료)
+    setSessionId(newSessionId())
     setConversations([])
     setQuery('')
     setError(null)
-    setExcludedSources([])
+    setExcludedIds([])
     setLastQuery(null)
   }
 
-  const handleExcludeSource = (sourceText) => {
-    setExcludedSources(prev => [...prev, sourceText])
+  const handleExcludeSource = (sourceId) => {
+    setExcludedIds(prev => [...prev, sourceId])
   }
 
   const handleRequery = async () => {
-    if (!lastQuery || excludedSources.length === 0) return
+    if (!lastQuery || excludedIds.length === 0) return
     
     setLoading(true)
     try {
-      // 대화 히스토리를 API 형식으로 변환
-      const apiConversationHistory = conversations.map(conv => [
-        { role: 'user', content: conv.question },
-        { role: 'assistant', content: conv.answer }
-      ]).flat()
-
-      const result = await queryInsuranceCriteria(
-        lastQuery.question,
-        apiConversationHistory.length > 0 ? apiConversationHistory : null,
-        excludedSources
-      )
-      
-      setConversations(prev => [...prev, result])
-      setExcludedSources([]) // 재검색 후 제외 목록 초기화
+      await runStreamingQuery(lastQuery.question, excludedIds)
+      setExcludedIds([]) // 재검색 후 제외 목록 초기화
       setError(null)
     } catch (err) {
       setError(err.message || '오류가 발생했습니다.')
     } finally {
       setLoading(false)
+      setStreaming(false)
     }
   }
 
@@ -198,14 +205,14 @@ function MainView() {
               <ConversationHistory 
                 conversations={conversations}
                 onClearHistory={handleClearHistory}
-                excludedSources={excludedSources}
+                excludedIds={excludedIds}
                 onExcludeSource={handleExcludeSource}
                 onRequery={handleRequery}
               />
             </div>
 
-            {/* Loading State */}
-            {loading && (
+            {/* Loading State - 답변 스트리밍이 시작되면 숨김 */}
+            {loading && !streaming && (
               <div className="animate-slideInDown">
                 <LoadingSpinner />
               </div>
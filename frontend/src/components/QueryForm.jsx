@@ -6,7 +6,7 @@ const QueryForm = ({
   onLoading, 
   onError, 
   conversationHistory = [],
-  excludedSources = []
+  excludedIds = []
 }) => {
   const [formData, setFormData] = useState({
     question: '',
@@ -39,7 +39,7 @@ const QueryForm = ({
       const result = await queryInsuranceCriteria(
         formData.question,
         apiConversationHistory.length > 0 ? apiConversationHistory : null,
-        excludedSources.length > 0 ? excludedSources : null
+        excludedIds.length > 0 ? excludedIds : null
       )
       
       // 쿼리 정보도 함께 전달 (재검색용)
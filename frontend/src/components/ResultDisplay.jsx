@@ -1,7 +1,45 @@
 import SourcesList from './SourcesList'
 import { parseAnswer } from '../utils/parseAnswer'
 
-const ResultDisplay = ({ result, excludedSources = [], onExcludeSource, onRequery }) => {
+// 단계별 처리 시간 (include_timings 응답, 느린 답변 원인 확인용)
+const TimingsPanel = ({ timings }) => {
+  const stages = Object.entries(timings.stages || {})
+  const candidates = timings.candidates || {}
+
+  return (
+    <details className="mt-6 pt-6 border-t border-gray-200 text-sm text-gray-700">
+      <summary className="cursor-pointer font-medium">
+        ⏱ 처리 시간 {timings.total_ms.toLocaleString()}ms
+      </summary>
+      <table className="mt-3 min-w-full border-collapse text-xs">
+        <thead>
+          <tr className="bg-gray-50">
+            <th className="border border-gray-200 px-3 py-1 text-left">단계</th>
+            <th className="border border-gray-200 px-3 py-1 text-right">시간(ms)</th>
+            <th className="border border-gray-200 px-3 py-1 text-right">후보 수</th>
+          </tr>
+        </thead>
+        <tbody>
+          {stages.map(([stage, ms]) => (
+            <tr key={stage}>
+              <td className="border border-gray-200 px-3 py-1 font-mono">{stage}</td>
+              <td className="border border-gray-200 px-3 py-1 text-right">{ms.toLocaleString()}</td>
+              <td className="border border-gray-200 px-3 py-1 text-right">{candidates[stage] ?? '-'}</td>
+            </tr>
+          ))}
+        </tbody>
+      </table>
+      {timings.prompt_chars !== undefined && (
+        <div className="mt-2 text-xs text-gray-500">
+          프롬프트 {timings.prompt_chars.toLocaleString()}자
+          {timings.coalesced && ' · 동시 요청 합쳐짐'}
+        </div>
+      )}
+    </details>
+  )
+}
+
+const ResultDisplay = ({ result, excludedIds = [], onExcludeSource, onRequery }) => {
   if (!result) return null
 
   // 답변 내용 파싱 (테이블과 일반 텍스트 구분)
@@ -89,12 +127,15 @@ const ResultDisplay = ({ result, excludedSources = [], onExcludeSource, onRequer
           <div className="mt-6 pt-6 border-t border-gray-200">
             <SourcesList 
               sources={result.sources} 
-              excludedSources={excludedSources}
+              excludedIds={excludedIds}
               onExclude={onExcludeSource}
               onRequery={onRequery}
             />
           </div>
         )}
+
+        {/* 단계별 처리 시간 (VITE_SHOW_TIMINGS=true) */}
+        {result.timings && <TimingsPanel timings={result.timings} />}
       </div>
     </div>
   )
@@ -1,4 +1,52 @@
-const SourcesList = ({ sources, excludedSources = [], onExclude, onRequery }) => {
+import { useState } from 'react'
+import { getChunk } from '../api/client'
+
+// 미리보기(snippet)만 보여주고, 펼칠 때 전체 텍스트를 한 번만 가져옴
+const SourceText = ({ source }) => {
+  const [fullText, setFullText] = useState(null)
+  const [expanded, setExpanded] = useState(false)
+  const [loading, setLoading] = useState(false)
+  const [error, setError] = useState(null)
+
+  if (!source.snippet) return null
+
+  const toggle = async () => {
+    if (expanded) {
+      setExpanded(false)
+      return
+    }
+    if (fullText === null && source.id) {
+      setLoading(true)
+      setError(null)
+      try {
+        const chunk = await getChunk(source.id)
+        setFullText(chunk.text)
+      } catch (err) {
+        setError(err.message)
+        return
+      } finally {
+        setLoading(false)
+      }
+    }
+    setExpanded(true)
+  }
+
+  return (
+    <div className="text-xs text-stone-600 bg-stone-50 rounded p-2">
+      <p className="whitespace-pre-wrap">{expanded && fullText ? fullText : source.snippet}</p>
+      <button
+        onClick={toggle}
+        disabled={loading}
+        className="mt-1 text-blue-600 hover:text-blue-800 font-medium disabled:opacity-50"
+      >
+        {loading ? '불러오는 중...' : expanded ? '접기' : '전체 보기'}
+      </button>
+      {error && <div className="mt-1 text-red-600">{error}</div>}
+    </div>
+  )
+}
+
+const SourcesList = ({ sources, excludedIds = [], onExclude, onRequery }) => {
   if (!sources || sources.length === 0) return null
 
   // 유사도가 높은 순으로 정렬 (score가 작을수록 유사도가 높음)
@@ -14,21 +62,21 @@ const SourcesList = ({ sources, excludedSources = [], onExclude, onRequery }) =>
         <h3 className="text-base font-bold text-stone-800 flex items-center gap-2">
           📚 참고 문서
         </h3>
-        {excludedSources.length > 0 && onRequery && (
+        {excludedIds.length > 0 && onRequery && (
           <button
             onClick={onRequery}
             className="px-3 py-1.5 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors text-xs font-medium shadow-sm"
           >
-            🔄 다시 검색 ({excludedSources.length}개 제외)
+            🔄 다시 검색 ({excludedIds.length}개 제외)
           </button>
         )}
       </div>
       <div className="space-y-3">
         {sortedSources.map((source, index) => {
-          const isExcluded = excludedSources.includes(source.text)
+          const isExcluded = excludedIds.includes(source.id)
           return (
             <div
-              key={index}
+              key={source.id || index}
               className={`rounded-lg p-3 border transition-colors ${
                 isExcluded 
                   ? 'bg-red-50 border-red-200 opacity-60' 
@@ -65,6 +113,9 @@ const SourcesList = ({ sources, excludedSources = [], onExclude, onRequery }) =>
                   )}
                 </div>
 
+                {/* 미리보기 (전체 텍스트는 펼칠 때 로드) */}
+                <SourceText source={source} />
+
                 {/* 유사도와 버튼 - 별도 행 */}
                 <div className="flex items-center justify-between gap-2 pt-2 border-t border-stone-100">
                   <span className="inline-flex items-center px-2 py-1 rounded text-xs font-medium bg-stone-100 text-stone-700">
@@ -72,7 +123,7 @@ const SourcesList = ({ sources, excludedSources = [], onExclude, onRequery }) =>
                   </span>
                   {onExclude && !isExcluded && (
                     <button
-                      onClick={() => onExclude(source.text)}
+                      onClick={() => onExclude(source.id)}
                       className="px-2.5 py-1 bg-red-100 text-red-700 rounded text-xs font-medium hover:bg-red-200 transition-colors flex-shrink-0"
                       title="이 문서를 제외하고 다시 검색"
                     >